@@ -2,6 +2,7 @@ import os
 import shutil
 import unittest
 
+import lmdb
 import yaml
 
 from ymir_exc import dataset_reader as dr, env, settings
@@ -16,6 +17,7 @@ class TestDatasetReader(unittest.TestCase):
         self._custom_env_file = os.path.join(self._test_root, 'env.yml')
         self._training_index_file = os.path.join(
             self._test_root, 'training-index.tsv')
+        self._assets_dir = os.path.join(self._test_root, 'assets')
 
     def setUp(self) -> None:
         settings.DEFAULT_ENV_FILE_PATH = self._custom_env_file
@@ -42,7 +44,7 @@ class TestDatasetReader(unittest.TestCase):
             'run_infer': False,
             'input': {
                 'root_dir': '/in1',
-                'assets_dir': '/in1/assets',
+                'assets_dir': self._assets_dir,
                 'annotations_dir': '/in1/annotations',
                 'models_dir': '/in1/models',
                 'training_index_file': self._training_index_file,
@@ -85,3 +87,24 @@ class TestDatasetReader(unittest.TestCase):
             dr.item_paths(dataset_type=env.DatasetType.CANDIDATE)
         except Exception as e:
             self.assertTrue(isinstance(e, ValueError))
+
+    def test_01(self) -> None:
+        # lmdb asset format: index files list keys
+        os.makedirs(self._assets_dir, exist_ok=True)
+        lmdb_env = lmdb.open(os.path.join(self._assets_dir, settings.LMDB_DIR_NAME))
+        with lmdb_env.begin(write=True) as txn:
+            for idx in range(3):
+                txn.put(f"a{idx}".encode(), f"asset-{idx}".encode())
+                txn.put(f"gt/a{idx}".encode(), f"annotation-{idx}".encode())
+        lmdb_env.close()
+        with open(self._training_index_file, 'w') as f:
+            f.write(''.join(f"a{idx}\tgt/a{idx}\n" for idx in range(3)))
+
+        items = [(bytes(asset), bytes(annotation))
+                 for asset, annotation in dr.lmdb_items(dataset_type=env.DatasetType.TRAINING)]
+        self.assertEqual([(f"asset-{idx}".encode(), f"annotation-{idx}".encode()) for idx in range(3)], items)
+
+        with open(self._training_index_file, 'w') as f:
+            f.write('a3\tgt/a3\n')
+        with self.assertRaises(KeyError):
+            list(dr.lmdb_items(dataset_type=env.DatasetType.TRAINING))
@@ -1,6 +1,9 @@
-from typing import Iterator, Tuple
+import os
+from typing import Iterator, Optional, Tuple
 
-from ymir_exc import env
+import lmdb
+
+from ymir_exc import env, settings
 
 
 def _index_file_for_dataset_type(env_config: env.EnvConfig, dataset_type: env.DatasetType) -> str:
@@ -32,3 +35,27 @@ def item_paths(dataset_type: env.DatasetType) -> Iterator[Tuple[str, str]]:
 
 def items_count(dataset_type: env.DatasetType) -> int:
     return len(list(item_paths(dataset_type=dataset_type)))
+
+
+def lmdb_items(dataset_type: env.DatasetType) -> Iterator[Tuple[memoryview, Optional[memoryview]]]:
+    """
+    iterates (asset, annotation) buffers of dataset exported in lmdb asset format,
+        index files of this format list lmdb keys instead of file paths
+
+    buffers are zero-copy views of the memory mapped lmdb, only valid before next item,
+        use `bytes(buffer)` if needed later, annotation buffer is None if dataset has no annotations
+    """
+    env_config = env.get_current_env()
+    lmdb_env = lmdb.open(os.path.join(env_config.input.assets_dir, settings.LMDB_DIR_NAME),
+                         readonly=True,
+                         lock=False,
+                         readahead=False)
+    try:
+        with lmdb_env.begin(buffers=True) as txn:
+            for asset_key, annotation_key in item_paths(dataset_type=dataset_type):
+                asset_buffer = txn.get(asset_key.encode())
+                if asset_buffer is None:
+                    raise KeyError(f"asset not found in lmdb: {asset_key}")
+                yield asset_buffer, (txn.get(annotation_key.encode()) if annotation_key else None)
+    finally:
+        lmdb_env.close()
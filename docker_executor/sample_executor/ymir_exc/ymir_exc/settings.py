@@ -3,3 +3,6 @@
 # if your app is running inside docker image, env file is always at /in/env.yaml
 # you can change the location of this file IF AND ONLY IF you are doing test
 DEFAULT_ENV_FILE_PATH = '/in/env.yaml'
+
+# dir name of lmdb in assets dir, if dataset is exported in lmdb asset format
+LMDB_DIR_NAME = 'assets.lmdb'
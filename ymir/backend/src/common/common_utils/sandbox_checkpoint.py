@@ -0,0 +1,62 @@
+import os
+from typing import Optional, Set
+
+
+class RepoCheckpoint:
+    """
+    progress of one update step on one repo, kept in an append only log, so an interrupted update can resume
+
+    lines in log file: `begin <tag>` before a tag is written, `done <tag>` after it, `finish` after all tags,
+        a tag begun but not done means the repo may be half written, and should be updated again from its backup
+    """
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self.done_tags: Set[str] = set()
+        self.pending_tag: Optional[str] = None
+        self.finished = False
+
+        if not os.path.isfile(path):
+            return
+        valid_size = 0
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # last line partially written when interrupted
+                valid_size += len(line.encode())
+                action, _, tag = line[:-1].partition(' ')
+                if action == 'begin':
+                    self.pending_tag = tag
+                elif action == 'done':
+                    self.done_tags.add(tag)
+                    self.pending_tag = None
+                elif action == 'finish':
+                    self.finished = True
+        if valid_size < os.path.getsize(path):
+            # drop the partial line, or the next line appended would be joined with it
+            os.truncate(path, valid_size)
+
+    def begin(self, tag: str) -> None:
+        self._append(f"begin {tag}")
+        self.pending_tag = tag
+
+    def done(self, tag: str) -> None:
+        self._append(f"done {tag}")
+        self.done_tags.add(tag)
+        self.pending_tag = None
+
+    def finish(self) -> None:
+        self._append('finish')
+        self.finished = True
+
+    def reset(self) -> None:
+        if os.path.isfile(self._path):
+            os.remove(self._path)
+        self.done_tags.clear()
+        self.pending_tag = None
+        self.finished = False
+
+    def _append(self, line: str) -> None:
+        with open(self._path, 'a') as f:
+            f.write(f"{line}\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -1,37 +1,65 @@
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 import logging
 import os
 import shutil
-from typing import Callable, List
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 import yaml
 
+from common_utils.sandbox_checkpoint import RepoCheckpoint
 from common_utils.sandbox_util import check_sandbox, detect_users_and_repos
 from common_utils.version import ymir_salient_version
 
-from update_1_1_0_to_2_0_0.step_updater import update_repo as update_repo_110_200
 
+# args: mir_root, assets_root, models_root, checkpoint, returns: count of updated tags
+_RepoUpdaterType = Callable[[str, str, str, RepoCheckpoint], int]
 
-_RepoUpdaterType = Callable[[str, str, str], None]
+# checkpoints of an interrupted update are kept here, with versions in manifest file, until update done or rolled back
+_CHECKPOINT_DIR_NAME = 'sandbox-update'
+_MANIFEST_FILE_NAME = 'manifest.yaml'
 
 
-def update(sandbox_root: str, assets_root: str, models_root: str, src_ver: str, dst_ver: str) -> None:
+def update(sandbox_root: str,
+           assets_root: str,
+           models_root: str,
+           src_ver: str,
+           dst_ver: str,
+           workers: Optional[int] = None) -> None:
+    """
+    updates all user repos in sandbox, repos are updated in `workers` processes (cpu count if not set, 0 or 1 to
+        update in current process), and each tag is checkpointed, so an interrupted update resumes from where it
+        stopped, any error rolls back the whole sandbox
+    """
     steps = _get_update_steps(src_ver=src_ver, dst_ver=dst_ver)
     if not steps:
         logging.info(f"nothing to update {src_ver} -> {dst_ver}")
         return
 
     check_sandbox(sandbox_root)
-    _backup(sandbox_root=sandbox_root)
+    checkpoint_dir = os.path.join(sandbox_root, _CHECKPOINT_DIR_NAME)
+    resume_versions = _load_manifest(sandbox_root)
+    if resume_versions:
+        if resume_versions != (src_ver, dst_ver):
+            raise ValueError(f"can not resume update {resume_versions}, with versions: {(src_ver, dst_ver)}")
+        logging.info(f"resume update {src_ver} -> {dst_ver} from checkpoints: {checkpoint_dir}")
+    else:
+        # manifest written after backup, so an update is resumed only with a complete backup
+        _backup(sandbox_root=sandbox_root)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        with open(os.path.join(checkpoint_dir, _MANIFEST_FILE_NAME), 'w') as f:
+            yaml.safe_dump({'src_ver': src_ver, 'dst_ver': dst_ver}, f)
 
     # update
     user_to_repos = detect_users_and_repos(sandbox_root)
     try:
-        for repo_func in steps:
-            # update user repos
-            if repo_func:
-                for user_id, repo_ids in user_to_repos.items():
-                    for repo_id in repo_ids:
-                        repo_func(os.path.join(sandbox_root, user_id, repo_id), assets_root, models_root)
+        _update_repos(sandbox_root=sandbox_root,
+                      assets_root=assets_root,
+                      models_root=models_root,
+                      user_repos=[(user_id, repo_id) for user_id in sorted(user_to_repos)
+                                  for repo_id in sorted(user_to_repos[user_id])],
+                      steps=steps,
+                      workers=(os.cpu_count() or 1) if workers is None else workers)
 
         for user_id in user_to_repos:
             _update_user_labels(label_path=os.path.join(sandbox_root, user_id, 'labels.yaml'), dst_ver=dst_ver)
@@ -41,6 +69,84 @@ def update(sandbox_root: str, assets_root: str, models_root: str, src_ver: str,
 
     # cleanup
     shutil.rmtree(os.path.join(sandbox_root, 'sandbox-bk'))
+    shutil.rmtree(checkpoint_dir)
+
+
+def resume_src_version(sandbox_root: str) -> Optional[str]:
+    """
+    src version of an interrupted update in this sandbox, None if no update to resume
+    """
+    resume_versions = _load_manifest(sandbox_root)
+    return resume_versions[0] if resume_versions else None
+
+
+def _load_manifest(sandbox_root: str) -> Optional[Tuple[str, str]]:
+    manifest_path = os.path.join(sandbox_root, _CHECKPOINT_DIR_NAME, _MANIFEST_FILE_NAME)
+    if not os.path.isfile(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        manifest = yaml.safe_load(f)
+    return (manifest['src_ver'], manifest['dst_ver'])
+
+
+def _update_repos(sandbox_root: str, assets_root: str, models_root: str, user_repos: List[Tuple[str, str]],
+                  steps: List[_RepoUpdaterType], workers: int) -> None:
+    start = time.time()
+    total_tags = 0
+
+    def _log_progress(user_id: str, repo_id: str, tags: int, seconds: float, done_repos: int) -> None:
+        nonlocal total_tags
+        total_tags += tags
+        elapsed = time.time() - start
+        logging.info(f"updated repo: {user_id}/{repo_id}, {tags} tags in {seconds:.1f}s, "
+                     f"progress: {done_repos}/{len(user_repos)} repos, {total_tags} tags in {elapsed:.1f}s, "
+                     f"{done_repos / elapsed:.2f} repos/s, {total_tags / elapsed:.2f} tags/s")
+
+    if workers <= 1:
+        for idx, (user_id, repo_id) in enumerate(user_repos):
+            tags, seconds = _update_repo(sandbox_root, assets_root, models_root, user_id, repo_id, steps)
+            _log_progress(user_id, repo_id, tags, seconds, idx + 1)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        future_to_repos: Dict[Future, Tuple[str, str]] = {
+            executor.submit(_update_repo, sandbox_root, assets_root, models_root, user_id, repo_id, steps):
+            (user_id, repo_id)
+            for user_id, repo_id in user_repos
+        }
+        try:
+            for idx, future in enumerate(as_completed(future_to_repos)):
+                tags, seconds = future.result()
+                _log_progress(*future_to_repos[future], tags, seconds, idx + 1)
+        except Exception:
+            # repos in progress are finished before roll back, others cancelled
+            for future in future_to_repos:
+                future.cancel()
+            raise
+
+
+def _update_repo(sandbox_root: str, assets_root: str, models_root: str, user_id: str, repo_id: str,
+                 steps: List[_RepoUpdaterType]) -> Tuple[int, float]:
+    start = time.time()
+    mir_root = os.path.join(sandbox_root, user_id, repo_id)
+    checkpoints = [
+        RepoCheckpoint(os.path.join(sandbox_root, _CHECKPOINT_DIR_NAME, f"{user_id}-{repo_id}-{idx}.log"))
+        for idx in range(len(steps))
+    ]
+
+    # interrupted while writing a tag: repo restored from backup, and all steps updated again
+    if any(checkpoint.pending_tag is not None for checkpoint in checkpoints):
+        logging.info(f"restore interrupted repo: {mir_root}")
+        shutil.rmtree(mir_root)
+        shutil.copytree(src=os.path.join(sandbox_root, 'sandbox-bk', user_id, repo_id), dst=mir_root, symlinks=True)
+        for checkpoint in checkpoints:
+            checkpoint.reset()
+
+    tags = 0
+    for repo_func, checkpoint in zip(steps, checkpoints):
+        if not checkpoint.finished:
+            tags += repo_func(mir_root, assets_root, models_root, checkpoint)
+    return tags, time.time() - start
 
 
 def _backup(sandbox_root: str) -> None:
@@ -62,10 +168,14 @@ def _roll_back(sandbox_root: str) -> None:
         shutil.move(src=src_user_dir, dst=dst_user_dir)
 
     shutil.rmtree(sandbox_backup_dir)
+    shutil.rmtree(os.path.join(sandbox_root, _CHECKPOINT_DIR_NAME), ignore_errors=True)
     logging.info('roll back done')
 
 
 def _get_update_steps(src_ver: str, dst_ver: str) -> List[_RepoUpdaterType]:
+    # step updaters only exist in updater app, imported here so this module can be loaded (and tested) without it
+    from update_1_1_0_to_2_0_0.step_updater import update_repo as update_repo_110_200
+
     eq_src_ver = ymir_salient_version(src_ver)
     eq_dst_ver = ymir_salient_version(dst_ver)
 
@@ -18,9 +18,10 @@ from app.api.errors.errors import (
 )
 from app.config import settings
 from app.constants.state import TaskState, TaskType, ResultState, ObjectType
+from app.utils.cache import CacheClient
 from app.utils.ymir_controller import ControllerClient
 from app.utils.ymir_viz import VizClient
-from app.libs.datasets import import_dataset_in_background, ensure_datasets_are_ready
+from app.libs.datasets import import_dataset_in_background, ensure_datasets_are_ready, get_datasets_stats
 from app.libs.labels import keywords_to_class_ids
 from app.libs.tasks import create_single_task
 from common_utils.labels import UserLabels
@@ -31,7 +32,7 @@ router = APIRouter()
 @router.get("/batch", response_model=schemas.DatasetsAnalysesOut)
 def batch_get_datasets(
     db: Session = Depends(deps.get_db),
-    viz_client: VizClient = Depends(deps.get_viz_client),
+    cache: CacheClient = Depends(deps.get_cache),
     project_id: int = Query(None),
     dataset_ids: str = Query(..., example="1,2,3", alias="ids", min_length=1),
     require_ck: bool = Query(False, alias="ck"),
@@ -46,15 +47,19 @@ def batch_get_datasets(
 
     datasets_info = [schemas.dataset.DatasetInDB.from_orm(dataset).dict() for dataset in datasets]
     if project_id and (require_ck or require_hist):
-        viz_client.initialize(user_id=current_user.id, project_id=project_id, user_labels=user_labels)
+        ready_hashes = [dataset["hash"] for dataset in datasets_info if dataset["result_state"] == ResultState.ready]
+        datasets_stats = get_datasets_stats(
+            cache,
+            user_id=current_user.id,
+            project_id=project_id,
+            user_labels=user_labels,
+            dataset_hashes=ready_hashes,
+            require_ck=require_ck,
+            require_hist=require_hist,
+        )
         for dataset in datasets_info:
-            if dataset["result_state"] != ResultState.ready:
-                continue
-            if require_ck:
-                dataset_extra_info = viz_client.get_dataset_info(dataset["hash"])
-            elif require_hist:
-                dataset_extra_info = viz_client.get_dataset_analysis(dataset["hash"], require_hist=True)
-            dataset.update(dataset_extra_info)
+            if dataset["hash"] in datasets_stats:
+                dataset.update(datasets_stats[dataset["hash"]])
     return {"result": datasets_info}
 
 
@@ -283,6 +288,7 @@ def get_dataset(
     verbose_info: bool = Query(False, alias="verbose"),
     current_user: schemas.user.UserInfo = Depends(deps.get_current_active_user),
     viz_client: VizClient = Depends(deps.get_viz_client),
+    cache: CacheClient = Depends(deps.get_cache),
     user_labels: UserLabels = Depends(deps.get_user_labels),
 ) -> Any:
     """
@@ -305,9 +311,18 @@ def get_dataset(
             user_labels=user_labels,
         )
         try:
-            if verbose_info:
-                # get cks and tags
+            if verbose_info and dataset.result_state != ResultState.ready:
                 dataset_stats = viz_client.get_dataset_info(dataset_hash=dataset.hash)
+            elif verbose_info:
+                # get cks and tags, cached as ready dataset never changes
+                dataset_stats = get_datasets_stats(
+                    cache,
+                    user_id=current_user.id,
+                    project_id=dataset.project_id,
+                    user_labels=user_labels,
+                    dataset_hashes=[dataset.hash],
+                    require_ck=True,
+                )[dataset.hash]
             else:
                 # get negative info based on given keywords
                 dataset_stats = viz_client.get_dataset_analysis(
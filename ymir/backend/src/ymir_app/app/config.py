@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     DATABASE_URI: str = "sqlite:///app.db"
     TOKEN_URL: str = "/auth/token"
     GRPC_CHANNEL: str = "controller:50066"
+    GRPC_KEEPALIVE_TIME_MS: int = 60 * 1000
+    GRPC_KEEPALIVE_TIMEOUT_MS: int = 20 * 1000
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 40  # 40 hours
     APP_SECRET_KEY: str = secrets.token_urlsafe(32)
     DEFAULT_LIMIT: int = 20
@@ -100,6 +102,10 @@ class Settings(BaseSettings):
 
     # ymir_viewer
     VIEWER_HOST_PORT: Optional[int] = None
+    # max concurrent viewer requests of one batch
+    VIEWER_CONCURRENCY: int = 8
+    # dataset stats are immutable per hash and labels, expire only to drop the outdated labels versions
+    DATASET_STATS_CACHE_EXPIRE_SECONDS: int = 7 * 24 * 60 * 60
 
     # migration
     MIGRATION_CHECKPOINT: str = "9bb7bb8b71c3"
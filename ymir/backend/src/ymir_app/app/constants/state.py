@@ -93,6 +93,15 @@ class ObjectType(IntEnum):
     multi_modal = mir_cmd_pb.ObjectType.OT_MULTI_MODAL  # 50
 
 
+class EvaluationState(IntEnum):
+    not_set = mir_cmd_pb.EvaluationState.ES_NOT_SET  # 0
+    ready = mir_cmd_pb.EvaluationState.ES_READY  # 1
+    no_gt_or_pred = mir_cmd_pb.EvaluationState.ES_NO_GT_OR_PRED  # 2
+    exceeds_limit = mir_cmd_pb.EvaluationState.ES_EXCEEDS_LIMIT  # 3
+    not_enough_class_ids = mir_cmd_pb.EvaluationState.ES_NOT_ENOUGH_CLASS_IDS  # 4
+    pending = mir_cmd_pb.EvaluationState.ES_PENDING  # 5
+
+
 class AnnotationType(IntEnum):
     gt = 1
     pred = 2
@@ -1,4 +1,6 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Union
 
 from fastapi.logger import logger
 from sqlalchemy.orm import Session
@@ -11,9 +13,13 @@ from app.api.errors.errors import (
     FieldValidationFailed,
     PrematureDatasets,
 )
-from app.constants.state import ResultState, TaskState
+from app.config import settings
+from app.constants.state import EvaluationState, ResultState, TaskState
+from app.utils.cache import CacheClient, dataset_stats_cache_key
 from app.utils.ymir_controller import ControllerClient
+from app.utils.ymir_viz import AsyncVizClient
 from app.schemas.common import ImportStrategy
+from common_utils.labels import UserLabels
 from id_definition.error_codes import APIErrorCode as error_codes
 from id_definition.task_id import gen_repo_hash, gen_user_hash
 
@@ -117,3 +123,56 @@ def ensure_datasets_are_ready(
     if not all(dataset.result_state == ResultState.ready for dataset in datasets):
         raise PrematureDatasets()
     return datasets
+
+
+def get_datasets_stats(
+    cache: CacheClient,
+    user_id: int,
+    project_id: int,
+    user_labels: UserLabels,
+    dataset_hashes: List[str],
+    require_ck: bool = False,
+    require_hist: bool = False,
+) -> Dict[str, Dict]:
+    """
+    stats of ready datasets, key: dataset hash, value: stats from viewer
+    cached ones are got in one round-trip, missing ones are got from viewer concurrently and then cached,
+        unless they may still change: viewer index not ready, or evaluation pending
+    require_ck: stats with cks and tags (viewer dataset_meta_count), otherwise viewer dataset_stats
+    """
+    kind, require_hist = ("info", False) if require_ck else ("analysis", require_hist)
+    cache_keys = {
+        dataset_hash: dataset_stats_cache_key(kind, dataset_hash, require_hist, user_labels)
+        for dataset_hash in dataset_hashes
+    }
+    cached_values = cache.batch_get(list(cache_keys.values()))
+    datasets_stats = {
+        dataset_hash: json.loads(cached_value)
+        for dataset_hash, cached_value in zip(cache_keys, cached_values)
+        if cached_value
+    }
+
+    missing_hashes = [dataset_hash for dataset_hash in cache_keys if dataset_hash not in datasets_stats]
+    logger.info("[dataset stats] %s cached, %s from viewer", len(datasets_stats), len(missing_hashes))
+    if missing_hashes:
+        viz = AsyncVizClient(user_id=user_id, project_id=project_id, user_labels=user_labels)
+        if require_ck:
+            fetched_stats = asyncio.run(viz.batch_get_dataset_info(missing_hashes))
+        else:
+            fetched_stats = asyncio.run(viz.batch_get_dataset_analysis(missing_hashes, require_hist=require_hist))
+        final_stats: Dict[str, Union[str, Dict]] = {
+            cache_keys[dataset_hash]: stats
+            for dataset_hash, stats in fetched_stats.items()
+            if is_final_stats(stats, require_ck=require_ck)
+        }
+        if final_stats:
+            cache.batch_set(final_stats, expire=settings.DATASET_STATS_CACHE_EXPIRE_SECONDS)
+        datasets_stats.update(fetched_stats)
+    return datasets_stats
+
+
+def is_final_stats(stats: Dict, require_ck: bool) -> bool:
+    # only dataset_meta_count reports index state, dataset_stats is queried from a ready index
+    if require_ck and not stats.get("repo_index_ready"):
+        return False
+    return stats.get("evaluation_state") != EvaluationState.pending
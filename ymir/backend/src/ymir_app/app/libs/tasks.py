@@ -26,7 +26,7 @@ from app.libs.datasets import ensure_datasets_are_ready
 from app.libs.labels import keywords_to_class_ids
 from app.libs.metrics import send_keywords_metrics
 from app.libs.models import create_model_stages
-from app.utils.cache import CacheClient
+from app.utils.cache import CacheClient, dataset_stats_cache_key
 from app.utils.err import retry
 from app.utils.ymir_controller import ControllerClient
 from app.utils.ymir_viz import VizClient
@@ -180,7 +180,7 @@ class TaskResult:
         self.cache = CacheClient(user_id=self.user_id)
 
     @cached_property
-    def user_labels(self) -> Dict:
+    def user_labels(self) -> UserLabels:
         return self.controller.get_labels_of_user(self.user_id)
 
     @cached_property
@@ -400,6 +400,7 @@ class TaskResult:
                 result_state=ResultState.ready,
                 result=self.dataset_analysis,
             )
+            self.warm_dataset_stats_cache(self.dataset_analysis)
         else:
             crud.dataset.finish(
                 self.db,
@@ -407,6 +408,16 @@ class TaskResult:
                 result_state=ResultState.error,
             )
 
+    def warm_dataset_stats_cache(self, dataset_analysis: Dict) -> None:
+        """
+        dataset_analysis is exactly what datasets batch api asks viewer for with hist, cache it for that
+        """
+        cache_key = dataset_stats_cache_key("analysis", self.task_hash, True, self.user_labels)
+        try:
+            self.cache.batch_set({cache_key: dataset_analysis}, expire=settings.DATASET_STATS_CACHE_EXPIRE_SECONDS)
+        except Exception:
+            logger.exception("[update task] failed to warm dataset stats cache, skip")
+
     def update_prediction_result(self, task_result: schemas.TaskUpdateStatus) -> None:
         """
         Criterion for ready prediction: task state is DONE and viewer returns valid dataset_info
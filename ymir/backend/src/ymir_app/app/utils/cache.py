@@ -1,11 +1,23 @@
+import hashlib
 import json
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from redis import StrictRedis
 
 from app.config import settings
+from common_utils.labels import UserLabels
 
 KEYWORDS_CACHE_KEY = "keywords"
+DATASET_STATS_CACHE_KEY = "dataset_stats"
+
+
+def dataset_stats_cache_key(kind: str, dataset_hash: str, require_hist: bool, user_labels: UserLabels) -> str:
+    """
+    kind: `info` for viewer dataset_meta_count, `analysis` for viewer dataset_stats
+    labels version is part of the key, as class names in stats are changed by renames
+    """
+    labels_version = hashlib.sha1(user_labels.json().encode()).hexdigest()[:16]
+    return f"{DATASET_STATS_CACHE_KEY}:{kind}:{dataset_hash}:{int(require_hist)}:{labels_version}"
 
 
 class CacheClient:
@@ -36,6 +48,20 @@ class CacheClient:
         redis_key = f"{self.prefix}:{self.user_id}:{key}"
         return self.conn.get(redis_key)
 
+    def batch_get(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        return self.conn.mget([f"{self.prefix}:{self.user_id}:{key}" for key in keys])
+
+    def batch_set(self, mapping: Dict[str, Union[str, dict]], expire: Optional[int] = None) -> None:
+        pipe = self.conn.pipeline()
+        for key, value in mapping.items():
+            redis_key = f"{self.prefix}:{self.user_id}:{key}"
+            if isinstance(value, dict):
+                value = json.dumps(value)
+            pipe.set(redis_key, value, ex=expire)
+        pipe.execute()
+
     def delete(self, key: str) -> None:
         redis_key = f"{self.prefix}:{self.user_id}:{key}"
         self.conn.delete(redis_key)
@@ -1,11 +1,15 @@
 import enum
 from dataclasses import dataclass
-from typing import Any, Dict, Generator, List, Optional, Union
+import json
+import os
+import threading
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 import grpc
 from fastapi.logger import logger
 from google.protobuf.json_format import MessageToDict
 from google.protobuf.text_format import MessageToString
+from prometheus_client import Histogram
 
 from app.api.errors.errors import InvalidRepo
 from app.config import settings
@@ -362,6 +366,83 @@ class ControllerRequest:
         return request
 
 
+CONTROLLER_REQUEST_SECONDS = Histogram(
+    "ymir_controller_request_seconds",
+    "latency of requests to controller, percentiles by histogram_quantile",
+    ["request_type"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# read only requests, safe to send again if controller was unavailable,
+#   others (creating tasks, for example) might have been received before connection broken
+_RETRY_REQUEST_TYPES = {
+    ExtraRequestType.get_label,
+    ExtraRequestType.get_gpu_info,
+    ExtraRequestType.check_repo,
+    ExtraRequestType.get_cmd_version,
+}
+
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+    ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    # client side health checking, watches the health service of controller, and
+    #   only sends requests to a connection which is SERVING
+    (
+        "grpc.service_config",
+        json.dumps({"loadBalancingConfig": [{"round_robin": {}}], "healthCheckConfig": {"serviceName": ""}}),
+    ),
+]
+
+
+class _ChannelPool:
+    """
+    process wide channels and stubs to controller, one for each endpoint
+    grpc channels are thread safe, and reconnect by themselves when idle connections dropped
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._stubs: Dict[str, Tuple[grpc.Channel, mir_grpc.mir_controller_serviceStub]] = {}
+
+    def get_stub(self, endpoint: str) -> mir_grpc.mir_controller_serviceStub:
+        with self._lock:
+            if self._pid != os.getpid():
+                # channels are not inherited by forked workers
+                self._pid = os.getpid()
+                self._stubs = {}
+            if endpoint not in self._stubs:
+                channel = grpc.insecure_channel(endpoint, options=_CHANNEL_OPTIONS)
+                self._stubs[endpoint] = (channel, mir_grpc.mir_controller_serviceStub(channel))
+            return self._stubs[endpoint][1]
+
+    def reset(self, endpoint: str, failed_stub: mir_grpc.mir_controller_serviceStub) -> None:
+        # channel might be reset by another thread already
+        with self._lock:
+            channel_stub = self._stubs.get(endpoint)
+            if not channel_stub or channel_stub[1] is not failed_stub:
+                return
+            del self._stubs[endpoint]
+        channel_stub[0].close()
+
+
+_channel_pool = _ChannelPool()
+
+
+def parse_user_labels(resp: Dict, user_id: int) -> UserLabels:
+    # if not set labels, lost the key label_collection
+    if not resp.get("label_collection"):
+        raise ValueError(f"Missing labels for user {user_id}")
+    return UserLabels.parse_obj(
+        dict(
+            labels=resp["label_collection"]["labels"],
+            ymir_version=resp["label_collection"]["ymir_version"],
+        )
+    )
+
+
 class ControllerClient:
     def __init__(self, channel: str = settings.GRPC_CHANNEL) -> None:
         self.channel_ep = channel
@@ -377,9 +458,22 @@ class ControllerClient:
 
     def send(self, req: mirsvrpb.GeneralReq, verbose: bool = True) -> Dict:
         logger.info("[controller] request: %s", req.req)
-        with grpc.insecure_channel(self.channel_ep) as channel:
-            stub = mir_grpc.mir_controller_serviceStub(channel)
-            resp = stub.data_manage_request(req.req)
+        with CONTROLLER_REQUEST_SECONDS.labels(req.type.name).time():
+            stub = _channel_pool.get_stub(self.channel_ep)
+            try:
+                resp = stub.data_manage_request(req.req)
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNAVAILABLE:
+                    raise
+                # connection broken (controller restarted, for example), reconnect, and try once more if safe
+                _channel_pool.reset(self.channel_ep, stub)
+                if req.type not in _RETRY_REQUEST_TYPES:
+                    raise
+                logger.warning("[controller] unavailable, reconnect and retry: %s", e)
+                resp = _channel_pool.get_stub(self.channel_ep).data_manage_request(req.req)
+        return self.parse_response(resp, verbose)
+
+    def parse_response(self, resp: mirsvrpb.GeneralResp, verbose: bool = True) -> Dict:
         self.check_response_code(resp.code, resp.message, verbose)
 
         msg = "[controller] successfully get response"
@@ -405,15 +499,7 @@ class ControllerClient:
     def get_labels_of_user(self, user_id: int) -> UserLabels:
         req = ControllerRequest(ExtraRequestType.get_label, user_id)
         resp = self.send(req, verbose=False)
-        # if not set labels, lost the key label_collection
-        if not resp.get("label_collection"):
-            raise ValueError(f"Missing labels for user {user_id}")
-        return UserLabels.parse_obj(
-            dict(
-                labels=resp["label_collection"]["labels"],
-                ymir_version=resp["label_collection"]["ymir_version"],
-            )
-        )
+        return parse_user_labels(resp, user_id)
 
     def create_task(
         self,
@@ -1,7 +1,9 @@
+import asyncio
 from dataclasses import asdict, InitVar
 import json
 from typing import Any, Dict, List, Optional
 
+import aiohttp
 import requests
 from requests.exceptions import ConnectionError, Timeout
 from fastapi.logger import logger
@@ -501,5 +503,76 @@ class VizClient:
         self.session.close()
 
 
+class AsyncVizClient:
+    """
+    viewer client to get stats of many datasets concurrently, at most `concurrency` requests in flight
+    """
+
+    def __init__(
+        self,
+        *,
+        user_id: int,
+        project_id: int,
+        user_labels: UserLabels,
+        concurrency: int = settings.VIEWER_CONCURRENCY,
+    ) -> None:
+        self._user_labels = user_labels
+        self._concurrency = concurrency
+        self._url_prefix = (
+            f"http://127.0.0.1:{settings.VIEWER_HOST_PORT}/api/v1/users/{user_id:0>4}/repo/{project_id:0>6}"
+        )
+
+    async def batch_get_dataset_info(self, dataset_hashes: List[str]) -> Dict[str, Dict]:
+        """
+        viewer: GET /dataset_meta_count, for each dataset
+        """
+        urls = [f"{self._url_prefix}/branch/{dataset_hash}/dataset_meta_count" for dataset_hash in dataset_hashes]
+        return await self._batch_get_datasets(dataset_hashes, urls, params=None)
+
+    async def batch_get_dataset_analysis(
+        self, dataset_hashes: List[str], require_hist: bool = False
+    ) -> Dict[str, Dict]:
+        """
+        viewer: GET /dataset_stats, for each dataset
+        """
+        urls = [f"{self._url_prefix}/branch/{dataset_hash}/dataset_stats" for dataset_hash in dataset_hashes]
+        # same as requests does for bool params, which aiohttp refuses
+        params = {"require_assets_hist": str(require_hist), "require_annos_hist": str(require_hist)}
+        return await self._batch_get_datasets(dataset_hashes, urls, params=params)
+
+    async def _batch_get_datasets(
+        self, dataset_hashes: List[str], urls: List[str], params: Optional[Dict]
+    ) -> Dict[str, Dict]:
+        semaphore = asyncio.Semaphore(self._concurrency)
+        timeout = aiohttp.ClientTimeout(total=settings.VIZ_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(*[self._get_result(session, semaphore, url, params) for url in urls])
+        return {
+            dataset_hash: asdict(DatasetInfo.from_dict(res, user_labels=self._user_labels))
+            for dataset_hash, res in zip(dataset_hashes, results)
+        }
+
+    async def _get_result(
+        self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str, params: Optional[Dict]
+    ) -> Any:
+        async with semaphore:
+            logger.info("[viewer] request url %s and params %s", url, params)
+            try:
+                async with session.get(url, params=params) as resp:
+                    status, content = resp.status, await resp.read()
+            except aiohttp.ClientConnectionError:
+                raise VizError()
+            except asyncio.TimeoutError:
+                raise VizTimeOut()
+
+        if status < 400:
+            return json.loads(content)["result"]
+        logger.error("[viewer] error response: %s", content)
+        if status == 400 and json.loads(content)["code"] == VizErrorCode.MODEL_NOT_EXISTS:
+            logger.error("[viewer] model not found")
+            raise ModelNotFound()
+        raise FailedToParseVizResponse()
+
+
 def get_asset_url(asset_id: str) -> str:
     return f"{settings.NGINX_PREFIX}/ymir-assets/{asset_id[-2:]}/{asset_id}"
@@ -0,0 +1,61 @@
+import json
+from random import randint
+from typing import Any
+
+from app.libs import datasets as m
+from common_utils.labels import UserLabels
+
+
+class TestGetDatasetsStats:
+    def test_get_datasets_stats(self, mocker: Any) -> None:
+        user_labels = UserLabels.parse_obj({"labels": [{"id": 0, "name": "cat", "aliases": []}]})
+        cached_stats = {"total_assets_count": 1}
+        cache = mocker.Mock(batch_get=mocker.Mock(return_value=[json.dumps(cached_stats), None]))
+        viz = mocker.Mock(batch_get_dataset_analysis=mocker.AsyncMock(return_value={"b": {"total_assets_count": 2}}))
+        mock_viz_cls = mocker.patch.object(m, "AsyncVizClient", return_value=viz)
+
+        datasets_stats = m.get_datasets_stats(
+            cache,
+            user_id=randint(100, 200),
+            project_id=randint(100, 200),
+            user_labels=user_labels,
+            dataset_hashes=["a", "b"],
+            require_hist=True,
+        )
+        assert datasets_stats == {"a": cached_stats, "b": {"total_assets_count": 2}}
+        mock_viz_cls.assert_called_once()
+        viz.batch_get_dataset_analysis.assert_awaited_once_with(["b"], require_hist=True)
+        cache_keys = cache.batch_get.call_args[0][0]
+        cache.batch_set.assert_called_once()
+        assert list(cache.batch_set.call_args[0][0].keys()) == [cache_keys[1]]
+
+    def test_get_datasets_stats_all_cached(self, mocker: Any) -> None:
+        user_labels = UserLabels.parse_obj({"labels": [{"id": 0, "name": "cat", "aliases": []}]})
+        cache = mocker.Mock(batch_get=mocker.Mock(return_value=[json.dumps({"total_assets_count": 1})]))
+        mock_viz_cls = mocker.patch.object(m, "AsyncVizClient")
+
+        datasets_stats = m.get_datasets_stats(
+            cache, user_id=1, project_id=1, user_labels=user_labels, dataset_hashes=["a"], require_ck=True
+        )
+        assert datasets_stats == {"a": {"total_assets_count": 1}}
+        mock_viz_cls.assert_not_called()
+        cache.batch_set.assert_not_called()
+
+    def test_get_datasets_stats_not_final(self, mocker: Any) -> None:
+        user_labels = UserLabels.parse_obj({"labels": [{"id": 0, "name": "cat", "aliases": []}]})
+        cache = mocker.Mock(batch_get=mocker.Mock(return_value=[None, None, None]))
+        fetched_stats = {
+            "a": {"repo_index_ready": True, "evaluation_state": 1},
+            "b": {"repo_index_ready": False, "evaluation_state": 1},
+            "c": {"repo_index_ready": True, "evaluation_state": 5},
+        }
+        viz = mocker.Mock(batch_get_dataset_info=mocker.AsyncMock(return_value=fetched_stats))
+        mocker.patch.object(m, "AsyncVizClient", return_value=viz)
+
+        datasets_stats = m.get_datasets_stats(
+            cache, user_id=1, project_id=1, user_labels=user_labels, dataset_hashes=["a", "b", "c"], require_ck=True
+        )
+        assert datasets_stats == fetched_stats
+        # index not ready or evaluation pending: not cached
+        cache_keys = cache.batch_get.call_args[0][0]
+        assert list(cache.batch_set.call_args[0][0].keys()) == [cache_keys[0]]
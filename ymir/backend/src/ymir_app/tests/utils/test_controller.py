@@ -152,6 +152,60 @@ class TestControllerClient:
         mocker.patch.object(m, "MessageToString")
         cc.send(req)
 
+    def test_send_reuses_channel(self, mocker):
+        channel_str = random_lower_string()
+        mock_grpc = mocker.Mock()
+        mocker.patch.object(m, "grpc", mock_grpc)
+        mock_mir_grpc = mocker.Mock()
+        mock_mir_grpc.mir_controller_serviceStub().data_manage_request.return_value = mocker.Mock(code=0)
+        mocker.patch.object(m, "mir_grpc", mock_mir_grpc)
+        mocker.patch.object(m, "MessageToDict")
+        mocker.patch.object(m, "MessageToString")
+
+        for _ in range(3):
+            m.ControllerClient(channel_str).send(mocker.Mock())
+        mock_grpc.insecure_channel.assert_called_once()
+
+    def test_send_reconnect_when_unavailable(self, mocker):
+        channel_str = random_lower_string()
+
+        class FakeRpcError(Exception):
+            def code(self):
+                return mock_grpc.StatusCode.UNAVAILABLE
+
+        mock_grpc = mocker.Mock(RpcError=FakeRpcError)
+        mocker.patch.object(m, "grpc", mock_grpc)
+        failed_stub, ok_stub = mocker.Mock(), mocker.Mock()
+        failed_stub.data_manage_request.side_effect = FakeRpcError()
+        ok_stub.data_manage_request.return_value = mocker.Mock(code=0)
+        mocker.patch.object(m.mir_grpc, "mir_controller_serviceStub", side_effect=[failed_stub, ok_stub])
+        mocker.patch.object(m, "MessageToDict")
+        mocker.patch.object(m, "MessageToString")
+
+        m.ControllerClient(channel_str).send(mocker.Mock(type=m.ExtraRequestType.get_label))
+        assert mock_grpc.insecure_channel.call_count == 2
+        mock_grpc.insecure_channel().close.assert_called_once()
+        ok_stub.data_manage_request.assert_called_once()
+
+    def test_send_no_retry_when_unavailable(self, mocker):
+        channel_str = random_lower_string()
+
+        class FakeRpcError(Exception):
+            def code(self):
+                return mock_grpc.StatusCode.UNAVAILABLE
+
+        mock_grpc = mocker.Mock(RpcError=FakeRpcError)
+        mocker.patch.object(m, "grpc", mock_grpc)
+        failed_stub, ok_stub = mocker.Mock(), mocker.Mock()
+        failed_stub.data_manage_request.side_effect = FakeRpcError()
+        mocker.patch.object(m.mir_grpc, "mir_controller_serviceStub", side_effect=[failed_stub, ok_stub])
+
+        # task might be created already, not sent again, but channel reconnects for next requests
+        with pytest.raises(FakeRpcError):
+            m.ControllerClient(channel_str).send(mocker.Mock(type=m.TaskType.training))
+        mock_grpc.insecure_channel().close.assert_called_once()
+        ok_stub.data_manage_request.assert_not_called()
+
     def test_inference(self, mocker):
         user_id = random.randint(1000, 9000)
         project_id = random.randint(1000, 9000)
@@ -1,3 +1,4 @@
+import asyncio
 import random
 import time
 from typing import Dict
@@ -350,3 +351,27 @@ class TestVizClient:
 
         viz.close()
         mock_session.close.assert_called()
+
+
+class TestAsyncVizClient:
+    def test_batch_get_dataset_analysis(self, mock_user_labels, mocker):
+        res = {
+            "class_ids_count": {},
+            "new_types_added": False,
+            "evaluation_state": 4,
+            "cks_count_total": {},
+            "cks_count": {},
+            "total_assets_count": 1,
+            "gt": {},
+        }
+        mock_get_result = mocker.patch.object(m.AsyncVizClient, "_get_result", mocker.AsyncMock(return_value=res))
+        viz = m.AsyncVizClient(user_id=1, project_id=2, user_labels=mock_user_labels, concurrency=2)
+        dataset_hashes = [random_lower_string() for _ in range(5)]
+
+        ret = asyncio.run(viz.batch_get_dataset_analysis(dataset_hashes, require_hist=True))
+        assert list(ret.keys()) == dataset_hashes
+        assert ret[dataset_hashes[0]]["total_assets_count"] == 1
+        assert mock_get_result.await_count == len(dataset_hashes)
+        url, params = mock_get_result.await_args[0][2:]
+        assert url.endswith(f"/branch/{dataset_hashes[-1]}/dataset_stats")
+        assert params == {"require_assets_hist": "True", "require_annos_hist": "True"}
@@ -20,3 +20,28 @@ IMAGE_CONFIG_FILE_NAMES = {
 }
 
 MONITOR_URL = os.environ.get("MONITOR_URL", "http://127.0.0.1:9098")
+
+# warm mir worker pool, see controller.utils.mir_worker_pool, size 0 to run all mir commands as cli subprocess
+MIR_WORKER_POOL_SIZE = int(os.environ.get("MIR_WORKER_POOL_SIZE", 4))
+MIR_WORKER_MAX_CALLS = int(os.environ.get("MIR_WORKER_MAX_CALLS", 200))
+MIR_WORKER_MEMORY_LIMIT_MB = int(os.environ.get("MIR_WORKER_MEMORY_LIMIT_MB", 0))
+# a worker is killed on timeout, maybe in the middle of a commit, so 0 (no timeout) by default, as cli subprocess
+MIR_WORKER_TIMEOUT_SECONDS = int(os.environ.get("MIR_WORKER_TIMEOUT_SECONDS", 0))
+# exodus blob cache of each worker, lower than the default of a mir process, as workers live long
+MIR_WORKER_EXODUS_CACHE_MB = int(os.environ.get("MIR_WORKER_EXODUS_CACHE_MB", 64))
+# commands run in mir process only, training, mining and infer run docker containers, still in cli subprocess
+MIR_WORKER_COMMANDS = {
+    "init", "commit", "checkout", "status", "filter", "merge", "sampling", "copy", "export", "import", "fuse", "models"
+}
+
+# evaluate policy of mir commands which commit with evaluation (filter, sampling, copy): sync, deferred or off,
+#   see mir.tools.mir_storage_ops.EvaluatePolicy, empty to keep the default of mir
+MIR_EVALUATE_POLICY = os.environ.get("MIR_EVALUATE_POLICY", "")
+
+# worker threads of controller.utils.task_scheduler, for each task class
+TASK_SCHEDULER_REPO_WORKERS = int(os.environ.get("TASK_SCHEDULER_REPO_WORKERS", 4))
+TASK_SCHEDULER_IO_WORKERS = int(os.environ.get("TASK_SCHEDULER_IO_WORKERS", 2))
+# docker tasks lock gpus when started, a queued task holds no gpu
+TASK_SCHEDULER_GPU_WORKERS = int(os.environ.get("TASK_SCHEDULER_GPU_WORKERS", 4))
+# a task which can not lock its gpus when started goes back to queue, and is retried after so many seconds
+TASK_SCHEDULER_RETRY_SECONDS = int(os.environ.get("TASK_SCHEDULER_RETRY_SECONDS", 30))
@@ -34,5 +34,6 @@ class SamplingInvoker(BaseMirControllerInvoker):
             command.extend(['--count', str(self._request.sampling_count)])
         elif self._request.sampling_rate:
             command.extend(['--rate', str(self._request.sampling_rate)])
+        command.extend(utils.evaluate_policy_args())
 
         return utils.run_command(command)
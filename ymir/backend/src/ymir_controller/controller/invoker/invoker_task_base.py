@@ -1,12 +1,13 @@
+from functools import partial
 import logging
 import os
-import threading
 from typing import Callable, Dict, List, Optional, Tuple
 
 from common_utils.labels import UserLabels
 from common_utils.percent_log_util import LogState, PercentLogHandler
 from controller.invoker.invoker_cmd_base import BaseMirControllerInvoker
 from controller.utils import checker, errors, tasks_util, utils
+from controller.utils.task_scheduler import TaskClass, TaskPriority, get_scheduler
 from id_definition.error_codes import CTLResponseCode
 from proto import backend_pb2
 
@@ -14,6 +15,8 @@ from proto import backend_pb2
 SubTaskType = Callable[
     [backend_pb2.GeneralReq, UserLabels, str, Dict[str, str], str, str, str, str, Optional[str], List[str]],
     backend_pb2.GeneralResp]
+# format: (task_func, weight, sub_task_id)
+SubTaskJoinType = Tuple[SubTaskType, float, str]
 
 
 class TaskBaseInvoker(BaseMirControllerInvoker):
@@ -55,6 +58,7 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
         master_work_dir: str,
         sub_task_id_weights: Dict[str, float],
         register_monitor: bool,
+        state: LogState = LogState.RUNNING,
     ) -> None:
         if not (sub_task_id_weights and task_id and master_work_dir):
             raise errors.MirCtrError(CTLResponseCode.ARG_VALIDATION_FAILED,
@@ -64,13 +68,12 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
         if abs(sum(sub_task_id_weights.values()) - 1) >= delta:
             raise errors.MirCtrError(CTLResponseCode.ARG_VALIDATION_FAILED, "invalid weights, abort.")
         sub_monitor_files_weights = {}
-        # format: (task_func, weight, sub_task_id)
         for sub_task_id in sub_task_id_weights:
             subtask_monitor_file = cls.subtask_monitor_file(master_work_dir=master_work_dir, subtask_id=sub_task_id)
             PercentLogHandler.write_percent_log(log_file=subtask_monitor_file,
                                                 tid=sub_task_id,
                                                 percent=0.0,
-                                                state=LogState.RUNNING)
+                                                state=state)
             sub_monitor_files_weights[subtask_monitor_file] = sub_task_id_weights[sub_task_id]
 
         logging.info(f"task {task_id} logging weights:\n{sub_monitor_files_weights}\n")
@@ -86,18 +89,32 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
 
     def invoke(self) -> backend_pb2.GeneralResp:
         if self._async_mode:
-            thread = threading.Thread(target=self.task_invoke,
-                                      args=(
-                                          self._task_id,
-                                          self._sandbox_root,
-                                          self._repo_root,
-                                          self._assets_config,
-                                          self._work_dir,
-                                          self._user_labels,
-                                          self._request,
-                                      ),
-                                      daemon=True)
-            thread.start()
+            # registered to monitor as pending, and marked as running when scheduled,
+            #   stays pending (back to scheduler queue) while its resources can not be locked
+            sub_tasks_join = self._prepare_subtasks(task_id=self._task_id,
+                                                    working_dir=self._work_dir,
+                                                    request=self._request,
+                                                    state=LogState.PENDING)
+            if not sub_tasks_join:
+                return utils.make_general_response(CTLResponseCode.ARG_VALIDATION_FAILED, 'empty ops')
+
+            get_scheduler().submit(task_class=self.task_class(),
+                                   task_id=self._task_id,
+                                   user_id=self._user_id,
+                                   priority=self.task_priority(),
+                                   func=partial(self._run_subtasks,
+                                                sub_tasks_join=sub_tasks_join,
+                                                task_id=self._task_id,
+                                                sandbox_root=self._sandbox_root,
+                                                repo_root=self._repo_root,
+                                                assets_config=self._assets_config,
+                                                working_dir=self._work_dir,
+                                                user_labels=self._user_labels,
+                                                request=self._request,
+                                                from_pending=True),
+                                   acquire=partial(self._lock_task_resources,
+                                                   task_id=self._task_id,
+                                                   working_dir=self._work_dir))
             return utils.make_general_response(CTLResponseCode.CTR_OK, "")
         else:
             return self.task_invoke(task_id=self._task_id,
@@ -112,12 +129,33 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
     def task_invoke(cls, task_id: str, sandbox_root: str, repo_root: str, assets_config: Dict[str,
                                                                                               str], working_dir: str,
                     user_labels: UserLabels, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
+        if not cls._lock_task_resources(task_id=task_id, working_dir=working_dir):
+            return utils.make_general_response(CTLResponseCode.LOCK_GPU_ERROR, "Not enough GPU available")
+
+        sub_tasks_join = cls._prepare_subtasks(task_id=task_id,
+                                               working_dir=working_dir,
+                                               request=request,
+                                               state=LogState.RUNNING)
+        if not sub_tasks_join:
+            return utils.make_general_response(CTLResponseCode.ARG_VALIDATION_FAILED, 'empty ops')
+
+        return cls._run_subtasks(sub_tasks_join=sub_tasks_join,
+                                 task_id=task_id,
+                                 sandbox_root=sandbox_root,
+                                 repo_root=repo_root,
+                                 assets_config=assets_config,
+                                 working_dir=working_dir,
+                                 user_labels=user_labels,
+                                 request=request)
+
+    @classmethod
+    def _prepare_subtasks(cls, task_id: str, working_dir: str, request: backend_pb2.GeneralReq,
+                          state: LogState) -> List[SubTaskJoinType]:
         sub_tasks = cls.register_subtasks(request)
         if not sub_tasks:
-            return utils.make_general_response(CTLResponseCode.ARG_VALIDATION_FAILED, 'empty ops')
+            return []
 
         # append subtask_id, in revsersed order, to make sure the last subtask idx is 0.
-        # format: (task_func, weight, sub_task_id)
         sub_tasks_join = [(sub_task[0], sub_task[1], utils.sub_task_id(request.task_id,
                                                                        len(sub_tasks) - 1 - subtask_idx))
                           for subtask_idx, sub_task in enumerate(sub_tasks)]
@@ -133,7 +171,28 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
         cls._register_subtask_monitor(task_id=task_id,
                                       master_work_dir=working_dir,
                                       sub_task_id_weights=sub_task_id_weights,
-                                      register_monitor=(not request.req_create_task.no_task_monitor))
+                                      register_monitor=(not request.req_create_task.no_task_monitor),
+                                      state=state)
+        return sub_tasks_join
+
+    @classmethod
+    def _run_subtasks(cls,
+                      sub_tasks_join: List[SubTaskJoinType],
+                      task_id: str,
+                      sandbox_root: str,
+                      repo_root: str,
+                      assets_config: Dict[str, str],
+                      working_dir: str,
+                      user_labels: UserLabels,
+                      request: backend_pb2.GeneralReq,
+                      from_pending: bool = False) -> backend_pb2.GeneralResp:
+        if from_pending:
+            for sub_task in sub_tasks_join:
+                PercentLogHandler.write_percent_log(log_file=cls.subtask_monitor_file(master_work_dir=working_dir,
+                                                                                      subtask_id=sub_task[2]),
+                                                    tid=sub_task[2],
+                                                    percent=0.0,
+                                                    state=LogState.RUNNING)
 
         in_dataset_ids: List[str] = request.in_dataset_ids
         his_task_id: Optional[str] = None
@@ -168,6 +227,12 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
     def task_pre_invoke(self, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
         raise NotImplementedError
 
+    @classmethod
+    def _lock_task_resources(cls, task_id: str, working_dir: str) -> bool:
+        # called when the task starts, not when queued, so resources (gpus) are not held while pending,
+        #   returns False if they can not be locked now
+        return True
+
     @classmethod
     def register_subtasks(cls, request: backend_pb2.GeneralReq) -> List[Tuple[SubTaskType, float]]:
         # register sub_tasks in executing orders.
@@ -177,6 +242,14 @@ class TaskBaseInvoker(BaseMirControllerInvoker):
     def need_index_repo(cls) -> bool:
         return True
 
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.REPO
+
+    @classmethod
+    def task_priority(cls) -> TaskPriority:
+        return TaskPriority.NORMAL
+
     # Index master_task_id repo into viewer cached db.
     @classmethod
     def _subtask_invoke_index(cls, request: backend_pb2.GeneralReq, user_labels: UserLabels, sandbox_root: str,
@@ -62,5 +62,6 @@ class TaskCopyInvoker(TaskBaseInvoker):
             copying_cmd_str.append('--ignore-unknown-types')
         if drop_annotations:
             copying_cmd_str.append('--drop-annotations')
+        copying_cmd_str.extend(utils.evaluate_policy_args())
 
         return utils.run_command(copying_cmd_str)
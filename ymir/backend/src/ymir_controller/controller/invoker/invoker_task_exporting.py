@@ -4,12 +4,17 @@ from common_utils.labels import UserLabels
 
 from controller.invoker.invoker_task_base import SubTaskType, TaskBaseInvoker
 from controller.utils import utils
+from controller.utils.task_scheduler import TaskClass
 from id_definition.error_codes import CTLResponseCode
 from mir.protos import mir_command_pb2 as mir_cmd_pb
 from proto import backend_pb2
 
 
 class TaskExportingInvoker(TaskBaseInvoker):
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.IO
+
     def task_pre_invoke(self, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
         if len(request.in_dataset_ids) != 1:
             return utils.make_general_response(code=CTLResponseCode.ARG_VALIDATION_FAILED,
@@ -6,12 +6,17 @@ from common_utils.labels import UserLabels
 
 from controller.invoker.invoker_task_base import SubTaskType, TaskBaseInvoker
 from controller.utils import utils
+from controller.utils.task_scheduler import TaskClass
 from id_definition.error_codes import CMDResponseCode, CTLResponseCode
 from mir.protos import mir_command_pb2 as mir_cmd_pb
 from proto import backend_pb2, backend_pb2_utils
 
 
 class TaskImportDatasetInvoker(TaskBaseInvoker):
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.IO
+
     def task_pre_invoke(self, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
         import_dataset_request = request.req_create_task.import_dataset
         (asset_dir, pred_dir, gt_dir) = (import_dataset_request.asset_dir, import_dataset_request.pred_dir,
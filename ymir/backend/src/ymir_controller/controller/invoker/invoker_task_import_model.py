@@ -3,11 +3,16 @@ from common_utils.labels import UserLabels
 
 from controller.invoker.invoker_task_base import SubTaskType, TaskBaseInvoker
 from controller.utils import utils
+from controller.utils.task_scheduler import TaskClass
 from id_definition.error_codes import CMDResponseCode, CTLResponseCode
 from proto import backend_pb2
 
 
 class TaskImportModelInvoker(TaskBaseInvoker):
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.IO
+
     def task_pre_invoke(self, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
         if not request.req_create_task.import_model.model_package_path:
             return utils.make_general_response(code=CTLResponseCode.ARG_VALIDATION_FAILED,
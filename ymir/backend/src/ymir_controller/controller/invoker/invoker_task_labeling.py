@@ -5,11 +5,16 @@ from common_utils import labels
 from controller.invoker.invoker_task_base import SubTaskType, TaskBaseInvoker
 from controller.label_model import label_runner
 from controller.utils import utils
+from controller.utils.task_scheduler import TaskClass
 from id_definition.error_codes import CTLResponseCode
 from proto import backend_pb2
 
 
 class TaskLabelingInvoker(TaskBaseInvoker):
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.IO
+
     def task_pre_invoke(self, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
         if len(request.in_dataset_ids) != 1:
             return utils.make_general_response(code=CTLResponseCode.ARG_VALIDATION_FAILED,
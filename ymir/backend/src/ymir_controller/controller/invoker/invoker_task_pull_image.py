@@ -5,11 +5,20 @@ from common_utils.percent_log_util import LogState, PercentLogHandler
 from common_utils.labels import UserLabels
 from controller.invoker.invoker_task_base import SubTaskType, TaskBaseInvoker
 from controller.utils import checker, utils
+from controller.utils.task_scheduler import TaskClass, TaskPriority
 from id_definition.error_codes import CTLResponseCode
 from proto import backend_pb2
 
 
 class ImageHandler(TaskBaseInvoker):
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.IO
+
+    @classmethod
+    def task_priority(cls) -> TaskPriority:
+        return TaskPriority.HIGH
+
     @classmethod
     def need_index_repo(cls) -> bool:
         return False
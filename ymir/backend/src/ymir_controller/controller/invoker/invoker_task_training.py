@@ -4,12 +4,17 @@ from typing import Dict, List, Optional, Tuple
 from common_utils.labels import UserLabels
 from controller.invoker.invoker_task_base import SubTaskType, TaskBaseInvoker
 from controller.utils import revs, utils
-from controller.utils.tasks_util import gen_executor_config_find_gpus
+from controller.utils.task_scheduler import TaskClass
+from controller.utils.tasks_util import gen_executor_config_find_gpus, lock_gpus_in_executor_config
 from id_definition.error_codes import CTLResponseCode
 from proto import backend_pb2
 
 
 class TaskTrainingInvoker(TaskBaseInvoker):
+    @classmethod
+    def task_class(cls) -> TaskClass:
+        return TaskClass.GPU
+
     def task_pre_invoke(self, request: backend_pb2.GeneralReq) -> backend_pb2.GeneralResp:
         train_request = request.req_create_task.training
         if not train_request.in_dataset_types:
@@ -29,12 +34,20 @@ class TaskTrainingInvoker(TaskBaseInvoker):
             object_type=request.object_type,
             assets_config=self._assets_config,
             preprocess=train_request.preprocess_config,
+            lock_gpu=False,
+            find_gpus=False,
         )
+        # gpus are found and locked when the task starts, see `_lock_task_resources`
         if not gpu_lock_ret:
-            return utils.make_general_response(CTLResponseCode.LOCK_GPU_ERROR, "Not enough GPU available")
+            return utils.make_general_response(CTLResponseCode.LOCK_GPU_ERROR, "Not enough GPU on this server")
 
         return utils.make_general_response(CTLResponseCode.CTR_OK, "")
 
+    @classmethod
+    def _lock_task_resources(cls, task_id: str, working_dir: str) -> bool:
+        subtask_work_dir_0 = cls.subtask_work_dir(working_dir, utils.sub_task_id(task_id, 0))
+        return lock_gpus_in_executor_config(cls.gen_executor_config_path(subtask_work_dir_0))
+
     @classmethod
     def register_subtasks(cls, request: backend_pb2.GeneralReq) -> List[Tuple[SubTaskType, float]]:
         return [(cls.subtask_invoke_training, 1.0)]
@@ -14,7 +14,8 @@ from requests.exceptions import ConnectionError, HTTPError, Timeout
 import yaml
 
 from common_utils.sandbox_util import check_sandbox
-from controller.utils import errors, metrics, utils, invoker_mapping
+from controller.config import common_task as common_task_config
+from controller.utils import errors, metrics, mir_worker_pool, utils, invoker_mapping
 from id_definition.error_codes import CTLResponseCode
 from proto import backend_pb2, backend_pb2_grpc
 
@@ -126,11 +127,22 @@ def main(main_args: Any) -> int:
 
     check_sandbox(sandbox_root)
     _init_metrics(server_config['METRICS'])
+    mir_worker_pool.start_pool(size=common_task_config.MIR_WORKER_POOL_SIZE,
+                               commands=common_task_config.MIR_WORKER_COMMANDS,
+                               max_calls=common_task_config.MIR_WORKER_MAX_CALLS,
+                               memory_limit_mb=common_task_config.MIR_WORKER_MEMORY_LIMIT_MB,
+                               exodus_cache_mb=common_task_config.MIR_WORKER_EXODUS_CACHE_MB,
+                               timeout=common_task_config.MIR_WORKER_TIMEOUT_SECONDS,
+                               executable=utils.mir_executable())
 
     # start grpc server
     port = server_config['SERVICE']['port']
     mc_service_impl = MirControllerService(sandbox_root=sandbox_root, assets_config=server_config['ASSETS'])
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # app keeps long lived channels with keepalive pings, accept them even when no calls in flight
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),
+                         options=[('grpc.keepalive_permit_without_calls', 1),
+                                  ('grpc.http2.min_ping_interval_without_data_ms', 30 * 1000),
+                                  ('grpc.http2.max_pings_without_data', 0)])
     backend_pb2_grpc.add_mir_controller_serviceServicer_to_server(mc_service_impl, server)
 
     health_pb2_grpc.add_HealthServicer_to_server(health.HealthServicer(), server)
@@ -141,6 +153,7 @@ def main(main_args: Any) -> int:
     logging.info("mir controller started, sandbox root: %s, port: %s", mc_service_impl.sandbox_root, port)
 
     server.wait_for_termination()  # message cycle started
+    mir_worker_pool.stop_pool()
 
     return 0
 
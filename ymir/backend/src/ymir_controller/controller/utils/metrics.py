@@ -36,6 +36,14 @@ class MetricsManager:
         self._client.incr(content)
         return
 
+    def send_gauge(self, content: str, value: float) -> None:
+        if not self._permission_pass:
+            return
+        if not self._client:
+            raise RuntimeError("MetricsManager client not initialized.")
+
+        self._client.gauge(content, value)
+
 
 def send_counter_metrics(content: str) -> None:
     # fake initializer, used to retrieval client instance.
@@ -43,6 +51,11 @@ def send_counter_metrics(content: str) -> None:
     manager.send_counter(content)
 
 
+def send_gauge_metrics(content: str, value: float) -> None:
+    manager = MetricsManager(False, "uuid", "localhost", "9125")
+    manager.send_gauge(content, value)
+
+
 # server as client.
 def _parse_args() -> Any:
     parser = argparse.ArgumentParser()
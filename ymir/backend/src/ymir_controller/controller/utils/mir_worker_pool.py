@@ -0,0 +1,268 @@
+"""
+warm mir worker pool
+
+every `mir` cli call pays interpreter startup and the import of mir (protos, numpy, PIL, pycocotools...),
+    this pool keeps a few long-lived worker processes, started from a forkserver with mir already imported,
+    and runs mir commands in them with the same argv as cli
+
+* commands on the same mir repo (`--root`) are serialized
+* a worker which crashes or times out is killed and replaced, the controller process is not affected
+* workers are replaced after `max_calls` commands, and can be limited in address space and exodus cache size
+* no timeout by default: a worker killed on timeout may leave a half written commit
+* commands not in `commands`, or when pool is not started, still run as cli subprocess
+* commands run as cli subprocess too when all workers are busy, so quick commands never wait for long ones
+* workers are not daemons, so mir tools can start their own process pools in them
+"""
+
+from collections import defaultdict
+import atexit
+import io
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection
+import os
+import queue
+import subprocess
+import threading
+import traceback
+from typing import Dict, List, Optional, Set, Tuple
+
+from id_definition.error_codes import CTLResponseCode
+
+_PRELOAD_MODULES = ['mir.main', 'mir.cli', 'mir.protos.mir_command_pb2']
+_LOG_FORMAT = '%(levelname)-4s: [%(asctime)s] %(filename)s:%(lineno)-03s: %(message)s'
+
+
+def _init_worker_resources(memory_limit_mb: int, exodus_cache_mb: int) -> None:
+    if exodus_cache_mb > 0:
+        from mir.tools import exodus
+        exodus.set_memory_cache_limit(exodus_cache_mb * 1024 * 1024)
+    if memory_limit_mb > 0:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_mir_in_process(argv: List[str], cwd: Optional[str]) -> Tuple[int, str]:
+    """
+    runs one mir command in current process, returns its return code and log output
+    """
+    from mir.main import main as mir_main
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(fmt=_LOG_FORMAT, datefmt='%Y%m%d-%H:%M:%S'))
+    for root_handler in logging.root.handlers[:]:
+        logging.root.removeHandler(root_handler)
+    logging.root.addHandler(handler)
+    logging.root.setLevel(logging.INFO)
+
+    prev_cwd = os.getcwd()
+    try:
+        if cwd:
+            os.chdir(cwd)
+        return_code = mir_main(argv)
+    except SystemExit as e:
+        return_code = e.code if isinstance(e.code, int) else (0 if e.code is None else -1)
+    except Exception:
+        logging.error(traceback.format_exc())
+        return_code = CTLResponseCode.RUN_COMMAND_ERROR
+    finally:
+        os.chdir(prev_cwd)
+        for root_handler in logging.root.handlers[:]:
+            logging.root.removeHandler(root_handler)
+
+    return return_code, stream.getvalue()
+
+
+def _worker_loop(conn: Connection, memory_limit_mb: int, exodus_cache_mb: int) -> None:
+    _init_worker_resources(memory_limit_mb=memory_limit_mb, exodus_cache_mb=exodus_cache_mb)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        argv, cwd = message
+        conn.send(_run_mir_in_process(argv=argv, cwd=cwd))
+
+
+class _Worker:
+    def __init__(self, ctx: multiprocessing.context.BaseContext, memory_limit_mb: int, exodus_cache_mb: int) -> None:
+        self.conn, child_conn = ctx.Pipe()  # type: ignore
+        # not daemon: daemon processes can not have children, and mir tools may start process pools
+        self.process = ctx.Process(  # type: ignore
+            target=_worker_loop, args=(child_conn, memory_limit_mb, exodus_cache_mb), daemon=False)
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def _repo_key(argv: List[str], cwd: Optional[str]) -> str:
+    for idx, arg in enumerate(argv):
+        if arg == '--root' and idx + 1 < len(argv):
+            return os.path.abspath(os.path.join(cwd or os.getcwd(), argv[idx + 1]))
+        if arg.startswith('--root='):
+            return os.path.abspath(os.path.join(cwd or os.getcwd(), arg[len('--root='):]))
+    return os.path.abspath(cwd or os.getcwd())
+
+
+class MirWorkerPool:
+    def __init__(self,
+                 size: int,
+                 commands: Set[str],
+                 max_calls: int = 0,
+                 memory_limit_mb: int = 0,
+                 exodus_cache_mb: int = 0,
+                 timeout: Optional[float] = None,
+                 executable: str = 'mir') -> None:
+        """
+        Args:
+            size (int): count of worker processes
+            commands (Set[str]): mir sub commands which can run in pool
+            max_calls (int): replace a worker after so many commands, 0 for never
+            memory_limit_mb (int): address space limit of each worker, 0 for no limit
+            exodus_cache_mb (int): exodus blob cache limit of each worker, 0 to keep the default of mir
+            timeout (Optional[float]): seconds to wait for a command, worker is killed on timeout,
+                None or 0 for no timeout
+            executable (str): mir executable, used when all workers are busy
+        """
+        if size <= 0:
+            raise ValueError(f"invalid mir worker pool size: {size}")
+        self._commands = commands
+        self._max_calls = max_calls
+        self._memory_limit_mb = memory_limit_mb
+        self._exodus_cache_mb = exodus_cache_mb
+        self._timeout = timeout or None
+        self._executable = executable
+
+        self._ctx = multiprocessing.get_context('forkserver')
+        self._ctx.set_forkserver_preload(_PRELOAD_MODULES)
+
+        self._repo_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._repo_locks_lock = threading.Lock()
+        self._idle_workers: 'queue.Queue[_Worker]' = queue.Queue()
+        for _ in range(size):
+            self._idle_workers.put(self._new_worker())
+        self._closed = False
+        # workers are not daemons, stop them before interpreter exits, or multiprocessing waits for them
+        atexit.register(self.close)
+
+    def _new_worker(self) -> _Worker:
+        return _Worker(ctx=self._ctx, memory_limit_mb=self._memory_limit_mb, exodus_cache_mb=self._exodus_cache_mb)
+
+    def _repo_lock(self, repo_key: str) -> threading.Lock:
+        with self._repo_locks_lock:
+            return self._repo_locks[repo_key]
+
+    def accepts(self, argv: List[str]) -> bool:
+        """
+        returns True if `argv` (without leading mir executable) can run in this pool
+        """
+        return not self._closed and bool(argv) and argv[0] in self._commands
+
+    def run(self, argv: List[str], cwd: Optional[str] = None) -> Tuple[int, str]:
+        """
+        runs mir command `argv` (without leading mir executable) in a worker
+
+        Returns:
+            Tuple[int, str]: return code and log output of this command,
+                if worker crashes or times out, returns RUN_COMMAND_ERROR and reason
+        """
+        with self._repo_lock(_repo_key(argv=argv, cwd=cwd)):
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                return self._run_subprocess(argv=argv, cwd=cwd)
+            next_worker: Optional[_Worker] = worker
+            try:
+                worker.conn.send((argv, cwd))
+                if not worker.conn.poll(self._timeout):
+                    worker.kill()
+                    next_worker = None
+                    return CTLResponseCode.RUN_COMMAND_ERROR, f"mir worker timeout after {self._timeout}s"
+                return_code, output = worker.conn.recv()
+
+                worker.calls += 1
+                if self._max_calls > 0 and worker.calls >= self._max_calls:
+                    worker.stop()
+                    next_worker = None
+                return return_code, output
+            except (EOFError, OSError) as e:
+                worker.process.join(timeout=1)
+                exitcode = worker.process.exitcode
+                worker.kill()
+                next_worker = None
+                return CTLResponseCode.RUN_COMMAND_ERROR, f"mir worker crashed, exitcode: {exitcode}, error: {e}"
+            finally:
+                if self._closed:
+                    if next_worker:
+                        next_worker.stop()
+                else:
+                    self._idle_workers.put(next_worker or self._new_worker())
+
+    def _run_subprocess(self, argv: List[str], cwd: Optional[str]) -> Tuple[int, str]:
+        result = subprocess.run([self._executable, *argv], capture_output=True, text=True, cwd=cwd)
+        return result.returncode, (result.stdout if result.returncode == 0 else result.stderr)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle_workers.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+_pool: Optional[MirWorkerPool] = None
+
+
+def start_pool(size: int,
+               commands: Set[str],
+               max_calls: int = 0,
+               memory_limit_mb: int = 0,
+               exodus_cache_mb: int = 0,
+               timeout: Optional[float] = None,
+               executable: str = 'mir') -> Optional[MirWorkerPool]:
+    """
+    starts the global mir worker pool used by `utils.run_command`, size 0 leaves it disabled
+    """
+    global _pool
+    if size <= 0:
+        return None
+    stop_pool()
+    _pool = MirWorkerPool(size=size,
+                          commands=commands,
+                          max_calls=max_calls,
+                          memory_limit_mb=memory_limit_mb,
+                          exodus_cache_mb=exodus_cache_mb,
+                          timeout=timeout,
+                          executable=executable)
+    logging.info(f"mir worker pool started, size: {size}")
+    return _pool
+
+
+def stop_pool() -> None:
+    global _pool
+    if _pool:
+        _pool.close()
+        _pool = None
+
+
+def get_pool() -> Optional[MirWorkerPool]:
+    return _pool
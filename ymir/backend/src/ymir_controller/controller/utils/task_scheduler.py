@@ -0,0 +1,201 @@
+"""
+task scheduler for async task invokers
+
+tasks are grouped by `TaskClass`, each class has a fixed count of worker threads,
+in each class, next task to run is chosen by:
+    1. priority, `TaskPriority.HIGH` first
+    2. fairness, task of user with less running tasks in this class first
+    3. submit order
+a task can have an `acquire` func, called when the task is about to run, to take resources it needs (gpus),
+    if it returns False, the task goes back to queue, and is not chosen again in `retry_seconds`
+queued and running counts of each class are sent as gauge metrics
+"""
+
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum, unique
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from controller.config import common_task as common_task_config
+from controller.utils import metrics
+
+
+@unique
+class TaskClass(str, Enum):
+    REPO = 'repo'  # cpu bound mir repo operations
+    IO = 'io'  # import / export, large file copies
+    GPU = 'gpu'  # docker tasks, mostly waiting for containers
+
+
+@unique
+class TaskPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@dataclass
+class _TaskEntry:
+    task_id: str
+    user_id: str
+    priority: TaskPriority
+    seq: int
+    func: Callable[[], object]
+    acquire: Optional[Callable[[], bool]] = None
+    queued_time: float = field(default_factory=time.time)
+    not_before: float = 0
+
+
+class TaskScheduler:
+    def __init__(self, workers: Dict[TaskClass, int], retry_seconds: float = 30) -> None:
+        """
+        Args:
+            workers (Dict[TaskClass, int]): count of worker threads for each task class
+            retry_seconds (float): seconds a task waits in queue after its `acquire` failed
+        """
+        self._retry_seconds = retry_seconds
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._closed = False
+        self._pending: Dict[TaskClass, List[_TaskEntry]] = {task_class: [] for task_class in TaskClass}
+        self._running: Dict[TaskClass, Dict[str, int]] = {task_class: {} for task_class in TaskClass}
+
+        self._threads: List[threading.Thread] = []
+        for task_class in TaskClass:
+            if workers.get(task_class, 0) <= 0:
+                raise ValueError(f"invalid worker count for task class {task_class.value}: {workers.get(task_class)}")
+            for idx in range(workers[task_class]):
+                thread = threading.Thread(target=self._worker_loop,
+                                          args=(task_class, ),
+                                          name=f"task-{task_class.value}-{idx}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self,
+               task_class: TaskClass,
+               task_id: str,
+               user_id: str,
+               func: Callable[[], object],
+               priority: TaskPriority = TaskPriority.NORMAL,
+               acquire: Optional[Callable[[], bool]] = None) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("task scheduler closed")
+            self._pending[task_class].append(
+                _TaskEntry(task_id=task_id,
+                           user_id=user_id,
+                           priority=priority,
+                           seq=next(self._seq),
+                           func=func,
+                           acquire=acquire))
+            self._report(task_class)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        returns queued and running counts of each task class
+        """
+        with self._cond:
+            return {
+                task_class.value: {
+                    'queued': len(self._pending[task_class]),
+                    'running': sum(self._running[task_class].values())
+                }
+                for task_class in TaskClass
+            }
+
+    def close(self) -> None:
+        """
+        stops all workers after their running tasks, queued tasks are dropped
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _pop_next(self, task_class: TaskClass) -> Optional[_TaskEntry]:
+        # called with self._cond held, returns None if no task ready to run now
+        now = time.time()
+        ready = [e for e in self._pending[task_class] if e.not_before <= now]
+        if not ready:
+            return None
+        running = self._running[task_class]
+        entry = min(ready, key=lambda e: (e.priority, running.get(e.user_id, 0), e.seq))
+        self._pending[task_class].remove(entry)
+        return entry
+
+    def _wait_timeout(self, task_class: TaskClass) -> Optional[float]:
+        # called with self._cond held, seconds until the first task waiting for retry is ready
+        pending = self._pending[task_class]
+        if not pending:
+            return None
+        return max(min(e.not_before for e in pending) - time.time(), 0)
+
+    def _worker_loop(self, task_class: TaskClass) -> None:
+        running = self._running[task_class]
+        while True:
+            with self._cond:
+                entry = None
+                while not self._closed:
+                    entry = self._pop_next(task_class)
+                    if entry:
+                        break
+                    self._cond.wait(timeout=self._wait_timeout(task_class))
+                if self._closed or not entry:
+                    return
+                running[entry.user_id] = running.get(entry.user_id, 0) + 1
+                self._report(task_class)
+
+            requeue = False
+            try:
+                if entry.acquire and not entry.acquire():
+                    requeue = True
+                    logging.info(f"task {entry.task_id} ({task_class.value}) can not acquire resources, "
+                                 f"retry in {self._retry_seconds}s")
+                else:
+                    logging.info(f"task {entry.task_id} ({task_class.value}) started "
+                                 f"after {time.time() - entry.queued_time:.2f}s in queue")
+                    entry.func()
+            except Exception:
+                logging.exception(f"task {entry.task_id} ({task_class.value}) failed")
+            finally:
+                with self._cond:
+                    running[entry.user_id] -= 1
+                    if running[entry.user_id] <= 0:
+                        del running[entry.user_id]
+                    if requeue:
+                        entry.not_before = time.time() + self._retry_seconds
+                        self._pending[task_class].append(entry)
+                        self._cond.notify_all()
+                    self._report(task_class)
+
+    def _report(self, task_class: TaskClass) -> None:
+        # called with self._cond held
+        queued_cnt = len(self._pending[task_class])
+        running_cnt = sum(self._running[task_class].values())
+        metrics.send_gauge_metrics(f"scheduler.{task_class.value}.queued", queued_cnt)
+        metrics.send_gauge_metrics(f"scheduler.{task_class.value}.running", running_cnt)
+
+
+_scheduler: Optional[TaskScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> TaskScheduler:
+    """
+    returns the global task scheduler, created with worker counts in `controller.config.common_task`
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if not _scheduler:
+            _scheduler = TaskScheduler(workers={
+                TaskClass.REPO: common_task_config.TASK_SCHEDULER_REPO_WORKERS,
+                TaskClass.IO: common_task_config.TASK_SCHEDULER_IO_WORKERS,
+                TaskClass.GPU: common_task_config.TASK_SCHEDULER_GPU_WORKERS,
+            }, retry_seconds=common_task_config.TASK_SCHEDULER_RETRY_SECONDS)
+        return _scheduler
@@ -1,5 +1,6 @@
 from distutils.util import strtobool
 import logging
+import threading
 from typing import Any, Dict, List, Optional
 
 import requests
@@ -30,7 +31,14 @@ def gen_executor_config_find_gpus(req_executor_config: str,
                                   object_type: "mir_cmd_pb.ObjectType.V",
                                   assets_config: Dict = {},
                                   preprocess: Optional[str] = None,
-                                  lock_gpu: bool = True) -> bool:
+                                  lock_gpu: bool = True,
+                                  find_gpus: bool = True) -> bool:
+    """
+    writes executor config to `output_config_file`, with local gpus found (and locked if `lock_gpu`),
+        if not `find_gpus`, gpus are left to `lock_gpus_in_executor_config` when task starts,
+        and only checks this server has enough gpus
+    returns False if not enough gpus
+    """
     executor_config = yaml.safe_load(req_executor_config)
     preprocess_config = yaml.safe_load(preprocess) if preprocess else None
     task_context: Dict[str, Any] = {}
@@ -75,6 +83,10 @@ def gen_executor_config_find_gpus(req_executor_config: str,
         task_context["openpai_gputype"] = openpai_gputype
 
         task_context["available_gpu_id"] = executor_config["gpu_id"]
+    elif not find_gpus:
+        if gpu_count > len(gpu_utils.GPUInfo.get_gpus_info()):
+            return False
+        task_context["available_gpu_id"] = ""
     else:
         # lock local gpus.
         gpu_ids = gpu_utils.GPUInfo().find_gpu_ids_by_config(gpu_count, lock_gpu=lock_gpu)
@@ -89,3 +101,31 @@ def gen_executor_config_find_gpus(req_executor_config: str,
         ), f, allow_unicode=True)
 
     return True
+
+
+# finding and locking gpus is not atomic, tasks started by scheduler threads at the same time lock in turn
+_gpu_lock_mutex = threading.Lock()
+
+
+def lock_gpus_in_executor_config(config_file: str) -> bool:
+    """
+    lock local gpus for the executor config written by `gen_executor_config_find_gpus` without `find_gpus`,
+        called when the task starts, so gpus are not held while it is queued
+    returns False if not enough gpus available now
+    """
+    with open(config_file, "r") as f:
+        config = yaml.safe_load(f)
+    task_context = config["task_context"]
+    if task_context.get("openpai_enable"):
+        return True
+
+    with _gpu_lock_mutex:
+        gpu_ids = gpu_utils.GPUInfo().find_gpu_ids_by_config(config["executor_config"].get("gpu_count", 0),
+                                                             lock_gpu=True)
+    if gpu_ids is None:
+        return False
+    task_context["available_gpu_id"] = gpu_ids
+
+    with open(config_file, "w") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return True
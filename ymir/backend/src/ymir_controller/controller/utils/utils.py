@@ -6,9 +6,11 @@ import subprocess
 import time
 from typing import Callable, Dict, List, Optional
 
+from controller.config import common_task as common_task_config
 from controller.config import label_task as label_task_config
 from controller.label_model.base import LabelBase
 from controller.label_model.label_free import LabelFree
+from controller.utils import mir_worker_pool
 from controller.utils.errors import MirCtrError
 from id_definition import task_id as task_id_proto
 from id_definition.error_codes import CTLResponseCode
@@ -21,6 +23,13 @@ def mir_executable() -> str:
     return "mir"
 
 
+def evaluate_policy_args() -> List[str]:
+    """`--evaluate-policy` args for mir commands which commit with evaluation, empty if not configured"""
+    if not common_task_config.MIR_EVALUATE_POLICY:
+        return []
+    return ['--evaluate-policy', common_task_config.MIR_EVALUATE_POLICY]
+
+
 def index_repo(user_id: str, repo_id: str, task_id: str) -> backend_pb2.GeneralResp:
     index_command = ['./hel_server', 'viewer_client']
     index_command.extend(
@@ -32,6 +41,15 @@ def run_command(cmd: List[str],
                 error_code: int = CTLResponseCode.RUN_COMMAND_ERROR,
                 cwd: str = None) -> backend_pb2.GeneralResp:
     logging.info(f"starting cmd: \n{' '.join(cmd)}\n")
+    pool = mir_worker_pool.get_pool()
+    if pool and cmd and cmd[0] == mir_executable() and pool.accepts(cmd[1:]):
+        return_code, output = pool.run(cmd[1:], cwd=cwd)
+        if return_code != 0:
+            logging.error(f"run cmd in mir worker error:\n output: {output}")
+            return make_general_response(error_code, output)
+        logging.info(f"run cmd in mir worker succeed: \n {output}")
+        return make_general_response(CTLResponseCode.CTR_OK, output)
+
     result = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)  # run and wait
     if result.returncode != 0:
         logging.error(f"run cmd error:\n stderr: {result.stderr} \n stdout: {result.stdout}")
@@ -0,0 +1,66 @@
+"""
+benchmark: per task latency of mir commands,
+cli subprocess (previous implementation) vs. warm mir worker pool
+
+each task runs a chain of `mir init` and `mir status` on a new repo
+
+usage: python -m tests.benchmarks.bench_mir_worker_pool [--tasks 20] [--workers 4] [--mir mir]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import time
+from typing import Callable, List, Tuple
+
+from controller.utils import mir_worker_pool
+
+
+def _task_cmds(root: str, task_idx: int) -> List[List[str]]:
+    mir_root = os.path.join(root, f"repo-{task_idx}")
+    os.makedirs(mir_root, exist_ok=True)
+    return [['init', '--root', mir_root], ['status', '--root', mir_root]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mir', type=str, default='mir', help='mir cli, such as `mir` or `python -m mir`')
+    parser.add_argument('--root', type=str, default='/tmp/ymir-controller-bench/mir_worker_pool')
+    args = parser.parse_args()
+
+    def _run_cli(cmd: List[str]) -> int:
+        return subprocess.run(args.mir.split() + cmd, capture_output=True, text=True).returncode
+
+    start = time.time()
+    pool = mir_worker_pool.MirWorkerPool(size=args.workers, commands={'init', 'status'})
+    print(f"{'pool start':>10}: {args.workers} workers, {time.time() - start:.3f}s")
+
+    def _run_pool(cmd: List[str]) -> int:
+        return pool.run(cmd)[0]
+
+    runs: List[Tuple[str, Callable[[List[str]], int]]] = [('cli', _run_cli), ('pool', _run_pool)]
+    try:
+        for name, run_func in runs:
+            if os.path.isdir(args.root):
+                shutil.rmtree(args.root)
+            costs = []
+            for task_idx in range(args.tasks):
+                start = time.time()
+                for cmd in _task_cmds(root=args.root, task_idx=task_idx):
+                    if run_func(cmd) != 0:
+                        raise RuntimeError(f"{name} failed: {cmd}")
+                costs.append(time.time() - start)
+            costs.sort()
+            print(f"{name:>10}: {args.tasks} tasks, mean {sum(costs) / len(costs):.3f}s, "
+                  f"p50 {costs[len(costs) // 2]:.3f}s, max {costs[-1]:.3f}s per task")
+    finally:
+        pool.close()
+        if os.path.isdir(args.root):
+            shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ import shutil
 import unittest
 from unittest import mock
 
+from controller.config import common_task as common_task_config
 from controller.utils.invoker_call import make_invoker_cmd_call
 from controller.utils.invoker_mapping import RequestTypeToInvoker
 from proto import backend_pb2
@@ -88,3 +89,20 @@ class TestInvokerSampling(unittest.TestCase):
         expected_cmd += f" --src-revs {self.in_dataset_ids[0]}@{self.in_dataset_ids[0]}"
         expected_cmd += f" -w {work_dir} --count 10"
         mock_run.assert_called_once_with(expected_cmd.split(' '), capture_output=True, text=True, cwd=None)
+
+        # evaluate policy from controller config
+        mock_run.reset_mock()
+        with mock.patch.object(common_task_config, 'MIR_EVALUATE_POLICY', 'deferred'):
+            response = make_invoker_cmd_call(invoker=RequestTypeToInvoker[backend_pb2.CMD_SAMPLING],
+                                             sandbox_root=self._sandbox_root,
+                                             req_type=backend_pb2.CMD_SAMPLING,
+                                             user_id=self._user_name,
+                                             repo_id=self._mir_repo_name,
+                                             task_id=self._task_id,
+                                             his_task_id=self.in_dataset_ids[0],
+                                             dst_dataset_id=self._task_id,
+                                             in_dataset_ids=self.in_dataset_ids,
+                                             sampling_count=10)
+        self.assertEqual(response.code, 0)
+        expected_cmd += " --evaluate-policy deferred"
+        mock_run.assert_called_once_with(expected_cmd.split(' '), capture_output=True, text=True, cwd=None)
@@ -184,6 +184,8 @@ class TestInvokerTaskTraining(unittest.TestCase):
                                                          task_id=self._task_id)
         mock_run.assert_has_calls(
             [mock.call(training_cmd.split(' '), capture_output=True, text=True, cwd=None), mocked_index_call])
+        # gpus locked once, when the task starts
+        rds.zadd.assert_called_once()
 
         expected_ret = backend_pb2.GeneralResp()
         expected_dict = {'message': RET_ID}
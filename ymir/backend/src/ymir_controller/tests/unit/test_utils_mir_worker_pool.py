@@ -0,0 +1,90 @@
+import os
+import shutil
+import unittest
+
+from controller.utils import mir_worker_pool
+from id_definition.error_codes import CTLResponseCode
+import tests.utils as test_utils
+
+
+class TestMirWorkerPool(unittest.TestCase):
+    def __init__(self, methodName: str) -> None:
+        super().__init__(methodName=methodName)
+        self._sandbox_root = test_utils.dir_test_root(self.id().split(".")[-3:])
+
+    def setUp(self) -> None:
+        if os.path.isdir(self._sandbox_root):
+            shutil.rmtree(self._sandbox_root)
+        os.makedirs(self._sandbox_root)
+        self._pool = mir_worker_pool.MirWorkerPool(size=1, commands={'init', 'status'}, max_calls=3)
+
+    def tearDown(self) -> None:
+        self._pool.close()
+        if os.path.isdir(self._sandbox_root):
+            shutil.rmtree(self._sandbox_root)
+
+    def _worker_pid(self) -> int:
+        worker = self._pool._idle_workers.get()
+        self._pool._idle_workers.put(worker)
+        return worker.process.pid
+
+    def test_repo_key_00(self) -> None:
+        self.assertEqual('/a/b', mir_worker_pool._repo_key(['filter', '--root', '/a/b', '-w', '/c'], cwd=None))
+        self.assertEqual('/a/b', mir_worker_pool._repo_key(['filter', '--root=b'], cwd='/a'))
+        self.assertEqual('/a', mir_worker_pool._repo_key(['status'], cwd='/a'))
+
+    def test_accepts_00(self) -> None:
+        self.assertTrue(self._pool.accepts(['init', '--root', '/a']))
+        self.assertFalse(self._pool.accepts(['train', '--root', '/a']))
+        self.assertFalse(self._pool.accepts([]))
+
+    def test_run_00(self) -> None:
+        # normal run, same worker
+        mir_root = os.path.join(self._sandbox_root, 'repo')
+        os.makedirs(mir_root)
+        pid = self._worker_pid()
+        return_code, _ = self._pool.run(['init', '--root', mir_root])
+        self.assertEqual(0, return_code)
+        self.assertTrue(os.path.isdir(os.path.join(mir_root, '.mir')))
+        return_code, output = self._pool.run(['status'], cwd=mir_root)
+        self.assertEqual(0, return_code)
+        self.assertTrue(output)
+        self.assertEqual(pid, self._worker_pid())
+
+        # recycled after max calls
+        self._pool.run(['status'], cwd=mir_root)
+        self.assertNotEqual(pid, self._worker_pid())
+
+    def test_run_01(self) -> None:
+        # crashed worker is replaced
+        pid = self._worker_pid()
+        self._pool._idle_workers.queue[0].process.kill()
+        self._pool._idle_workers.queue[0].process.join()
+        return_code, output = self._pool.run(['status'], cwd=self._sandbox_root)
+        self.assertEqual(CTLResponseCode.RUN_COMMAND_ERROR, return_code)
+        self.assertIn('crashed', output)
+        self.assertNotEqual(pid, self._worker_pid())
+
+        # not a mir repo, command fails but worker survives
+        pid = self._worker_pid()
+        return_code, _ = self._pool.run(['status'], cwd=self._sandbox_root)
+        self.assertNotEqual(0, return_code)
+        self.assertEqual(pid, self._worker_pid())
+
+    def test_run_02(self) -> None:
+        # workers can have children, mir tools may start process pools
+        self.assertFalse(self._pool._idle_workers.queue[0].process.daemon)
+
+        # all workers busy: runs as cli subprocess
+        mir_root = os.path.join(self._sandbox_root, 'repo')
+        os.makedirs(mir_root)
+        worker = self._pool._idle_workers.get()
+        try:
+            return_code, _ = self._pool.run(['init', '--root', mir_root])
+            self.assertEqual(0, return_code)
+            self.assertTrue(os.path.isdir(os.path.join(mir_root, '.mir')))
+            return_code, output = self._pool.run(['status'], cwd=self._sandbox_root)
+            self.assertNotEqual(0, return_code)
+            self.assertEqual(worker.calls, 0)
+        finally:
+            self._pool._idle_workers.put(worker)
@@ -0,0 +1,139 @@
+import os
+import shutil
+import unittest
+from unittest import mock
+
+import yaml
+
+from common_utils import sandbox_updater
+from common_utils.sandbox_checkpoint import RepoCheckpoint
+
+import tests.utils as test_utils
+
+
+class TestSandboxUpdater(unittest.TestCase):
+    def __init__(self, methodName: str) -> None:
+        super().__init__(methodName=methodName)
+        # dir structure:
+        # sandbox_root
+        # ├── sandbox-bk
+        # │   └── 0001
+        # │       └── 000001
+        # ├── sandbox-update
+        # └── 0001
+        #     ├── labels.yaml
+        #     └── 000001
+        self._user_id = '0001'
+        self._repo_id = '000001'
+        self._sandbox_root = test_utils.dir_test_root(self.id().split(".")[-3:])
+        self._mir_root = os.path.join(self._sandbox_root, self._user_id, self._repo_id)
+        self._backup_mir_root = os.path.join(self._sandbox_root, 'sandbox-bk', self._user_id, self._repo_id)
+        self._checkpoint_dir = os.path.join(self._sandbox_root, 'sandbox-update')
+
+    def setUp(self) -> None:
+        if os.path.isdir(self._sandbox_root):
+            shutil.rmtree(self._sandbox_root)
+        os.makedirs(os.path.join(self._mir_root, '.git'))
+        with open(os.path.join(self._sandbox_root, self._user_id, 'labels.yaml'), 'w') as f:
+            yaml.safe_dump({'ymir_version': '1.1.0', 'labels': []}, f)
+        os.makedirs(self._checkpoint_dir)
+
+    def tearDown(self) -> None:
+        if os.path.isdir(self._sandbox_root):
+            shutil.rmtree(self._sandbox_root)
+
+    # protected: misc
+    def _write_file(self, path: str, content: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def _read_file(self, path: str) -> str:
+        with open(path, 'r') as f:
+            return f.read()
+
+    # public: test cases
+    def test_checkpoint_00(self) -> None:
+        # last line partially written when interrupted: ignored
+        checkpoint_path = os.path.join(self._checkpoint_dir, 'a.log')
+        self._write_file(checkpoint_path, 'begin t0\ndone t0\nbegin t1\ndone t1\nfini')
+        checkpoint = RepoCheckpoint(checkpoint_path)
+        self.assertEqual({'t0', 't1'}, checkpoint.done_tags)
+        self.assertIsNone(checkpoint.pending_tag)
+        self.assertFalse(checkpoint.finished)
+
+        # partial `done` line: tag still pending
+        self._write_file(checkpoint_path, 'begin t0\ndone t0\nbegin t1\ndone t')
+        checkpoint = RepoCheckpoint(checkpoint_path)
+        self.assertEqual({'t0'}, checkpoint.done_tags)
+        self.assertEqual('t1', checkpoint.pending_tag)
+
+        # appends after reload, and reset
+        checkpoint.done('t1')
+        checkpoint.finish()
+        checkpoint = RepoCheckpoint(checkpoint_path)
+        self.assertEqual({'t0', 't1'}, checkpoint.done_tags)
+        self.assertTrue(checkpoint.finished)
+        checkpoint.reset()
+        self.assertFalse(os.path.isfile(checkpoint_path))
+        self.assertEqual(set(), checkpoint.done_tags)
+        self.assertFalse(checkpoint.finished)
+
+    def test_update_repo_00(self) -> None:
+        # repo interrupted while writing a tag: restored from backup, and all steps updated again
+        self._write_file(os.path.join(self._mir_root, 'data.txt'), 'half written')
+        self._write_file(os.path.join(self._backup_mir_root, 'data.txt'), 'original')
+        os.makedirs(os.path.join(self._backup_mir_root, '.git'))
+        self._write_file(os.path.join(self._checkpoint_dir, f"{self._user_id}-{self._repo_id}-0.log"),
+                         'begin t0\ndone t0\nbegin t1\n')
+        self._write_file(os.path.join(self._checkpoint_dir, f"{self._user_id}-{self._repo_id}-1.log"), '')
+
+        step_calls = []
+
+        def _step(mir_root: str, assets_root: str, models_root: str, checkpoint: RepoCheckpoint) -> int:
+            step_calls.append((self._read_file(os.path.join(mir_root, 'data.txt')), set(checkpoint.done_tags),
+                               checkpoint.pending_tag))
+            for tag in ['t0', 't1']:
+                checkpoint.begin(tag)
+                checkpoint.done(tag)
+            checkpoint.finish()
+            return 2
+
+        tags, _ = sandbox_updater._update_repo(sandbox_root=self._sandbox_root,
+                                               assets_root='',
+                                               models_root='',
+                                               user_id=self._user_id,
+                                               repo_id=self._repo_id,
+                                               steps=[_step, _step])
+        self.assertEqual(4, tags)
+        self.assertEqual([('original', set(), None)] * 2, step_calls)
+        self.assertEqual('original', self._read_file(os.path.join(self._mir_root, 'data.txt')))
+
+        # finished repo: not updated again
+        tags, _ = sandbox_updater._update_repo(sandbox_root=self._sandbox_root,
+                                               assets_root='',
+                                               models_root='',
+                                               user_id=self._user_id,
+                                               repo_id=self._repo_id,
+                                               steps=[_step, _step])
+        self.assertEqual(0, tags)
+        self.assertEqual(2, len(step_calls))
+
+    def test_update_00(self) -> None:
+        # manifest of an interrupted update with other versions: rejected, sandbox untouched
+        with open(os.path.join(self._checkpoint_dir, 'manifest.yaml'), 'w') as f:
+            yaml.safe_dump({'src_ver': '1.0.0', 'dst_ver': '2.0.0'}, f)
+        self.assertEqual('1.0.0', sandbox_updater.resume_src_version(self._sandbox_root))
+
+        step = mock.Mock(return_value=0)
+        with mock.patch.object(sandbox_updater, '_get_update_steps', return_value=[step]):
+            with self.assertRaises(ValueError):
+                sandbox_updater.update(sandbox_root=self._sandbox_root,
+                                       assets_root='',
+                                       models_root='',
+                                       src_ver='1.1.0',
+                                       dst_ver='2.0.0',
+                                       workers=0)
+        step.assert_not_called()
+        self.assertFalse(os.path.isdir(os.path.join(self._sandbox_root, 'sandbox-bk')))
+        self.assertTrue(os.path.isfile(os.path.join(self._checkpoint_dir, 'manifest.yaml')))
@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+from typing import Callable, List
+
+from controller.utils.task_scheduler import TaskClass, TaskPriority, TaskScheduler
+
+
+class TestTaskScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self._scheduler = TaskScheduler(workers={TaskClass.REPO: 1, TaskClass.IO: 2, TaskClass.GPU: 1})
+        self._orders: List[str] = []
+        self._orders_lock = threading.Lock()
+
+    def tearDown(self) -> None:
+        self._scheduler.close()
+
+    def _task(self, task_id: str, gate: threading.Event = None) -> Callable[[], None]:
+        def _run() -> None:
+            if gate:
+                gate.wait(timeout=5)
+            with self._orders_lock:
+                self._orders.append(task_id)
+
+        return _run
+
+    def _wait_for(self, cnt: int) -> None:
+        for _ in range(500):
+            if len(self._orders) >= cnt:
+                return
+            time.sleep(0.01)
+        self.fail(f"expected {cnt} finished tasks, got: {self._orders}")
+
+    def test_schedule_00(self) -> None:
+        # block the only repo worker, then queue tasks with different priorities and users
+        gate = threading.Event()
+        self._scheduler.submit(TaskClass.REPO, task_id='t0', user_id='u1', func=self._task('t0', gate))
+        time.sleep(0.1)
+        self._scheduler.submit(TaskClass.REPO, task_id='t1', user_id='u1', func=self._task('t1'))
+        self._scheduler.submit(TaskClass.REPO, task_id='t2', user_id='u1', func=self._task('t2'))
+        self._scheduler.submit(TaskClass.REPO, task_id='t3', user_id='u2', func=self._task('t3'))
+        self._scheduler.submit(TaskClass.REPO,
+                               task_id='t4',
+                               user_id='u1',
+                               func=self._task('t4'),
+                               priority=TaskPriority.HIGH)
+        self._scheduler.submit(TaskClass.REPO,
+                               task_id='t5',
+                               user_id='u2',
+                               func=self._task('t5'),
+                               priority=TaskPriority.LOW)
+        self.assertEqual({'queued': 5, 'running': 1}, self._scheduler.stats()['repo'])
+
+        gate.set()
+        self._wait_for(6)
+        self.assertEqual(['t0', 't4', 't1', 't2', 't3', 't5'], self._orders)
+        self.assertEqual({'queued': 0, 'running': 0}, self._scheduler.stats()['repo'])
+
+    def test_schedule_01(self) -> None:
+        # both io workers blocked, u2 finishes first, and its queued task goes before earlier ones of u1
+        gate_1, gate_2 = threading.Event(), threading.Event()
+        self._scheduler.submit(TaskClass.IO, task_id='a', user_id='u1', func=self._task('a', gate_1))
+        self._scheduler.submit(TaskClass.IO, task_id='b', user_id='u2', func=self._task('b', gate_2))
+        time.sleep(0.1)
+        self._scheduler.submit(TaskClass.IO, task_id='c', user_id='u1', func=self._task('c', gate_1))
+        self._scheduler.submit(TaskClass.IO, task_id='d', user_id='u1', func=self._task('d', gate_1))
+        self._scheduler.submit(TaskClass.IO, task_id='e', user_id='u2', func=self._task('e'))
+        self.assertEqual({'queued': 3, 'running': 2}, self._scheduler.stats()['io'])
+
+        gate_2.set()
+        self._wait_for(2)
+        self.assertEqual(['b', 'e'], self._orders)
+
+        gate_1.set()
+        self._wait_for(5)
+        self.assertEqual(['b', 'e', 'a', 'c', 'd'], self._orders[:2] + sorted(self._orders[2:]))
+
+    def test_schedule_02(self) -> None:
+        # task classes are independent, and failed task does not stop worker
+        gate = threading.Event()
+
+        def _failed_task() -> None:
+            raise RuntimeError('expected failure')
+
+        self._scheduler.submit(TaskClass.GPU, task_id='g0', user_id='u1', func=self._task('g0', gate))
+        self._scheduler.submit(TaskClass.IO, task_id='i0', user_id='u1', func=_failed_task)
+        self._scheduler.submit(TaskClass.IO, task_id='i1', user_id='u1', func=self._task('i1'))
+        self._scheduler.submit(TaskClass.REPO, task_id='r0', user_id='u1', func=self._task('r0'))
+        self._wait_for(2)
+        self.assertEqual({'i1', 'r0'}, set(self._orders))
+
+        gate.set()
+        self._wait_for(3)
+        self.assertEqual('g0', self._orders[-1])
+
+    def test_schedule_03(self) -> None:
+        # task can not acquire its resources: back to queue, later tasks run, and it is retried after retry_seconds
+        self._scheduler.close()
+        self._scheduler = TaskScheduler(workers={TaskClass.REPO: 1, TaskClass.IO: 1, TaskClass.GPU: 1},
+                                        retry_seconds=0.3)
+        acquire_times: List[float] = []
+
+        def _acquire() -> bool:
+            acquire_times.append(time.time())
+            return len(acquire_times) > 1
+
+        self._scheduler.submit(TaskClass.GPU, task_id='g0', user_id='u1', func=self._task('g0'), acquire=_acquire)
+        self._scheduler.submit(TaskClass.GPU, task_id='g1', user_id='u1', func=self._task('g1'))
+        self._wait_for(2)
+        self.assertEqual(['g1', 'g0'], self._orders)
+        self.assertEqual(2, len(acquire_times))
+        self.assertGreaterEqual(acquire_times[1] - acquire_times[0], 0.3)
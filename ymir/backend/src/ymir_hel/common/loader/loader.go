@@ -1,6 +1,12 @@
 package loader
 
 import (
+	"errors"
+	"fmt"
+	"io/fs"
+	"os"
+	"path"
+
 	"gopkg.in/yaml.v3"
 
 	"github.com/vektra/gitreader"
@@ -46,6 +52,9 @@ func (l *MirRepoLoader) LoadMutipleMirDatas(
 		if err != nil {
 			panic(err)
 		}
+		if mirTasks, ok := newData.(*protos.MirTasks); ok {
+			fillDeferredEvaluation(mirRoot, mirRepo.BranchID, mirTasks)
+		}
 		sliceDatas[i] = newData
 	}
 	repo.Close()
@@ -53,6 +62,29 @@ func (l *MirRepoLoader) LoadMutipleMirDatas(
 	return sliceDatas
 }
 
+// Head task committed with deferred evaluation has state ES_PENDING in tasks.mir,
+// its result is saved by evaluation worker in .mir/evaluations, see mir/tools/eval/eval_deferred.py.
+func fillDeferredEvaluation(mirRoot string, branchID string, mirTasks *protos.MirTasks) {
+	task, ok := mirTasks.Tasks[mirTasks.HeadTaskId]
+	if !ok || task.Evaluation == nil || task.Evaluation.State != protos.EvaluationState_ES_PENDING {
+		return
+	}
+
+	resultPath := path.Join(mirRoot, ".mir", "evaluations", fmt.Sprintf("%s@%s.mir", branchID, mirTasks.HeadTaskId))
+	bytes, err := os.ReadFile(resultPath)
+	if errors.Is(err, fs.ErrNotExist) {
+		return
+	}
+	if err != nil {
+		panic(err)
+	}
+	evaluation := &protos.Evaluation{}
+	if err = proto.Unmarshal(bytes, evaluation); err != nil {
+		panic(err)
+	}
+	task.Evaluation = evaluation
+}
+
 func (l *MirRepoLoader) LoadModelInfo(mirRepo *constants.MirRepo) *constants.MirdataModel {
 	mirTasks := l.LoadSingleMirData(mirRepo, constants.MirfileTasks).(*protos.MirTasks)
 	task := mirTasks.Tasks[mirTasks.HeadTaskId]
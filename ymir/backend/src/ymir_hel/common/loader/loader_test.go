@@ -105,3 +105,40 @@ func TestLoadModelInfo(t *testing.T) {
 	mirModel := mirRepoLoader.LoadModelInfo(mirRepo)
 	assert.Equal(t, expectedModel, mirModel)
 }
+
+func TestLoadDeferredEvaluation(t *testing.T) {
+	workDir := fmt.Sprintf("%s/deferred_evaluation", t.TempDir())
+	mirRepo := createTestMirRepo(workDir)
+	mirRoot, mirRev := mirRepo.BuildRepoID()
+
+	headTaskID := mirRepo.TaskID
+	mirTasks := protos.MirTasks{
+		Tasks: map[string]*protos.Task{
+			headTaskID: {Evaluation: &protos.Evaluation{State: protos.EvaluationState_ES_PENDING}},
+		},
+		HeadTaskId: headTaskID,
+	}
+	encodedData, _ := proto.Marshal(&mirTasks)
+	createGitRepo(t, mirRoot, map[string][]byte{"tasks.mir": encodedData}, mirRev)
+
+	// result not ready: still pending
+	mirRepoLoader := MirRepoLoader{}
+	loadedTasks := mirRepoLoader.LoadSingleMirData(mirRepo, constants.MirfileTasks).(*protos.MirTasks)
+	assert.Equal(t, protos.EvaluationState_ES_PENDING, loadedTasks.Tasks[headTaskID].Evaluation.State)
+
+	// result ready: filled from evaluations dir
+	evaluationsRoot := path.Join(mirRoot, ".mir", "evaluations")
+	if err := os.MkdirAll(evaluationsRoot, 0777); err != nil {
+		panic(err)
+	}
+	evaluation := &protos.Evaluation{
+		State:  protos.EvaluationState_ES_READY,
+		Config: &protos.EvaluateConfig{ConfThr: 0.3, ClassIds: []int32{0, 1}},
+	}
+	encodedEvaluation, _ := proto.Marshal(evaluation)
+	if err := os.WriteFile(path.Join(evaluationsRoot, mirRev+".mir"), encodedEvaluation, 0666); err != nil {
+		panic(err)
+	}
+	loadedTasks = mirRepoLoader.LoadSingleMirData(mirRepo, constants.MirfileTasks).(*protos.MirTasks)
+	assert.True(t, proto.Equal(evaluation, loadedTasks.Tasks[headTaskID].Evaluation))
+}
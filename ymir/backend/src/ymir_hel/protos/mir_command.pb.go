@@ -749,6 +749,8 @@ const (
 	EvaluationState_ES_EXCEEDS_LIMIT EvaluationState = 3
 	// evaluation not finished because there's no evaluate class ids
 	EvaluationState_ES_NOT_ENOUGH_CLASS_IDS EvaluationState = 4
+	// evaluation deferred to a background worker, result not ready yet
+	EvaluationState_ES_PENDING EvaluationState = 5
 )
 
 // Enum value maps for EvaluationState.
@@ -759,6 +761,7 @@ var (
 		2: "ES_NO_GT_OR_PRED",
 		3: "ES_EXCEEDS_LIMIT",
 		4: "ES_NOT_ENOUGH_CLASS_IDS",
+		5: "ES_PENDING",
 	}
 	EvaluationState_value = map[string]int32{
 		"ES_NOT_SET":              0,
@@ -766,6 +769,7 @@ var (
 		"ES_NO_GT_OR_PRED":        2,
 		"ES_EXCEEDS_LIMIT":        3,
 		"ES_NOT_ENOUGH_CLASS_IDS": 4,
+		"ES_PENDING":              5,
 	}
 )
 
@@ -3954,15 +3958,16 @@ var file_mir_command_proto_rawDesc = []byte{
 	0x06, 0x0a, 0x02, 0x46, 0x4e, 0x10, 0x03, 0x12, 0x06, 0x0a, 0x02, 0x54, 0x4e, 0x10, 0x04, 0x12,
 	0x0b, 0x0a, 0x07, 0x55, 0x6e, 0x6b, 0x6e, 0x6f, 0x77, 0x6e, 0x10, 0x05, 0x12, 0x07, 0x0a, 0x03,
 	0x4d, 0x54, 0x50, 0x10, 0x0b, 0x12, 0x0b, 0x0a, 0x07, 0x49, 0x47, 0x4e, 0x4f, 0x52, 0x45, 0x44,
-	0x10, 0x0c, 0x2a, 0x78, 0x0a, 0x0f, 0x45, 0x76, 0x61, 0x6c, 0x75, 0x61, 0x74, 0x69, 0x6f, 0x6e,
-	0x53, 0x74, 0x61, 0x74, 0x65, 0x12, 0x0e, 0x0a, 0x0a, 0x45, 0x53, 0x5f, 0x4e, 0x4f, 0x54, 0x5f,
-	0x53, 0x45, 0x54, 0x10, 0x00, 0x12, 0x0c, 0x0a, 0x08, 0x45, 0x53, 0x5f, 0x52, 0x45, 0x41, 0x44,
-	0x59, 0x10, 0x01, 0x12, 0x14, 0x0a, 0x10, 0x45, 0x53, 0x5f, 0x4e, 0x4f, 0x5f, 0x47, 0x54, 0x5f,
-	0x4f, 0x52, 0x5f, 0x50, 0x52, 0x45, 0x44, 0x10, 0x02, 0x12, 0x14, 0x0a, 0x10, 0x45, 0x53, 0x5f,
-	0x45, 0x58, 0x43, 0x45, 0x45, 0x44, 0x53, 0x5f, 0x4c, 0x49, 0x4d, 0x49, 0x54, 0x10, 0x03, 0x12,
-	0x1b, 0x0a, 0x17, 0x45, 0x53, 0x5f, 0x4e, 0x4f, 0x54, 0x5f, 0x45, 0x4e, 0x4f, 0x55, 0x47, 0x48,
-	0x5f, 0x43, 0x4c, 0x41, 0x53, 0x53, 0x5f, 0x49, 0x44, 0x53, 0x10, 0x04, 0x42, 0x09, 0x5a, 0x07,
-	0x2f, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x73, 0x62, 0x06, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x33,
+	0x10, 0x0c, 0x2a, 0x88, 0x01, 0x0a, 0x0f, 0x45, 0x76, 0x61, 0x6c, 0x75, 0x61, 0x74, 0x69, 0x6f,
+	0x6e, 0x53, 0x74, 0x61, 0x74, 0x65, 0x12, 0x0e, 0x0a, 0x0a, 0x45, 0x53, 0x5f, 0x4e, 0x4f, 0x54,
+	0x5f, 0x53, 0x45, 0x54, 0x10, 0x00, 0x12, 0x0c, 0x0a, 0x08, 0x45, 0x53, 0x5f, 0x52, 0x45, 0x41,
+	0x44, 0x59, 0x10, 0x01, 0x12, 0x14, 0x0a, 0x10, 0x45, 0x53, 0x5f, 0x4e, 0x4f, 0x5f, 0x47, 0x54,
+	0x5f, 0x4f, 0x52, 0x5f, 0x50, 0x52, 0x45, 0x44, 0x10, 0x02, 0x12, 0x14, 0x0a, 0x10, 0x45, 0x53,
+	0x5f, 0x45, 0x58, 0x43, 0x45, 0x45, 0x44, 0x53, 0x5f, 0x4c, 0x49, 0x4d, 0x49, 0x54, 0x10, 0x03,
+	0x12, 0x1b, 0x0a, 0x17, 0x45, 0x53, 0x5f, 0x4e, 0x4f, 0x54, 0x5f, 0x45, 0x4e, 0x4f, 0x55, 0x47,
+	0x48, 0x5f, 0x43, 0x4c, 0x41, 0x53, 0x53, 0x5f, 0x49, 0x44, 0x53, 0x10, 0x04, 0x12, 0x0e, 0x0a,
+	0x0a, 0x45, 0x53, 0x5f, 0x50, 0x45, 0x4e, 0x44, 0x49, 0x4e, 0x47, 0x10, 0x05, 0x42, 0x09, 0x5a,
+	0x07, 0x2f, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x73, 0x62, 0x06, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x33,
 }
 
 var (
@@ -1,10 +1,10 @@
 import argparse
 import logging
-from typing import List
+from typing import List, Optional
 
 from mir.commands import base
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools import checker, revs_parser, mir_repo_utils, mir_storage_ops
+from mir.tools import checker, revs_parser, mir_repo_utils, mir_storage_ops, settings as mir_settings
 from mir.tools.annotations import map_and_filter_annotations
 from mir.tools.code import MirCode
 from mir.tools.command_run_in_out import command_run_in_out
@@ -25,7 +25,8 @@ class CmdCopy(base.BaseCommand):
                                      ignore_unknown_types=self.args.ignore_unknown_types,
                                      drop_annotations=self.args.drop_annotations,
                                      src_revs='master',
-                                     work_dir=self.args.work_dir)
+                                     work_dir=self.args.work_dir,
+                                     evaluate_policy=mir_storage_ops.EvaluatePolicy(self.args.evaluate_policy))
 
     @staticmethod
     @command_run_in_out
@@ -38,7 +39,8 @@ class CmdCopy(base.BaseCommand):
                       ignore_unknown_types: bool,
                       drop_annotations: bool,
                       src_revs: str = 'master',
-                      work_dir: str = None) -> int:
+                      work_dir: str = None,
+                      evaluate_policy: Optional[mir_storage_ops.EvaluatePolicy] = None) -> int:
         # ! pay attention to param: `src_revs` and `data_src_revs`
         # ! data_src_revs means the source branch in data_mir_root
         # ! src_revs means the source branch we commit from, in this destination mir_root
@@ -120,7 +122,8 @@ class CmdCopy(base.BaseCommand):
                                                           mirpb.MirStorage.MIR_METADATAS: mir_metadatas,
                                                           mirpb.MirStorage.MIR_ANNOTATIONS: mir_annotations,
                                                       },
-                                                      task=task)
+                                                      task=task,
+                                                      evaluate_policy=evaluate_policy)
 
         return MirCode.RC_OK
 
@@ -157,4 +160,11 @@ def bind_to_subparsers(subparsers: argparse._SubParsersAction, parent_parser: ar
                                  required=False,
                                  action='store_true',
                                  help='drop all annotations when copy')
+    copy_arg_parser.add_argument('--evaluate-policy',
+                                 dest='evaluate_policy',
+                                 type=str,
+                                 default=mir_settings.DEFAULT_EVALUATE_POLICY,
+                                 choices=[policy.value for policy in mir_storage_ops.EvaluatePolicy],
+                                 help='sync: evaluate before commit; deferred: evaluate in background after commit; '
+                                 'off: never evaluate')
     copy_arg_parser.set_defaults(func=CmdCopy)
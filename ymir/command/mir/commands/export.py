@@ -30,6 +30,8 @@ class CmdExport(base.BaseCommand):
             anno_format=annotations.parse_anno_format(self.args.anno_format),
             class_names=self.args.class_names.split(';') if self.args.class_names else [],
             work_dir=self.args.work_dir,
+            link_mode=exporter.ExportLinkMode(self.args.link_mode),
+            anno_archive=exporter.AnnoArchiveFormat(self.args.anno_archive),
         )
 
     @staticmethod
@@ -47,6 +49,8 @@ class CmdExport(base.BaseCommand):
         anno_format: "mirpb.AnnoFormat.V",
         class_names: List[str],
         work_dir: str,
+        link_mode: exporter.ExportLinkMode = exporter.ExportLinkMode.COPY,
+        anno_archive: exporter.AnnoArchiveFormat = exporter.AnnoArchiveFormat.NONE,
     ) -> int:
         if not asset_dir or not media_location or not src_revs:
             logging.error('empty --asset-dir, --media-location or --src-revs')
@@ -92,6 +96,9 @@ class CmdExport(base.BaseCommand):
             mir_annotations=mir_annotations,
             class_ids_mapping=class_ids_mapping,
             cls_id_mgr=cls_mgr,
+            link_mode=link_mode,
+            phase='export.others',
+            anno_archive=anno_archive,
         )
         if export_code != MirCode.RC_OK:
             return export_code
@@ -162,5 +169,19 @@ def bind_to_subparsers(subparsers: argparse._SubParsersAction, parent_parser: ar
                                       required=False,
                                       default='',
                                       help="class names, do not set if you want to export all types")
+    exporting_arg_parser.add_argument('--link-mode',
+                                      dest='link_mode',
+                                      type=str,
+                                      default=exporter.ExportLinkMode.COPY.value,
+                                      choices=[mode.value for mode in exporter.ExportLinkMode],
+                                      help='how raw assets are placed into asset dir: copy / hardlink / reflink / '
+                                      'symlink, link modes fall back to copy if not supported')
+    exporting_arg_parser.add_argument('--anno-archive',
+                                      dest='anno_archive',
+                                      type=str,
+                                      default=exporter.AnnoArchiveFormat.NONE.value,
+                                      choices=[archive.value for archive in exporter.AnnoArchiveFormat],
+                                      help='ark and voc annotations as one file for each asset (none), '
+                                      'or as one tar / zip archive in gt and pred dir')
     exporting_arg_parser.add_argument('-w', dest='work_dir', type=str, required=False, help='working directory')
     exporting_arg_parser.set_defaults(func=CmdExport)
@@ -1,11 +1,11 @@
 import argparse
 import logging
-from typing import Set
+from typing import Callable, Iterable, List, Optional, Set
 
 from mir.commands import base
 from mir.protos import mir_command_pb2 as mirpb
 from mir.tools import checker, class_ids
-from mir.tools import mir_repo_utils, mir_storage_ops, revs_parser
+from mir.tools import mir_columnar, mir_repo_utils, mir_storage_ops, revs_parser, settings as mir_settings
 from mir.tools.annotations import anno_type_from_str, filter_mirdatas_by_asset_ids
 from mir.tools.code import MirCode
 from mir.tools.command_run_in_out import command_run_in_out
@@ -19,7 +19,8 @@ class CmdFilter(base.BaseCommand):
     @command_run_in_out
     def run_with_args(mir_root: str, label_storage_file: str, in_cis: str, ex_cis: str,
                       filter_anno_src: "mirpb.AnnotationType.V", src_revs: str, dst_rev: str,
-                      work_dir: str) -> int:  # type: ignore
+                      work_dir: str, evaluate_policy: Optional[mir_storage_ops.EvaluatePolicy] = None
+                      ) -> int:  # type: ignore
         src_typ_rev_tid = revs_parser.parse_single_arg_rev(src_revs, need_tid=False)
         dst_typ_rev_tid = revs_parser.parse_single_arg_rev(dst_rev, need_tid=True)
 
@@ -34,21 +35,41 @@ class CmdFilter(base.BaseCommand):
 
         PhaseLoggerCenter.update_phase(phase="filter.init")
 
-        mir_metadatas, mir_annotations = mir_storage_ops.MirStorageOps.load_multiple_storages(
-            mir_root=mir_root,
-            mir_branch=src_typ_rev_tid.rev,
-            mir_task_id=src_typ_rev_tid.tid,
-            ms_list=[mirpb.MirStorage.MIR_METADATAS, mirpb.MirStorage.MIR_ANNOTATIONS],
-            as_dict=False)
+        mir_metadatas = mir_storage_ops.MirStorageOps.load_single_storage(mir_root=mir_root,
+                                                                          mir_branch=src_typ_rev_tid.rev,
+                                                                          mir_task_id=src_typ_rev_tid.tid,
+                                                                          ms=mirpb.MirStorage.MIR_METADATAS)
+        columnar_annotations = mir_storage_ops.MirStorageOps.load_columnar_annotations(mir_root=mir_root,
+                                                                                       mir_branch=src_typ_rev_tid.rev,
+                                                                                       mir_task_id=src_typ_rev_tid.tid)
 
         PhaseLoggerCenter.update_phase(phase='filter.read')
 
-        filter_with_pb(mir_metadatas=mir_metadatas,
-                       mir_annotations=mir_annotations,
-                       label_storage_file=label_storage_file,
-                       in_cis=in_cis,
-                       ex_cis=ex_cis,
-                       filter_anno_src=filter_anno_src)
+        if columnar_annotations:
+            # matches by class id columns, and only decodes annotations of matched assets
+            asset_ids_set = match_asset_ids(mir_metadatas=mir_metadatas,
+                                            mir_annotations=None,
+                                            label_storage_file=label_storage_file,
+                                            in_cis=in_cis,
+                                            ex_cis=ex_cis,
+                                            filter_anno_src=filter_anno_src,
+                                            columnar_annotations=columnar_annotations)
+            for asset_id in mir_metadatas.attributes.keys() - asset_ids_set:
+                del mir_metadatas.attributes[asset_id]
+            mir_annotations = _annotations_of_assets(columnar_annotations=columnar_annotations,
+                                                     asset_ids=mir_metadatas.attributes.keys())
+        else:
+            # annotations are parsed for output anyway, scanning them is cheaper than parsing keywords for its index
+            mir_annotations = mir_storage_ops.MirStorageOps.load_single_storage(mir_root=mir_root,
+                                                                                mir_branch=src_typ_rev_tid.rev,
+                                                                                mir_task_id=src_typ_rev_tid.tid,
+                                                                                ms=mirpb.MirStorage.MIR_ANNOTATIONS)
+            filter_with_pb(mir_metadatas=mir_metadatas,
+                           mir_annotations=mir_annotations,
+                           label_storage_file=label_storage_file,
+                           in_cis=in_cis,
+                           ex_cis=ex_cis,
+                           filter_anno_src=filter_anno_src)
 
         logging.info("matched: %d, overriding current mir repo", len(mir_metadatas.attributes))
 
@@ -69,7 +90,8 @@ class CmdFilter(base.BaseCommand):
                                                       mir_branch=dst_typ_rev_tid.rev,
                                                       his_branch=src_typ_rev_tid.rev,
                                                       mir_datas=matched_mir_contents,
-                                                      task=task)
+                                                      task=task,
+                                                      evaluate_policy=evaluate_policy)
 
         return MirCode.RC_OK
 
@@ -83,7 +105,8 @@ class CmdFilter(base.BaseCommand):
             filter_anno_src=anno_type_from_str(self.args.filter_anno_src),
             src_revs=self.args.src_revs,
             dst_rev=self.args.dst_rev,
-            work_dir=self.args.work_dir)
+            work_dir=self.args.work_dir,
+            evaluate_policy=mir_storage_ops.EvaluatePolicy(self.args.evaluate_policy))
 
 
 def _class_ids_set_from_str(preds_str: str, cls_mgr: class_ids.UserLabels) -> Set[int]:
@@ -99,44 +122,134 @@ def _class_ids_set_from_str(preds_str: str, cls_mgr: class_ids.UserLabels) -> Se
     return set(class_ids)
 
 
+def _annotations_of_assets(columnar_annotations: mir_columnar.ColumnarAnnotations,
+                           asset_ids: Iterable[str]) -> mirpb.MirAnnotations:
+    mir_annotations = mirpb.MirAnnotations()
+    mir_annotations.prediction.CopyFrom(columnar_annotations.prediction.header)
+    mir_annotations.ground_truth.CopyFrom(columnar_annotations.ground_truth.header)
+    for asset_id in asset_ids:
+        for task_annotations, columnar_task_annotations in [
+            (mir_annotations.prediction, columnar_annotations.prediction),
+            (mir_annotations.ground_truth, columnar_annotations.ground_truth),
+        ]:
+            image_annotations = columnar_task_annotations.get(asset_id)
+            if image_annotations is not None:
+                task_annotations.image_annotations[asset_id].CopyFrom(image_annotations)
+        image_cks = columnar_annotations.get_image_cks(asset_id)
+        if image_cks is not None:
+            mir_annotations.image_cks[asset_id].CopyFrom(image_cks)
+    return mir_annotations
+
+
+# class ids to asset ids which have at least one annotation of these class ids
+ClassIndexType = Callable[[Set[int]], Set[str]]
+
+
+def _columnar_class_indexes(columnar_annotations: mir_columnar.ColumnarAnnotations,
+                            filter_anno_src: "mirpb.AnnotationType.V") -> List[ClassIndexType]:
+    class_indexes: List[ClassIndexType] = []
+    if filter_anno_src in {mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_GT}:
+        class_indexes.append(columnar_annotations.ground_truth.asset_ids_of_class_ids)
+    if filter_anno_src in {mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_PRED}:
+        class_indexes.append(columnar_annotations.prediction.asset_ids_of_class_ids)
+    return class_indexes
+
+
+def _include_exclude_match_by_index(asset_ids_set: Set[str], class_indexes: List[ClassIndexType],
+                                    in_cis_set: Set[int], ex_cis_set: Set[int]) -> Set[str]:
+    def _asset_ids_of(cis: Set[int]) -> Set[str]:
+        asset_ids: Set[str] = set()
+        for class_index in class_indexes:
+            asset_ids.update(class_index(cis))
+        return asset_ids
+
+    # if don't need include match, returns all
+    filtered_asset_ids_set = (_asset_ids_of(in_cis_set) & asset_ids_set) if in_cis_set else set(asset_ids_set)
+    if ex_cis_set:
+        filtered_asset_ids_set -= _asset_ids_of(ex_cis_set)
+    return filtered_asset_ids_set
+
+
 def _include_exclude_match(asset_ids_set: Set[str], mir_annotations: mirpb.MirAnnotations, in_cis_set: Set[int],
                            ex_cis_set: Set[int], filter_anno_src: "mirpb.AnnotationType.V") -> Set[str]:
     # if don't need include match, returns all
     need_no_include = not in_cis_set
     need_no_exclude = not ex_cis_set
 
+    task_annotations_list = []
+    if filter_anno_src in {mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_GT}:
+        task_annotations_list.append(mir_annotations.ground_truth)
+    if filter_anno_src in {mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_PRED}:
+        task_annotations_list.append(mir_annotations.prediction)
+
     filtered_asset_ids_set = set()
     for asset_id in asset_ids_set:
-        pred = mir_annotations.prediction.image_annotations.get(asset_id, mirpb.SingleImageAnnotations())
-        gt = mir_annotations.ground_truth.image_annotations.get(asset_id, mirpb.SingleImageAnnotations())
-
         cids = set()
-        if filter_anno_src in {mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_GT}:
-            cids.update({v.class_id for v in gt.boxes})
-        elif filter_anno_src in {mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_PRED}:
-            cids.update({v.class_id for v in pred.boxes})
+        for task_annotations in task_annotations_list:
+            if asset_id in task_annotations.image_annotations:
+                cids.update({v.class_id for v in task_annotations.image_annotations[asset_id].boxes})
         if (need_no_include or cids & in_cis_set) and (need_no_exclude or not (cids & ex_cis_set)):
             filtered_asset_ids_set.add(asset_id)
 
     return filtered_asset_ids_set
 
 
-def filter_with_pb(mir_metadatas: mirpb.MirMetadatas, mir_annotations: mirpb.MirAnnotations, label_storage_file: str,
-                   in_cis: str, ex_cis: str, filter_anno_src: "mirpb.AnnotationType.V") -> None:
+def match_asset_ids(mir_metadatas: mirpb.MirMetadatas,
+                    mir_annotations: Optional[mirpb.MirAnnotations],
+                    label_storage_file: str,
+                    in_cis: str,
+                    ex_cis: str,
+                    filter_anno_src: "mirpb.AnnotationType.V",
+                    columnar_annotations: Optional[mir_columnar.ColumnarAnnotations] = None) -> Set[str]:
+    """
+    returns asset ids in `mir_metadatas` matching include and exclude class names
+
+    matches by class id columns of `columnar_annotations` if provided, otherwise scans `mir_annotations`
+    """
+    asset_ids_set = set(mir_metadatas.attributes.keys())
     in_cis = in_cis.strip().lower() if in_cis else ''
     ex_cis = ex_cis.strip().lower() if ex_cis else ''
     if not in_cis and not ex_cis:
-        return
+        return asset_ids_set
 
     class_manager = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
     in_cis_set: Set[int] = _class_ids_set_from_str(in_cis, class_manager)
     ex_cis_set: Set[int] = _class_ids_set_from_str(ex_cis, class_manager)
 
-    asset_ids_set = _include_exclude_match(asset_ids_set=set(mir_metadatas.attributes.keys()),
-                                           mir_annotations=mir_annotations,
-                                           in_cis_set=in_cis_set,
-                                           ex_cis_set=ex_cis_set,
-                                           filter_anno_src=filter_anno_src)
+    if columnar_annotations:
+        return _include_exclude_match_by_index(asset_ids_set=asset_ids_set,
+                                               class_indexes=_columnar_class_indexes(
+                                                   columnar_annotations=columnar_annotations,
+                                                   filter_anno_src=filter_anno_src),
+                                               in_cis_set=in_cis_set,
+                                               ex_cis_set=ex_cis_set)
+    if mir_annotations is None:
+        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS,
+                              error_message='filter needs annotations or columnar annotations')
+    return _include_exclude_match(asset_ids_set=asset_ids_set,
+                                  mir_annotations=mir_annotations,
+                                  in_cis_set=in_cis_set,
+                                  ex_cis_set=ex_cis_set,
+                                  filter_anno_src=filter_anno_src)
+
+
+def filter_with_pb(mir_metadatas: mirpb.MirMetadatas,
+                   mir_annotations: mirpb.MirAnnotations,
+                   label_storage_file: str,
+                   in_cis: str,
+                   ex_cis: str,
+                   filter_anno_src: "mirpb.AnnotationType.V") -> None:
+    in_cis = in_cis.strip().lower() if in_cis else ''
+    ex_cis = ex_cis.strip().lower() if ex_cis else ''
+    if not in_cis and not ex_cis:
+        return
+
+    asset_ids_set = match_asset_ids(mir_metadatas=mir_metadatas,
+                                    mir_annotations=mir_annotations,
+                                    label_storage_file=label_storage_file,
+                                    in_cis=in_cis,
+                                    ex_cis=ex_cis,
+                                    filter_anno_src=filter_anno_src)
 
     filter_mirdatas_by_asset_ids(mir_metadatas=mir_metadatas,
                                  mir_annotations=mir_annotations,
@@ -160,4 +273,11 @@ def bind_to_subparsers(subparsers: argparse._SubParsersAction, parent_parser: ar
     filter_arg_parser.add_argument("--src-revs", dest="src_revs", type=str, help="type:rev@bid")
     filter_arg_parser.add_argument("--dst-rev", dest="dst_rev", type=str, help="rev@tid")
     filter_arg_parser.add_argument('-w', dest='work_dir', type=str, required=False, help='working directory')
+    filter_arg_parser.add_argument('--evaluate-policy',
+                                   dest='evaluate_policy',
+                                   type=str,
+                                   default=mir_settings.DEFAULT_EVALUATE_POLICY,
+                                   choices=[policy.value for policy in mir_storage_ops.EvaluatePolicy],
+                                   help='sync: evaluate before commit; deferred: evaluate in background after commit; '
+                                   'off: never evaluate')
     filter_arg_parser.set_defaults(func=CmdFilter)
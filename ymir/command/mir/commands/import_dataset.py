@@ -1,8 +1,9 @@
 import argparse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import logging
 import os
-import shutil
-from typing import Dict, Optional
+from typing import Deque, Dict, Iterator, Optional, Tuple
 from urllib.parse import urlparse
 from zipfile import ZipFile
 
@@ -15,7 +16,7 @@ from mir.tools.command_run_in_out import command_run_in_out
 from mir.tools.errors import MirRuntimeError
 from mir.tools.files import locate_ymir_dataset_dirs, download_file
 from mir.tools.phase_logger import PhaseLoggerCenter
-from mir.tools.mir_storage import get_asset_storage_path, sha1sum_for_file
+from mir.tools.mir_storage import sha1sum_and_store_file
 
 
 class CmdImport(base.BaseCommand):
@@ -33,13 +34,16 @@ class CmdImport(base.BaseCommand):
                                        work_dir=self.args.work_dir,
                                        unknown_types_strategy=annotations.UnknownTypesStrategy(
                                            self.args.unknown_types_strategy),
-                                       anno_type_fmt=self.args.anno_type_fmt)
+                                       anno_type_fmt=self.args.anno_type_fmt,
+                                       workers=self.args.workers,
+                                       hardlink=self.args.hardlink)
 
     @staticmethod
     @command_run_in_out
     def run_with_args(mir_root: str, pred_abs: Optional[str], gt_abs: Optional[str], asset_abs: str, gen_abs: str,
                       dst_rev: str, src_revs: str, work_dir: str, label_storage_file: str,
-                      unknown_types_strategy: annotations.UnknownTypesStrategy, anno_type_fmt: str) -> int:
+                      unknown_types_strategy: annotations.UnknownTypesStrategy, anno_type_fmt: str,
+                      workers: int = settings.ASSET_IO_WORKERS, hardlink: bool = False) -> int:
         # step 0: check args
         if not gen_abs or not work_dir or not asset_abs:
             raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS,
@@ -91,14 +95,15 @@ class CmdImport(base.BaseCommand):
                                   error_message=f"invalid gt_abs: {gt_abs}")
 
         # Step 3: generate sha1 file and rename images.
-        file_name_to_asset_ids = _generate_sha_and_copy(index_file, gen_abs)
+        file_name_to_asset_ids = _generate_sha_and_copy(index_file, gen_abs, workers=workers, hardlink=hardlink)
 
         # Step 4 import metadat and annotations:
         mir_metadatas = mirpb.MirMetadatas()
         ret = metadatas.import_metadatas(mir_metadatas=mir_metadatas,
                                          file_name_to_asset_ids=file_name_to_asset_ids,
                                          hashed_asset_root=gen_abs,
-                                         phase='import.metadatas')
+                                         phase='import.metadatas',
+                                         workers=workers)
         if ret != MirCode.RC_OK:
             logging.error(f"import metadatas error: {ret}")
             return ret
@@ -144,13 +149,40 @@ class CmdImport(base.BaseCommand):
         return MirCode.RC_OK
 
 
-def _generate_sha_and_copy(index_file: str, sha_folder: str) -> Dict[str, str]:
+def _hash_and_store(media_src: str, sha_folder: str, hardlink: bool) -> Optional[Tuple[str, bool]]:
+    if not os.path.isfile(media_src):
+        return None
+    try:
+        return sha1sum_and_store_file(file_path=media_src, location=sha_folder, hardlink=hardlink)
+    except OSError:
+        logging.info(f"{media_src} is not accessable.")
+        return None
+
+
+def _iter_index_media_srcs(index_file: str) -> Iterator[str]:
+    with open(index_file) as idx_f:
+        for line in idx_f:
+            components = line.strip().split('\t')
+            if not components or not components[0]:
+                continue
+            yield components[0]
+
+
+def _generate_sha_and_copy(index_file: str,
+                           sha_folder: str,
+                           workers: int = settings.ASSET_IO_WORKERS,
+                           hardlink: bool = False) -> Dict[str, str]:
+    """
+    hashes and stores assets listed in `index_file` into `sha_folder`, returns file name -> asset id
+
+    each asset is read once: hashed and copied (or hardlinked) in the same pass, by a bounded pool of workers,
+    results are consumed in index order, so the first file name of duplicated assets is always kept
+    """
     hash_phase_name = 'import.hash'
     os.makedirs(sha_folder, exist_ok=True)
 
     with open(index_file) as idx_f:
-        lines = idx_f.readlines()
-    total_count = len(lines)
+        total_count = sum(1 for _ in idx_f)
     if total_count > settings.ASSET_LIMIT_PER_DATASET:  # large number of images may trigger redis timeout error.
         raise MirRuntimeError(
             error_code=MirCode.RC_CMD_INVALID_ARGS,
@@ -158,34 +190,35 @@ def _generate_sha_and_copy(index_file: str, sha_folder: str) -> Dict[str, str]:
 
     idx = 0
     copied_assets = 0
-    asset_id_to_file_names = {}
-    for line in lines:
-        components = line.strip().split('\t')
-        if not components:
-            continue
-        media_src = components[0]
-        if not os.path.isfile(media_src):
-            continue
-
-        try:
-            sha1 = sha1sum_for_file(media_src)
-        except OSError:
-            logging.info(f"{media_src} is not accessable.")
-            continue
-
+    asset_id_to_file_names: Dict[str, str] = {}
+
+    def _consume(media_src: str, future: 'Future[Optional[Tuple[str, bool]]]') -> None:
+        nonlocal idx, copied_assets
+        result = future.result()
+        if not result:
+            return
+        sha1, stored = result
+        copied_assets += int(stored)
         if sha1 not in asset_id_to_file_names:
             asset_id_to_file_names[sha1] = os.path.basename(media_src)
-            media_dst = get_asset_storage_path(location=sha_folder, hash=sha1)
-            if not os.path.isfile(media_dst):
-                copied_assets += 1
-                shutil.copyfile(media_src, media_dst)
 
         idx += 1
         if idx % 5000 == 0:
             PhaseLoggerCenter.update_phase(phase=hash_phase_name, local_percent=(idx / total_count))
             logging.info(f"finished {idx} / {total_count} hashes")
 
-    logging.info(f"skipped assets: {len(lines) - len(asset_id_to_file_names)}, copied assets: {copied_assets}")
+    # at most `max_pending` assets in flight, so memory stays bounded for large index files
+    max_pending = max(1, workers) * 4
+    pending: Deque[Tuple[str, 'Future[Optional[Tuple[str, bool]]]']] = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for media_src in _iter_index_media_srcs(index_file):
+            pending.append((media_src, executor.submit(_hash_and_store, media_src, sha_folder, hardlink)))
+            if len(pending) >= max_pending:
+                _consume(*pending.popleft())
+        while pending:
+            _consume(*pending.popleft())
+
+    logging.info(f"skipped assets: {total_count - len(asset_id_to_file_names)}, copied assets: {copied_assets}")
 
     PhaseLoggerCenter.update_phase(phase=hash_phase_name)
     return {name: asset_id for asset_id, name in asset_id_to_file_names.items()}
@@ -253,4 +286,17 @@ def bind_to_subparsers(subparsers: argparse._SubParsersAction, parent_parser: ar
         choices=['det:voc', 'det:coco', 'sem-seg:coco', 'ins-seg:coco', 'multi-modal:coco', 'no-annos:none',
                  'sem-seg', 'ins-seg', 'multi-modal', 'no-annos'],
         help='anno_type:anno_format\n')
+    import_dataset_arg_parser.add_argument('--workers',
+                                           dest='workers',
+                                           type=int,
+                                           required=False,
+                                           default=settings.ASSET_IO_WORKERS,
+                                           help='number of workers to hash and copy assets')
+    import_dataset_arg_parser.add_argument('--hardlink',
+                                           dest='hardlink',
+                                           action='store_true',
+                                           help='hardlink assets into gen dir instead of copying them,\n'
+                                           'assets are then shared with source files, which must not be modified '
+                                           'after import,\n'
+                                           'falls back to copy if they are on different devices')
     import_dataset_arg_parser.set_defaults(func=CmdImport)
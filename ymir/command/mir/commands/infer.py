@@ -1,17 +1,15 @@
 import argparse
-import json
 import logging
 import os
 import shutil
 import time
 from typing import Any
 
-from google.protobuf import json_format
 import yaml
 
 from mir.commands import base
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools import class_ids, models
+from mir.tools import class_ids, json_stream, models
 from mir.tools import settings as mir_settings
 from mir.tools import env_config
 from mir.tools.annotations import import_annotations_coco_json, valid_image_annotation
@@ -227,47 +225,68 @@ def _process_infer_detbox_result(task_annotations: mirpb.SingleTaskAnnotations,
                                  label_storage_file: str,
                                  unknown_types_strategy: UnknownTypesStrategy) -> None:
     infer_result_file = os.path.join(work_dir_out, 'infer-result.json')
-    with open(infer_result_file, 'r') as f:
-        results = json.loads(f.read())
-
-    detections = results.get('detection')
-    if not isinstance(detections, dict):
-        raise MirRuntimeError(error_code=MirCode.RC_CMD_NO_RESULT,
-                              error_message=f"Invalid infer result file: {infer_result_file}, have no detection dict")
 
     unknown_class_id_annos_cnt = 0
     no_score_annos_cnt = 0
-    class_id_mgr = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
-    for asset_name, annotations_dict in detections.items():
-        annotations = annotations_dict.get('boxes') or annotations_dict.get('annotations')
-        if not isinstance(annotations, list):
-            logging.error(f"invalid annotations: {annotations}")
-            continue
-
-        single_image_annotations = mirpb.SingleImageAnnotations()
-        for annotation_dict in annotations:
-            if 'score' not in annotation_dict:
-                no_score_annos_cnt += 1
-                continue
+    class_name_resolver = class_ids.ClassNameResolver(
+        class_ids.load_or_create_userlabels(label_storage_file=label_storage_file))
 
-            annotation: Any = mirpb.ObjectAnnotation()
-            json_format.ParseDict(annotation_dict['box'], annotation.box)
-            annotation.class_name = annotation_dict['class_name']
-            annotation.score = float(annotation_dict['score'])
-            annotation.class_id, annotation.class_name = class_id_mgr.id_and_main_name_for_name(annotation.class_name)
-            if annotation.class_id < 0 and unknown_types_strategy == UnknownTypesStrategy.IGNORE:
-                unknown_class_id_annos_cnt += 1
+    # result file can be several GBs, streamed asset by asset
+    detections_found = False
+    with open(infer_result_file, 'r') as f:
+        reader = json_stream.JsonStreamReader(f)
+        for key in reader.iter_keys():
+            if key != 'detection' or reader.peek() != '{':
                 continue
+            detections_found = True
+
+            for asset_name, annotations_dict in reader.iter_object_items():
+                annotations = annotations_dict.get('boxes') or annotations_dict.get('annotations')
+                if not isinstance(annotations, list):
+                    logging.error(f"invalid annotations: {annotations}")
+                    continue
+
+                # task_annotations.image_annotations key: image file base name
+                # boxes are filled in place, copies of pure python messages cost more than parsing
+                asset_key = os.path.basename(asset_name)
+                single_image_annotations = task_annotations.image_annotations[asset_key]
+                single_image_annotations.Clear()
+                for annotation_dict in annotations:
+                    if 'score' not in annotation_dict:
+                        no_score_annos_cnt += 1
+                        continue
+
+                    class_id, class_name = class_name_resolver.resolve(annotation_dict['class_name'])
+                    if class_id < 0 and unknown_types_strategy == UnknownTypesStrategy.IGNORE:
+                        unknown_class_id_annos_cnt += 1
+                        continue
+
+                    annotation = single_image_annotations.boxes.add()
+                    _fill_detbox_annotation(annotation=annotation, annotation_dict=annotation_dict)
+                    annotation.class_id, annotation.class_name = class_id, class_name
+                    annotation.index = len(single_image_annotations.boxes) - 1
+
+                if not valid_image_annotation(single_image_annotations):
+                    del task_annotations.image_annotations[asset_key]
+            break
+
+    if not detections_found:
+        raise MirRuntimeError(error_code=MirCode.RC_CMD_NO_RESULT,
+                              error_message=f"Invalid infer result file: {infer_result_file}, have no detection dict")
 
-            annotation.index = len(single_image_annotations.boxes)
-            single_image_annotations.boxes.append(annotation)
+    logging.info(f"count of objects with unknown class ids: {unknown_class_id_annos_cnt}, "
+                 f"unknown class names: {class_name_resolver.unknown_names}")
+    logging.info(f"count of objects without score: {no_score_annos_cnt}")
 
-        # task_annotations.image_annotations key: image file base name
-        if valid_image_annotation(single_image_annotations):
-            task_annotations.image_annotations[os.path.basename(asset_name)].CopyFrom(single_image_annotations)
 
-    logging.info(f"count of objects with unknown class ids: {unknown_class_id_annos_cnt}")
-    logging.info(f"count of objects without score: {no_score_annos_cnt}")
+def _fill_detbox_annotation(annotation: mirpb.ObjectAnnotation, annotation_dict: dict) -> None:
+    # fields assigned directly, ParseDict on each box is too slow for millions of boxes
+    box_dict = annotation_dict['box']
+    box = annotation.box
+    box.x, box.y = int(box_dict.get('x', 0)), int(box_dict.get('y', 0))
+    box.w, box.h = int(box_dict.get('w', 0)), int(box_dict.get('h', 0))
+    box.rotate_angle = float(box_dict.get('rotate_angle', 0))
+    annotation.score = float(annotation_dict['score'])
 
 
 def _process_infer_coco_result(task_annotations: mirpb.SingleTaskAnnotations, work_dir_out: str,
@@ -275,12 +294,15 @@ def _process_infer_coco_result(task_annotations: mirpb.SingleTaskAnnotations, wo
                                unknown_types_strategy: UnknownTypesStrategy) -> None:
     coco_json_filename = 'infer-result.json'
 
-    with open(os.path.join(work_dir_out, coco_json_filename), 'r') as f:
-        result = json.loads(f.read())
-    images_list = result['images']
+    # only images list is read here, reading stops right after it
     file_name_to_asset_ids = {}
-    for v in images_list:
-        file_name_to_asset_ids[v['file_name']] = v['file_name']
+    with open(os.path.join(work_dir_out, coco_json_filename), 'r') as f:
+        reader = json_stream.JsonStreamReader(f)
+        for key in reader.iter_keys():
+            if key == 'images':
+                for v in reader.iter_array_items():
+                    file_name_to_asset_ids[v['file_name']] = v['file_name']
+                break
 
     # task_annotations.image_annotations key: image file base name
     import_annotations_coco_json(file_name_to_asset_ids=file_name_to_asset_ids,
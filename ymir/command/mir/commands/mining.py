@@ -10,6 +10,7 @@ from mir.commands.merge import merge_with_pb
 from mir.protos import mir_command_pb2 as mirpb
 from mir.tools import checker, class_ids, env_config, exporter
 from mir.tools import models, revs_parser
+from mir.tools import settings as mir_settings
 from mir.tools.annotations import filter_mirdatas_by_asset_ids, valid_image_annotation
 from mir.tools.annotations import MergeStrategy, UnknownTypesStrategy
 from mir.tools.code import MirCode
@@ -162,6 +163,7 @@ class CmdMining(base.BaseCommand):
         export_code = exporter.export_mirdatas_to_dir(
             mir_metadatas=mir_metadatas,
             ec=ec,
+            link_mode=exporter.ExportLinkMode(mir_settings.EXECUTANT_EXPORT_LINK_MODE),
         )
         if export_code != MirCode.RC_OK:
             return export_code
@@ -1,10 +1,11 @@
 import argparse
 import logging
 import random
+from typing import Optional
 
 from mir.commands import base
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools import mir_storage_ops, revs_parser
+from mir.tools import mir_storage_ops, revs_parser, settings as mir_settings
 from mir.tools.annotations import filter_mirdatas_by_asset_ids
 from mir.tools.code import MirCode
 from mir.tools.command_run_in_out import command_run_in_out
@@ -19,11 +20,18 @@ class CmdSampling(base.BaseCommand):
                                          src_revs=self.args.src_revs,
                                          dst_rev=self.args.dst_rev,
                                          count=self.args.count,
-                                         rate=self.args.rate)
+                                         rate=self.args.rate,
+                                         evaluate_policy=mir_storage_ops.EvaluatePolicy(self.args.evaluate_policy))
 
     @staticmethod
     @command_run_in_out
-    def run_with_args(mir_root: str, work_dir: str, src_revs: str, dst_rev: str, count: int, rate: float) -> int:
+    def run_with_args(mir_root: str,
+                      work_dir: str,
+                      src_revs: str,
+                      dst_rev: str,
+                      count: int,
+                      rate: float,
+                      evaluate_policy: Optional[mir_storage_ops.EvaluatePolicy] = None) -> int:
         src_typ_rev_tid = revs_parser.parse_single_arg_rev(src_revs, need_tid=False)
         dst_typ_rev_tid = revs_parser.parse_single_arg_rev(dst_rev, need_tid=True)
 
@@ -65,7 +73,8 @@ class CmdSampling(base.BaseCommand):
                                                       mir_branch=dst_typ_rev_tid.rev,
                                                       his_branch=src_typ_rev_tid.rev,
                                                       mir_datas=sampled_mir_datas,
-                                                      task=task)
+                                                      task=task,
+                                                      evaluate_policy=evaluate_policy)
 
         return MirCode.RC_OK
 
@@ -108,4 +117,11 @@ def bind_to_subparsers(subparsers: argparse._SubParsersAction, parent_parser: ar
     group = sampling_arg_parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--count', dest='count', type=int, default=0, help='assets count')
     group.add_argument('--rate', dest='rate', type=float, default=0.0, help='assets sampling rate')
+    sampling_arg_parser.add_argument('--evaluate-policy',
+                                     dest='evaluate_policy',
+                                     type=str,
+                                     default=mir_settings.DEFAULT_EVALUATE_POLICY,
+                                     choices=[policy.value for policy in mir_storage_ops.EvaluatePolicy],
+                                     help='sync: evaluate before commit; '
+                                     'deferred: evaluate in background after commit; off: never evaluate')
     sampling_arg_parser.set_defaults(func=CmdSampling)
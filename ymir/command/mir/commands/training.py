@@ -262,6 +262,7 @@ class CmdTrain(base.BaseCommand):
             mir_annotations=mir_annotations,
             class_ids_mapping=type_id_idx_mapping,
             cls_id_mgr=cls_mgr,
+            link_mode=exporter.ExportLinkMode(mir_settings.EXECUTANT_EXPORT_LINK_MODE),
         )
         if export_code != MirCode.RC_OK:
             return export_code
@@ -337,6 +337,9 @@ class _EvaluationStateEnumTypeWrapper(google.protobuf.internal.enum_type_wrapper
     ES_NOT_ENOUGH_CLASS_IDS = EvaluationState.V(4)
     """evaluation not finished because there's no evaluate class ids"""
 
+    ES_PENDING = EvaluationState.V(5)
+    """evaluation deferred to a background worker, result not ready yet"""
+
 
 ES_NOT_SET = EvaluationState.V(0)
 """evaluate not started"""
@@ -353,6 +356,9 @@ ES_EXCEEDS_LIMIT = EvaluationState.V(3)
 ES_NOT_ENOUGH_CLASS_IDS = EvaluationState.V(4)
 """evaluation not finished because there's no evaluate class ids"""
 
+ES_PENDING = EvaluationState.V(5)
+"""evaluation deferred to a background worker, result not ready yet"""
+
 global___EvaluationState = EvaluationState
 
 
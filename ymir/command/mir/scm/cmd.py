@@ -1,17 +1,20 @@
 #    Modified on GitPython CMD wrapper:
 #    https://github.com/gitpython-developers/GitPython/blob/master/git/cmd.py
 
+import atexit
 import io
 import logging
 import os
 import signal
-from subprocess import (Popen, PIPE)
+from subprocess import (Popen, PIPE, DEVNULL)
 import sys
 import threading
 from collections import OrderedDict
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, IO, List, Optional, Tuple, Union
 
 from mir.scm.base import BaseScm
+from mir.tools.code import MirCode
+from mir.tools.errors import MirRuntimeError
 
 
 def dashify(string: str) -> str:
@@ -99,6 +102,135 @@ execute_kwargs = {
 }
 
 
+class CatFileBatch():
+    """
+    A long-lived `git cat-file --batch` (or `--batch-check`) co-process of one repo.
+    Requests are written to stdin line by line and responses are read back from stdout,
+    a lock serializes request / response pairs of threaded callers.
+    """
+    def __init__(self, working_dir: str, scm_executable: str, check_only: bool) -> None:
+        self._working_dir = working_dir
+        self._scm_executable = scm_executable
+        self._check_only = check_only
+        self._proc: Optional[Popen] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            env = os.environ.copy()
+            env["LANGUAGE"] = "C"
+            env["LC_ALL"] = "C"
+            command = [self._scm_executable, 'cat-file', '--batch-check' if self._check_only else '--batch']
+            logging.debug("{}: {}".format(self._working_dir, ' '.join(command)))
+            self._proc = Popen(command,
+                               env=env,
+                               cwd=self._working_dir,
+                               stdin=PIPE,
+                               stdout=PIPE,
+                               stderr=DEVNULL,
+                               close_fds=True)
+        return self._proc
+
+    def _request(self, obj: str) -> Optional[Tuple[str, str, int, bytes]]:
+        proc = self._start()
+        stdin: IO[bytes] = proc.stdin  # type: ignore
+        stdout: IO[bytes] = proc.stdout  # type: ignore
+        stdin.write(obj.encode('utf-8') + b'\n')
+        stdin.flush()
+
+        header = stdout.readline()
+        if not header:
+            raise BrokenPipeError(f"git cat-file exited: {self._working_dir}")
+        components = header.split()
+        if len(components) != 3:
+            # `<obj> missing` or `<obj> ambiguous`
+            return None
+        size = int(components[2])
+        contents = b''
+        if not self._check_only:
+            contents = stdout.read(size)
+            stdout.read(1)  # trailing LF
+        return (safe_decode(components[0]), safe_decode(components[1]), size, contents)
+
+    def request(self, obj: str) -> Optional[Tuple[str, str, int, bytes]]:
+        """
+        returns (object hash, object type, object size, object contents) of `obj`, None if not found,
+        contents is always empty for `--batch-check`
+        """
+        if not obj or '\n' in obj:
+            raise ValueError(f"invalid object name: {obj!r}")
+
+        with self._lock:
+            try:
+                return self._request(obj)
+            except (BrokenPipeError, ValueError):
+                # co-process died or stream out of sync: restart it and retry once
+                self._close()
+                return self._request(obj)
+
+    def _close(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            if self._proc.stdin:
+                self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except Exception:
+            self._proc.kill()
+        finally:
+            if self._proc.stdout:
+                self._proc.stdout.close()
+            self._proc = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+class _CatFileBatchPool():
+    """
+    process-wide co-processes, at most `max_size` repos, least recently used ones are closed first
+    """
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._batches: 'OrderedDict[tuple, CatFileBatch]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, working_dir: str, scm_executable: str, check_only: bool) -> CatFileBatch:
+        # repo identity includes pid (forked children need their own pipes)
+        # and inode of .git (a repo removed and created again at the same path needs a new co-process)
+        try:
+            git_dir_stat = os.stat(os.path.join(working_dir, '.git'))
+        except OSError as e:
+            raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_MIR_REPO,
+                                  error_message=f"not a git repo: {working_dir}") from e
+        key = (working_dir, scm_executable, check_only, os.getpid(), git_dir_stat.st_dev, git_dir_stat.st_ino)
+        evicted: List[CatFileBatch] = []
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch:
+                self._batches.move_to_end(key)
+                return batch
+            batch = CatFileBatch(working_dir=working_dir, scm_executable=scm_executable, check_only=check_only)
+            self._batches[key] = batch
+            while len(self._batches) > self._max_size:
+                evicted.append(self._batches.popitem(last=False)[1])
+        for evicted_batch in evicted:
+            evicted_batch.close()
+        return batch
+
+    def close_all(self) -> None:
+        with self._lock:
+            batches = list(self._batches.values())
+            self._batches.clear()
+        for batch in batches:
+            batch.close()
+
+
+_cat_file_batch_pool = _CatFileBatchPool(max_size=32)
+atexit.register(_cat_file_batch_pool.close_all)
+
+
 class CmdScm(BaseScm):
     """
     The Git class manages communication with the Git binary.
@@ -139,6 +271,18 @@ class CmdScm(BaseScm):
         """:return: Git directory we are working on"""
         return self._working_dir
 
+    def cat_file_batch(self, obj: str) -> Optional[bytes]:
+        """Contents of `obj` (such as `rev:path` or blob hash) through a long-lived `git cat-file --batch`
+        :return: None if `obj` not found"""
+        result = _cat_file_batch_pool.get(self._working_dir, str(self._scm_executable), check_only=False).request(obj)
+        return result[3] if result else None
+
+    def cat_file_batch_check(self, obj: str) -> Optional[Tuple[str, str, int]]:
+        """(object hash, type, size) of `obj` through a long-lived `git cat-file --batch-check`
+        :return: None if `obj` not found"""
+        result = _cat_file_batch_pool.get(self._working_dir, str(self._scm_executable), check_only=True).request(obj)
+        return result[:3] if result else None
+
     def execute(self,
                 command: str,
                 istream: Any = None,
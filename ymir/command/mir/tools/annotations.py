@@ -1,16 +1,19 @@
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import enum
+import itertools
 import json
 import logging
 import os
-from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+import xml.etree.ElementTree as ElementTree
 
 from google.protobuf.internal.containers import MessageMap
 from google.protobuf.json_format import ParseDict
-import xmltodict
 import yaml
 
-from mir.tools import class_ids
+from mir.tools import class_ids, json_stream, masks
+from mir.tools import settings as mir_settings
 from mir.tools.code import MirCode
 from mir.tools.errors import MirRuntimeError
 from mir.tools.settings import COCO_JSON_NAME
@@ -88,39 +91,39 @@ def _annotation_parse_func(anno_fmt: "mirpb.AnnoFormat.V") -> Callable:
     return _func_dict[anno_fmt]
 
 
-def _annotation_signature(annotation: mirpb.ObjectAnnotation, asset_id: str) -> str:
-    return (
-        f"{asset_id}-{annotation.class_name}-{annotation.box.x}-{annotation.box.y}-{annotation.box.w}"
-        f"-{annotation.box.h}-{annotation.box.rotate_angle}")
+# duplicated objects of one asset: same class name, box and rotate angle
+_DedupKey = Tuple[str, int, int, int, int, float]
 
+# import stats, key: counter name, value: warning message if counter is not zero
+_IMPORT_STATS_MESSAGES = {
+    'unhashed_filenames': 'Count of unhashed file names in images list',
+    'unknown_category_ids': 'Count of unknown category ids in categories list',
+    'unknown_image_objects': 'Count of objects with unknown image ids in annotations list',
+    'error_format_objects': 'Count of error format objects',
+    'zero_size_objects': 'Count of zero size objects',
+    'duplicate_objects': 'Count of duplicate objects',
+}
+
+
+def _log_import_stats(import_stats: Counter) -> None:
+    for key, message in _IMPORT_STATS_MESSAGES.items():
+        if import_stats[key]:
+            logging.warning(f"[import error]: {message}: {import_stats[key]}")
+    logging.info(f"[import stats]: {json.dumps(dict(import_stats), sort_keys=True)}")
+
+
+def _voc_object_to_annotation(voc_object: "_VocObject", cid: int, cname: str) -> mirpb.ObjectAnnotation:
+    if not voc_object.box:
+        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET, error_message='no value for bndbox')
 
-def _voc_object_dict_to_annotation(object_dict: dict, cid: int, cname: str) -> mirpb.ObjectAnnotation:
-    # Fill shared fields.
     annotation = mirpb.ObjectAnnotation()
     annotation.class_id = cid
     annotation.class_name = cname
-    annotation.score = float(object_dict.get('confidence', '-1.0'))
-    annotation.anno_quality = float(object_dict.get('box_quality', '-1.0'))
-    tags = object_dict.get('tags', {})  # tags could be None
-    if tags:
-        annotation.tags.update(tags)
-
-    if object_dict.get('bndbox'):
-        bndbox_dict: Dict[str, Any] = object_dict['bndbox']
-        xmin = int(float(bndbox_dict['xmin']))
-        ymin = int(float(bndbox_dict['ymin']))
-        xmax = int(float(bndbox_dict['xmax']))
-        ymax = int(float(bndbox_dict['ymax']))
-        width = xmax - xmin + 1
-        height = ymax - ymin + 1
-
-        annotation.box.x = xmin
-        annotation.box.y = ymin
-        annotation.box.w = width
-        annotation.box.h = height
-        annotation.box.rotate_angle = float(bndbox_dict.get('rotate_angle', '0.0'))
-    else:
-        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET, error_message='no value for bndbox')
+    annotation.score = voc_object.score
+    annotation.anno_quality = voc_object.anno_quality
+    if voc_object.tags:
+        annotation.tags.update(voc_object.tags)
+    annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h, annotation.box.rotate_angle = voc_object.box
     return annotation
 
 
@@ -133,9 +136,12 @@ def _coco_object_dict_to_annotation(anno_dict: dict,
 
     # box, polygon and mask
     seg_obj = anno_dict.get('segmentation')
+    mask_hw = (0, 0)
     if isinstance(seg_obj, dict):  # mask
         obj_anno.type = mirpb.ObjectSubType.OST_SEG_MASK
         obj_anno.mask = seg_obj['counts']
+        if seg_obj.get('size'):
+            mask_hw = (int(seg_obj['size'][0]), int(seg_obj['size'][1]))
     elif isinstance(seg_obj, list):  # polygon
         if len(seg_obj) > 1:
             raise NotImplementedError('Multi polygons not supported')
@@ -150,7 +156,9 @@ def _coco_object_dict_to_annotation(anno_dict: dict,
     obj_anno.box.y = int(bbox_list[1])
     obj_anno.box.w = int(bbox_list[2])
     obj_anno.box.h = int(bbox_list[3])
-    obj_anno.mask_area = int(anno_dict['area'])
+    obj_anno.mask_area = int(anno_dict.get('area', 0))
+    # box and area if absent, context stats use area, and never decode masks
+    masks.fill_box_and_area(annotation=obj_anno, mask_hw=mask_hw)
 
     obj_anno.iscrowd = anno_dict.get('iscrowd', 0)
     obj_anno.class_name = category_id_to_names[anno_dict['category_id']]
@@ -211,96 +219,242 @@ def import_annotations(mir_annotation: mirpb.MirAnnotations, label_storage_file:
     return accu_new_class_names
 
 
-def _iter_voc_annos_dict(file_name_to_asset_ids: Dict[str, str],
-                         annotations_dir_path: str) -> Generator[Tuple[str, dict], None, None]:
+class _VocObject(NamedTuple):
+    name: str
+    box: Optional[Tuple[int, int, int, int, float]]  # x, y, w, h, rotate_angle, None if no bndbox
+    score: float
+    anno_quality: float
+    tags: Dict[str, str]
+
+
+class _VocImage(NamedTuple):
+    cks: Dict[str, str]
+    image_quality: float
+    objects: List[_VocObject]
+
+
+def _voc_text(element: Optional[ElementTree.Element]) -> str:
+    # stripped text of element, empty if no element or no text
+    return (element.text or '').strip() if element is not None else ''
+
+
+def _voc_element_to_object(object_element: ElementTree.Element) -> _VocObject:
+    box: Optional[Tuple[int, int, int, int, float]] = None
+    bndbox_element = object_element.find('bndbox')
+    if bndbox_element is not None and len(bndbox_element):
+        xmin = int(float(_voc_text(bndbox_element.find('xmin'))))
+        ymin = int(float(_voc_text(bndbox_element.find('ymin'))))
+        xmax = int(float(_voc_text(bndbox_element.find('xmax'))))
+        ymax = int(float(_voc_text(bndbox_element.find('ymax'))))
+        box = (xmin, ymin, xmax - xmin + 1, ymax - ymin + 1,
+               float(_voc_text(bndbox_element.find('rotate_angle')) or '0.0'))
+
+    tags_element = object_element.find('tags')
+    return _VocObject(name=_voc_text(object_element.find('name')),
+                      box=box,
+                      score=float(_voc_text(object_element.find('confidence')) or '-1.0'),
+                      anno_quality=float(_voc_text(object_element.find('box_quality')) or '-1.0'),
+                      tags={child.tag: _voc_text(child)
+                            for child in tags_element} if tags_element is not None else {})
+
+
+def _parse_voc_file(annotation_file: str) -> Optional[_VocImage]:
     """
-    Walk through annotation files of file_name_to_asset_ids dict, yields annos_dict to each image parse from voc
+    parses voc xml in one streaming pass, each child of root is converted once it ends, and then cleared
+
+    Returns:
+        parsed image, None if annotation file not found or empty
     """
-    for filename, asset_hash in file_name_to_asset_ids.items():
-        annotation_file = os.path.join(annotations_dir_path, os.path.splitext(filename)[0] + '.xml')
-        if not os.path.isfile(annotation_file):
+    if not os.path.isfile(annotation_file):
+        return None
+    if os.path.getsize(annotation_file) == 0:
+        logging.error(f"[import error]: Cannot open annotation_file: {annotation_file}")
+        return None
+
+    voc_image = _VocImage(cks={}, image_quality=-1.0, objects=[])
+    depth = 0
+    for event, element in ElementTree.iterparse(annotation_file, events=('start', 'end')):
+        if event == 'start':
+            if depth == 0 and element.tag != 'annotation':
+                raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET,
+                                      error_message=f"no annotation root in: {annotation_file}")
+            depth += 1
             continue
-        with open(annotation_file, 'r') as f:
-            annos_xml_str = f.read()
-        if not annos_xml_str:
-            logging.error(f"[import error]: Cannot open annotation_file: {annotation_file}")
+
+        depth -= 1
+        if depth != 1:
             continue
-        annos_dict: dict = xmltodict.parse(annos_xml_str)['annotation']
-        yield (asset_hash, annos_dict)
-    return None
+        if element.tag == 'object':
+            voc_image.objects.append(_voc_element_to_object(element))
+        elif element.tag == 'cks':
+            voc_image.cks.update((child.tag, _voc_text(child)) for child in element)
+        elif element.tag == 'image_quality':
+            voc_image = voc_image._replace(image_quality=float(_voc_text(element) or '-1.0'))
+        element.clear()
+    return voc_image
+
+
+def _parse_voc_files(file_name_to_asset_ids: Dict[str, str], annotations_dir_path: str,
+                     workers: int) -> List[Tuple[str, _VocImage]]:
+    """
+    returns (asset hash, parsed image) in the same order as `file_name_to_asset_ids`, assets without annotation
+        files skipped, files are parsed in shards by worker processes if there are many of them
+    """
+    annotation_files = [
+        os.path.join(annotations_dir_path,
+                     os.path.splitext(filename)[0] + '.xml') for filename in file_name_to_asset_ids.keys()
+    ]
+    executor: Optional[ProcessPoolExecutor] = None
+    if workers > 1 and len(annotation_files) >= mir_settings.IMPORT_ANNO_POOL_MIN_FILES:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        voc_images: Iterator[Optional[_VocImage]] = executor.map(
+            _parse_voc_file, annotation_files, chunksize=max(1, min(1000, len(annotation_files) // (workers * 4))))
+    else:
+        voc_images = map(_parse_voc_file, annotation_files)
 
+    try:
+        return [(asset_hash, voc_image) for asset_hash, voc_image in zip(file_name_to_asset_ids.values(), voc_images)
+                if voc_image]
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
 
-def _import_annotations_voc_xml(file_name_to_asset_ids: Dict[str, str], mir_annotation: mirpb.MirAnnotations,
-                                annotations_dir_path: str, label_storage_file: str,
-                                unknown_types_strategy: UnknownTypesStrategy, accu_new_class_names: Set[str],
-                                image_annotations: mirpb.SingleTaskAnnotations) -> None:
-    if unknown_types_strategy == UnknownTypesStrategy.KEEP:
-        raise NotImplementedError("_import_annotations_voc_xml not support UnknownTypesStrategy.KEEP")
 
-    # get all unknown types and add (or stop)
-    class_names: Set[str] = set()
-    for _, annos_dict in _iter_voc_annos_dict(file_name_to_asset_ids=file_name_to_asset_ids,
-                                              annotations_dir_path=annotations_dir_path):
-        objects: Union[List[dict], dict] = annos_dict.get('object', [])
-        if isinstance(objects, dict):
-            # when there's only ONE object node in xml, it will be parsed to a dict, not a list
-            objects = [objects]
-        class_names.update([obj['name'] for obj in objects if obj.get('name')])
-    class_type_manager = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
-    _, unknown_class_names = class_type_manager.id_for_names(list(class_names))
+def _resolve_class_names(label_storage_file: str, class_names: Iterable[str],
+                         unknown_types_strategy: UnknownTypesStrategy,
+                         accu_new_class_names: Set[str]) -> class_ids.ClassNameResolver:
+    """
+    resolves all class names once, unknown names are added to label storage file (or stop) by strategy,
+        returns the resolver used for each object
+    """
+    class_name_resolver = class_ids.ClassNameResolver(
+        class_ids.load_or_create_userlabels(label_storage_file=label_storage_file))
+    class_name_resolver.resolve_many(class_names)
+    unknown_class_names = class_name_resolver.unknown_names
     if len(unknown_class_names) > 0:
         if unknown_types_strategy == UnknownTypesStrategy.STOP:
             raise MirRuntimeError(error_code=MirCode.RC_CMD_UNKNOWN_TYPES,
                                   error_message=f"{unknown_class_names}")
         if unknown_types_strategy == UnknownTypesStrategy.ADD:
-            class_type_manager.add_main_names(unknown_class_names)
+            class_name_resolver.add_unknown_names()
         accu_new_class_names.update(unknown_class_names)
+    return class_name_resolver
+
+
+def _import_annotations_voc_xml(file_name_to_asset_ids: Dict[str, str],
+                                mir_annotation: mirpb.MirAnnotations,
+                                annotations_dir_path: str,
+                                label_storage_file: str,
+                                unknown_types_strategy: UnknownTypesStrategy,
+                                accu_new_class_names: Set[str],
+                                image_annotations: mirpb.SingleTaskAnnotations,
+                                workers: int = mir_settings.IMPORT_ANNO_WORKERS) -> None:
+    """
+    each xml file is parsed once into light weight tuples, class names are resolved once for each name,
+        and protobuf messages are built from parsed images after that, in the same order as
+        `file_name_to_asset_ids`
+    """
+    if unknown_types_strategy == UnknownTypesStrategy.KEEP:
+        raise NotImplementedError("_import_annotations_voc_xml not support UnknownTypesStrategy.KEEP")
+
+    asset_voc_images = _parse_voc_files(file_name_to_asset_ids=file_name_to_asset_ids,
+                                        annotations_dir_path=annotations_dir_path,
+                                        workers=workers)
+
+    # get all unknown types and add (or stop)
+    class_names: Set[str] = {
+        voc_object.name
+        for _, voc_image in asset_voc_images for voc_object in voc_image.objects if voc_object.name
+    }
+    class_name_resolver = _resolve_class_names(label_storage_file=label_storage_file,
+                                               class_names=sorted(class_names),
+                                               unknown_types_strategy=unknown_types_strategy,
+                                               accu_new_class_names=accu_new_class_names)
 
-    zero_size_count = 0
-    duplicate_count = 0
-    for asset_hash, annos_dict in _iter_voc_annos_dict(file_name_to_asset_ids=file_name_to_asset_ids,
-                                                       annotations_dir_path=annotations_dir_path):
+    import_stats: Counter = Counter()
+    for asset_hash, voc_image in asset_voc_images:
         # cks
-        cks = annos_dict.get('cks', {})  # cks could be None
-        if cks:
-            mir_annotation.image_cks[asset_hash].cks.update(cks)
-        mir_annotation.image_cks[asset_hash].image_quality = float(annos_dict.get('image_quality', '-1.0'))
-
-        # annotations and tags
-        objects = annos_dict.get('object', [])
-        if isinstance(objects, dict):
-            # when there's only ONE object node in xml, it will be parsed to a dict, not a list
-            objects = [objects]
-
-        known_signatures = set()
-        for object_dict in objects:
-            cid, cname = class_type_manager.id_and_main_name_for_name(name=object_dict['name'])
+        if voc_image.cks:
+            mir_annotation.image_cks[asset_hash].cks.update(voc_image.cks)
+        mir_annotation.image_cks[asset_hash].image_quality = voc_image.image_quality
+
+        # annotations and tags, boxes checked before protobuf messages built
+        known_keys: Set[_DedupKey] = set()
+        for voc_object in voc_image.objects:
+            if not voc_object.name:
+                raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET,
+                                      error_message=f"no name for object of asset: {asset_hash}")
+            cid, cname = class_name_resolver.resolve(voc_object.name)
             # all class names are added (if strategy is ADD), and strategy KEEP is not supported here
             # so cid < 0 here means ignored classes
             if cid < 0 and unknown_types_strategy == UnknownTypesStrategy.IGNORE:
+                import_stats['ignored_objects'] += 1
                 continue
+            if not voc_object.box:
+                raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET, error_message='no value for bndbox')
 
-            annotation = _voc_object_dict_to_annotation(object_dict=object_dict,
-                                                        cid=cid,
-                                                        cname=cname)
-            if annotation.box.w <= 0 or annotation.box.h <= 0:
-                zero_size_count += 1
+            x, y, w, h, rotate_angle = voc_object.box
+            if w <= 0 or h <= 0:
+                import_stats['zero_size_objects'] += 1
                 continue
 
-            signature = _annotation_signature(annotation, asset_hash)
-            if signature in known_signatures:
-                logging.warning(f"[import error]: Found duplicated annotation for asset hash: {asset_hash}")
-                duplicate_count += 1
+            dedup_key = (cname, x, y, w, h, rotate_angle)
+            if dedup_key in known_keys:
+                logging.debug(f"[import error]: Found duplicated annotation for asset hash: {asset_hash}")
+                import_stats['duplicate_objects'] += 1
                 continue
-            known_signatures.add(signature)
+            known_keys.add(dedup_key)
 
+            annotation = _voc_object_to_annotation(voc_object=voc_object, cid=cid, cname=cname)
             annotation.index = len(image_annotations.image_annotations[asset_hash].boxes)
             image_annotations.image_annotations[asset_hash].boxes.append(annotation)
+            import_stats['objects'] += 1
+
+    _log_import_stats(import_stats)
+
 
-    if zero_size_count:
-        logging.warning(f"[import error]: Count of zero size objects: {zero_size_count}")
-    if duplicate_count:
-        logging.warning(f"[import error]: Count of duplicate objects: {duplicate_count}")
+_NO_ANNOTATION = object()
+
+
+def _iter_coco_annotations(coco_file_path: str, sections: Dict[str, Any]) -> Iterator[Any]:
+    """
+    streams a coco json file: `images` and `categories` are read into `sections`,
+        items of `annotations` are yielded one by one, and `sections['annotations']` is set to True if it is a list
+
+    if annotations come before images or categories in file, they are skipped and read in a second pass,
+        so `sections` is complete once the first annotation is yielded, or the iteration ends
+    """
+    try:
+        annotations_deferred = False
+        with open(coco_file_path, 'r') as f:
+            reader = json_stream.JsonStreamReader(f)
+            for key in reader.iter_keys():
+                if key in ('images', 'categories'):
+                    sections[key] = reader.read_value()
+                elif key == 'annotations':
+                    if 'images' in sections and 'categories' in sections:
+                        yield from _iter_coco_list(reader=reader, sections=sections, key=key)
+                    else:
+                        annotations_deferred = True
+
+        if annotations_deferred:
+            with open(coco_file_path, 'r') as f:
+                reader = json_stream.JsonStreamReader(f)
+                for key in reader.iter_keys():
+                    if key == 'annotations':
+                        yield from _iter_coco_list(reader=reader, sections=sections, key=key)
+                        break
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET,
+                              error_message=f"Can not open or parse annotation file, {e}")
+
+
+def _iter_coco_list(reader: json_stream.JsonStreamReader, sections: Dict[str, Any], key: str) -> Iterator[Any]:
+    if reader.peek() != '[':
+        sections[key] = reader.read_value()
+        return
+    sections[key] = True
+    yield from reader.iter_array_items()
 
 
 def import_annotations_coco_json(file_name_to_asset_ids: Dict[str, str],
@@ -312,43 +466,36 @@ def import_annotations_coco_json(file_name_to_asset_ids: Dict[str, str],
                                  accu_new_class_names: Set[str] = set(),
                                  coco_json_filename: str = COCO_JSON_NAME) -> None:
     coco_file_path = os.path.join(annotations_dir_path, coco_json_filename)
-    try:
-        with open(coco_file_path, 'r') as f:
-            coco_obj = json.loads(f.read())
-            images_list = coco_obj['images']
-            categories_list = coco_obj['categories']
-            annotations_list = coco_obj['annotations']
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_DATASET,
-                              error_message=f"Can not open or parse annotation file, {e}")
-
+    # annotations are streamed, images and categories are ready once the first annotation comes
+    coco_sections: Dict[str, Any] = {}
+    annotations_iter = _iter_coco_annotations(coco_file_path=coco_file_path, sections=coco_sections)
+    first_annotation = next(annotations_iter, _NO_ANNOTATION)
+    annotations_list: Iterator[Any] = itertools.chain([first_annotation], annotations_iter) if (
+        first_annotation is not _NO_ANNOTATION) else iter([])
+
+    images_list = coco_sections.get('images')
+    categories_list = coco_sections.get('categories')
     if not images_list or not isinstance(images_list, list):
         logging.warning(f"[import error]: Can not find images list in coco json: {coco_file_path}")
         images_list = []
     if not isinstance(categories_list, list):
         logging.warning(f"[import error]: Can not find categories list in coco json: {coco_file_path}")
         categories_list = []
-    if not isinstance(annotations_list, list):
+    if coco_sections.get('annotations') is not True:
         logging.warning(f"[import error]: Can not find annotations list in coco json: {coco_file_path}")
-        annotations_list = []
     counter = Counter([v['id'] for v in images_list])
     duplicated_image_ids = {iid for iid, cnt in counter.items() if cnt > 1}
     counter = Counter([v['id'] for v in categories_list])
     duplicated_category_ids = {cid for cid, cnt in counter.items() if cnt > 1}
 
-    unhashed_filenames_cnt = 0
-    unknown_category_ids_cnt = 0
-    unknown_image_objects_cnt = 0
-    error_format_objects_cnt = 0
-    zero_size_count = 0
-    duplicate_count = 0
+    import_stats: Counter = Counter()
 
     # images_list -> image_id_to_hashes (key: coco image id, value: ymir asset hash)
     image_id_to_hashes: Dict[int, str] = {}
     for v in images_list:
         filename = os.path.basename(v['file_name'])  # file_name may contains path
         if filename not in file_name_to_asset_ids:
-            unhashed_filenames_cnt += 1
+            import_stats['unhashed_filenames'] += 1
             continue
         if v['id'] in duplicated_image_ids:
             continue
@@ -360,65 +507,67 @@ def import_annotations_coco_json(file_name_to_asset_ids: Dict[str, str],
         cat['id']: cat['name']
         for cat in categories_list if cat['id'] not in duplicated_category_ids
     }
-    class_type_manager = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
-    _, unknown_class_names = class_type_manager.id_for_names(list(category_id_to_names.values()))
-    if len(unknown_class_names) > 0:
-        if unknown_types_strategy == UnknownTypesStrategy.STOP:
-            raise MirRuntimeError(error_code=MirCode.RC_CMD_UNKNOWN_TYPES,
-                                  error_message=f"{unknown_class_names}")
-        if unknown_types_strategy == UnknownTypesStrategy.ADD:
-            class_type_manager.add_main_names(unknown_class_names)
-        accu_new_class_names.update(unknown_class_names)
+    class_name_resolver = _resolve_class_names(label_storage_file=label_storage_file,
+                                               class_names=category_id_to_names.values(),
+                                               unknown_types_strategy=unknown_types_strategy,
+                                               accu_new_class_names=accu_new_class_names)
 
-    known_signatures = set()
+    # dedup keys are scoped per asset, boxes checked before protobuf messages and masks built
+    known_keys: Dict[str, Set[_DedupKey]] = defaultdict(set)
     for anno_dict in annotations_list:
         if anno_dict['category_id'] not in category_id_to_names:
-            unknown_category_ids_cnt += 1
+            import_stats['unknown_category_ids'] += 1
             continue
         if anno_dict['image_id'] not in image_id_to_hashes:
-            unknown_image_objects_cnt += 1
+            import_stats['unknown_image_objects'] += 1
             continue
 
-        obj_anno = _coco_object_dict_to_annotation(anno_dict=anno_dict,
-                                                   category_id_to_names=category_id_to_names)
-        if not obj_anno:
-            error_format_objects_cnt += 1
+        bbox_list = anno_dict.get('bbox')
+        if bbox_list is None or len(bbox_list) != 4:
+            import_stats['error_format_objects'] += 1
             continue
-        if obj_anno.box.w <= 0 or obj_anno.box.h <= 0:
-            zero_size_count += 1
+        obj_anno: Optional[mirpb.ObjectAnnotation] = None
+        x, y, w, h = int(bbox_list[0]), int(bbox_list[1]), int(bbox_list[2]), int(bbox_list[3])
+        if (w <= 0 or h <= 0) and isinstance(anno_dict.get('segmentation'), (dict, list)):
+            # empty box of polygon or mask is filled from its rle, so build it before checking size
+            obj_anno = _coco_object_dict_to_annotation(anno_dict=anno_dict,
+                                                       category_id_to_names=category_id_to_names)
+            if obj_anno:
+                x, y, w, h = obj_anno.box.x, obj_anno.box.y, obj_anno.box.w, obj_anno.box.h
+        if w <= 0 or h <= 0:
+            import_stats['zero_size_objects'] += 1
             continue
-        obj_anno.class_id, obj_anno.class_name = class_type_manager.id_and_main_name_for_name(obj_anno.class_name)
-        if obj_anno.class_id < 0 and unknown_types_strategy == UnknownTypesStrategy.IGNORE:
+        cid, cname = class_name_resolver.resolve(category_id_to_names[anno_dict['category_id']])
+        if cid < 0 and unknown_types_strategy == UnknownTypesStrategy.IGNORE:
+            import_stats['ignored_objects'] += 1
             continue
 
         asset_hash = image_id_to_hashes[anno_dict['image_id']]
-        signature = _annotation_signature(obj_anno, asset_hash)
-        if signature in known_signatures:
-            logging.warning(f"[import error]: Found duplicated annotation for asset hash: {asset_hash}")
-            duplicate_count += 1
+        dedup_key = (cname, x, y, w, h, 0.0)
+        asset_known_keys = known_keys[asset_hash]
+        if dedup_key in asset_known_keys:
+            logging.debug(f"[import error]: Found duplicated annotation for asset hash: {asset_hash}")
+            import_stats['duplicate_objects'] += 1
             continue
-        known_signatures.add(signature)
+        asset_known_keys.add(dedup_key)
 
+        obj_anno = obj_anno or _coco_object_dict_to_annotation(anno_dict=anno_dict,
+                                                               category_id_to_names=category_id_to_names)
+        if not obj_anno:
+            import_stats['error_format_objects'] += 1
+            continue
+        obj_anno.class_id, obj_anno.class_name = cid, cname
         obj_anno.index = len(image_annotations.image_annotations[asset_hash].boxes)
         image_annotations.image_annotations[asset_hash].boxes.append(obj_anno)
+        import_stats['objects'] += 1
 
     if duplicated_image_ids:
         logging.warning(f"[import error]: Duplicated image ids: {duplicated_image_ids}")
     if duplicated_category_ids:
         logging.warning(f"[import error]: Duplicated category ids: {duplicated_category_ids}")
-    if unhashed_filenames_cnt:
-        logging.warning(f"[import error]: Count of unhashed file names in images list: {unhashed_filenames_cnt}")
-    if unknown_category_ids_cnt:
-        logging.warning(f"[import error]: Count of unknown category ids in categories list: {unknown_category_ids_cnt}")
-    if unknown_image_objects_cnt:
-        logging.warning(
-            f"[import error]: Count of objects with unknown image ids in annotations list: {unknown_image_objects_cnt}")
-    if error_format_objects_cnt:
-        logging.warning(f"[import error]: Count of error format objects: {error_format_objects_cnt}")
-    if zero_size_count:
-        logging.warning(f"[import error]: Count of zero size objects: {zero_size_count}")
-    if duplicate_count:
-        logging.warning(f"[import error]: Count of duplicate objects: {duplicate_count}")
+    import_stats['duplicated_image_ids'] = len(duplicated_image_ids)
+    import_stats['duplicated_category_ids'] = len(duplicated_category_ids)
+    _log_import_stats(import_stats)
 
 
 def _import_no_annotations(file_name_to_asset_ids: Dict[str, str], mir_annotation: mirpb.MirAnnotations,
@@ -1,9 +1,12 @@
+from collections import OrderedDict
 from datetime import datetime
 import os
-from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+import threading
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
 import uuid
 
 import fasteners  # type: ignore
+from mir.tools import settings as mir_settings
 from mir.version import check_ymir_version_or_crash, YMIR_REPO_VERSION
 from pydantic import BaseModel, root_validator, validator, validate_model
 import yaml
@@ -67,11 +70,12 @@ class UserLabels(LabelStorage):
         # in most cases, UserLabels is bind to a storage_file.
         storage_file = values.get("storage_file")
         if storage_file and os.path.isfile(storage_file):
-            with open(storage_file, 'r') as f:
-                file_obj = yaml.safe_load(f)
-            if file_obj is None:
-                file_obj = {}
-            values["labels"] = LabelStorage(**file_obj).labels
+            # lookup dicts are copied, they are updated in place when new names added.
+            lookup = _load_labels_lookup(storage_file)
+            values['labels'] = list(lookup.labels)
+            values['_name_aliases_to_id'] = dict(lookup.name_aliases_to_id)
+            values['_id_to_name'] = dict(lookup.id_to_name)
+            return values
 
         name_aliases_to_id: Dict[str, int] = {}
         id_to_name: Dict[int, str] = {}
@@ -280,6 +284,92 @@ class UserLabels(LabelStorage):
                 yield label
 
 
+class ClassNameResolver:
+    """
+    resolves raw class names to (class id, main name) for one import or infer run, each distinct raw name is
+        normalized and looked up only once, unknown names resolve to (-1, normalized name) and are recorded
+    """
+    def __init__(self, user_labels: UserLabels) -> None:
+        self._user_labels = user_labels
+        self._resolved: Dict[str, Tuple[int, str]] = {}
+        self._unknown_names: Dict[str, None] = {}  # normalized unknown names, in the order first seen
+
+    def resolve(self, name: str) -> Tuple[int, str]:
+        resolved = self._resolved.get(name)
+        if resolved is None:
+            resolved = self._user_labels.id_and_main_name_for_name(name)
+            self._resolved[name] = resolved
+            if resolved[0] < 0:
+                self._unknown_names[resolved[1]] = None
+        return resolved
+
+    def resolve_many(self, names: Iterable[str]) -> List[Tuple[int, str]]:
+        resolved = self._resolved
+        return [resolved[name] if name in resolved else self.resolve(name) for name in names]
+
+    @property
+    def unknown_names(self) -> List[str]:
+        return list(self._unknown_names)
+
+    def add_unknown_names(self) -> List[Tuple[int, str]]:
+        """
+        adds all unknown names met so far to user labels and its storage file, returns their ids and main names
+        """
+        if not self._unknown_names:
+            return []
+        added = self._user_labels.add_main_names(list(self._unknown_names))
+        self._resolved = {k: v for k, v in self._resolved.items() if v[0] >= 0}
+        self._unknown_names.clear()
+        return added
+
+
+class _LabelsLookup(NamedTuple):
+    """
+    labels and lookup dicts built from one version of a label storage file, shared by all `UserLabels` loaded from it
+    """
+    labels: Tuple[SingleLabel, ...]
+    name_aliases_to_id: Mapping[str, int]
+    id_to_name: Mapping[int, str]
+
+
+# storage file -> ((st_ino, st_mtime_ns, st_size), lookup), at most `LABELS_CACHE_MAX_FILES` files, lru.
+#   `UserLabels.__save` renames a new file onto storage file, so inode changes even if mtime and size not.
+_labels_lookup_cache: 'OrderedDict[str, Tuple[Tuple[int, int, int], _LabelsLookup]]' = OrderedDict()
+_labels_lookup_lock = threading.Lock()
+
+
+def _load_labels_lookup(storage_file: str) -> _LabelsLookup:
+    storage_file = os.path.abspath(storage_file)
+    with open(storage_file, 'r') as f:
+        # stat the opened file, so the key always matches the content read below.
+        stat = os.fstat(f.fileno())
+        file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with _labels_lookup_lock:
+            cached = _labels_lookup_cache.get(storage_file)
+            if cached and cached[0] == file_key:
+                _labels_lookup_cache.move_to_end(storage_file)
+                return cached[1]
+
+        file_obj = yaml.safe_load(f)
+
+    labels = LabelStorage(**(file_obj or {})).labels
+    name_aliases_to_id: Dict[str, int] = {}
+    id_to_name: Dict[int, str] = {}
+    for label in labels:
+        name_aliases_to_id[label.name] = label.id
+        for label_alias in label.aliases:
+            name_aliases_to_id[label_alias] = label.id
+        id_to_name[label.id] = label.name
+    lookup = _LabelsLookup(labels=tuple(labels), name_aliases_to_id=name_aliases_to_id, id_to_name=id_to_name)
+
+    with _labels_lookup_lock:
+        _labels_lookup_cache[storage_file] = (file_key, lookup)
+        _labels_lookup_cache.move_to_end(storage_file)
+        while len(_labels_lookup_cache) > mir_settings.LABELS_CACHE_MAX_FILES:
+            _labels_lookup_cache.popitem(last=False)
+    return lookup
+
+
 def ids_file_name() -> str:
     return 'labels.yaml'
 
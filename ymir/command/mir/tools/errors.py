@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Dict, Tuple, Type
 
 
 class MirError(Exception):
@@ -10,6 +10,11 @@ class MirError(Exception):
         self.error_code = error_code
         self.error_message = error_message
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # rebuilt from attributes when pickled, for example raised in worker processes
+        #   default reduce calls `__init__` with `args`, which are empty here
+        return (_rebuild_error, (self.__class__, self.__dict__))
+
     def __str__(self) -> str:
         return f"code: {self.error_code}, content: {self.error_message}"
 
@@ -44,3 +49,9 @@ class MirContainerError(MirRuntimeError):
                          error_message=task.return_msg,
                          needs_new_commit=True,
                          task=task)
+
+
+def _rebuild_error(cls: Type[MirError], state: Dict[str, Any]) -> MirError:
+    error = cls.__new__(cls)
+    error.__dict__.update(state)
+    return error
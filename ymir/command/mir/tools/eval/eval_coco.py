@@ -1,9 +1,9 @@
-from collections import defaultdict
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pycocotools.mask
 
+from mir.tools import masks
 from mir.tools.code import MirCode
 from mir.tools.errors import MirRuntimeError
 from mir.tools.eval import eval_utils
@@ -11,8 +11,11 @@ from mir.protos import mir_command_pb2 as mirpb
 
 
 class MirCoco:
-    def __init__(self, task_annotations: mirpb.SingleTaskAnnotations, mir_metadatas: mirpb.MirMetadatas,
-                 conf_thr: Optional[float]) -> None:
+    def __init__(self,
+                 task_annotations: mirpb.SingleTaskAnnotations,
+                 mir_metadatas: mirpb.MirMetadatas,
+                 conf_thr: Optional[float],
+                 need_segmentation: bool = True) -> None:
         """
         creates MirCoco instance
 
@@ -21,6 +24,8 @@ class MirCoco:
             conf_thr (Optional[float]): lower bound of annotation confidence score
                 only annotation with confidence greater then conf_thr will be used.
                 if you wish to use all annotations, let conf_thr = None
+            need_segmentation (bool): if False, skip converting annotations to coco segmentations,
+                used when evaluating with bbox iou
         """
         if len(task_annotations.image_annotations) == 0:
             raise MirRuntimeError(error_code=MirCode.RC_CMD_NO_ANNOTATIONS,
@@ -33,245 +38,321 @@ class MirCoco:
         if len(extra_asset_ids) > 0:
             raise ValueError(f"Can not find attributes for following assets: {extra_asset_ids}")
 
-        self.img_cat_to_annotations = self._aggregate_annotations(single_task_annotations=task_annotations,
-                                                                  mir_metadatas=mir_metadatas,
-                                                                  conf_thr=conf_thr)
+        self._aggregate_annotations(single_task_annotations=task_annotations,
+                                    mir_metadatas=mir_metadatas,
+                                    conf_thr=conf_thr,
+                                    need_segmentation=need_segmentation)
 
     def _aggregate_annotations(self, single_task_annotations: mirpb.SingleTaskAnnotations,
-                               mir_metadatas: mirpb.MirMetadatas,
-                               conf_thr: Optional[float]) -> Dict[Tuple[str, int], List[dict]]:
+                               mir_metadatas: mirpb.MirMetadatas, conf_thr: Optional[float],
+                               need_segmentation: bool) -> None:
         """
-        aggregates annotations with confidence >= conf_thr into a dict with key: (asset id, class id)
+        aggregates annotations with confidence >= conf_thr into flat arrays, one element for each annotation,
+            in the order of self.asset_ids and annotations in each asset
 
         Args:
             single_task_annotations (mirpb.SingleTaskAnnotations): annotations
             conf_thr (float): confidence threshold of bbox, set to None if you want all annotations
-
-        Returns:
-            annotations dict with key: (asset idx, class id), value: annotations list,
-            each element is a dict, and has following keys and values:
-                id: int, global id for a single annotation
-                area: int, area of bbox
-                bbox: List[int], bounding box, xywh
-                score: float, confidence of bbox
-                iscrowd: always 0 because mir knows nothing about it
-                ignore: always 0
-                pb_index_id: annotation.index in mir_annotations file
+            need_segmentation (bool): if True, also makes coco segmentations
+
+        Side effects:
+            self.asset_idxes: index of asset in self.asset_ids
+            self.class_ids: class id
+            self.ids: global id for a single annotation, starts from 1
+            self.areas: area of bbox, or mask area if not detection
+            self.bboxes: bounding box, xywh, shape: annotations x 4
+            self.scores: confidence of bbox
+            self.iscrowds: iscrowd of annotation
+            self.pb_index_ids: annotation.index in mir_annotations file
+            self.segmentations: coco segmentations, None if not need_segmentation
         """
-        img_cat_to_annotations: Dict[Tuple[str, int], List[dict]] = defaultdict(list)
-
-        annotation_idx = 1
-        for asset_id in self.asset_ids:
-            if asset_id not in single_task_annotations.image_annotations:
-                continue
-
-            single_image_annotations = single_task_annotations.image_annotations[asset_id]
-            for annotation in single_image_annotations.boxes:
+        asset_idxes: List[int] = []
+        class_ids: List[int] = []
+        areas: List[int] = []
+        bboxes: List[Tuple[int, int, int, int]] = []
+        scores: List[float] = []
+        iscrowds: List[int] = []
+        pb_index_ids: List[int] = []
+        segmentations: List[Union[dict, list]] = []
+
+        is_det = (single_task_annotations.type == mirpb.OT_DET)
+        for asset_idx, asset_id in enumerate(self.asset_ids):
+            attrs = mir_metadatas.attributes[asset_id]
+            for annotation in single_task_annotations.image_annotations[asset_id].boxes:
                 if conf_thr is not None and annotation.score < conf_thr:
                     continue
 
-                if single_task_annotations.type == mirpb.OT_DET:
-                    area = annotation.box.w * annotation.box.h
-                else:
-                    area = annotation.mask_area
-                annotation_dict = {
-                    'id': annotation_idx,
-                    'area': area,
-                    'bbox': [annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h],
-                    'score': annotation.score,
-                    'iscrowd': annotation.iscrowd,
-                    'ignore': 0,
-                    'pb_index_id': annotation.index,
-                }
-                annotation_dict['segmentation'] = self._convert_to_coco_segmentation(
-                    annotation=annotation, attrs=mir_metadatas.attributes[asset_id])
-                img_cat_to_annotations[asset_id, annotation.class_id].append(annotation_dict)
-
-                annotation_idx += 1
-
-        return img_cat_to_annotations
+                box = annotation.box
+                asset_idxes.append(asset_idx)
+                class_ids.append(annotation.class_id)
+                areas.append(box.w * box.h if is_det else annotation.mask_area)
+                bboxes.append((box.x, box.y, box.w, box.h))
+                scores.append(annotation.score)
+                iscrowds.append(annotation.iscrowd)
+                pb_index_ids.append(annotation.index)
+                if need_segmentation:
+                    segmentations.append(self._convert_to_coco_segmentation(annotation=annotation, attrs=attrs))
+
+        self.asset_idxes = np.array(asset_idxes, dtype=np.int64)
+        self.class_ids = np.array(class_ids, dtype=np.int64)
+        self.ids = np.arange(1, len(asset_idxes) + 1, dtype=np.int64)
+        self.areas = np.array(areas, dtype=np.int64)
+        self.bboxes = np.array(bboxes, dtype=np.float64).reshape((-1, 4))
+        self.scores = np.array(scores, dtype=np.float64)
+        self.iscrowds = np.array(iscrowds, dtype=np.int64)
+        self.pb_index_ids = np.array(pb_index_ids, dtype=np.int64)
+        self.segmentations: Optional[List[Union[dict, list]]] = segmentations if need_segmentation else None
 
     @classmethod
     def _convert_to_coco_segmentation(cls, annotation: mirpb.ObjectAnnotation,
                                       attrs: mirpb.MetadataAttributes) -> Union[dict, list]:
-        if annotation.type == mirpb.ObjectSubType.OST_SEG_MASK:
-            return {"counts": annotation.mask, "size": [attrs.height, attrs.width]}
-        elif annotation.type == mirpb.ObjectSubType.OST_SEG_POLYGON:
-            polygon = [[i for point in annotation.polygon for i in (point.x, point.y)]]
-            return pycocotools.mask.merge(pycocotools.mask.frPyObjects(polygon, attrs.height, attrs.width))
-        else:
-            raise ValueError("Failed to convert to coco segmentation format")
+        return masks.annotation_rle(annotation=annotation, hw=(attrs.height, attrs.width))
+
+
+class _GroupedAnnotations:
+    """
+    annotations of one MirCoco, selected by class ids and sorted by group: (class index, asset index)
+
+    a group holds annotations of a single image and category,
+        gts keeps the original order in each group, dts are sorted by score (desc) in each group
+    """
+    def __init__(self, coco: MirCoco, cat_ids: List[int], asset_id_to_idx: Dict[str, int], sort_by_score: bool,
+                 max_per_group: Optional[int]) -> None:
+        assets_count = len(asset_id_to_idx)
+        coco_asset_idxes = np.array([asset_id_to_idx[asset_id] for asset_id in coco.asset_ids], dtype=np.int64)
+
+        selected_list = [np.flatnonzero(coco.class_ids == cat_id) for cat_id in cat_ids]
+        indexes = np.concatenate(selected_list).astype(np.int64)
+        class_idxes = np.repeat(np.arange(len(cat_ids), dtype=np.int64), [len(v) for v in selected_list])
+        groups = class_idxes * assets_count + coco_asset_idxes[coco.asset_idxes[indexes]]
+
+        # np.lexsort is stable, same as sorting by score with mergesort in each group
+        sort_keys = (indexes, -coco.scores[indexes], groups) if sort_by_score else (indexes, groups)
+        order = np.lexsort(sort_keys)
+        indexes, groups = indexes[order], groups[order]
+
+        # rank of annotation in its group
+        _, group_starts, group_counts = np.unique(groups, return_index=True, return_counts=True)
+        ranks = np.arange(len(groups), dtype=np.int64) - np.repeat(group_starts, group_counts)
+        if max_per_group is not None:
+            keep = ranks < max_per_group
+            indexes, groups, ranks = indexes[keep], groups[keep], ranks[keep]
+
+        self.indexes = indexes  # index in flat arrays of coco
+        self.groups = groups
+        self.ranks = ranks
+        unique_groups, group_starts, group_counts = np.unique(groups, return_index=True, return_counts=True)
+        self.unique_groups: np.ndarray = unique_groups
+        self.group_starts: np.ndarray = group_starts
+        self.group_counts: np.ndarray = group_counts
+        self.class_idxes = groups // assets_count
+        self.asset_idxes = groups % assets_count
+        self.areas = coco.areas[indexes]
+        self.bboxes = coco.bboxes[indexes]
+        self.scores = coco.scores[indexes]
+        self.iscrowds = coco.iscrowds[indexes]
+        self.pb_index_ids = coco.pb_index_ids[indexes]
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def class_range(self, class_idx: int, assets_count: int) -> Tuple[int, int]:
+        """
+        [start, end) of annotations with class index `class_idx`
+        """
+        return (int(np.searchsorted(self.groups, class_idx * assets_count, side='left')),
+                int(np.searchsorted(self.groups, (class_idx + 1) * assets_count, side='left')))
 
 
 class CocoDetEval:
     def __init__(
         self, coco_gt: MirCoco, coco_dt: MirCoco, params: 'Params', assets_metadata: Optional[mirpb.MirMetadatas]
     ):
-        self.evalImgs: dict = {}  # per-image per-category evaluation results [KxAxI] elements
         self.eval: dict = {}  # accumulated evaluation results
         self.params = params
         self.stats: np.ndarray = np.zeros(1)  # result summarization
-        self.ious: dict = {
-        }  # key: (asset id, class id), value: ious ndarray of ith dt (sorted by score, desc) and jth gt
 
-        self._gts = defaultdict(list, coco_gt.img_cat_to_annotations)
-        self._dts = defaultdict(list, coco_dt.img_cat_to_annotations)
         self._asset_ids: List[str] = sorted(set(coco_gt.asset_ids) | set(coco_dt.asset_ids))
         self._assets_metadata = assets_metadata.attributes if assets_metadata else None
 
         self._coco_gt = coco_gt
         self._coco_dt = coco_dt
 
+        # per area range evaluation results, see `evaluate`
+        self._gts: Optional[_GroupedAnnotations] = None
+        self._dts: Optional[_GroupedAnnotations] = None
+        self._gt_ignores: List[np.ndarray] = []
+        self._dt_matches: List[np.ndarray] = []
+        self._dt_ignores: List[np.ndarray] = []
+
         self.match_result = eval_utils.DetEvalMatchResult()
 
     def evaluate(self) -> None:
         '''
-        Run per image evaluation on given images and store results (a list of dict) in self.evalImgs
+        Run evaluation on all images, categories and area ranges at once
 
         Returns: None
         SideEffects:
             self.params.maxDets: will be sorted
-            self.ious: will be cauculated
-            self.evalImgs: will be cauculated
+            self._gts, self._dts: annotations grouped by category and image
+            self._gt_ignores: for each area range, gt ignored or not, shape: gts
+            self._dt_matches: for each area range, index of gt matched by dt, -1 if not matched, shape: iouThrs x dts
+            self._dt_ignores: for each area range, dt ignored or not, shape: iouThrs x dts
+            self.match_result: will be filled
         '''
         self.params.maxDets.sort()
         p = self.params
 
-        # loop through images, area range, max detection number
-        catIds = p.catIds
+        asset_id_to_idx = {asset_id: idx for idx, asset_id in enumerate(self._asset_ids)}
+        gts = _GroupedAnnotations(coco=self._coco_gt,
+                                  cat_ids=p.catIds,
+                                  asset_id_to_idx=asset_id_to_idx,
+                                  sort_by_score=False,
+                                  max_per_group=None)
+        dts = _GroupedAnnotations(coco=self._coco_dt,
+                                  cat_ids=p.catIds,
+                                  asset_id_to_idx=asset_id_to_idx,
+                                  sort_by_score=True,
+                                  max_per_group=p.maxDets[-1])
+        self._gts, self._dts = gts, dts
+
+        pair_dts, pair_gts = self._make_pairs(gts=gts, dts=dts)
+        pair_ious = self._compute_pair_ious(gts=gts, dts=dts, pair_dts=pair_dts, pair_gts=pair_gts)
+
+        self._gt_ignores, self._dt_matches, self._dt_ignores = [], [], []
+        for aRng in p.areaRng:
+            gt_ignores = (gts.areas < aRng[0]) | (gts.areas > aRng[1])
+            dt_matches = self._match(gts=gts,
+                                     dts=dts,
+                                     gt_ignores=gt_ignores,
+                                     pair_dts=pair_dts,
+                                     pair_gts=pair_gts,
+                                     pair_ious=pair_ious)
+
+            dt_matched = dt_matches >= 0
+            dt_ignores = np.zeros(dt_matches.shape, dtype=bool)
+            dt_ignores[dt_matched] = gt_ignores[dt_matches[dt_matched]]
+            # set unmatched detections outside of area range to ignore
+            dt_out_of_range = (dts.areas < aRng[0]) | (dts.areas > aRng[1])
+            dt_ignores |= (~dt_matched & dt_out_of_range[np.newaxis, :])
+
+            self._gt_ignores.append(gt_ignores)
+            self._dt_matches.append(dt_matches)
+            self._dt_ignores.append(dt_ignores)
+
+            for tind, iou_thr in enumerate(p.iouThrs):
+                dinds = np.flatnonzero(dt_matched[tind])
+                self.match_result.add_matches(iou_thr=iou_thr,
+                                              asset_ids=[self._asset_ids[i] for i in dts.asset_idxes[dinds].tolist()],
+                                              gt_pb_idxes=gts.pb_index_ids[dt_matches[tind, dinds]].tolist(),
+                                              pred_pb_idxes=dts.pb_index_ids[dinds].tolist())
 
-        # self.ious: key: (img_idx, class_id), value: ious ndarray of len(dts) * len(gts)
-        self.ious = {(asset_id, catId): self.computeIoU(asset_id, catId)
-                     for asset_id in self._asset_ids for catId in catIds}
-
-        maxDet = p.maxDets[-1]
-        self.evalImgs = {(asset_id, cIdx, aIdx): self.evaluateImg(asset_id, catId, areaRng, maxDet)
-                         for cIdx, catId in enumerate(catIds) for aIdx, areaRng in enumerate(p.areaRng)
-                         for asset_id in self._asset_ids}
+    @classmethod
+    def _make_pairs(cls, gts: _GroupedAnnotations, dts: _GroupedAnnotations) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        all (dt, gt) pairs in the same group, ordered by dt and then gt, so pairs of a group is a dts x gts block
 
-    def computeIoU(self, asset_id: str, catId: int) -> Union[np.ndarray, list]:
+        Returns:
+            pair_dts, pair_gts: index of dt and gt of each pair
         """
-        compute ious of detections and ground truth boxes of single image and class /category
+        if len(gts) == 0 or len(dts) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
 
-        Args:
-            asset_id (str): asset id
-            catId (int): category / class id
+        group_pos = np.minimum(np.searchsorted(gts.unique_groups, dts.groups), len(gts.unique_groups) - 1)
+        has_gts = (gts.unique_groups[group_pos] == dts.groups)
+        gt_counts = np.where(has_gts, gts.group_counts[group_pos], 0)
+        gt_starts = np.where(has_gts, gts.group_starts[group_pos], 0)
 
-        Returns:
-            ious ndarray of detections and ground truth boxes of single image and category
-            ious[i][j] means the iou i-th detection (sorted by score, desc) and j-th ground truth box
+        pair_dts = np.repeat(np.arange(len(dts), dtype=np.int64), gt_counts)
+        pair_offsets = np.arange(len(pair_dts), dtype=np.int64) - np.repeat(np.cumsum(gt_counts) - gt_counts, gt_counts)
+        pair_gts = np.repeat(gt_starts, gt_counts) + pair_offsets
+        return pair_dts, pair_gts
+
+    def _compute_pair_ious(self, gts: _GroupedAnnotations, dts: _GroupedAnnotations, pair_dts: np.ndarray,
+                           pair_gts: np.ndarray) -> np.ndarray:
         """
-        gt = self._gts[asset_id, catId]
-        dt = self._dts[asset_id, catId]
-        if len(gt) == 0 and len(dt) == 0:
-            return []
-
-        # sort dt by score, desc
-        inds = np.argsort([-d['score'] for d in dt], kind='mergesort')
-        dt = [dt[i] for i in inds]
-        if len(dt) > self.params.maxDets[-1]:
-            dt = dt[0:self.params.maxDets[-1]]
-
-        if self.params.iouType == "bbox":
-            g_boxes = [g['bbox'] for g in gt]
-            d_boxes = [d['bbox'] for d in dt]
-        elif self.params.iouType == "segm":
-            g_boxes = [g['segmentation'] for g in gt]
-            d_boxes = [d['segmentation'] for d in dt]
+        ious of all (dt, gt) pairs, same as `pycocotools.mask.iou`
+        """
+        if self.params.iouType == 'bbox':
+            d = dts.bboxes[pair_dts]
+            g = gts.bboxes[pair_gts]
+            w = np.minimum(d[:, 2] + d[:, 0], g[:, 2] + g[:, 0]) - np.maximum(d[:, 0], g[:, 0])
+            h = np.minimum(d[:, 3] + d[:, 1], g[:, 3] + g[:, 1]) - np.maximum(d[:, 1], g[:, 1])
+            i = w * h
+            da = d[:, 2] * d[:, 3]
+            u = np.where(gts.iscrowds[pair_gts] != 0, da, da + g[:, 2] * g[:, 3] - i)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where((w > 0) & (h > 0), i / u, 0.0)
+        elif self.params.iouType == 'segm':
+            gt_segmentations = self._coco_gt.segmentations
+            dt_segmentations = self._coco_dt.segmentations
+            if gt_segmentations is None or dt_segmentations is None:
+                raise ValueError('no segmentations for segm iou computation')
+
+            pair_ious = np.zeros(len(pair_dts), dtype=np.float64)
+            # pairs of each group is a continuous dts x gts block
+            block_start = 0
+            dt_group_pos = np.searchsorted(gts.unique_groups, dts.unique_groups).tolist()
+            for group, dt_start, dt_count, gt_pos in zip(dts.unique_groups.tolist(), dts.group_starts.tolist(),
+                                                         dts.group_counts.tolist(), dt_group_pos):
+                if gt_pos >= len(gts.unique_groups) or gts.unique_groups[gt_pos] != group:
+                    continue
+                gt_start, gt_count = gts.group_starts[gt_pos], gts.group_counts[gt_pos]
+                ious = pycocotools.mask.iou([dt_segmentations[i] for i in dts.indexes[dt_start:dt_start + dt_count]],
+                                            [gt_segmentations[i] for i in gts.indexes[gt_start:gt_start + gt_count]],
+                                            [int(v) for v in gts.iscrowds[gt_start:gt_start + gt_count]])
+                pair_ious[block_start:block_start + dt_count * gt_count] = np.asarray(ious).reshape(-1)
+                block_start += dt_count * gt_count
+            return pair_ious
         else:
             raise ValueError('unknown iouType for iou computation')
 
-        iscrowd = [int(o.get('iscrowd', 0)) for o in gt]
-        # compute iou between each dt and gt region
-        # ious: matrix of len(d_boxes) * len(g_boxes)
-        #   ious[i][j]: iou of d_boxes[i] and g_boxes[j]
-        ious = pycocotools.mask.iou(d_boxes, g_boxes, iscrowd)
-        return ious
+    def _match(self, gts: _GroupedAnnotations, dts: _GroupedAnnotations, gt_ignores: np.ndarray,
+               pair_dts: np.ndarray, pair_gts: np.ndarray, pair_ious: np.ndarray) -> np.ndarray:
+        """
+        greedy matching of all groups and iou thresholds at once, dts in each group are matched in score order
 
-    def evaluateImg(self, asset_id: str, catId: int, aRng: Any, maxDet: int) -> Optional[dict]:
-        '''
-        perform evaluation for single category and image
-
-        Args:
-            asset_id (str): asset id
-            catId (int): category / class id
-            aRng (List[float]): area range (lower and upper bound)
-            maxDet (int):
+        for each dt, matches the unmatched (or crowd) gt with the highest iou >= iou thr, not ignored gts first,
+            if ious are equal, the last gt wins, the same as the per image loop of cocoapi
 
         Returns:
-            dict (single image results)
-        '''
-        gt = self._gts[asset_id, catId]
-        dt = self._dts[asset_id, catId]
-        if len(gt) == 0 and len(dt) == 0:
-            return None
-
-        for g in gt:
-            if g['ignore'] or (g['area'] < aRng[0] or g['area'] > aRng[1]):
-                g['_ignore'] = 1
-            else:
-                g['_ignore'] = 0
-
-        # sort dt highest score first, sort gt ignore last
-        gtind = np.argsort([g['_ignore'] for g in gt], kind='mergesort')
-        gt = [gt[i] for i in gtind]
-        dtind = np.argsort([-d['score'] for d in dt], kind='mergesort')
-        dt = [dt[i] for i in dtind[0:maxDet]]
-        iscrowd = [int(o['iscrowd']) for o in gt]
-        # load computed ious
-        ious = self.ious[asset_id, catId][:, gtind] if len(self.ious[asset_id, catId]) > 0 else self.ious[asset_id,
-                                                                                                          catId]
+            index of gt matched by each dt, -1 if not matched, shape: iouThrs x dts
+        """
+        iou_thrs = np.minimum(self.params.iouThrs, 1 - 1e-10)
+        T = len(iou_thrs)
+        dt_matches = np.full((T, len(dts)), -1, dtype=np.int64)
+        gt_matched = np.zeros((T, len(gts)), dtype=bool)
+        if len(pair_dts) == 0:
+            return dt_matches
+
+        gt_not_ignores = ~gt_ignores
+        gt_iscrowds = gts.iscrowds != 0
+
+        # each group has at most one dt in each rank, so dts of the same rank never compete for the same gt
+        pair_ranks = dts.ranks[pair_dts]
+        rank_order = np.argsort(pair_ranks, kind='stable')
+        rank_bounds = np.searchsorted(pair_ranks[rank_order], np.arange(pair_ranks.max() + 2), side='left')
+        for rank in range(len(rank_bounds) - 1):
+            rank_pairs = rank_order[rank_bounds[rank]:rank_bounds[rank + 1]]
+            r_dts, r_gts, r_ious = pair_dts[rank_pairs], pair_gts[rank_pairs], pair_ious[rank_pairs]
+
+            # candidates: iouThrs x pairs
+            candidates = ((~gt_matched[:, r_gts] | gt_iscrowds[r_gts][np.newaxis, :])
+                          & (r_ious[np.newaxis, :] >= iou_thrs[:, np.newaxis]))
+            candidate_tinds, candidate_pinds = np.nonzero(candidates)
+            if len(candidate_tinds) == 0:
+                continue
 
-        p = self.params
-        T = len(p.iouThrs)
-        G = len(gt)
-        D = len(dt)
-        gtm = np.zeros((T, G))  # gtm[i, j]: dt annotation id matched by j-th gt in i-th iou thr, iouThrs x gts
-        dtm = np.zeros((T, D))  # dtm[i, j]: gt annotation id matched by j-th dt in i-th iou thr, iouThrs x dets
-        gtIg = np.array([g['_ignore'] for g in gt])  # gt ignore
-        dtIg = np.zeros((T, D))  # dt ignore
-        if not len(ious) == 0:
-            for tind, t in enumerate(p.iouThrs):
-                for dind, d in enumerate(dt):
-                    # information about best match so far (m=-1 -> unmatched)
-                    iou = min([t, 1 - 1e-10])
-                    m = -1  # best matched gind for current dind, -1 for unmatch
-                    for gind, g in enumerate(gt):
-                        # if this gt already matched, and not a crowd, continue
-                        if gtm[tind, gind] > 0 and not iscrowd[gind]:
-                            continue
-                        # if dt matched to reg gt, and on ignore gt, stop
-                        if m > -1 and gtIg[m] == 0 and gtIg[gind] == 1:
-                            break
-                        # continue to next gt unless better match made
-                        if ious[dind, gind] < iou:
-                            continue
-                        # if match successful and best so far, store appropriately
-                        iou = ious[dind, gind]
-                        m = gind
-                    # if match made store id of match for both dt and gt
-                    if m == -1:
-                        continue
-                    dtIg[tind, dind] = gtIg[m]
-                    dtm[tind, dind] = gt[m]['id']
-                    gtm[tind, m] = d['id']
-
-                    self.match_result.add_match(asset_id=asset_id,
-                                                iou_thr=t,
-                                                gt_pb_idx=gt[m]['pb_index_id'],
-                                                pred_pb_idx=d['pb_index_id'])
-
-        # set unmatched detections outside of area range to ignore
-        a = np.array([d['area'] < aRng[0] or d['area'] > aRng[1] for d in dt]).reshape((1, len(dt)))
-        dtIg = np.logical_or(dtIg, np.logical_and(dtm == 0, np.repeat(a, T, 0)))
-        # store results for given image and category
-        return {
-            'dtMatches': dtm,
-            'gtMatches': gtm,
-            'dtScores': [d['score'] for d in dt],
-            'gtIgnore': gtIg,
-            'dtIgnore': dtIg,
-        }
+            c_dts, c_gts = r_dts[candidate_pinds], r_gts[candidate_pinds]
+            order = np.lexsort((c_gts, r_ious[candidate_pinds], gt_not_ignores[c_gts], c_dts, candidate_tinds))
+            s_tinds, s_dts, s_gts = candidate_tinds[order], c_dts[order], c_gts[order]
+            # best candidate of each (iou thr, dt) is the last one in sorted order
+            is_best = np.ones(len(order), dtype=bool)
+            is_best[:-1] = (s_tinds[1:] != s_tinds[:-1]) | (s_dts[1:] != s_dts[:-1])
+
+            dt_matches[s_tinds[is_best], s_dts[is_best]] = s_gts[is_best]
+            gt_matched[s_tinds[is_best], s_gts[is_best]] = True
+        return dt_matches
 
     def accumulate(self, p: 'Params' = None) -> None:
         '''
@@ -279,8 +360,9 @@ class CocoDetEval:
         :param p: input params for evaluation
         :return: None
         '''
-        if not self.evalImgs:
+        if self._gts is None or self._dts is None:
             raise ValueError('Please run evaluate() first')
+        gts, dts = self._gts, self._dts
 
         # allows input customized parameters
         if p is None:
@@ -300,36 +382,33 @@ class CocoDetEval:
         # create dictionary for future indexing
         catIds = self.params.catIds
         setK: set = set(catIds)
-        setA: Set[tuple] = set(map(tuple, self.params.areaRng))
+        setA = set(map(tuple, self.params.areaRng))
         setM: set = set(self.params.maxDets)
         # get inds to evaluate
         k_list = [n for n, k in enumerate(p.catIds) if k in setK]
         m_list = [m for n, m in enumerate(p.maxDets) if m in setM]
         a_list = [n for n, a in enumerate(map(lambda x: tuple(x), p.areaRng)) if a in setA]
-        # retrieve E at each category, area range, and max number of detections
+        assets_count = len(self._asset_ids)
+        # retrieve dts and gts at each category, area range, and max number of detections
         for k, _ in enumerate(k_list):
+            dt_start, dt_end = dts.class_range(class_idx=k, assets_count=assets_count)
+            gt_start, gt_end = gts.class_range(class_idx=k, assets_count=assets_count)
             for a, _ in enumerate(a_list):
-                # Na = a0 * I0
+                npig = np.count_nonzero(~self._gt_ignores[a][gt_start:gt_end])
                 for m, maxDet in enumerate(m_list):
-                    E = [self.evalImgs.get((asset_id, k, a), None) for asset_id in self._asset_ids]
-                    E = [e for e in E if e is not None]
-                    if len(E) == 0:
-                        continue
-                    dtScores = np.concatenate([e['dtScores'][0:maxDet] for e in E])
-                    if len(dtScores) == 0:
+                    # dts of this category, ordered by image and then score
+                    dt_inds = dt_start + np.flatnonzero(dts.ranks[dt_start:dt_end] < maxDet)
+                    if len(dt_inds) == 0 or npig == 0:
                         continue
+                    dtScores = dts.scores[dt_inds]
 
                     # different sorting method generates slightly different results.
                     # mergesort is used to be consistent as Matlab implementation.
                     inds = np.argsort(-dtScores, kind='mergesort')
                     dtScoresSorted = dtScores[inds]
 
-                    dtm = np.concatenate([e['dtMatches'][:, 0:maxDet] for e in E], axis=1)[:, inds]
-                    dtIg = np.concatenate([e['dtIgnore'][:, 0:maxDet] for e in E], axis=1)[:, inds]
-                    gtIg = np.concatenate([e['gtIgnore'] for e in E])
-                    npig = np.count_nonzero(gtIg == 0)
-                    if npig == 0:
-                        continue
+                    dtm = self._dt_matches[a][:, dt_inds[inds]] >= 0
+                    dtIg = self._dt_ignores[a][:, dt_inds[inds]]
 
                     tps = np.logical_and(dtm, np.logical_not(dtIg))  # iouThrs x dts
                     fps = np.logical_and(np.logical_not(dtm), np.logical_not(dtIg))  # iouThrs x dts
@@ -340,38 +419,23 @@ class CocoDetEval:
                     all_fps[:, k, a, m] = fp_sum[:, -1]
                     all_fns[:, k, a, m] = npig - all_tps[:, k, a, m]
 
-                    for t, (tp, fp) in enumerate(zip(tp_sum, fp_sum)):
-                        tp = np.array(tp)
-                        fp = np.array(fp)
-                        nd = len(tp)
-                        rc = tp / npig
-                        pr = tp / (fp + tp + np.spacing(1))
+                    nd = tp_sum.shape[1]
+                    rc = tp_sum / npig
+                    pr = tp_sum / (fp_sum + tp_sum + np.spacing(1))
+                    recall[:, k, a, m] = rc[:, -1]
+
+                    # make precision monotonically decreasing
+                    pr = np.maximum.accumulate(pr[:, ::-1], axis=1)[:, ::-1]
+
+                    for t in range(T):
+                        inds = np.searchsorted(rc[t], p.recThrs, side='left')
+                        inds = inds[inds < nd]
                         q = np.zeros((R, ))
                         ss = np.zeros((R, ))
-
-                        if nd:
-                            recall[t, k, a, m] = rc[-1]
-                        else:
-                            recall[t, k, a, m] = 0
-
-                        # numpy is slow without cython optimization for accessing elements
-                        # use python array gets significant speed improvement
-                        pr = pr.tolist()
-                        q = q.tolist()
-
-                        for i in range(nd - 1, 0, -1):
-                            if pr[i] > pr[i - 1]:
-                                pr[i - 1] = pr[i]
-
-                        inds = np.searchsorted(rc, p.recThrs, side='left')
-                        try:
-                            for ri, pi in enumerate(inds):
-                                q[ri] = pr[pi]
-                                ss[ri] = dtScoresSorted[pi]
-                        except Exception:
-                            pass
-                        precision[t, :, k, a, m] = np.array(q)
-                        scores[t, :, k, a, m] = np.array(ss)
+                        q[:len(inds)] = pr[t, inds]
+                        ss[:len(inds)] = dtScoresSorted[inds]
+                        precision[t, :, k, a, m] = q
+                        scores[t, :, k, a, m] = ss
 
         self.eval = {
             'params': p,
@@ -545,8 +609,15 @@ def evaluate(prediction: mirpb.SingleTaskAnnotations, ground_truth: mirpb.Single
     area_ranges_index = 0  # area range: 'all'
     max_dets_index = len(params.maxDets) - 1  # last max det number
 
-    mir_gt = MirCoco(task_annotations=ground_truth, mir_metadatas=assets_metadata, conf_thr=None)
-    mir_dt = MirCoco(task_annotations=prediction, mir_metadatas=assets_metadata, conf_thr=config.conf_thr)
+    need_segmentation = (params.iouType == 'segm')
+    mir_gt = MirCoco(task_annotations=ground_truth,
+                     mir_metadatas=assets_metadata,
+                     conf_thr=None,
+                     need_segmentation=need_segmentation)
+    mir_dt = MirCoco(task_annotations=prediction,
+                     mir_metadatas=assets_metadata,
+                     conf_thr=config.conf_thr,
+                     need_segmentation=need_segmentation)
 
     evaluator = CocoDetEval(coco_gt=mir_gt, coco_dt=mir_dt, params=params, assets_metadata=assets_metadata)
     evaluator.evaluate()
@@ -0,0 +1,206 @@
+"""
+deferred evaluation
+
+commits saved with `EvaluatePolicy.DEFERRED` have evaluation state `ES_PENDING` in tasks.mir,
+    and a pending record in `<mir_root>/.mir/evaluations`,
+    a background worker evaluates them later and saves results beside the pending records,
+    `MirStorageOps.load_single_storage` fills the results into loaded tasks.mir when ready
+
+at most one worker runs for a mir repo, it holds `worker.lock` in evaluations root while running,
+    so records still running when a worker gets that lock are left by a dead worker,
+    they, and records failed to evaluate, get results with state `ES_NOT_SET`, instead of staying pending
+
+note that annotations.mir of such commits have no confusion matrix results (cm and det_link_id),
+    they are only filled when evaluated before commit
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+import fasteners  # type: ignore
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import exodus, mir_storage
+from mir.tools.eval import eval_ops
+
+_PENDING_SUFFIX = '.pending'
+_RUNNING_SUFFIX = '.running'
+_RESULT_SUFFIX = '.mir'
+_WORKER_LOCK_FILE = 'worker.lock'
+
+
+def evaluations_root(mir_root: str) -> str:
+    return os.path.join(mir_root, '.mir', 'evaluations')
+
+
+def _evaluation_path(mir_root: str, rev_tid: str, suffix: str) -> str:
+    return os.path.join(evaluations_root(mir_root), f"{rev_tid}{suffix}")
+
+
+def _worker_lock(mir_root: str) -> fasteners.InterProcessLock:
+    return fasteners.InterProcessLock(os.path.join(evaluations_root(mir_root), _WORKER_LOCK_FILE))
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def enqueue(mir_root: str, rev_tid: str, evaluate_config: mirpb.EvaluateConfig) -> None:
+    """
+    records a pending evaluation for committed `rev_tid`
+    """
+    os.makedirs(evaluations_root(mir_root), exist_ok=True)
+    _write_atomic(_evaluation_path(mir_root, rev_tid, _PENDING_SUFFIX), evaluate_config.SerializeToString())
+
+
+def pending_rev_tids(mir_root: str) -> List[str]:
+    if not os.path.isdir(evaluations_root(mir_root)):
+        return []
+    return sorted(file_name[:-len(_PENDING_SUFFIX)] for file_name in os.listdir(evaluations_root(mir_root))
+                  if file_name.endswith(_PENDING_SUFFIX))
+
+
+def load_evaluation(mir_root: str, rev_tid: str) -> Optional[mirpb.Evaluation]:
+    """
+    returns deferred evaluation result of `rev_tid`, or None if not ready
+    """
+    result_path = _evaluation_path(mir_root, rev_tid, _RESULT_SUFFIX)
+    if not os.path.isfile(result_path):
+        return None
+    with open(result_path, 'rb') as f:
+        return mirpb.Evaluation.FromString(f.read())
+
+
+def evaluate_pending(mir_root: str, rev_tid: str) -> bool:
+    """
+    evaluates a pending `rev_tid` and saves result
+
+    Returns:
+        bool: False if this pending record is not found, or already taken by another worker
+    """
+    pending_path = _evaluation_path(mir_root, rev_tid, _PENDING_SUFFIX)
+    running_path = _evaluation_path(mir_root, rev_tid, _RUNNING_SUFFIX)
+    try:
+        # rename is atomic, only one worker can take it
+        os.rename(pending_path, running_path)
+    except FileNotFoundError:
+        return False
+
+    with open(running_path, 'rb') as f:
+        evaluate_config = mirpb.EvaluateConfig.FromString(f.read())
+
+    mir_metadatas = mirpb.MirMetadatas.FromString(
+        exodus.read_mir(mir_root=mir_root, rev=rev_tid, file_name=mir_storage.mir_path(mirpb.MirStorage.MIR_METADATAS)))
+    mir_annotations = mirpb.MirAnnotations.FromString(
+        exodus.read_mir(mir_root=mir_root,
+                        rev=rev_tid,
+                        file_name=mir_storage.mir_path(mirpb.MirStorage.MIR_ANNOTATIONS)))
+    evaluation = eval_ops.evaluate_with_pb(prediction=mir_annotations.prediction,
+                                           ground_truth=mir_annotations.ground_truth,
+                                           config=evaluate_config,
+                                           assets_metadata=mir_metadatas)
+
+    _write_atomic(_evaluation_path(mir_root, rev_tid, _RESULT_SUFFIX), evaluation.SerializeToString())
+    os.remove(running_path)
+    return True
+
+
+def _save_failed(mir_root: str, rev_tid: str, evaluate_config: mirpb.EvaluateConfig) -> None:
+    evaluation = mirpb.Evaluation()
+    evaluation.config.CopyFrom(evaluate_config)
+    evaluation.state = mirpb.EvaluationState.ES_NOT_SET
+    _write_atomic(_evaluation_path(mir_root, rev_tid, _RESULT_SUFFIX), evaluation.SerializeToString())
+
+
+def _fail_running(mir_root: str, rev_tid: str) -> None:
+    running_path = _evaluation_path(mir_root, rev_tid, _RUNNING_SUFFIX)
+    if not os.path.isfile(running_path):
+        return
+    with open(running_path, 'rb') as f:
+        evaluate_config = mirpb.EvaluateConfig.FromString(f.read())
+    _save_failed(mir_root=mir_root, rev_tid=rev_tid, evaluate_config=evaluate_config)
+    os.remove(running_path)
+
+
+def _fail_stale_running(mir_root: str) -> None:
+    # only called with worker lock held, so no other worker is running these records
+    for file_name in sorted(os.listdir(evaluations_root(mir_root))):
+        if not file_name.endswith(_RUNNING_SUFFIX):
+            continue
+        rev_tid = file_name[:-len(_RUNNING_SUFFIX)]
+        logging.error(f"deferred evaluation left running by a dead worker: {rev_tid}")
+        _fail_running(mir_root=mir_root, rev_tid=rev_tid)
+
+
+def run_pending(mir_root: str) -> int:
+    """
+    evaluates all pending records in `mir_root`, until there's none,
+        should be called with worker lock held
+
+    Returns:
+        int: count of evaluated records
+    """
+    evaluated_cnt = 0
+    while True:
+        rev_tids = pending_rev_tids(mir_root)
+        if not rev_tids:
+            return evaluated_cnt
+        for rev_tid in rev_tids:
+            try:
+                if evaluate_pending(mir_root=mir_root, rev_tid=rev_tid):
+                    evaluated_cnt += 1
+            except Exception as e:
+                logging.error(f"deferred evaluation failed: {rev_tid}, error: {e}")
+                _fail_running(mir_root=mir_root, rev_tid=rev_tid)
+
+
+def run_worker(mir_root: str) -> int:
+    """
+    evaluates all pending records in `mir_root` if no other worker is running for it
+
+    Returns:
+        int: count of evaluated records
+    """
+    evaluated_cnt = 0
+    lock = _worker_lock(mir_root)
+    # records enqueued while the lock is being released are not seen by anyone else, check again after release
+    while pending_rev_tids(mir_root):
+        if not lock.acquire(blocking=False):
+            break
+        try:
+            _fail_stale_running(mir_root)
+            evaluated_cnt += run_pending(mir_root)
+        finally:
+            lock.release()
+    return evaluated_cnt
+
+
+def start_worker(mir_root: str) -> None:
+    """
+    starts a detached worker process to evaluate all pending records in `mir_root`,
+        does nothing if a worker is already running for it
+    """
+    lock = _worker_lock(mir_root)
+    if not lock.acquire(blocking=False):
+        return
+    lock.release()
+
+    subprocess.Popen([sys.executable, '-m', 'mir.tools.eval.eval_deferred', '--root', os.path.abspath(mir_root)],
+                     stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='evaluate all pending records in a mir repo')
+    parser.add_argument('--root', dest='mir_root', type=str, required=True, help='path to mir repo')
+    args = parser.parse_args()
+    run_worker(mir_root=args.mir_root)
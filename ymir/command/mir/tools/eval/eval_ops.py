@@ -15,7 +15,14 @@ def evaluate_with_pb(
     ground_truth: mirpb.SingleTaskAnnotations,
     config: mirpb.EvaluateConfig,
     assets_metadata: Optional[mirpb.MirMetadatas] = None,
+    defer: bool = False,
 ) -> mirpb.Evaluation:
+    """
+    evaluates prediction against ground_truth
+
+    if `defer`, only checks whether they can be evaluated, and returns ES_PENDING if can,
+        see `eval_deferred` for details
+    """
     if not (0 <= config.conf_thr <= 1):
         # -1 means skip conf_thr check
         raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS, error_message="invalid conf_thr")
@@ -57,6 +64,10 @@ def evaluate_with_pb(
         evaluation.state = mirpb.EvaluationState.ES_NOT_SET
         return evaluation
 
+    if defer:
+        evaluation.state = mirpb.EvaluationState.ES_PENDING
+        return evaluation
+
     start_time = time.time()
     for image_annotations in prediction.image_annotations.values():
         for annotation in image_annotations.boxes:
@@ -27,6 +27,12 @@ class DetEvalMatchResult:
     def add_match(self, asset_id: str, iou_thr: float, gt_pb_idx: int, pred_pb_idx: int) -> None:
         self._iou_matches[iou_thr].add_match(asset_id=asset_id, gt_pb_idx=gt_pb_idx, pred_pb_idx=pred_pb_idx)
 
+    def add_matches(self, iou_thr: float, asset_ids: List[str], gt_pb_idxes: List[int],
+                    pred_pb_idxes: List[int]) -> None:
+        gt_pred_match = self._iou_matches[iou_thr].gt_pred_match
+        for asset_id, gt_pb_idx, pred_pb_idx in zip(asset_ids, gt_pb_idxes, pred_pb_idxes):
+            gt_pred_match[asset_id].add((gt_pb_idx, pred_pb_idx))
+
     def get_asset_ids(self, iou_thr: float) -> Collection[str]:
         return self._iou_matches[iou_thr].gt_pred_match.keys() if iou_thr in self._iou_matches else []
 
@@ -1,32 +1,63 @@
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import logging
-from typing import Any, Dict, List, Optional, OrderedDict, Tuple
+from typing import Any, Dict, Iterator, List, Optional, OrderedDict, Tuple
 
 import numpy as np
-import pycocotools.mask
 
 from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import masks, settings as mir_settings
 from mir.tools.eval.eval_utils import get_iou_thrs_array, write_semantic_confusion_matrix
 
 
-_SEMANTIC_SEGMENTATION_BACKGROUND = 255
-
-
 # protected: semantic segmentation evaluation
-def _mir_mean_iou(
-        prediction: mirpb.SingleTaskAnnotations, ground_truth: mirpb.SingleTaskAnnotations, class_ids: List[int],
-        asset_id_to_hws: OrderedDict[str, Tuple[int, int]]) -> Tuple[mirpb.SegmentationMetrics, np.ndarray]:
-
-    dts = _aggregate_imagewise_annotations(task_annotations=prediction,
-                                           asset_id_to_hws=asset_id_to_hws,
-                                           class_ids=class_ids)
-    gts = _aggregate_imagewise_annotations(task_annotations=ground_truth,
-                                           asset_id_to_hws=asset_id_to_hws,
-                                           class_ids=class_ids)
-    all_acc, acc, iou, macc, miou, image_class_iou = _mean_iou(dts=dts,
-                                                               gts=gts,
-                                                               num_classes=len(class_ids),
-                                                               ignore_index=_SEMANTIC_SEGMENTATION_BACKGROUND,
+def _mir_mean_iou(prediction: mirpb.SingleTaskAnnotations,
+                  ground_truth: mirpb.SingleTaskAnnotations,
+                  class_ids: List[int],
+                  asset_id_to_hws: OrderedDict[str, Tuple[int, int]],
+                  workers: int = mir_settings.SEM_SEG_EVAL_WORKERS) -> Tuple[mirpb.SegmentationMetrics, np.ndarray]:
+    """
+    streaming evaluation: areas of one asset are counted on rle masks and added up before the next one
+
+    Returns:
+        metrics, and iou matrix, [i, j]: iou of i-th asset in `asset_id_to_hws` and j-th class in `class_ids`
+    """
+    num_classes = len(class_ids)
+    total_area_intersect = np.zeros((num_classes, ), dtype=float)
+    total_area_union = np.zeros((num_classes, ), dtype=float)
+    total_area_gt = np.zeros((num_classes, ), dtype=float)
+    image_class_iou = np.zeros((len(asset_id_to_hws), num_classes), dtype=float)
+
+    executor: Optional[ProcessPoolExecutor] = None
+    if workers > 1 and len(asset_id_to_hws) >= mir_settings.SEM_SEG_EVAL_POOL_MIN_ASSETS:
+        # shards assets to worker processes, annotations of each asset are sent as serialized bytes
+        executor = ProcessPoolExecutor(max_workers=workers)
+        asset_areas = executor.map(partial(_serialized_asset_areas, class_ids=class_ids),
+                                   _serialized_assets(prediction=prediction,
+                                                      ground_truth=ground_truth,
+                                                      asset_id_to_hws=asset_id_to_hws),
+                                   chunksize=max(1, min(64, len(asset_id_to_hws) // (workers * 4))))
+    else:
+        asset_areas = (_asset_areas(dt_annotations=prediction.image_annotations.get(asset_id),
+                                    gt_annotations=ground_truth.image_annotations.get(asset_id),
+                                    hw=hw,
+                                    class_ids=class_ids) for asset_id, hw in asset_id_to_hws.items())
+
+    try:
+        for asset_idx, (area_intersect, area_union, area_gt) in enumerate(asset_areas):
+            total_area_intersect += area_intersect
+            total_area_union += area_union
+            total_area_gt += area_gt
+            image_class_iou[asset_idx, :] = area_intersect / area_union
+    finally:
+        if executor:
+            executor.shutdown()
+
+    all_acc, acc, iou, macc, miou, image_class_iou = _mean_iou(total_area_intersect=total_area_intersect,
+                                                               total_area_union=total_area_union,
+                                                               total_area_gt=total_area_gt,
+                                                               image_class_iou=image_class_iou,
                                                                nan_to_num=-1)
     order_to_class_id = dict(zip(range(len(class_ids)), class_ids))
 
@@ -40,49 +71,90 @@ def _mir_mean_iou(
     return metrics, image_class_iou
 
 
-def _aggregate_imagewise_annotations(task_annotations: mirpb.SingleTaskAnnotations,
-                                     asset_id_to_hws: OrderedDict[str, Tuple[int, int]],
-                                     class_ids: List[int]) -> List[np.ndarray]:
-    class_id_to_order = dict(zip(class_ids, range(len(class_ids))))
-
-    image_annotations: List[np.ndarray] = []
+def _serialized_assets(prediction: mirpb.SingleTaskAnnotations, ground_truth: mirpb.SingleTaskAnnotations,
+                       asset_id_to_hws: OrderedDict[str, Tuple[int, int]]) -> Iterator[tuple]:
     for asset_id, hw in asset_id_to_hws.items():
-        # use 255 as a special class, which will be ignored upon evaluation
-        img = np.ones(shape=hw, dtype=np.uint8) * _SEMANTIC_SEGMENTATION_BACKGROUND
-        if asset_id not in task_annotations.image_annotations:
-            image_annotations.append(img)
+        dt_annotations = prediction.image_annotations.get(asset_id)
+        gt_annotations = ground_truth.image_annotations.get(asset_id)
+        yield (dt_annotations.SerializeToString() if dt_annotations is not None else None,
+               gt_annotations.SerializeToString() if gt_annotations is not None else None, hw)
+
+
+def _serialized_asset_areas(serialized_asset: tuple, class_ids: List[int]) -> Tuple[np.ndarray, ...]:
+    dt_bytes, gt_bytes, hw = serialized_asset
+    return _asset_areas(dt_annotations=mirpb.SingleImageAnnotations.FromString(dt_bytes) if dt_bytes else None,
+                        gt_annotations=mirpb.SingleImageAnnotations.FromString(gt_bytes) if gt_bytes else None,
+                        hw=hw,
+                        class_ids=class_ids)
+
+
+def _asset_areas(dt_annotations: Optional[mirpb.SingleImageAnnotations],
+                 gt_annotations: Optional[mirpb.SingleImageAnnotations], hw: Tuple[int, int],
+                 class_ids: List[int]) -> Tuple[np.ndarray, ...]:
+    """
+    returns area_intersect, area_union and area_gt of a single asset, all counted on rle masks,
+        pixels not covered by any gt region are ignored
+    """
+    num_classes = len(class_ids)
+    area_intersect = np.zeros((num_classes, ), dtype=np.int64)
+    area_dt = np.zeros((num_classes, ), dtype=np.int64)
+    area_gt = np.zeros((num_classes, ), dtype=np.int64)
+
+    dt_regions, _ = _class_regions(image_annotations=dt_annotations, hw=hw, class_ids=class_ids)
+    gt_regions, gt_covered = _class_regions(image_annotations=gt_annotations, hw=hw, class_ids=class_ids)
+    for order, gt_region in gt_regions.items():
+        area_gt[order] = masks.area(gt_region)
+    if gt_covered is not None:
+        for order, dt_region in dt_regions.items():
+            area_dt[order] = masks.area(masks.intersect([dt_region, gt_covered]))
+            if order in gt_regions:
+                area_intersect[order] = masks.area(masks.intersect([dt_region, gt_regions[order]]))
+
+    area_union = area_dt + area_gt - area_intersect
+    return area_intersect, area_union, area_gt
+
+
+def _class_regions(image_annotations: Optional[mirpb.SingleImageAnnotations], hw: Tuple[int, int],
+                   class_ids: List[int]) -> Tuple[Dict[int, dict], Optional[dict]]:
+    """
+    returns rle region of each class order, and rle of all regions
+
+    same as a label image painted with annotations in order: where annotations overlap, the later one wins
+    """
+    if image_annotations is None:
+        return {}, None
+
+    class_id_to_order = dict(zip(class_ids, range(len(class_ids))))
+    regions: Dict[int, dict] = {}
+    covered: Optional[dict] = None
+    for annotation in reversed(image_annotations.boxes):
+        if annotation.class_id not in class_id_to_order:
             continue
+        rle = masks.annotation_rle(annotation=annotation, hw=hw)
+        region = rle if covered is None else masks.difference(rle, covered)
+        covered = rle if covered is None else masks.union([covered, rle])
 
-        for annotation in task_annotations.image_annotations[asset_id].boxes:
-            if annotation.class_id not in class_ids:
-                continue
-            img[_decode_mir_mask(annotation, hw) == 1] = class_id_to_order[annotation.class_id]
-        image_annotations.append(img)
-    return image_annotations
+        order = class_id_to_order[annotation.class_id]
+        regions[order] = masks.union([regions[order], region]) if order in regions else region
+    return regions, covered
 
 
 # protected: calc mean iou
 def _mean_iou(
-    dts: List[np.ndarray],
-    gts: List[np.ndarray],
-    num_classes: int,
-    ignore_index: int,
+    total_area_intersect: np.ndarray,
+    total_area_union: np.ndarray,
+    total_area_gt: np.ndarray,
+    image_class_iou: np.ndarray,
     nan_to_num: Optional[int] = None,
 ) -> List[Any]:
     """
     calc mean iou and associated metrics
     Returns:
-        list of 5 elements: aAcc (float), Acc (ndarray), IoU (ndarray), mAcc (float), mIoU (float)
+        list of 6 elements: aAcc (float), Acc (ndarray), IoU (ndarray), mAcc (float), mIoU (float),
+            image_class_iou (ndarray)
         Acc (ndarray): i-th element means Acc of i-th class
         IoU (ndarray): i-th element means IoU of i-th class
     """
-    (
-        total_area_intersect,
-        total_area_union,
-        _,
-        total_area_gt,
-        image_class_iou
-    ) = _total_intersect_and_union(dts, gts, num_classes, ignore_index)
     all_acc = np.nansum(total_area_intersect) / np.nansum(total_area_gt)
     acc = total_area_intersect / total_area_gt
     iou = total_area_intersect / total_area_union
@@ -94,62 +166,6 @@ def _mean_iou(
     return ret_metrics
 
 
-def _intersect_and_union(
-    dt: np.ndarray,
-    gt: np.ndarray,
-    num_classes: int,
-    ignore_index: Optional[int],
-) -> Tuple:
-    mask = gt != ignore_index
-    dt = dt[mask]
-    gt = gt[mask]
-    intersect = dt[dt == gt]
-    area_intersect, _ = np.histogram(intersect, bins=np.arange(num_classes + 1))
-    area_dt, _ = np.histogram(dt, bins=np.arange(num_classes + 1))
-    area_gt, _ = np.histogram(gt, bins=np.arange(num_classes + 1))
-    area_union = area_dt + area_gt - area_intersect
-    return area_intersect, area_union, area_dt, area_gt
-
-
-def _total_intersect_and_union(
-    dts: List[np.ndarray],
-    gts: List[np.ndarray],
-    num_classes: int,
-    ignore_index: int,
-) -> Tuple:
-    total_area_intersect = np.zeros((num_classes,), dtype=float)
-    total_area_union = np.zeros((num_classes,), dtype=float)
-    total_area_dt = np.zeros((num_classes,), dtype=float)
-    total_area_gt = np.zeros((num_classes,), dtype=float)
-    image_class_iou = np.zeros((len(dts), num_classes), dtype=float)  # [i, j]: iou of i-th image and j-th class
-    for asset_idx, (dt, gt) in enumerate(zip(dts, gts)):
-        area_intersect, area_union, area_dt, area_gt = _intersect_and_union(
-            dt,
-            gt,
-            num_classes,
-            ignore_index,
-        )
-        total_area_intersect += area_intersect
-        total_area_union += area_union
-        total_area_dt += area_dt
-        total_area_gt += area_gt
-        image_class_iou[asset_idx, :] = area_intersect / area_union
-    return total_area_intersect, total_area_union, total_area_dt, total_area_gt, image_class_iou
-
-
-def _decode_mir_mask(annotation: mirpb.ObjectAnnotation, hw: Tuple[int, int]) -> np.ndarray:
-    coco_segmentation: dict
-    if annotation.type == mirpb.ObjectSubType.OST_SEG_MASK:
-        coco_segmentation = {"counts": annotation.mask, "size": hw}
-    elif annotation.type == mirpb.ObjectSubType.OST_SEG_POLYGON:
-        coco_segmentation = pycocotools.mask.frPyObjects(
-            [[i for point in annotation.polygon for i in (point.x, point.y)]], hw[0], hw[1])[0]
-    else:
-        raise ValueError(f"Unsupported object annotation sub type: {annotation.type}")
-
-    return pycocotools.mask.decode(coco_segmentation)
-
-
 # public: general
 def evaluate(prediction: mirpb.SingleTaskAnnotations, ground_truth: mirpb.SingleTaskAnnotations,
              config: mirpb.EvaluateConfig, assets_metadata: mirpb.MirMetadatas) -> mirpb.Evaluation:
@@ -179,10 +195,11 @@ def evaluate(prediction: mirpb.SingleTaskAnnotations, ground_truth: mirpb.Single
     if config.iou_thrs_interval:
         iou_thr = get_iou_thrs_array(config.iou_thrs_interval)[0]
         match_result: Dict[str, List[int]] = defaultdict(list)
-        for i in range(len(asset_ids)):
+        # rows of image_class_iou are in the same order as asset_id_to_hws
+        for i, asset_id in enumerate(asset_id_to_hws.keys()):
             for j in range(len(config.class_ids)):
                 if image_class_iou[i, j] >= iou_thr:
-                    match_result[asset_ids[i]].append(config.class_ids[j])
+                    match_result[asset_id].append(config.class_ids[j])
 
         write_semantic_confusion_matrix(gt_annotations=ground_truth,
                                         pred_annotations=prediction,
@@ -48,10 +48,10 @@ def _get_shm_size(executor_config: Dict, shm_size_count: int) -> str:
         return f'{shm_size}G'
 
 
-def _append_binds(cmd: List, bind_path: str) -> None:
+def _append_binds(cmd: List, bind_path: str, read_only: bool = False) -> None:
     if os.path.exists(bind_path) and os.path.islink(bind_path):
         actual_bind_path = os.readlink(bind_path)
-        cmd.append(f"-v{actual_bind_path}:{actual_bind_path}")
+        cmd.append(f"-v{actual_bind_path}:{actual_bind_path}{':ro' if read_only else ''}")
 
 
 def _get_docker_executable(runtime: str) -> str:
@@ -75,7 +75,8 @@ def _execute_locally(
     cmd.append(f"-v{work_dir_in}:/in:ro")
     cmd.append(f"-v{work_dir_out}:/out")
     # assets and tensorboard dir may be sym-links, check and mount on demands.
-    _append_binds(cmd, os.path.join(work_dir_in, 'assets'))
+    # assets may be hardlinked from asset storage, see `EXECUTANT_EXPORT_LINK_MODE`
+    _append_binds(cmd, os.path.join(work_dir_in, 'assets'), read_only=True)
     _append_binds(cmd, os.path.join(work_dir_in, 'models'))
     _append_binds(cmd, os.path.join(work_dir_out, 'tensorboard'))
 
@@ -1,24 +1,199 @@
 """
 use this module to read contents in other branch head ref or from other tags \n
 some mir commands, such as `mir search`, `mir merge` will use this module
+
+contents are cached by git blob hash, git blobs are immutable, so cached contents never go stale:
+    1. rev to blob hash: resolved by reading loose refs or packed-refs in `.git` to get commit id,
+        and (commit id, file name) -> blob hash is cached in a bounded LRU, only unknown revs go to git
+    2. blob hash to contents: bounded LRU in memory, only missed blobs go to git
+
+git reads go through the long-lived `git cat-file --batch-check` / `--batch` co-processes of `CmdScm`
 """
 
-import io
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
 
 from mir import scm
+from mir.tools import settings as mir_settings
 from mir.tools.code import MirCode
 from mir.tools.errors import MirRuntimeError
 
+_SHA1_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+_REF_NAME_PATTERN = re.compile(r'^[\w\-.@/]+$')
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    misses: int = 0
+    rev_hits: int = 0
+    rev_misses: int = 0
+
+
+class _BlobCache:
+    """
+    LRU cache for blob contents, bounded by total bytes, and for (commit id, file name) -> blob hash,
+        bounded by entries, thread safe, lookups are counted in `stats`
+    """
+    def __init__(self, max_bytes: int, max_rev_blobs: int) -> None:
+        self._max_bytes = max_bytes
+        self._max_rev_blobs = max_rev_blobs
+        self._total_bytes = 0
+        self._blobs: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._rev_blobs: 'OrderedDict[Tuple[str, str], str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, blob_hash: str) -> Optional[bytes]:
+        with self._lock:
+            contents = self._blobs.get(blob_hash)
+            if contents is not None:
+                self._blobs.move_to_end(blob_hash)
+                self.stats.memory_hits += 1
+            else:
+                self.stats.misses += 1
+            return contents
+
+    def put(self, blob_hash: str, contents: bytes) -> None:
+        if len(contents) > self._max_bytes:
+            return
+        with self._lock:
+            if blob_hash in self._blobs:
+                self._blobs.move_to_end(blob_hash)
+                return
+            self._blobs[blob_hash] = contents
+            self._total_bytes += len(contents)
+            while self._total_bytes > self._max_bytes:
+                _, evicted = self._blobs.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self._lock:
+            self._max_bytes = max_bytes
+            while self._total_bytes > self._max_bytes:
+                _, evicted = self._blobs.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def get_rev_blob(self, commit_id: Optional[str], file_name: str) -> Optional[str]:
+        # revs not resolved to commit ids are counted as misses
+        with self._lock:
+            blob_hash = self._rev_blobs.get((commit_id, file_name)) if commit_id else None
+            if commit_id and blob_hash:
+                self._rev_blobs.move_to_end((commit_id, file_name))
+                self.stats.rev_hits += 1
+            else:
+                self.stats.rev_misses += 1
+            return blob_hash
+
+    def put_rev_blob(self, commit_id: str, file_name: str, blob_hash: str) -> None:
+        with self._lock:
+            self._rev_blobs[(commit_id, file_name)] = blob_hash
+            self._rev_blobs.move_to_end((commit_id, file_name))
+            while len(self._rev_blobs) > self._max_rev_blobs:
+                self._rev_blobs.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blobs.clear()
+            self._rev_blobs.clear()
+            self._total_bytes = 0
+            self.stats = CacheStats()
+
+    def snapshot_stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self.stats)
+
+
+_blob_cache = _BlobCache(max_bytes=mir_settings.EXODUS_CACHE_MEMORY_BYTES,
+                         max_rev_blobs=mir_settings.EXODUS_CACHE_REV_BLOBS)
+
 
+def cache_stats() -> CacheStats:
+    return _blob_cache.snapshot_stats()
+
+
+def clear_memory_cache() -> None:
+    _blob_cache.clear()
+
+
+def set_memory_cache_limit(max_bytes: int) -> None:
+    """
+    sets bytes limit of blob contents cache in this process, default: `EXODUS_CACHE_MEMORY_BYTES`
+    """
+    _blob_cache.set_max_bytes(max_bytes)
+
+
+# private: rev resolving
+def _read_ref_commit_id(mir_root: str, rev: str) -> Optional[str]:
+    """
+    reads commit id of tag or branch `rev` from `.git` without running git, returns None if not a plain ref
+    """
+    if not _REF_NAME_PATTERN.match(rev) or '..' in rev:
+        return None
+
+    git_dir = os.path.join(mir_root, '.git')
+    # same precedence as git rev-parse: tags before branches
+    ref_names = [f"refs/tags/{rev}", f"refs/heads/{rev}"]
+    for ref_name in ref_names:
+        try:
+            with open(os.path.join(git_dir, ref_name), 'r') as f:
+                commit_id = f.read().strip()
+        except OSError:
+            continue
+        return commit_id if _SHA1_PATTERN.match(commit_id) else None
+
+    try:
+        with open(os.path.join(git_dir, 'packed-refs'), 'r') as f:
+            packed_refs: Dict[str, str] = {}
+            for line in f:
+                components = line.split()
+                if len(components) == 2 and _SHA1_PATTERN.match(components[0]):
+                    packed_refs[components[1]] = components[0]
+    except OSError:
+        return None
+    for ref_name in ref_names:
+        if ref_name in packed_refs:
+            return packed_refs[ref_name]
+    return None
+
+
+def _resolve_blob_hash(mir_root: str, rev: str, file_name: str, scm_git: 'scm.CmdScm') -> str:
+    commit_id = _read_ref_commit_id(mir_root=mir_root, rev=rev)
+    blob_hash = _blob_cache.get_rev_blob(commit_id=commit_id, file_name=file_name)
+    if blob_hash:
+        return blob_hash
+
+    # resolves by commit id if we have it, so the cached mapping never points to another commit
+    object_info = scm_git.cat_file_batch_check(f"{commit_id or rev}:{file_name}")
+    if not object_info:
+        # same as a failed `git rev-parse`
+        raise ValueError(f"found no file: {rev}:{file_name}")
+    blob_hash = object_info[0]
+
+    if commit_id:
+        _blob_cache.put_rev_blob(commit_id=commit_id, file_name=file_name, blob_hash=blob_hash)
+    return blob_hash
+
+
+# public: read
 def read_mir(mir_root: str, rev: str, file_name: str) -> bytes:
     if not mir_root or not file_name or not rev:
         raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS, error_message='invalid args')
 
     scm_git = scm.Scm(mir_root if mir_root else ".", scm_executable="git")
-    blob_hash = scm_git.rev_parse(f"{rev}:{file_name}")
-    if not blob_hash:
-        raise MirRuntimeError(MirCode.RC_CMD_INVALID_MIR_REPO, f"found no file: {rev}:{file_name}")
+    blob_hash = _resolve_blob_hash(mir_root=mir_root, rev=rev, file_name=file_name, scm_git=scm_git)
+
+    contents = _blob_cache.get(blob_hash)
+    if contents is not None:
+        return contents
+
+    contents = scm_git.cat_file_batch(blob_hash)
+    if contents is None:
+        raise MirRuntimeError(MirCode.RC_CMD_INVALID_MIR_REPO, f"found no blob: {blob_hash} for {rev}:{file_name}")
 
-    bio = io.BytesIO()
-    scm_git.cat_file(['-p', blob_hash], output_stream=bio)
-    return bio.getvalue()
+    _blob_cache.put(blob_hash, contents)
+    return contents
@@ -1,20 +1,60 @@
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from functools import partial
+import enum
+import fcntl
+import io
 import json
+import logging
 import os
 import shutil
-from typing import Dict, List, Optional, Protocol, TextIO, Tuple, Union
-import xml.etree.ElementTree as ElementTree
+import tarfile
+import time
+from typing import Deque, Dict, List, Optional, Protocol, Set, TextIO, Tuple, Union
+from xml.sax.saxutils import escape as xml_escape
+import zipfile
+
+import lmdb
 
 from mir.protos import mir_command_pb2 as mirpb
 from mir.tools import annotations, mir_storage
+from mir.tools import settings as mir_settings
 from mir.tools.class_ids import UserLabels
 from mir.tools.code import MirCode, time_it
 from mir.tools.errors import MirRuntimeError
+from mir.tools.phase_logger import PhaseLoggerCenter
 from mir.tools.settings import COCO_JSON_NAME
 
 
+class ExportLinkMode(str, enum.Enum):
+    """
+    how assets are placed into export dir, link modes fall back to copy if not supported by file system
+    """
+    COPY = 'copy'
+    HARDLINK = 'hardlink'
+    REFLINK = 'reflink'  # copy on write clone, btrfs, xfs
+    SYMLINK = 'symlink'  # only if readers can see asset storage at the same path, not inside executor containers
+
+
+class AnnoArchiveFormat(str, enum.Enum):
+    """
+    how per image annotations (ark, voc) are written into gt and pred dirs: one file for each asset, or one archive
+        with a member for each asset, member named by its path relative to gt or pred dir, index files unchanged
+    """
+    NONE = 'none'
+    TAR = 'tar'
+    ZIP = 'zip'
+
+
+# `FICLONE` ioctl in linux/fs.h
+_FICLONE = 0x40049409
+# index files are written line by line, large buffers keep them off per line syscalls
+_INDEX_FILE_BUFFER_SIZE = 1024 * 1024
+# annotations of one asset sent to worker processes: rel file, asset index file, serialized attributes,
+#   serialized image annotations and serialized image cks
+_SerializedImageAnnotations = Tuple[str, str, bytes, bytes, bytes]
+
+
 def _asset_file_ext(asset_format: "mirpb.AssetType.V") -> str:
     _asset_ext_map = {
         mirpb.AssetType.AssetTypeImageJpeg: 'jpg',
@@ -33,31 +73,20 @@ def _anno_file_ext(anno_format: "mirpb.AnnoFormat.V") -> str:
     return _anno_ext_map.get(anno_format, "unknown")
 
 
-class _SingleTaskAnnotationCallable(Protocol):
-    def __call__(self, mir_metadatas: mirpb.MirMetadatas, task_annotations: mirpb.SingleTaskAnnotations,
-                 ec: mirpb.ExportConfig, class_ids_mapping: Optional[Dict[int, int]], cls_id_mgr: Optional[UserLabels],
-                 dst_dir: str, image_cks: Dict[str, mirpb.SingleImageCks]) -> None:
-        ...
-
-
 class _SingleImageAnnotationCallable(Protocol):
     def __call__(self, attributes: mirpb.MetadataAttributes, image_annotations: mirpb.SingleImageAnnotations,
                  image_cks: Optional[mirpb.SingleImageCks], class_ids_mapping: Optional[Dict[int, int]],
-                 cls_id_mgr: Optional[UserLabels], asset_filename: str, anno_dst_file: str) -> None:
+                 cls_id_mgr: Optional[UserLabels], asset_filename: str) -> str:
         ...
 
 
-def _task_annotations_output_func(
-    anno_format: "mirpb.AnnoFormat.V"
-) -> _SingleTaskAnnotationCallable:
-    _format_func_map: Dict["mirpb.AnnoFormat.V", _SingleTaskAnnotationCallable] = {
-        mirpb.AnnoFormat.AF_ARK_TXT: _single_task_annotations_to_ark,
-        mirpb.AnnoFormat.AF_VOC_XML: _single_task_annotations_to_voc,
-        mirpb.AnnoFormat.AF_COCO_JSON: _single_task_annotations_to_coco,
+def _image_annotations_output_func(anno_format: "mirpb.AnnoFormat.V") -> Optional[_SingleImageAnnotationCallable]:
+    # formats with one annotation file for each asset, None for others
+    _format_func_map: Dict["mirpb.AnnoFormat.V", _SingleImageAnnotationCallable] = {
+        mirpb.AnnoFormat.AF_ARK_TXT: _single_image_annotations_to_det_ark,
+        mirpb.AnnoFormat.AF_VOC_XML: _single_image_annotations_to_voc,
     }
-    if anno_format not in _format_func_map:
-        raise NotImplementedError(f"unknown anno_format: {anno_format}")
-    return _format_func_map[anno_format]
+    return _format_func_map.get(anno_format)
 
 
 def parse_asset_format(asset_format_str: str) -> "mirpb.AssetFormat.V":
@@ -101,11 +130,22 @@ def _gen_abs_idx_file_path(abs_dir: str,
                            idx_prefix: str,
                            file_name: str,
                            file_ext: str,
-                           need_sub_folder: bool,) -> Tuple[str, str]:
+                           need_sub_folder: bool,
+                           made_dirs: Optional[Set[str]] = None) -> Tuple[str, str]:
+    """
+    returns abs path and index path of file, sub dir of abs path is made if needed,
+        sub dirs in `made_dirs` are skipped, and newly made ones are added into it
+    """
     abs_path: str = mir_storage.get_asset_storage_path(location=abs_dir,
                                                        hash=file_name,
-                                                       make_dirs=True,
+                                                       make_dirs=False,
                                                        need_sub_folder=need_sub_folder)
+    if need_sub_folder:
+        sub_dir = os.path.dirname(abs_path)
+        if made_dirs is None or sub_dir not in made_dirs:
+            os.makedirs(sub_dir, exist_ok=True)
+            if made_dirs is not None:
+                made_dirs.add(sub_dir)
     abs_file = f"{abs_path}.{file_ext}"
     index_path: str = mir_storage.get_asset_storage_path(location=idx_prefix,
                                                          hash=file_name,
@@ -122,7 +162,23 @@ def export_mirdatas_to_dir(
     mir_annotations: Optional[mirpb.MirAnnotations] = None,
     class_ids_mapping: Optional[Dict[int, int]] = None,
     cls_id_mgr: Optional[UserLabels] = None,
+    link_mode: ExportLinkMode = ExportLinkMode.COPY,
+    workers: int = mir_settings.ASSET_IO_WORKERS,
+    phase: str = '',
+    anno_archive: AnnoArchiveFormat = AnnoArchiveFormat.NONE,
+    anno_workers: int = mir_settings.EXPORT_ANNO_WORKERS,
 ) -> int:
+    """
+    exports assets and annotations to `ec.asset_dir`, `ec.gt_dir` and `ec.pred_dir`
+
+    Args:
+        link_mode (ExportLinkMode): how raw assets are placed into `ec.asset_dir`, raw format only
+        workers (int): workers to copy, link or read assets
+        phase (str): phase logger to report export progress and throughput, empty for none
+        anno_archive (AnnoArchiveFormat): per image annotations as files, or as one archive in gt and pred dirs,
+            raw format with ark or voc annotations only
+        anno_workers (int): worker processes to write per image annotations, 0 or 1 to write in current process
+    """
     if not (ec.asset_dir and ec.media_location and os.path.isdir(ec.media_location)):
         raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS,
                               error_message=f"invalid export config {ec}")
@@ -135,6 +191,8 @@ def export_mirdatas_to_dir(
             mir_annotations=mir_annotations,
             class_ids_mapping=class_ids_mapping,
             cls_id_mgr=cls_id_mgr,
+            workers=workers,
+            phase=phase,
         )
     elif ec.asset_format == mirpb.AssetFormat.AF_RAW:
         return _export_mirdatas_to_raw(
@@ -143,6 +201,11 @@ def export_mirdatas_to_dir(
             mir_annotations=mir_annotations,
             class_ids_mapping=class_ids_mapping,
             cls_id_mgr=cls_id_mgr,
+            link_mode=link_mode,
+            workers=workers,
+            phase=phase,
+            anno_archive=anno_archive,
+            anno_workers=anno_workers,
         )
 
     raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS,
@@ -155,18 +218,206 @@ def _export_mirdatas_to_raw(
     mir_annotations: Optional[mirpb.MirAnnotations] = None,
     class_ids_mapping: Optional[Dict[int, int]] = None,
     cls_id_mgr: Optional[UserLabels] = None,
+    link_mode: ExportLinkMode = ExportLinkMode.COPY,
+    workers: int = mir_settings.ASSET_IO_WORKERS,
+    phase: str = '',
+    anno_archive: AnnoArchiveFormat = AnnoArchiveFormat.NONE,
+    anno_workers: int = mir_settings.EXPORT_ANNO_WORKERS,
 ) -> int:
+    """
+    exports assets, annotations and index files in one pass over assets:
+        assets are copied or linked by a bounded pool of workers, index lines are written by current thread in
+        metadatas order, paths of each asset are computed once, and sub dirs made once,
+        per image annotations are written by current thread, or if there are many assets, sent to worker processes
+        in chunks during the pass, with a bounded count of chunks in flight
+    """
+    anno_tasks = _annotation_tasks(ec=ec, mir_annotations=mir_annotations)
+    image_output_func = _image_annotations_output_func(ec.anno_format)
+    index_asset_f, index_gt_f, index_pred_f, index_tvt_f = _open_index_files(ec)
+
+    # coco: one json file for all assets, written after all assets
+    coco_idx_files: Dict[bool, str] = {
+        is_pred: os.path.join(ec.pred_index_prefix if is_pred else ec.gt_index_prefix, COCO_JSON_NAME)
+        for is_pred, _, _ in anno_tasks
+    }
+    anno_file_ext = _anno_file_ext(anno_format=ec.anno_format)
+    anno_writers: Dict[bool, _AnnoWriter] = {}
+    if image_output_func:
+        anno_writers = {
+            is_pred: _open_anno_writer(anno_dir=ec.pred_dir if is_pred else ec.gt_dir, anno_archive=anno_archive)
+            for is_pred, _, _ in anno_tasks
+        }
+
+    total_count = len(mir_metadatas.attributes)
+    results: Counter = Counter()
+    idx = 0
+    exported_bytes = 0
+    start = time.time()
+    made_dirs: Set[str] = set()
+
+    # is_pred -> serialized annotations not yet sent to worker processes
+    anno_chunks: Dict[bool, List[_SerializedImageAnnotations]] = defaultdict(list)
+    anno_pending: Deque[Tuple[bool, 'Future[List[Tuple[str, str]]]']] = deque()
+    use_anno_pool = (image_output_func is not None and anno_workers > 1
+                     and total_count >= mir_settings.EXPORT_ANNO_POOL_MIN_ASSETS)
+    anno_executor = ProcessPoolExecutor(max_workers=anno_workers) if use_anno_pool else None
+
+    def _consume(future: 'Future[Tuple[str, int]]') -> None:
+        nonlocal idx, exported_bytes
+        result, size = future.result()
+        results[result] += 1
+        exported_bytes += size
+
+        idx += 1
+        if idx % 5000 == 0:
+            throughput = _throughput_message(count=idx,
+                                             total_count=total_count,
+                                             exported_bytes=exported_bytes,
+                                             start=start)
+            PhaseLoggerCenter.update_phase(phase=phase, local_percent=(idx / total_count), message=throughput)
+            logging.info(throughput)
+
+    def _consume_anno() -> None:
+        # annotations go into archive here, if written by workers, contents are empty
+        is_pred, anno_future = anno_pending.popleft()
+        for rel_file, content in anno_future.result():
+            anno_writers[is_pred].write(rel_file, content)
+
+    def _submit_anno_chunk(is_pred: bool) -> None:
+        if not anno_executor or not anno_chunks[is_pred]:
+            return
+        anno_pending.append((is_pred,
+                             anno_executor.submit(_write_serialized_image_annotations,
+                                                  anno_dir=ec.pred_dir if is_pred else ec.gt_dir,
+                                                  items=anno_chunks.pop(is_pred),
+                                                  anno_format=ec.anno_format,
+                                                  class_ids_mapping=class_ids_mapping,
+                                                  cls_id_mgr=cls_id_mgr,
+                                                  archived=(anno_archive != AnnoArchiveFormat.NONE))))
+        if len(anno_pending) > anno_workers * 2:
+            _consume_anno()
+
+    try:
+        # at most `max_pending` assets in flight
+        max_pending = max(1, workers) * 4
+        pending: Deque['Future[Tuple[str, int]]'] = deque()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for asset_id, attributes in mir_metadatas.attributes.items():
+                asset_abs_file, asset_idx_file = _gen_abs_idx_file_path(abs_dir=ec.asset_dir,
+                                                                        idx_prefix=ec.asset_index_prefix,
+                                                                        file_name=asset_id,
+                                                                        file_ext=_asset_file_ext(attributes.asset_type),
+                                                                        need_sub_folder=ec.need_sub_folder,
+                                                                        made_dirs=made_dirs)
+                pending.append(executor.submit(_export_asset, ec.media_location, asset_id, asset_abs_file, link_mode))
+                index_asset_f.write(f"{asset_idx_file}\n")
+
+                for is_pred, task_annotations, image_cks in anno_tasks:
+                    if image_output_func:
+                        anno_rel_file = _anno_rel_file(asset_id=asset_id,
+                                                       file_ext=anno_file_ext,
+                                                       need_sub_folder=ec.need_sub_folder)
+                        anno_idx_file = os.path.join(ec.pred_index_prefix if is_pred else ec.gt_index_prefix,
+                                                     anno_rel_file)
+                        image_annotations = task_annotations.image_annotations.get(asset_id,
+                                                                                   mirpb.SingleImageAnnotations())
+                        single_image_cks = image_cks.get(asset_id, mirpb.SingleImageCks())
+                        if use_anno_pool:
+                            anno_chunks[is_pred].append(
+                                (anno_rel_file, asset_idx_file, attributes.SerializeToString(),
+                                 image_annotations.SerializeToString(), single_image_cks.SerializeToString()))
+                            if len(anno_chunks[is_pred]) >= mir_settings.EXPORT_ANNO_POOL_CHUNK_ASSETS:
+                                _submit_anno_chunk(is_pred)
+                        else:
+                            anno_writers[is_pred].write(
+                                anno_rel_file,
+                                image_output_func(
+                                    attributes=attributes,
+                                    image_annotations=image_annotations,
+                                    image_cks=single_image_cks,
+                                    class_ids_mapping=class_ids_mapping,
+                                    cls_id_mgr=cls_id_mgr,
+                                    asset_filename=asset_idx_file,
+                                ))
+                    else:
+                        anno_idx_file = coco_idx_files[is_pred]
+                    _write_index_lines(is_pred=is_pred,
+                                       tvt_type=attributes.tvt_type,
+                                       asset_anno_pair_line=f"{asset_idx_file}\t{anno_idx_file}\n",
+                                       index_gt_f=index_gt_f,
+                                       index_pred_f=index_pred_f,
+                                       index_tvt_f=index_tvt_f)
+
+                if len(pending) >= max_pending:
+                    _consume(pending.popleft())
+
+            for is_pred in list(anno_chunks.keys()):
+                _submit_anno_chunk(is_pred)
+            while anno_pending:
+                _consume_anno()
+            while pending:
+                _consume(pending.popleft())
+
+        if not image_output_func:
+            for is_pred, task_annotations, _ in anno_tasks:
+                coco_dict = _single_task_annotations_to_coco_dict(mir_metadatas=mir_metadatas,
+                                                                  task_annotations=task_annotations,
+                                                                  class_ids_mapping=class_ids_mapping,
+                                                                  cls_id_mgr=cls_id_mgr)
+                with open(os.path.join(ec.pred_dir if is_pred else ec.gt_dir, COCO_JSON_NAME), 'w') as f:
+                    f.write(json.dumps(coco_dict))
+    finally:
+        if anno_executor:
+            anno_executor.shutdown()
+        _close_index_files(index_asset_f, index_gt_f, index_pred_f, index_tvt_f)
+        for anno_writer in anno_writers.values():
+            anno_writer.close()
+
+    throughput = _throughput_message(count=idx, total_count=total_count, exported_bytes=exported_bytes, start=start)
+    logging.info(f"{throughput}, link mode: {link_mode.value}, {dict(results)}")
+    return MirCode.RC_OK
+
+
+def _annotation_tasks(
+    ec: mirpb.ExportConfig, mir_annotations: Optional[mirpb.MirAnnotations]
+) -> List[Tuple[bool, mirpb.SingleTaskAnnotations, Dict[str, mirpb.SingleImageCks]]]:
+    # (is_pred, task annotations, image cks) of annotations to export: pred first, then gt
+    anno_tasks: List[Tuple[bool, mirpb.SingleTaskAnnotations, Dict[str, mirpb.SingleImageCks]]] = []
+    if ec.anno_format != mirpb.AnnoFormat.AF_NO_ANNOS and mir_annotations:
+        if ec.pred_dir:
+            anno_tasks.append((True, mir_annotations.prediction, {}))
+        if ec.gt_dir:
+            anno_tasks.append((False, mir_annotations.ground_truth, dict(mir_annotations.image_cks)))
+    if (anno_tasks and not _image_annotations_output_func(ec.anno_format)
+            and ec.anno_format != mirpb.AnnoFormat.AF_COCO_JSON):
+        raise NotImplementedError(f"unknown anno_format: {ec.anno_format}")
+    return anno_tasks
+
+
+def _write_index_lines(is_pred: bool, tvt_type: "mirpb.TvtType.V", asset_anno_pair_line: str,
+                       index_gt_f: Optional[TextIO], index_pred_f: Optional[TextIO],
+                       index_tvt_f: Dict[Tuple[bool, "mirpb.TvtType.V"], TextIO]) -> None:
+    index_anno_f = index_pred_f if is_pred else index_gt_f
+    if index_anno_f:
+        index_anno_f.write(asset_anno_pair_line)
+    if index_tvt_f:
+        index_tvt_f[(is_pred, tvt_type)].write(asset_anno_pair_line)
+
+
+def _open_index_files(
+    ec: mirpb.ExportConfig
+) -> Tuple[TextIO, Optional[TextIO], Optional[TextIO], Dict[Tuple[bool, "mirpb.TvtType.V"], TextIO]]:
     # Setup path and file handler.
     ec.asset_index_file = ec.asset_index_file or os.path.join(ec.asset_dir, get_index_filename())
     ec.asset_index_prefix = ec.asset_index_prefix or ec.asset_dir
-    index_asset_f = open(ec.asset_index_file, 'w')
+    index_asset_f = open(ec.asset_index_file, 'w', buffering=_INDEX_FILE_BUFFER_SIZE)
 
     index_gt_f = None
     if ec.gt_dir:
         if not ec.gt_index_file:
             ec.gt_index_file = os.path.join(ec.gt_dir, get_index_filename())
         os.makedirs(ec.gt_dir, exist_ok=True)
-        index_gt_f = open(ec.gt_index_file, 'w')
+        index_gt_f = open(ec.gt_index_file, 'w', buffering=_INDEX_FILE_BUFFER_SIZE)
         ec.gt_index_prefix = ec.gt_index_prefix or ec.gt_dir
 
     index_pred_f = None
@@ -174,7 +425,7 @@ def _export_mirdatas_to_raw(
         if not ec.pred_index_file:
             ec.pred_index_file = os.path.join(ec.pred_dir, get_index_filename())
         os.makedirs(ec.pred_dir, exist_ok=True)
-        index_pred_f = open(ec.pred_index_file, 'w')
+        index_pred_f = open(ec.pred_index_file, 'w', buffering=_INDEX_FILE_BUFFER_SIZE)
         ec.pred_index_prefix = ec.pred_index_prefix or ec.pred_dir
 
     index_tvt_f: Dict[Tuple[bool, "mirpb.TvtType.V"], TextIO] = {}
@@ -183,90 +434,15 @@ def _export_mirdatas_to_raw(
         for is_pred in [True, False]:
             for tvt_type in [mirpb.TvtType.TvtTypeTraining, mirpb.TvtType.TvtTypeValidation, mirpb.TvtType.TvtTypeTest]:
                 file_name = get_index_filename(is_asset=False, is_pred=is_pred, tvt_type=tvt_type)
-                index_tvt_f[(is_pred, tvt_type)] = open(os.path.join(ec.tvt_index_dir, file_name), 'w')
-
-    for asset_id, attributes in mir_metadatas.attributes.items():
-        # export asset.
-        asset_src_file: str = mir_storage.locate_asset_path(location=ec.media_location, hash=asset_id)
-        asset_abs_file, asset_idx_file = _gen_abs_idx_file_path(abs_dir=ec.asset_dir,
-                                                                idx_prefix=ec.asset_index_prefix,
-                                                                file_name=asset_id,
-                                                                file_ext=_asset_file_ext(attributes.asset_type),
-                                                                need_sub_folder=ec.need_sub_folder)
-        if not os.path.isfile(asset_abs_file) or os.stat(asset_src_file).st_size != os.stat(asset_abs_file).st_size:
-            shutil.copyfile(asset_src_file, asset_abs_file)
-        index_asset_f.write(f"{asset_idx_file}\n")
+                index_tvt_f[(is_pred, tvt_type)] = open(os.path.join(ec.tvt_index_dir, file_name),
+                                                        'w',
+                                                        buffering=_INDEX_FILE_BUFFER_SIZE)
+    return index_asset_f, index_gt_f, index_pred_f, index_tvt_f
 
-    if ec.anno_format != mirpb.AnnoFormat.AF_NO_ANNOS and mir_annotations:
-        # export annotations
-        _output_func = _task_annotations_output_func(ec.anno_format)
-        if ec.pred_dir:
-            _output_func(
-                mir_metadatas=mir_metadatas,
-                task_annotations=mir_annotations.prediction,
-                ec=ec,
-                class_ids_mapping=class_ids_mapping,
-                cls_id_mgr=cls_id_mgr,
-                dst_dir=ec.pred_dir,
-                image_cks={},
-            )
-        if ec.gt_dir:
-            _output_func(
-                mir_metadatas=mir_metadatas,
-                task_annotations=mir_annotations.ground_truth,
-                ec=ec,
-                class_ids_mapping=class_ids_mapping,
-                cls_id_mgr=cls_id_mgr,
-                dst_dir=ec.gt_dir,
-                image_cks=dict(mir_annotations.image_cks),
-            )
-
-        # write index tsv files
-        for asset_id, attributes in mir_metadatas.attributes.items():
-            _, asset_idx_file = _gen_abs_idx_file_path(abs_dir=ec.asset_dir,
-                                                       idx_prefix=ec.asset_index_prefix,
-                                                       file_name=asset_id,
-                                                       file_ext=_asset_file_ext(attributes.asset_type),
-                                                       need_sub_folder=ec.need_sub_folder)
-            if index_gt_f:
-                if ec.anno_format == mirpb.AnnoFormat.AF_COCO_JSON:
-                    _, gt_idx_file = _gen_abs_idx_file_path(abs_dir=ec.gt_dir,
-                                                            idx_prefix=ec.gt_index_prefix,
-                                                            file_name='coco-annotations',
-                                                            file_ext='json',
-                                                            need_sub_folder=False)
-                else:
-                    _, gt_idx_file = _gen_abs_idx_file_path(abs_dir=ec.gt_dir,
-                                                            idx_prefix=ec.gt_index_prefix,
-                                                            file_name=asset_id,
-                                                            file_ext=_anno_file_ext(anno_format=ec.anno_format),
-                                                            need_sub_folder=ec.need_sub_folder)
-                asset_anno_pair_line = f"{asset_idx_file}\t{gt_idx_file}\n"
-
-                index_gt_f.write(asset_anno_pair_line)
-                if ec.tvt_index_dir:
-                    index_tvt_f[(False, attributes.tvt_type)].write(asset_anno_pair_line)
-            if index_pred_f:
-                if ec.anno_format == mirpb.AnnoFormat.AF_COCO_JSON:
-                    _, pred_idx_file = _gen_abs_idx_file_path(abs_dir=ec.pred_dir,
-                                                              idx_prefix=ec.pred_index_prefix,
-                                                              file_name='coco-annotations',
-                                                              file_ext='json',
-                                                              need_sub_folder=False)
-                else:
-                    _, pred_idx_file = _gen_abs_idx_file_path(abs_dir=ec.pred_dir,
-                                                              idx_prefix=ec.pred_index_prefix,
-                                                              file_name=asset_id,
-                                                              file_ext=_anno_file_ext(anno_format=ec.anno_format),
-                                                              need_sub_folder=ec.need_sub_folder)
-                asset_anno_pair_line = f"{asset_idx_file}\t{pred_idx_file}\n"
-
-                index_pred_f.write(asset_anno_pair_line)
-                if index_tvt_f:
-                    index_tvt_f[(True, attributes.tvt_type)].write(asset_anno_pair_line)
 
+def _close_index_files(index_asset_f: TextIO, index_gt_f: Optional[TextIO], index_pred_f: Optional[TextIO],
+                       index_tvt_f: Dict[Tuple[bool, "mirpb.TvtType.V"], TextIO]) -> None:
     index_asset_f.close()
-    # Clean up.
     if index_gt_f:
         index_gt_f.close()
     if index_pred_f:
@@ -274,7 +450,182 @@ def _export_mirdatas_to_raw(
     for single_idx_f in index_tvt_f.values():
         single_idx_f.close()
 
-    return MirCode.RC_OK
+
+def _anno_rel_file(asset_id: str, file_ext: str, need_sub_folder: bool) -> str:
+    # path of annotation file relative to gt or pred dir
+    rel_path = mir_storage.get_asset_storage_path(location='',
+                                                  hash=asset_id,
+                                                  make_dirs=False,
+                                                  need_sub_folder=need_sub_folder)
+    return f"{rel_path}.{file_ext}"
+
+
+class _AnnoWriter(Protocol):
+    def write(self, rel_file: str, content: str) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class _AnnoFilesWriter:
+    """
+    writes annotations of each asset into its own file, sub dirs made once
+    """
+    def __init__(self, anno_dir: str) -> None:
+        self._anno_dir = anno_dir
+        self._made_dirs: Set[str] = set()
+
+    def write(self, rel_file: str, content: str) -> None:
+        abs_file = os.path.join(self._anno_dir, rel_file)
+        sub_dir = os.path.dirname(abs_file)
+        if sub_dir not in self._made_dirs:
+            os.makedirs(sub_dir, exist_ok=True)
+            self._made_dirs.add(sub_dir)
+        with open(abs_file, 'w') as f:
+            f.write(content)
+
+    def close(self) -> None:
+        pass
+
+
+class _AnnoArchiveWriter:
+    """
+    streams annotations of all assets into one uncompressed tar or zip archive
+    """
+    def __init__(self, archive_file: str, anno_archive: AnnoArchiveFormat) -> None:
+        self._mtime = int(time.time())
+        self._tar: Optional[tarfile.TarFile] = None
+        self._zip: Optional[zipfile.ZipFile] = None
+        if anno_archive == AnnoArchiveFormat.TAR:
+            self._tar = tarfile.open(archive_file, 'w|')
+        else:
+            self._zip = zipfile.ZipFile(archive_file, 'w', compression=zipfile.ZIP_STORED)
+
+    def write(self, rel_file: str, content: str) -> None:
+        data = content.encode()
+        if self._tar:
+            tar_info = tarfile.TarInfo(name=rel_file)
+            tar_info.size = len(data)
+            tar_info.mtime = self._mtime
+            self._tar.addfile(tar_info, io.BytesIO(data))
+        elif self._zip:
+            zip_info = zipfile.ZipInfo(filename=rel_file, date_time=time.localtime(self._mtime)[:6])
+            zip_info.external_attr = 0o644 << 16
+            self._zip.writestr(zip_info, data)
+
+    def close(self) -> None:
+        if self._tar:
+            self._tar.close()
+        if self._zip:
+            self._zip.close()
+
+
+def _open_anno_writer(anno_dir: str, anno_archive: AnnoArchiveFormat) -> _AnnoWriter:
+    if anno_archive == AnnoArchiveFormat.NONE:
+        return _AnnoFilesWriter(anno_dir=anno_dir)
+    return _AnnoArchiveWriter(archive_file=os.path.join(anno_dir,
+                                                        f"{mir_settings.ANNO_ARCHIVE_NAME}.{anno_archive.value}"),
+                              anno_archive=anno_archive)
+
+
+def _write_serialized_image_annotations(anno_dir: str, items: List[_SerializedImageAnnotations],
+                                        anno_format: "mirpb.AnnoFormat.V", class_ids_mapping: Optional[Dict[int, int]],
+                                        cls_id_mgr: Optional[UserLabels], archived: bool) -> List[Tuple[str, str]]:
+    # runs in worker process, returns (rel file, content) of each asset if archived, or writes them into `anno_dir`
+    image_output_func = _image_annotations_output_func(anno_format)
+    if not image_output_func:
+        raise NotImplementedError(f"unknown anno_format: {anno_format}")
+
+    contents: List[Tuple[str, str]] = []
+    anno_writer = _AnnoFilesWriter(anno_dir=anno_dir)
+    for rel_file, asset_idx_file, attributes_bytes, image_annotations_bytes, image_cks_bytes in items:
+        content = image_output_func(attributes=mirpb.MetadataAttributes.FromString(attributes_bytes),
+                                    image_annotations=mirpb.SingleImageAnnotations.FromString(image_annotations_bytes),
+                                    image_cks=mirpb.SingleImageCks.FromString(image_cks_bytes),
+                                    class_ids_mapping=class_ids_mapping,
+                                    cls_id_mgr=cls_id_mgr,
+                                    asset_filename=asset_idx_file)
+        if archived:
+            contents.append((rel_file, content))
+        else:
+            anno_writer.write(rel_file, content)
+    return contents
+
+
+def _throughput_message(count: int, total_count: int, exported_bytes: int, start: float) -> str:
+    seconds = max(time.time() - start, 1e-6)
+    return (f"exported {count} / {total_count} assets, {count / seconds:.1f} assets/s, "
+            f"{exported_bytes / mir_settings.BYTES_PER_MB / seconds:.1f}MB/s")
+
+
+def _export_asset(media_location: str, asset_id: str, dst_file: str, link_mode: ExportLinkMode) -> Tuple[str, int]:
+    """
+    places one asset at `dst_file`, src is stated once, dst is only checked if it already exists
+
+    Returns:
+        Tuple[str, int]: one of copied, linked and skipped, and asset size
+    """
+    src_file, src_stat = _locate_asset(media_location=media_location, asset_id=asset_id)
+    try:
+        return _place_file(src_file=src_file, dst_file=dst_file, link_mode=link_mode), src_stat.st_size
+    except FileExistsError:
+        pass
+
+    # exported before: kept if unchanged, otherwise replaced
+    if link_mode == ExportLinkMode.SYMLINK:
+        if os.path.islink(dst_file) and os.readlink(dst_file) == src_file:
+            return 'skipped', src_stat.st_size
+    elif not os.path.islink(dst_file) and os.stat(dst_file).st_size == src_stat.st_size:
+        return 'skipped', src_stat.st_size
+    os.remove(dst_file)
+    return _place_file(src_file=src_file, dst_file=dst_file, link_mode=link_mode), src_stat.st_size
+
+
+def _locate_asset(media_location: str, asset_id: str) -> Tuple[str, os.stat_result]:
+    # same as `mir_storage.locate_asset_path`, but with one stat for most assets, and stat result returned
+    src_file = mir_storage.get_asset_storage_path(location=media_location, hash=asset_id, make_dirs=False)
+    try:
+        return src_file, os.stat(src_file)
+    except FileNotFoundError:
+        pass
+    src_file = mir_storage.get_asset_storage_path(location=media_location,
+                                                  hash=asset_id,
+                                                  make_dirs=False,
+                                                  need_sub_folder=False)
+    try:
+        return src_file, os.stat(src_file)
+    except FileNotFoundError:
+        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS, error_message=f"cannot locate asset: {asset_id}")
+
+
+def _place_file(src_file: str, dst_file: str, link_mode: ExportLinkMode) -> str:
+    # raises FileExistsError if `dst_file` already exists
+    if link_mode == ExportLinkMode.SYMLINK:
+        os.symlink(src_file, dst_file)
+        return 'linked'
+    if link_mode == ExportLinkMode.HARDLINK:
+        try:
+            os.link(src_file, dst_file)
+            return 'linked'
+        except FileExistsError:
+            raise
+        except OSError:
+            pass  # different devices, or file system without hardlinks: copy instead
+
+    with open(dst_file, 'xb') as dst_f, open(src_file, 'rb') as src_f:
+        if link_mode == ExportLinkMode.REFLINK:
+            try:
+                fcntl.ioctl(dst_f.fileno(), _FICLONE, src_f.fileno())
+                return 'linked'
+            except OSError:
+                pass  # no copy on write support: copy instead
+        shutil.copyfileobj(src_f, dst_f, mir_storage.HASH_BUFFER_SIZE)
+    return 'copied'
+
+
+def lmdb_annotation_key(is_pred: bool, asset_id: str) -> str:
+    return f"{'pred' if is_pred else 'gt'}/{asset_id}"
 
 
 def _export_mirdatas_to_lmdb(
@@ -283,8 +634,124 @@ def _export_mirdatas_to_lmdb(
     mir_annotations: Optional[mirpb.MirAnnotations] = None,
     class_ids_mapping: Optional[Dict[int, int]] = None,
     cls_id_mgr: Optional[UserLabels] = None,
+    workers: int = mir_settings.ASSET_IO_WORKERS,
+    phase: str = '',
 ) -> int:
-    raise NotImplementedError("LMDB format is not supported yet.")
+    """
+    exports assets and their annotations into one lmdb: `ec.asset_dir`/`LMDB_EXPORT_DIR_NAME`,
+        asset bytes keyed by asset id, annotations keyed by `lmdb_annotation_key`,
+        coco json is not separated by assets, so it is keyed by `lmdb_annotation_key(is_pred, COCO_JSON_NAME)`
+
+    index files are written as raw format does, but list lmdb keys instead of file paths
+    """
+    lmdb_dir = os.path.join(ec.asset_dir, mir_settings.LMDB_EXPORT_DIR_NAME)
+    if os.path.isdir(lmdb_dir):
+        shutil.rmtree(lmdb_dir)
+    map_size = sum(attributes.byte_size for attributes in mir_metadatas.attributes.values()) * 2
+    env = lmdb.open(lmdb_dir, map_size=max(map_size, mir_settings.LMDB_EXPORT_COMMIT_BYTES * 2), meminit=False)
+
+    anno_tasks = _annotation_tasks(ec=ec, mir_annotations=mir_annotations)
+    image_output_func = _image_annotations_output_func(ec.anno_format)
+
+    index_asset_f, index_gt_f, index_pred_f, index_tvt_f = _open_index_files(ec)
+    batch: List[Tuple[bytes, bytes]] = []
+    batch_bytes = 0
+    total_count = len(mir_metadatas.attributes)
+    idx = 0
+    exported_bytes = 0
+    start = time.time()
+
+    def _consume(asset_id: str, future: 'Future[bytes]') -> None:
+        nonlocal idx, exported_bytes, batch_bytes
+        asset_bytes = future.result()
+        batch.append((asset_id.encode(), asset_bytes))
+        batch_bytes += len(asset_bytes)
+        exported_bytes += len(asset_bytes)
+
+        attributes = mir_metadatas.attributes[asset_id]
+        index_asset_f.write(f"{asset_id}\n")
+        for is_pred, task_annotations, image_cks in anno_tasks:
+            if image_output_func:
+                anno_key = lmdb_annotation_key(is_pred=is_pred, asset_id=asset_id)
+                anno_str = image_output_func(
+                    attributes=attributes,
+                    image_annotations=task_annotations.image_annotations.get(asset_id,
+                                                                             mirpb.SingleImageAnnotations()),
+                    image_cks=image_cks.get(asset_id, mirpb.SingleImageCks()),
+                    class_ids_mapping=class_ids_mapping,
+                    cls_id_mgr=cls_id_mgr,
+                    asset_filename=asset_id)
+                batch.append((anno_key.encode(), anno_str.encode()))
+                batch_bytes += len(batch[-1][1])
+            else:
+                anno_key = lmdb_annotation_key(is_pred=is_pred, asset_id=COCO_JSON_NAME)
+            _write_index_lines(is_pred=is_pred,
+                               tvt_type=attributes.tvt_type,
+                               asset_anno_pair_line=f"{asset_id}\t{anno_key}\n",
+                               index_gt_f=index_gt_f,
+                               index_pred_f=index_pred_f,
+                               index_tvt_f=index_tvt_f)
+
+        if batch_bytes >= mir_settings.LMDB_EXPORT_COMMIT_BYTES:
+            _lmdb_put_batch(env=env, batch=batch)
+            batch.clear()
+            batch_bytes = 0
+
+        idx += 1
+        if idx % 5000 == 0:
+            throughput = _throughput_message(count=idx,
+                                             total_count=total_count,
+                                             exported_bytes=exported_bytes,
+                                             start=start)
+            PhaseLoggerCenter.update_phase(phase=phase, local_percent=(idx / total_count), message=throughput)
+            logging.info(throughput)
+
+    try:
+        # assets are read by workers, and written by current thread: lmdb has only one writer
+        max_pending = max(1, workers) * 4
+        pending: Deque[Tuple[str, 'Future[bytes]']] = deque()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for asset_id in mir_metadatas.attributes:
+                pending.append((asset_id, executor.submit(_read_asset, ec.media_location, asset_id)))
+                if len(pending) >= max_pending:
+                    _consume(*pending.popleft())
+            while pending:
+                _consume(*pending.popleft())
+
+        if image_output_func is None:
+            for is_pred, task_annotations, _ in anno_tasks:
+                coco_dict = _single_task_annotations_to_coco_dict(mir_metadatas=mir_metadatas,
+                                                                  task_annotations=task_annotations,
+                                                                  class_ids_mapping=class_ids_mapping,
+                                                                  cls_id_mgr=cls_id_mgr)
+                batch.append((lmdb_annotation_key(is_pred=is_pred, asset_id=COCO_JSON_NAME).encode(),
+                              json.dumps(coco_dict).encode()))
+        _lmdb_put_batch(env=env, batch=batch)
+    finally:
+        env.close()
+        _close_index_files(index_asset_f, index_gt_f, index_pred_f, index_tvt_f)
+
+    throughput = _throughput_message(count=idx, total_count=total_count, exported_bytes=exported_bytes, start=start)
+    logging.info(f"{throughput}, lmdb: {lmdb_dir}")
+    return MirCode.RC_OK
+
+
+def _read_asset(media_location: str, asset_id: str) -> bytes:
+    src_file, _ = _locate_asset(media_location=media_location, asset_id=asset_id)
+    with open(src_file, 'rb') as f:
+        return f.read()
+
+
+def _lmdb_put_batch(env: lmdb.Environment, batch: List[Tuple[bytes, bytes]]) -> None:
+    # map size is only an estimation from asset byte sizes, doubled and retried if full
+    while True:
+        try:
+            with env.begin(write=True) as txn:
+                for key, value in batch:
+                    txn.put(key, value)
+            return
+        except lmdb.MapFullError:
+            env.set_mapsize(env.info()['map_size'] * 2)
 
 
 # single image annotations export functions
@@ -292,195 +759,94 @@ def _single_image_annotations_to_det_ark(attributes: mirpb.MetadataAttributes,
                                          image_annotations: mirpb.SingleImageAnnotations,
                                          image_cks: Optional[mirpb.SingleImageCks],
                                          class_ids_mapping: Optional[Dict[int, int]],
-                                         cls_id_mgr: Optional[UserLabels], asset_filename: str,
-                                         anno_dst_file: str) -> None:
-    output_str = ""
+                                         cls_id_mgr: Optional[UserLabels], asset_filename: str) -> str:
+    lines: List[str] = []
     for annotation in image_annotations.boxes:
         if class_ids_mapping and annotation.class_id not in class_ids_mapping:
             continue
 
         mapped_id = class_ids_mapping[annotation.class_id] if class_ids_mapping else annotation.class_id
-        output_str += f"{mapped_id}, {annotation.box.x}, {annotation.box.y}, "
-        output_str += f"{annotation.box.x + annotation.box.w - 1}, {annotation.box.y + annotation.box.h - 1}, "
-        output_str += f"{annotation.anno_quality}, {annotation.box.rotate_angle}\n"
+        box = annotation.box
+        lines.append(f"{mapped_id}, {box.x}, {box.y}, {box.x + box.w - 1}, {box.y + box.h - 1}, "
+                     f"{annotation.anno_quality}, {box.rotate_angle}\n")
+    return ''.join(lines)
+
 
-    with open(anno_dst_file, 'w') as af:
-        af.write(output_str)
+def _xml_node(tag: str, text: Optional[str]) -> str:
+    # same as `ElementTree.tostring`: text escaped, element without text as short empty element
+    return f"<{tag}>{xml_escape(text)}</{tag}>" if text else f"<{tag} />"
 
 
 def _single_image_annotations_to_voc(attributes: mirpb.MetadataAttributes,
                                      image_annotations: mirpb.SingleImageAnnotations,
                                      image_cks: Optional[mirpb.SingleImageCks],
                                      class_ids_mapping: Optional[Dict[int, int]], cls_id_mgr: Optional[UserLabels],
-                                     asset_filename: str, anno_dst_file: str) -> None:
+                                     asset_filename: str) -> str:
+    """
+    serializes voc xml from templates, output is the same as xml built by `ElementTree` and `tostring`,
+        without an element tree for each image
+    """
     if not cls_id_mgr:
         raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS, error_message="invalid cls_id_mgr.")
 
-    annotations = image_annotations.boxes
-
-    # annotation
-    annotation_node = ElementTree.Element('annotation')
-
-    # annotation: folder
-    folder_node = ElementTree.SubElement(annotation_node, 'folder')
-    folder_node.text = 'folder'
-
-    # annotation: filename
-    filename_node = ElementTree.SubElement(annotation_node, 'filename')
-    filename_node.text = asset_filename
-
-    # annotation: source
-    source_node = ElementTree.SubElement(annotation_node, 'source')
-
-    # annotation: source: annotation
-    annotation2_node = ElementTree.SubElement(source_node, 'annotation')
-    annotation2_node.text = 'unknown'
-
-    # annotation: source: image
-    image_node = ElementTree.SubElement(source_node, 'image')
-    image_node.text = 'unknown'
-
-    # annotation: size
-    size_node = ElementTree.SubElement(annotation_node, 'size')
-
-    # annotation: size: width
-    width_node = ElementTree.SubElement(size_node, 'width')
-    width_node.text = str(attributes.width)
-
-    # annotation: size: height
-    height_node = ElementTree.SubElement(size_node, 'height')
-    height_node.text = str(attributes.height)
-
-    # annotation: size: depth
-    depth_node = ElementTree.SubElement(size_node, 'depth')
-    depth_node.text = str(attributes.image_channels)
-
-    # annotation: segmented
-    segmented_node = ElementTree.SubElement(annotation_node, 'segmented')
-    segmented_node.text = '0'
+    parts = [
+        '<annotation><folder>folder</folder>',
+        _xml_node('filename', asset_filename),
+        '<source><annotation>unknown</annotation><image>unknown</image></source>',
+        f"<size><width>{attributes.width}</width><height>{attributes.height}</height>"
+        f"<depth>{attributes.image_channels}</depth></size>",
+        '<segmented>0</segmented>',
+    ]
 
     # annotation: cks and sub nodes
     if image_cks:
         if image_cks.cks:
-            cks_node = ElementTree.SubElement(annotation_node, 'cks')
-            for k, v in image_cks.cks.items():
-                ElementTree.SubElement(cks_node, k).text = v
-
-        # annotation: image_quality
-        image_quality_node = ElementTree.SubElement(annotation_node, 'image_quality')
-        image_quality_node.text = f"{image_cks.image_quality:.4f}"
+            parts.append('<cks>')
+            parts.extend(_xml_node(k, v) for k, v in image_cks.cks.items())
+            parts.append('</cks>')
+        parts.append(f"<image_quality>{image_cks.image_quality:.4f}</image_quality>")
 
     # annotation: object(s)
-    for annotation in annotations:
+    for annotation in image_annotations.boxes:
         if class_ids_mapping and annotation.class_id not in class_ids_mapping:
             continue
 
-        object_node = ElementTree.SubElement(annotation_node, 'object')
-
-        name_node = ElementTree.SubElement(object_node, 'name')
-        name_node.text = cls_id_mgr.main_name_for_id(annotation.class_id)
-
-        pose_node = ElementTree.SubElement(object_node, 'pose')
-        pose_node.text = 'unknown'
-
-        truncated_node = ElementTree.SubElement(object_node, 'truncated')
-        truncated_node.text = 'unknown'
-
-        occluded_node = ElementTree.SubElement(object_node, 'occluded')
-        occluded_node.text = '0'
-
-        w, h = annotation.box.w, annotation.box.h
-        if w and h:  # det box
-            bndbox_node = ElementTree.SubElement(object_node, 'bndbox')
+        parts.append('<object>')
+        parts.append(_xml_node('name', cls_id_mgr.main_name_for_id(annotation.class_id)))
+        parts.append('<pose>unknown</pose><truncated>unknown</truncated><occluded>0</occluded>')
 
-            xmin_node = ElementTree.SubElement(bndbox_node, 'xmin')
-            xmin_node.text = str(annotation.box.x)
-
-            ymin_node = ElementTree.SubElement(bndbox_node, 'ymin')
-            ymin_node.text = str(annotation.box.y)
-
-            xmax_node = ElementTree.SubElement(bndbox_node, 'xmax')
-            xmax_node.text = str(annotation.box.x + w - 1)
-
-            ymax_node = ElementTree.SubElement(bndbox_node, 'ymax')
-            ymax_node.text = str(annotation.box.y + h - 1)
-
-            rotate_angle_node = ElementTree.SubElement(bndbox_node, 'rotate_angle')
-            rotate_angle_node.text = f"{annotation.box.rotate_angle:.4f}"
+        box = annotation.box
+        if box.w and box.h:  # det box
+            parts.append(f"<bndbox><xmin>{box.x}</xmin><ymin>{box.y}</ymin>"
+                         f"<xmax>{box.x + box.w - 1}</xmax><ymax>{box.y + box.h - 1}</ymax>"
+                         f"<rotate_angle>{box.rotate_angle:.4f}</rotate_angle></bndbox>")
         elif len(annotation.polygon) > 0:  # seg polygon
             raise NotImplementedError
 
-        difficult_node = ElementTree.SubElement(object_node, 'difficult')
-        difficult_node.text = '0'
+        parts.append('<difficult>0</difficult>')
 
         if annotation.tags:  # Not add tags node if empty, otherwise xmlparse lib will get tags: None.
-            tags_node = ElementTree.SubElement(object_node, 'tags')
-            for k, v in annotation.tags.items():
-                ElementTree.SubElement(tags_node, k).text = v
+            parts.append('<tags>')
+            parts.extend(_xml_node(k, v) for k, v in annotation.tags.items())
+            parts.append('</tags>')
 
-        box_quality_node = ElementTree.SubElement(object_node, 'box_quality')
-        box_quality_node.text = f"{annotation.anno_quality:.4f}"
+        parts.append(f"<box_quality>{annotation.anno_quality:.4f}</box_quality>")
 
         if annotation.cm != mirpb.ConfusionMatrixType.NotSet:
-            cm_node = ElementTree.SubElement(object_node, 'cm')
-            cm_node.text = f"{mirpb.ConfusionMatrixType.Name(annotation.cm)}"
-
-        confidence_node = ElementTree.SubElement(object_node, 'confidence')
-        confidence_node.text = f"{annotation.score:.4f}"
+            parts.append(f"<cm>{mirpb.ConfusionMatrixType.Name(annotation.cm)}</cm>")
 
-    with open(anno_dst_file, 'w') as af:
-        af.write(ElementTree.tostring(element=annotation_node, encoding='unicode'))
+        parts.append(f"<confidence>{annotation.score:.4f}</confidence></object>")
+    parts.append('</annotation>')
+    return ''.join(parts)
 
 
 # single task annotations export functions
-def _single_task_annotations_to_separated_any(
+def _single_task_annotations_to_coco_dict(
     mir_metadatas: mirpb.MirMetadatas,
     task_annotations: mirpb.SingleTaskAnnotations,
-    ec: mirpb.ExportConfig,
     class_ids_mapping: Optional[Dict[int, int]],
     cls_id_mgr: Optional[UserLabels],
-    dst_dir: str,
-    image_cks: Dict[str, mirpb.SingleImageCks],
-    single_image_func: _SingleImageAnnotationCallable,
-) -> None:
-    for asset_id, attributes in mir_metadatas.attributes.items():
-        _, asset_idx_file = _gen_abs_idx_file_path(abs_dir=ec.asset_dir,
-                                                   idx_prefix=ec.asset_index_prefix,
-                                                   file_name=asset_id,
-                                                   file_ext=_asset_file_ext(attributes.asset_type),
-                                                   need_sub_folder=ec.need_sub_folder)
-
-        anno_abs_file, _ = _gen_abs_idx_file_path(abs_dir=dst_dir,
-                                                  idx_prefix='',
-                                                  file_name=asset_id,
-                                                  file_ext=_anno_file_ext(anno_format=ec.anno_format),
-                                                  need_sub_folder=ec.need_sub_folder)
-        single_image_func(
-            attributes=attributes,
-            image_annotations=task_annotations.image_annotations.get(asset_id, mirpb.SingleImageAnnotations()),
-            image_cks=image_cks.get(asset_id, mirpb.SingleImageCks()),
-            class_ids_mapping=class_ids_mapping,
-            cls_id_mgr=cls_id_mgr,
-            asset_filename=asset_idx_file,
-            anno_dst_file=anno_abs_file,
-        )
-
-
-_single_task_annotations_to_voc: _SingleTaskAnnotationCallable = partial(
-    _single_task_annotations_to_separated_any, single_image_func=_single_image_annotations_to_voc)
-_single_task_annotations_to_ark: _SingleTaskAnnotationCallable = partial(
-    _single_task_annotations_to_separated_any, single_image_func=_single_image_annotations_to_det_ark)
-
-
-def _single_task_annotations_to_coco(
-    mir_metadatas: mirpb.MirMetadatas,
-    task_annotations: mirpb.SingleTaskAnnotations,
-    ec: mirpb.ExportConfig,  # noqa
-    class_ids_mapping: Optional[Dict[int, int]],
-    cls_id_mgr: Optional[UserLabels],
-    dst_dir: str,
-    image_cks: Dict[str, mirpb.SingleImageCks],  # noqa
-) -> None:
+) -> dict:
     if not cls_id_mgr:
         raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS, error_message='invalid cls_id_mgr')
 
@@ -553,11 +919,9 @@ def _single_task_annotations_to_coco(
             })
             coco_anno_id += 1
 
-    with open(os.path.join(dst_dir, COCO_JSON_NAME), 'w') as f:
-        coco_dict = {
-            'images': images_list,
-            'licenses': licenses_list,
-            'categories': categories_list,
-            'annotations': annotations_list,
-        }
-        f.write(json.dumps(coco_dict))
+    return {
+        'images': images_list,
+        'licenses': licenses_list,
+        'categories': categories_list,
+        'annotations': annotations_list,
+    }
@@ -0,0 +1,150 @@
+"""
+incremental reader for large json files, such as infer results and coco annotations
+
+the file is read in chunks, containers are walked item by item, and each item is decoded by
+    `json.JSONDecoder.raw_decode`, so memory is bounded by the largest single item instead of the whole file
+
+usage:
+    with open(file_path, 'r') as f:
+        reader = JsonStreamReader(f)
+        for key in reader.iter_keys():
+            if key == 'annotations':
+                for item in reader.iter_array_items():
+                    ...
+"""
+
+import json
+import re
+from typing import Any, Iterator, TextIO, Tuple
+
+_WHITESPACES = re.compile(r'[ \t\n\r]*')
+# chars which can continue a number, or a literal such as `true`
+_CONTINUATION_CHARS = frozenset('0123456789.eE+-abcdefghijklmnopqrstuvwxyz')
+
+
+class JsonStreamReader:
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 20) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._base = 0  # count of chars dropped from buf
+        self._eof = False
+
+    # public: read
+    def peek(self) -> str:
+        """
+        returns first char of next value without consuming it, empty str on eof
+        """
+        while True:
+            self._pos = _WHITESPACES.match(self._buf, self._pos).end()  # type: ignore
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._read_more(self._chunk_size):
+                return ''
+
+    def read_value(self) -> Any:
+        """
+        reads and returns next value as a whole
+        """
+        self.peek()
+        read_size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # a number or literal followed by nothing, or by a partial number, may be truncated
+                if self._eof or (end < len(self._buf) and self._buf[end] not in _CONTINUATION_CHARS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # larger reads each time, so a large value is not decoded again and again
+            self._read_more(read_size)
+            read_size *= 2
+
+    def skip_value(self) -> None:
+        c = self.peek()
+        if c == '[':
+            for _ in self.iter_array_items():
+                pass
+        elif c == '{':
+            for _ in self.iter_object_items():
+                pass
+        else:
+            self.read_value()
+
+    def iter_array_items(self) -> Iterator[Any]:
+        """
+        yields items of next value, which should be an array
+        """
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self._expect(',]') == ']':
+                return
+
+    def iter_object_items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        yields (key, value) pairs of next value, which should be an object
+        """
+        for key in self._iter_object_keys():
+            yield key, self.read_value()
+
+    def iter_keys(self) -> Iterator[str]:
+        """
+        walks next value, which should be an object, and yields its keys,
+            after a key is yielded, caller can consume its value entirely by `read_value`, `skip_value`,
+            `iter_array_items` or `iter_object_items`, value not consumed by caller is skipped
+        """
+        for key in self._iter_object_keys():
+            self.peek()  # so whitespaces skipped by caller's peek are not taken as consumed
+            offset = self._tell()
+            yield key
+            if self._tell() == offset:
+                self.skip_value()
+
+    # protected: read
+    def _iter_object_keys(self) -> Iterator[str]:
+        # value of each yielded key must be consumed before next iteration
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                self._raise('expecting property name enclosed in double quotes')
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def _expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            self._raise(f"expecting one of {chars!r}")
+        self._pos += 1
+        return c
+
+    def _raise(self, msg: str) -> None:
+        raise json.JSONDecodeError(msg, self._buf, self._pos)
+
+    def _read_more(self, size: int) -> bool:
+        if self._eof:
+            return False
+        data = self._f.read(size)
+        if not data:
+            self._eof = True
+            return False
+        self._base += self._pos
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _tell(self) -> int:
+        return self._base + self._pos
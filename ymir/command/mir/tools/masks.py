@@ -0,0 +1,107 @@
+"""
+run-length encoded masks of segmentation annotations
+
+masks are coco compressed rle dicts: `{'counts': str or bytes, 'size': [h, w]}`,
+    all operations here work on run lengths, dense bitmaps are never decoded
+"""
+
+from typing import Iterable, List, Tuple
+
+import pycocotools.mask
+
+from mir.protos import mir_command_pb2 as mirpb
+
+
+def polygon_rle(polygon: Iterable[mirpb.IntPoint], hw: Tuple[int, int]) -> dict:
+    points = [[i for point in polygon for i in (point.x, point.y)]]
+    return pycocotools.mask.merge(pycocotools.mask.frPyObjects(points, hw[0], hw[1]))
+
+
+def annotation_rle(annotation: mirpb.ObjectAnnotation, hw: Tuple[int, int]) -> dict:
+    """
+    returns rle of a segmentation annotation, `hw` is the image size in asset metadata
+    """
+    if annotation.type == mirpb.ObjectSubType.OST_SEG_MASK:
+        return {'counts': annotation.mask, 'size': [hw[0], hw[1]]}
+    if annotation.type == mirpb.ObjectSubType.OST_SEG_POLYGON:
+        return polygon_rle(polygon=annotation.polygon, hw=hw)
+    raise ValueError(f"Unsupported object annotation sub type: {annotation.type}")
+
+
+def fill_box_and_area(annotation: mirpb.ObjectAnnotation, mask_hw: Tuple[int, int]) -> None:
+    """
+    fills box and mask area of a polygon or mask annotation if they are not set, `annotation.mask` is never changed
+
+    a polygon is rasterized within its own extent, so it needs no image size,
+        a mask needs `mask_hw`, the size its rle is encoded with
+    """
+    if annotation.type == mirpb.ObjectSubType.OST_SEG_POLYGON and annotation.polygon:
+        extent_hw = (max(point.y for point in annotation.polygon) + 1, max(point.x for point in annotation.polygon) + 1)
+        if extent_hw[0] <= 0 or extent_hw[1] <= 0:
+            return
+        rle = polygon_rle(polygon=annotation.polygon, hw=extent_hw)
+    elif annotation.type == mirpb.ObjectSubType.OST_SEG_MASK and annotation.mask:
+        if mask_hw[0] <= 0 or mask_hw[1] <= 0:
+            return
+        rle = {'counts': annotation.mask, 'size': [mask_hw[0], mask_hw[1]]}
+    else:
+        return
+
+    if annotation.mask_area <= 0:
+        annotation.mask_area = area(rle)
+    if annotation.box.w <= 0 or annotation.box.h <= 0:
+        x, y, w, h = pycocotools.mask.toBbox(rle)
+        annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h = int(x), int(y), int(w), int(h)
+
+
+def area(rle: dict) -> int:
+    return int(pycocotools.mask.area(rle))
+
+
+def union(rles: List[dict]) -> dict:
+    return rles[0] if len(rles) == 1 else pycocotools.mask.merge(rles, intersect=0)
+
+
+def intersect(rles: List[dict]) -> dict:
+    return rles[0] if len(rles) == 1 else pycocotools.mask.merge(rles, intersect=1)
+
+
+def complement(rle: dict) -> dict:
+    # counts start with a run of 0, so complement only shifts all runs by one
+    counts = _counts_from_string(rle['counts'])
+    counts = counts[1:] if counts and counts[0] == 0 else [0] + counts
+    return _from_counts(counts, (rle['size'][0], rle['size'][1]))
+
+
+def difference(rle: dict, other: dict) -> dict:
+    # complement needs run lengths decoded in python, skipped if not overlapped
+    if area(intersect([rle, other])) == 0:
+        return rle
+    return intersect([rle, complement(other)])
+
+
+def _from_counts(counts: List[int], hw: Tuple[int, int]) -> dict:
+    return pycocotools.mask.frPyObjects({'counts': counts, 'size': [hw[0], hw[1]]}, hw[0], hw[1])
+
+
+def _counts_from_string(counts_str: object) -> List[int]:
+    # same as `rleFrString` in coco api: 5 bits per char, with continuation bit and delta to run two steps before
+    s = counts_str.encode('ascii') if isinstance(counts_str, str) else counts_str
+    assert isinstance(s, bytes)
+
+    counts: List[int] = []
+    pos = 0
+    while pos < len(s):
+        value, shift, more = 0, 0, True
+        while more:
+            c = s[pos] - 48
+            value |= (c & 0x1f) << (5 * shift)
+            more = bool(c & 0x20)
+            pos += 1
+            shift += 1
+            if not more and (c & 0x10):
+                value |= -1 << (5 * shift)
+        if len(counts) > 2:
+            value += counts[-2]
+        counts.append(value)
+    return counts
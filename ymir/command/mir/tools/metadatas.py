@@ -1,9 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import os
+import struct
 import time
 from PIL import Image, ImageFile, UnidentifiedImageError
-from typing import Dict, Set
-from mir.tools import mir_storage
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+from mir.tools import mir_storage, settings as mir_settings
 
 from mir.tools.code import MirCode
 from mir.tools.errors import MirRuntimeError
@@ -20,12 +22,109 @@ _ASSET_TYPE_STR_TO_ENUM_MAPPING = {
     'bmp': mirpb.AssetTypeImageBmp,
 }
 
+# (asset_type, width, height, channels)
+_TypeShape = Tuple[int, int, int, int]
+
+# jpeg SOFn markers, except DHT (0xC4), JPG (0xC8) and DAC (0xCC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# jpeg markers without length field: TEM, RSTn, SOI and EOI
+_JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xDA)}
+_JPEG_CHANNELS = {1, 3, 4}  # L, RGB, CMYK
+# png (bit depth, color type) -> channels, same as the modes PIL uses
+_PNG_CHANNELS = {
+    (1, 0): 1, (2, 0): 1, (4, 0): 1, (8, 0): 1, (16, 0): 1,
+    (8, 2): 3, (16, 2): 3,
+    (1, 3): 1, (2, 3): 1, (4, 3): 1, (8, 3): 1,
+    (8, 4): 2, (16, 4): 2,
+    (8, 6): 4, (16, 6): 4,
+}
+# bmp bits per pixel -> channels, uncompressed only,
+# palette based bmps (validated by PIL) and 32 bits ones (RGB or RGBA) are left to PIL
+_BMP_CHANNELS = {16: 3, 24: 3}
+_BMP_HEADER_SIZES = {40, 52, 56, 64, 108, 124}
+
+
+# private: header parsers, returns None if header is ambiguous, caller should fallback to PIL
+def _parse_jpeg_header(f: BinaryIO) -> Optional[_TypeShape]:
+    f.seek(2)
+    while True:
+        marker_prefix = f.read(1)
+        if marker_prefix != b'\xff':
+            return None
+        marker = f.read(1)
+        while marker == b'\xff':  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker_value = marker[0]
+        if marker_value in _JPEG_STANDALONE_MARKERS:
+            continue
 
-def _fill_type_shape_size_for_asset(asset_path: str, metadata_attributes: mirpb.MetadataAttributes) -> None:
-    if not asset_path:
-        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS,
-                              error_message='_type_shape_size_for_asset: empty asset_path')
-
+        length_bytes = f.read(2)
+        if len(length_bytes) != 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if length < 2:
+            return None
+
+        if marker_value in _JPEG_SOF_MARKERS:
+            segment = f.read(6)
+            if len(segment) != 6:
+                return None
+            _, height, width, channels = struct.unpack('>BHHB', segment)
+            if channels not in _JPEG_CHANNELS:
+                return None
+            return (mirpb.AssetTypeImageJpeg, width, height, channels)
+        if marker_value == 0xE2:
+            # APP2 with MPF: PIL opens it as MPO
+            if f.read(4) == b'MPF\x00':
+                return None
+            f.seek(length - 6, os.SEEK_CUR)
+            continue
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _parse_png_header(head: bytes) -> Optional[_TypeShape]:
+    if len(head) < 26 or head[12:16] != b'IHDR':
+        return None
+    width, height, bit_depth, color_type = struct.unpack('>IIBB', head[16:26])
+    channels = _PNG_CHANNELS.get((bit_depth, color_type))
+    if not channels:
+        return None
+    return (mirpb.AssetTypeImagePng, width, height, channels)
+
+
+def _parse_bmp_header(head: bytes) -> Optional[_TypeShape]:
+    if len(head) < 34:
+        return None
+    header_size = struct.unpack('<I', head[14:18])[0]
+    if header_size not in _BMP_HEADER_SIZES:
+        # os/2 core headers are left to PIL
+        return None
+    width, height, _, bits, compression = struct.unpack('<iiHHI', head[18:34])
+    channels = _BMP_CHANNELS.get(bits)
+    if not channels or compression != 0:
+        return None
+    return (mirpb.AssetTypeImageBmp, width, abs(height), channels)
+
+
+def _read_header_type_shape(asset_path: str) -> Optional[_TypeShape]:
+    """
+    reads asset type and shape from jpeg / png / bmp headers without decoding,
+    returns None if not one of these formats or header is ambiguous
+    """
+    with open(asset_path, 'rb') as f:
+        head = f.read(64)
+        if head[:3] == b'\xff\xd8\xff':
+            return _parse_jpeg_header(f)
+        if head[:8] == b'\x89PNG\r\n\x1a\n':
+            return _parse_png_header(head)
+        if head[:2] == b'BM':
+            return _parse_bmp_header(head)
+    return None
+
+
+def _pil_type_shape(asset_path: str) -> _TypeShape:
     try:
         asset_image = Image.open(asset_path)
         asset_type_str: str = asset_image.format.lower()  # type: ignore
@@ -33,24 +132,53 @@ def _fill_type_shape_size_for_asset(asset_path: str, metadata_attributes: mirpb.
         logging.info(f"{type(e).__name__}: {e} asset_path: {asset_path}")
         asset_type_str = ''  # didn't set it to 'unknown' as what i did in utils.py, because this is easy to compare
 
-    width, height, channel = 0, 0, 0
-    asset_type = mirpb.AssetTypeUnknown
-    if asset_type_str in _ASSET_TYPE_STR_TO_ENUM_MAPPING:
-        width, height = asset_image.size
-        channel = len(asset_image.getbands())
-        asset_type = _ASSET_TYPE_STR_TO_ENUM_MAPPING[asset_type_str]
+    if asset_type_str not in _ASSET_TYPE_STR_TO_ENUM_MAPPING:
+        return (mirpb.AssetTypeUnknown, 0, 0, 0)
 
-    metadata_attributes.asset_type = asset_type
-    metadata_attributes.width = width
-    metadata_attributes.height = height
-    metadata_attributes.image_channels = channel
-    metadata_attributes.byte_size = os.stat(asset_path).st_size
+    width, height = asset_image.size
+    return (_ASSET_TYPE_STR_TO_ENUM_MAPPING[asset_type_str], width, height, len(asset_image.getbands()))
+
+
+def _type_shape_for_asset(asset_path: str) -> _TypeShape:
+    try:
+        type_shape = _read_header_type_shape(asset_path)
+    except OSError:
+        type_shape = None
+    return type_shape or _pil_type_shape(asset_path)
+
+
+def _locate_asset_path_and_size(location: str, hash: str) -> Optional[Tuple[str, int]]:
+    # same lookup order as `mir_storage.locate_asset_path`, with only one stat for each candidate
+    for need_sub_folder in [True, False]:
+        asset_path = mir_storage.get_asset_storage_path(location=location,
+                                                        hash=hash,
+                                                        make_dirs=False,
+                                                        need_sub_folder=need_sub_folder)
+        try:
+            return asset_path, os.stat(asset_path).st_size
+        except OSError:
+            continue
+    return None
+
+
+def _extract_type_shape_size(location_and_hash: Tuple[str, str]) -> Optional[Tuple[int, int, int, int, int]]:
+    """
+    (asset_type, width, height, channels, byte_size) of asset, None if asset not found,
+    runs in worker processes, so never raises MirRuntimeError (which can not be pickled)
+    """
+    location, hash = location_and_hash
+    path_and_size = _locate_asset_path_and_size(location=location, hash=hash)
+    if not path_and_size:
+        return None
+    asset_path, byte_size = path_and_size
+    return (*_type_shape_for_asset(asset_path), byte_size)
 
 
 def import_metadatas(mir_metadatas: mirpb.MirMetadatas,
                      file_name_to_asset_ids: Dict[str, str],
                      hashed_asset_root: str,
-                     phase: str = '') -> int:
+                     phase: str = '',
+                     workers: int = mir_settings.ASSET_IO_WORKERS) -> int:
     # if not enough args, abort
     if (not file_name_to_asset_ids or not hashed_asset_root):
         logging.error('invalid map_hashed_path or hashed_asset_root')
@@ -66,28 +194,46 @@ def import_metadatas(mir_metadatas: mirpb.MirMetadatas,
 
     sha1s_count = len(file_name_to_asset_ids)
     exclude_file_names: Set[str] = set()
-    for idx, (file_name, asset_id) in enumerate(file_name_to_asset_ids.items()):
-        metadata_attributes = mirpb.MetadataAttributes()
-        metadata_attributes.timestamp.CopyFrom(timestamp)
-
-        # read file
-        # if any exception occured, exit without any handler
-        hashed_asset_path = mir_storage.locate_asset_path(location=hashed_asset_root, hash=asset_id)
-        _fill_type_shape_size_for_asset(hashed_asset_path, metadata_attributes)
-        if metadata_attributes.asset_type == mirpb.AssetTypeUnknown:
-            unknown_format_count += 1
-            exclude_file_names.add(file_name)
-            continue
-        if metadata_attributes.width <= 0 or metadata_attributes.height <= 0:
-            zero_size_count += 1
-            exclude_file_names.add(file_name)
-            continue
 
-        metadata_attributes.origin_filename = file_name
-        mir_metadatas.attributes[asset_id].CopyFrom(metadata_attributes)
+    # headers are parsed in worker processes, results come back in the same order as `file_name_to_asset_ids`
+    location_and_hashes: List[Tuple[str, str]] = [(hashed_asset_root, asset_id)
+                                                  for asset_id in file_name_to_asset_ids.values()]
+    executor: Optional[ProcessPoolExecutor] = None
+    if workers > 1 and sha1s_count >= mir_settings.METADATAS_POOL_MIN_ASSETS:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_extract_type_shape_size,
+                               location_and_hashes,
+                               chunksize=max(1, min(1000, sha1s_count // (workers * 4))))
+    else:
+        results = map(_extract_type_shape_size, location_and_hashes)
 
-        if idx > 0 and idx % 5000 == 0:
-            PhaseLoggerCenter.update_phase(phase=phase, local_percent=(idx / sha1s_count))
+    try:
+        for idx, ((file_name, asset_id), result) in enumerate(zip(file_name_to_asset_ids.items(), results)):
+            if not result:
+                raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS,
+                                      error_message=f"cannot locate asset: {asset_id}")
+
+            metadata_attributes = mirpb.MetadataAttributes()
+            metadata_attributes.timestamp.CopyFrom(timestamp)
+            (metadata_attributes.asset_type, metadata_attributes.width, metadata_attributes.height,
+             metadata_attributes.image_channels, metadata_attributes.byte_size) = result  # type: ignore
+            if metadata_attributes.asset_type == mirpb.AssetTypeUnknown:
+                unknown_format_count += 1
+                exclude_file_names.add(file_name)
+                continue
+            if metadata_attributes.width <= 0 or metadata_attributes.height <= 0:
+                zero_size_count += 1
+                exclude_file_names.add(file_name)
+                continue
+
+            metadata_attributes.origin_filename = file_name
+            mir_metadatas.attributes[asset_id].CopyFrom(metadata_attributes)
+
+            if idx > 0 and idx % 5000 == 0:
+                PhaseLoggerCenter.update_phase(phase=phase, local_percent=(idx / sha1s_count))
+    finally:
+        if executor:
+            executor.shutdown()
 
     for file_name in exclude_file_names:
         del file_name_to_asset_ids[file_name]
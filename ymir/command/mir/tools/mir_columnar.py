@@ -0,0 +1,351 @@
+"""
+columnar sidecar for annotations.mir
+
+annotations.mir is always the authoritative storage, the sidecar is a derived, read-only copy of it, laid out as flat
+numpy arrays so readers can mmap it and decode only the assets they need.
+
+sidecars live in `<mir_root>/.mir/columnar/<blob hash of annotations.mir>/`, `.mir` is ignored by git, and as git
+blobs are immutable, a sidecar keyed by blob hash is valid for every rev that points to the same annotations.mir.
+sidecars are opt-in, see `COLUMNAR_SIDECARS` in settings, each repo keeps only the most recently used ones.
+
+layout of a sidecar dir, `{p}` is `pred` or `gt`:
+    {p}_header.bin: serialized SingleTaskAnnotations without image_annotations
+    {p}_asset_ids.npy: sorted asset ids, fixed width bytes
+    {p}_anno_offsets.npy, {p}_annos.npy: per asset serialized SingleImageAnnotations, asset i is
+        annos[anno_offsets[i]:anno_offsets[i + 1]]
+    {p}_box_offsets.npy: boxes of asset i are in range [box_offsets[i], box_offsets[i + 1])
+    {p}_x.npy, {p}_y.npy, {p}_w.npy, {p}_h.npy, {p}_class_id.npy, {p}_score.npy: box columns
+    cks_asset_ids.npy, cks_offsets.npy, cks.npy: per asset serialized SingleImageCks
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from mir import scm
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import mir_storage
+from mir.tools.code import MirCode
+from mir.tools.errors import MirRuntimeError
+
+SIDECAR_VERSION = '1'
+_VERSION_FILE_NAME = 'VERSION'
+_BOX_COLUMNS: List[Tuple[str, type]] = [('x', np.int32), ('y', np.int32), ('w', np.int32), ('h', np.int32),
+                                        ('class_id', np.int32), ('score', np.float64)]
+
+
+def sidecar_root(mir_root: str) -> str:
+    return os.path.join(mir_root, '.mir', 'columnar')
+
+
+def git_blob_hash(data: bytes) -> str:
+    """
+    same hash as `git hash-object`, so sidecars can be located without writing blobs to git
+    """
+    h = hashlib.sha1()
+    h.update(f"blob {len(data)}\0".encode())
+    h.update(data)
+    return h.hexdigest()
+
+
+# private: write
+def _encode_string_table(keys: List[str]) -> np.ndarray:
+    # asset ids are sorted so they can be located by binary search
+    encoded = [k.encode('utf-8') for k in keys]
+    if not encoded:
+        return np.zeros(0, dtype='S1')
+    return np.array(encoded, dtype=f"S{max(1, max(len(e) for e in encoded))}")
+
+
+def _encode_blobs(blobs: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in blobs], dtype=np.int64)
+    return offsets, np.frombuffer(b''.join(blobs), dtype=np.uint8)
+
+
+def _task_header(task_annotations: mirpb.SingleTaskAnnotations) -> mirpb.SingleTaskAnnotations:
+    header = mirpb.SingleTaskAnnotations()
+    for field, value in task_annotations.ListFields():
+        if field.name == 'image_annotations':
+            continue
+        if field.label == field.LABEL_REPEATED:  # type: ignore
+            getattr(header, field.name).extend(value)
+        elif field.message_type:
+            getattr(header, field.name).CopyFrom(value)
+        else:
+            setattr(header, field.name, value)
+    return header
+
+
+def _task_columns(task_annotations: mirpb.SingleTaskAnnotations) -> Dict[str, np.ndarray]:
+    asset_ids = sorted(task_annotations.image_annotations.keys())
+    blobs: List[bytes] = []
+    box_offsets = np.zeros(len(asset_ids) + 1, dtype=np.int64)
+    box_values: Dict[str, list] = {name: [] for name, _ in _BOX_COLUMNS}
+    for idx, asset_id in enumerate(asset_ids):
+        image_annotations = task_annotations.image_annotations[asset_id]
+        blobs.append(image_annotations.SerializeToString())
+        for annotation in image_annotations.boxes:
+            box_values['x'].append(annotation.box.x)
+            box_values['y'].append(annotation.box.y)
+            box_values['w'].append(annotation.box.w)
+            box_values['h'].append(annotation.box.h)
+            box_values['class_id'].append(annotation.class_id)
+            box_values['score'].append(annotation.score)
+        box_offsets[idx + 1] = box_offsets[idx] + len(image_annotations.boxes)
+
+    anno_offsets, annos = _encode_blobs(blobs)
+    columns = {
+        'asset_ids': _encode_string_table(asset_ids),
+        'anno_offsets': anno_offsets,
+        'annos': annos,
+        'box_offsets': box_offsets,
+    }
+    for name, dtype in _BOX_COLUMNS:
+        columns[name] = np.array(box_values[name], dtype=dtype)
+    return columns
+
+
+def write_annotations_sidecar(mir_root: str, mir_annotations: mirpb.MirAnnotations, blob_hash: str) -> str:
+    """
+    writes sidecar of `mir_annotations` for annotations.mir blob `blob_hash`, returns sidecar dir
+
+    sidecar is written to a temp dir first and renamed, so readers never see a partially written one
+    """
+    sidecar_dir = os.path.join(sidecar_root(mir_root), blob_hash)
+    if os.path.isdir(sidecar_dir):
+        return sidecar_dir
+
+    tmp_dir = f"{sidecar_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        for prefix, task_annotations in [('pred', mir_annotations.prediction), ('gt', mir_annotations.ground_truth)]:
+            with open(os.path.join(tmp_dir, f"{prefix}_header.bin"), 'wb') as f:
+                f.write(_task_header(task_annotations).SerializeToString())
+            for name, array in _task_columns(task_annotations).items():
+                np.save(os.path.join(tmp_dir, f"{prefix}_{name}.npy"), array)
+
+        cks_asset_ids = sorted(mir_annotations.image_cks.keys())
+        cks_offsets, cks = _encode_blobs([mir_annotations.image_cks[k].SerializeToString() for k in cks_asset_ids])
+        np.save(os.path.join(tmp_dir, 'cks_asset_ids.npy'), _encode_string_table(cks_asset_ids))
+        np.save(os.path.join(tmp_dir, 'cks_offsets.npy'), cks_offsets)
+        np.save(os.path.join(tmp_dir, 'cks.npy'), cks)
+
+        # version file goes last: a sidecar dir without it is never opened
+        with open(os.path.join(tmp_dir, _VERSION_FILE_NAME), 'w') as f:
+            f.write(SIDECAR_VERSION)
+
+        os.rename(tmp_dir, sidecar_dir)
+    except OSError:
+        # another process may have renamed the same sidecar in first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(sidecar_dir):
+            raise
+    return sidecar_dir
+
+
+# public: read
+class _StringTable:
+    def __init__(self, keys: np.ndarray) -> None:
+        self._keys = keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._keys:
+            yield key.decode('utf-8')
+
+    def key(self, pos: int) -> str:
+        return self._keys[pos].decode('utf-8')
+
+    def position(self, key: str) -> int:
+        encoded = key.encode('utf-8')
+        if not len(self._keys) or len(encoded) > self._keys.dtype.itemsize:
+            return -1
+        pos = int(np.searchsorted(self._keys, np.bytes_(encoded)))
+        if pos < len(self._keys) and self._keys[pos] == encoded:
+            return pos
+        return -1
+
+
+def _asset_positions_of_class_ids(class_id_column: np.ndarray, box_offsets: np.ndarray,
+                                  class_ids: Set[int]) -> np.ndarray:
+    box_positions = np.flatnonzero(np.isin(class_id_column, list(class_ids)))
+    # boxes of asset i are in range [box_offsets[i], box_offsets[i + 1])
+    return np.unique(np.searchsorted(box_offsets, box_positions, side='right') - 1)
+
+
+def _load_array(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode='r')
+
+
+class ColumnarTaskAnnotations:
+    """
+    read-only, lazily decoded view of one SingleTaskAnnotations in sidecar
+    """
+    def __init__(self, sidecar_dir: str, prefix: str) -> None:
+        self._sidecar_dir = sidecar_dir
+        self._prefix = prefix
+        self._header = mirpb.SingleTaskAnnotations()
+        with open(os.path.join(self._sidecar_dir, f"{self._prefix}_header.bin"), 'rb') as f:
+            self._header.ParseFromString(f.read())
+        if self._header.type == mirpb.ObjectType.OT_UNKNOWN:
+            self._header.type = mirpb.ObjectType.OT_NO_ANNOS
+        self._asset_ids = _StringTable(self._load('asset_ids'))
+        self._anno_offsets = self._load('anno_offsets')
+        self._annos = self._load('annos')
+        self._box_offsets = self._load('box_offsets')
+        self._columns: Dict[str, np.ndarray] = {name: self._load(name) for name, _ in _BOX_COLUMNS}
+
+    def _load(self, name: str) -> np.ndarray:
+        return _load_array(os.path.join(self._sidecar_dir, f"{self._prefix}_{name}.npy"))
+
+    @property
+    def header(self) -> mirpb.SingleTaskAnnotations:
+        """
+        task level fields (task_id, type, eval_class_ids, model...), image_annotations always empty
+        """
+        return self._header
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        box columns of all assets, use `box_offsets` to split them by asset
+        """
+        return self._columns
+
+    @property
+    def box_offsets(self) -> np.ndarray:
+        return self._box_offsets
+
+    def __len__(self) -> int:
+        return len(self._asset_ids)
+
+    def __contains__(self, asset_id: str) -> bool:
+        return self._asset_ids.position(asset_id) >= 0
+
+    def asset_ids(self) -> Iterator[str]:
+        return iter(self._asset_ids)
+
+    def get(self, asset_id: str) -> Optional[mirpb.SingleImageAnnotations]:
+        pos = self._asset_ids.position(asset_id)
+        if pos < 0:
+            return None
+        image_annotations = mirpb.SingleImageAnnotations()
+        image_annotations.ParseFromString(self._annos[self._anno_offsets[pos]:self._anno_offsets[pos + 1]].tobytes())
+        return image_annotations
+
+    def box_columns(self, asset_id: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        box columns of a single asset, without decoding its protobuf
+        """
+        pos = self._asset_ids.position(asset_id)
+        if pos < 0:
+            return None
+        start, end = self._box_offsets[pos], self._box_offsets[pos + 1]
+        return {name: column[start:end] for name, column in self._columns.items()}
+
+    def asset_ids_of_class_ids(self, class_ids: Set[int]) -> Set[str]:
+        """
+        asset ids which have at least one box of `class_ids`, without decoding any protobuf
+        """
+        asset_positions = _asset_positions_of_class_ids(class_id_column=self._columns['class_id'],
+                                                        box_offsets=self._box_offsets,
+                                                        class_ids=class_ids)
+        return {self._asset_ids.key(pos) for pos in asset_positions}
+
+    def to_pb(self) -> mirpb.SingleTaskAnnotations:
+        task_annotations = mirpb.SingleTaskAnnotations()
+        task_annotations.CopyFrom(self.header)
+        for pos, asset_id in enumerate(self._asset_ids):
+            task_annotations.image_annotations[asset_id].ParseFromString(
+                self._annos[self._anno_offsets[pos]:self._anno_offsets[pos + 1]].tobytes())
+        return task_annotations
+
+
+class ColumnarAnnotations:
+    """
+    read-only, lazily decoded view of MirAnnotations in sidecar
+    """
+    def __init__(self, sidecar_dir: str) -> None:
+        self.sidecar_dir = sidecar_dir
+        self.prediction = ColumnarTaskAnnotations(sidecar_dir=sidecar_dir, prefix='pred')
+        self.ground_truth = ColumnarTaskAnnotations(sidecar_dir=sidecar_dir, prefix='gt')
+        self._cks_asset_ids = _StringTable(_load_array(os.path.join(sidecar_dir, 'cks_asset_ids.npy')))
+        self._cks_offsets = _load_array(os.path.join(sidecar_dir, 'cks_offsets.npy'))
+        self._cks = _load_array(os.path.join(sidecar_dir, 'cks.npy'))
+
+    def get_image_cks(self, asset_id: str) -> Optional[mirpb.SingleImageCks]:
+        pos = self._cks_asset_ids.position(asset_id)
+        if pos < 0:
+            return None
+        image_cks = mirpb.SingleImageCks()
+        image_cks.ParseFromString(self._cks[self._cks_offsets[pos]:self._cks_offsets[pos + 1]].tobytes())
+        return image_cks
+
+    def to_pb(self) -> mirpb.MirAnnotations:
+        mir_annotations = mirpb.MirAnnotations()
+        mir_annotations.prediction.CopyFrom(self.prediction.to_pb())
+        mir_annotations.ground_truth.CopyFrom(self.ground_truth.to_pb())
+        for pos, asset_id in enumerate(self._cks_asset_ids):
+            mir_annotations.image_cks[asset_id].ParseFromString(
+                self._cks[self._cks_offsets[pos]:self._cks_offsets[pos + 1]].tobytes())
+        return mir_annotations
+
+
+def open_annotations_sidecar(mir_root: str, blob_hash: str) -> Optional[ColumnarAnnotations]:
+    sidecar_dir = os.path.join(sidecar_root(mir_root), blob_hash)
+    version_path = os.path.join(sidecar_dir, _VERSION_FILE_NAME)
+    if not os.path.isfile(version_path):
+        return None
+    try:
+        with open(version_path, 'r') as f:
+            if f.read().strip() != SIDECAR_VERSION:
+                return None
+        columnar_annotations = ColumnarAnnotations(sidecar_dir=sidecar_dir)
+        # mtime of version file is the last used time, see `remove_stale_sidecars`
+        os.utime(version_path)
+        return columnar_annotations
+    except (OSError, ValueError) as e:
+        logging.warning(f"can not open columnar sidecar: {sidecar_dir}, fallback to annotations.mir, reason: {e}")
+        return None
+
+
+def locate_annotations_blob(mir_root: str, rev: str) -> str:
+    scm_git = scm.Scm(mir_root, scm_executable='git')
+    object_info = scm_git.cat_file_batch_check(f"{rev}:{mir_storage.mir_path(mirpb.MirStorage.MIR_ANNOTATIONS)}")
+    if not object_info:
+        raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_BRANCH_OR_TAG,
+                              error_message=f"can not find annotations.mir in {rev}")
+    return object_info[0]
+
+
+def remove_stale_sidecars(mir_root: str, keep_count: int) -> None:
+    """
+    keeps `keep_count` most recently written or opened sidecars, removes the others and unfinished ones
+
+    should be called with mir repo locked, so no sidecar is being written,
+        readers which already opened a removed sidecar can still read it, as all its files are opened on open
+    """
+    root_dir = sidecar_root(mir_root)
+    if not os.path.isdir(root_dir):
+        return
+
+    used_times: Dict[str, float] = {}
+    for name in os.listdir(root_dir):
+        version_path = os.path.join(root_dir, name, _VERSION_FILE_NAME)
+        if os.path.isfile(version_path):
+            used_times[name] = os.path.getmtime(version_path)
+        else:
+            shutil.rmtree(os.path.join(root_dir, name), ignore_errors=True)
+
+    for name in sorted(used_times, key=lambda k: used_times[k], reverse=True)[keep_count:]:
+        shutil.rmtree(os.path.join(root_dir, name), ignore_errors=True)
+    if keep_count <= 0:
+        shutil.rmtree(root_dir, ignore_errors=True)
@@ -27,11 +27,9 @@ def mir_check_repo_git_dirty(mir_root: str = ".") -> bool:
 def mir_check_branch_exists(mir_root: str, branch: str) -> bool:
     try:
         git_scm = scm.Scm(mir_root, scm_executable="git")
-        git_scm.rev_parse(branch)
-        return True
+        return git_scm.cat_file_batch_check(branch) is not None
     except Exception:
-        # git rev-parse will return non-zero code when can not find branch
-        # and cmd.py packs non-zero return code as an error
+        # not a git repo, or invalid branch name
         return False
 
 
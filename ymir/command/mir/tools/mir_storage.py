@@ -1,6 +1,7 @@
 import hashlib
 import os
-from typing import Any, List
+from typing import Any, List, Tuple
+import uuid
 
 from mir.protos import mir_command_pb2 as mirpb
 from mir.tools.code import MirCode
@@ -69,14 +70,74 @@ def get_asset_storage_path(location: str, hash: str, make_dirs: bool = True, nee
     return os.path.join(sub_dir, hash)
 
 
+# read buffer for hashing and copying assets, large reads keep hashing off the per-call overhead
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
 def sha1sum_for_file(file_path: str) -> str:
     """
     get sha1sum for file, raises FileNotFoundError if file not found
     """
     h = hashlib.sha1()
     with open(file_path, "rb") as f:
-        chunk = b'0'
-        while chunk != b'':
-            chunk = f.read(h.block_size)
+        for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b''):
             h.update(chunk)
     return h.hexdigest()
+
+
+def sha1sum_and_store_file(file_path: str, location: str, hardlink: bool = False) -> Tuple[str, bool]:
+    """
+    get sha1sum for file, and store it into asset storage `location` if not stored yet, file is read only once:
+        hashed while copied into a temp file in `location`, which is then renamed to its sha1sum,
+    raises OSError if file not accessable
+
+    Args:
+        file_path (str): path to source file
+        location (str): asset storage root
+        hardlink (bool): if True, hardlinks source file into storage instead of copying,
+            storage then shares the file with source, so source must never be modified after it is imported,
+            or the stored asset no longer matches its sha1sum,
+            falls back to copy if source and storage are on different devices
+
+    Returns:
+        Tuple[str, bool]: sha1sum, and whether the file was newly stored
+    """
+    tmp_path = os.path.join(location, f".tmp-{uuid.uuid4().hex}")
+    try:
+        linked = False
+        if hardlink:
+            try:
+                os.link(file_path, tmp_path)
+                linked = True
+            except OSError:
+                pass  # different devices, or file system without hardlinks: copy instead
+        sha1 = sha1sum_for_file(tmp_path) if linked else _copy_and_sha1sum(src_path=file_path, dst_path=tmp_path)
+        return sha1, _commit_stored_file(tmp_path=tmp_path, location=location, sha1=sha1)
+    finally:
+        _remove_silently(tmp_path)
+
+
+def _copy_and_sha1sum(src_path: str, dst_path: str) -> str:
+    h = hashlib.sha1()
+    with open(src_path, "rb") as src_f, open(dst_path, "wb") as dst_f:
+        for chunk in iter(lambda: src_f.read(HASH_BUFFER_SIZE), b''):
+            h.update(chunk)
+            dst_f.write(chunk)
+    return h.hexdigest()
+
+
+def _commit_stored_file(tmp_path: str, location: str, sha1: str) -> bool:
+    # link is atomic and never overwrites: if two workers store the same asset, only one of them wins,
+    #   and re-imported assets, already in storage, are not written again
+    try:
+        os.link(tmp_path, get_asset_storage_path(location=location, hash=sha1))
+        return True
+    except FileExistsError:
+        return False
+
+
+def _remove_silently(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,5 +1,7 @@
+import enum
 from functools import reduce
 from math import ceil
+import logging
 import os
 import time
 from typing import Any, List, Dict, Optional
@@ -12,12 +14,12 @@ from mir.commands.checkout import CmdCheckout
 from mir.commands.commit import CmdCommit
 from mir.protos import mir_command_pb2 as mirpb
 from mir.tools import exodus
-from mir.tools import mir_storage, mir_repo_utils, revs_parser
+from mir.tools import mir_columnar, mir_storage, mir_repo_utils, revs_parser
 from mir.tools import settings as mir_settings
 from mir.tools.annotations import valid_image_annotation
 from mir.tools.code import MirCode, time_it
 from mir.tools.errors import MirRuntimeError
-from mir.tools.eval import eval_ops
+from mir.tools.eval import eval_deferred, eval_ops
 
 
 def create_evaluate_config(conf_thr: float = mir_settings.DEFAULT_EVALUATE_CONF_THR,
@@ -32,11 +34,21 @@ def create_evaluate_config(conf_thr: float = mir_settings.DEFAULT_EVALUATE_CONF_
     return evaluate_config
 
 
+class EvaluatePolicy(str, enum.Enum):
+    # evaluates before commit
+    SYNC = 'sync'
+    # commits with evaluation state ES_PENDING, evaluates later in background, see `eval_deferred`
+    DEFERRED = 'deferred'
+    # commits with evaluation state ES_NOT_SET, never evaluates
+    OFF = 'off'
+
+
 class MirStorageOps():
     # private: save and load
     @classmethod
     def __build_task_keyword_context(cls, mir_datas: Dict['mirpb.MirStorage.V', Any], task: mirpb.Task,
-                                     evaluate_config: Optional[mirpb.EvaluateConfig]) -> None:
+                                     evaluate_config: Optional[mirpb.EvaluateConfig],
+                                     evaluate_policy: EvaluatePolicy) -> None:
         # add default members and check pred/gt object type
         mir_metadatas: mirpb.MirMetadatas = mir_datas[mirpb.MirStorage.MIR_METADATAS]
         mir_annotations: mirpb.MirAnnotations = mir_datas[mirpb.MirStorage.MIR_ANNOTATIONS]
@@ -70,12 +82,18 @@ class MirStorageOps():
         if not evaluate_config:
             evaluate_config = create_evaluate_config()
 
-        evaluation = eval_ops.evaluate_with_pb(
-            prediction=mir_annotations.prediction,
-            ground_truth=mir_annotations.ground_truth,
-            config=evaluate_config,
-            assets_metadata=mir_metadatas,
-        )
+        if evaluate_policy == EvaluatePolicy.OFF:
+            evaluation = mirpb.Evaluation()
+            evaluation.config.CopyFrom(evaluate_config)
+            evaluation.state = mirpb.EvaluationState.ES_NOT_SET
+        else:
+            evaluation = eval_ops.evaluate_with_pb(
+                prediction=mir_annotations.prediction,
+                ground_truth=mir_annotations.ground_truth,
+                config=evaluate_config,
+                assets_metadata=mir_metadatas,
+                defer=(evaluate_policy == EvaluatePolicy.DEFERRED),
+            )
         mir_tasks.tasks[mir_tasks.head_task_id].evaluation.CopyFrom(evaluation)
 
         mir_datas[mirpb.MirStorage.MIR_TASKS] = mir_tasks
@@ -192,7 +210,8 @@ class MirStorageOps():
                         his_branch: Optional[str],
                         mir_datas: Dict,
                         task: mirpb.Task,
-                        evaluate_config: Optional[mirpb.EvaluateConfig] = None) -> int:
+                        evaluate_config: Optional[mirpb.EvaluateConfig] = None,
+                        evaluate_policy: Optional[EvaluatePolicy] = None) -> int:
         """
         saves and commit all contents in mir_datas to branch: `mir_branch`;
         branch will be created if not exists, and it's history will be after `his_branch`
@@ -206,6 +225,8 @@ class MirStorageOps():
                  datasets
             task (mirpb.Task): task for this commit
             evaluate_config (mirpb.EvaluateConfig): evaluate config
+            evaluate_policy (Optional[EvaluatePolicy]): evaluate now, later or never,
+                if not provided, uses `DEFAULT_EVALUATE_POLICY` in settings
 
         Raises:
             MirRuntimeError
@@ -231,10 +252,14 @@ class MirStorageOps():
         if not task.task_id:
             raise MirRuntimeError(error_code=MirCode.RC_CMD_INVALID_ARGS, error_message='empty task id')
 
+        if not evaluate_policy:
+            evaluate_policy = EvaluatePolicy(mir_settings.DEFAULT_EVALUATE_POLICY)
+
         # Build all mir_datas.
         cls.__build_task_keyword_context(mir_datas=mir_datas,
                                          task=task,
-                                         evaluate_config=evaluate_config)
+                                         evaluate_config=evaluate_config,
+                                         evaluate_policy=evaluate_policy)
 
         branch_exists = mir_repo_utils.mir_check_branch_exists(mir_root=mir_root, branch=mir_branch)
         if not branch_exists and not his_branch:
@@ -262,10 +287,14 @@ class MirStorageOps():
                     return return_code
 
             # save to file
+            annotations_bytes = b''
             for ms, mir_data in mir_datas.items():
                 mir_file_path = os.path.join(mir_root, mir_storage.mir_path(ms))
+                mir_data_bytes = mir_data.SerializeToString()
                 with open(mir_file_path, "wb") as m_f:
-                    m_f.write(mir_data.SerializeToString())
+                    m_f.write(mir_data_bytes)
+                if ms == mirpb.MirStorage.MIR_ANNOTATIONS:
+                    annotations_bytes = mir_data_bytes
 
             ret_code = CmdCommit.run_with_args(mir_root=mir_root, msg=task.name)
             if ret_code != MirCode.RC_OK:
@@ -274,8 +303,33 @@ class MirStorageOps():
             # also have a tag for this commit
             cls.__add_git_tag(mir_root=mir_root, tag=revs_parser.join_rev_tid(mir_branch, task.task_id))
 
+            # still locked: no other process is writing sidecars
+            cls.__update_columnar_sidecars(mir_root=mir_root,
+                                           mir_annotations=mir_datas[mirpb.MirStorage.MIR_ANNOTATIONS],
+                                           annotations_bytes=annotations_bytes)
+
+        evaluation = mir_datas[mirpb.MirStorage.MIR_TASKS].tasks[task.task_id].evaluation
+        if evaluation.state == mirpb.EvaluationState.ES_PENDING:
+            eval_deferred.enqueue(mir_root=mir_root,
+                                  rev_tid=revs_parser.join_rev_tid(mir_branch, task.task_id),
+                                  evaluate_config=evaluation.config)
+            eval_deferred.start_worker(mir_root=mir_root)
+
         return ret_code
 
+    @classmethod
+    def __update_columnar_sidecars(cls, mir_root: str, mir_annotations: mirpb.MirAnnotations,
+                                   annotations_bytes: bytes) -> None:
+        # sidecar is only a derived copy of annotations.mir, failing to write or remove it never fails the commit
+        try:
+            if mir_settings.COLUMNAR_SIDECARS > 0:
+                mir_columnar.write_annotations_sidecar(mir_root=mir_root,
+                                                       mir_annotations=mir_annotations,
+                                                       blob_hash=mir_columnar.git_blob_hash(annotations_bytes))
+            mir_columnar.remove_stale_sidecars(mir_root=mir_root, keep_count=mir_settings.COLUMNAR_SIDECARS)
+        except Exception as e:
+            logging.warning(f"update columnar sidecars failed: {e}")
+
     # public: load
     @classmethod
     def load_single_storage(cls,
@@ -298,6 +352,16 @@ class MirStorageOps():
             if mir_storage_data.ground_truth.type == mirpb.ObjectType.OT_UNKNOWN:
                 mir_storage_data.ground_truth.type = mirpb.ObjectType.OT_NO_ANNOS
 
+        # fill deferred evaluation if ready
+        if isinstance(mir_storage_data, mirpb.MirTasks) and mir_storage_data.head_task_id in mir_storage_data.tasks:
+            head_task = mir_storage_data.tasks[mir_storage_data.head_task_id]
+            if head_task.evaluation.state == mirpb.EvaluationState.ES_PENDING:
+                evaluation = eval_deferred.load_evaluation(mir_root=mir_root,
+                                                           rev_tid=revs_parser.join_rev_tid(
+                                                               mir_branch, mir_storage_data.head_task_id))
+                if evaluation:
+                    head_task.evaluation.CopyFrom(evaluation)
+
         if as_dict:
             mir_storage_data = cls.__message_to_dict(mir_storage_data)
 
@@ -320,6 +384,22 @@ class MirStorageOps():
             ) for ms in ms_list
         ]
 
+    @classmethod
+    def load_columnar_annotations(cls,
+                                  mir_root: str,
+                                  mir_branch: str,
+                                  mir_task_id: str = '') -> Optional[mir_columnar.ColumnarAnnotations]:
+        """
+        returns columnar sidecar of annotations.mir in rev `mir_branch@mir_task_id`, assets are decoded lazily from it,
+            returns None if the sidecar not exists, then annotations.mir should be parsed instead
+        """
+        if not os.path.isdir(mir_columnar.sidecar_root(mir_root)):
+            return None
+
+        rev = revs_parser.join_rev_tid(mir_branch, mir_task_id)
+        blob_hash = mir_columnar.locate_annotations_blob(mir_root=mir_root, rev=rev)
+        return mir_columnar.open_annotations_sidecar(mir_root=mir_root, blob_hash=blob_hash)
+
     @classmethod
     def __message_to_dict(cls, message: Any) -> Dict:
         return json_format.MessageToDict(message,
@@ -1,3 +1,5 @@
+import os
+
 PRODUCER_KEY = 'producer'
 PRODUCER_NAME = 'ymir'
 EXECUTOR_CONFIG_KEY = 'executor_config'
@@ -7,13 +9,54 @@ EXECUTOR_OUTLOG_NAME = 'ymir-executor-out.log'
 COCO_JSON_NAME = 'coco-annotations.json'
 
 BYTES_PER_MB = 1048576
+# exodus blob cache, see `exodus`
+EXODUS_CACHE_MEMORY_BYTES = 512 * BYTES_PER_MB
+# exodus (commit id, file name) -> blob hash entries, each about 200 bytes
+EXODUS_CACHE_REV_BLOBS = 100000
+# columnar sidecars for annotations.mir, see `mir_columnar`: each commit writes one, and each repo keeps this many
+#   most recently written or read ones, a sidecar is a second full copy of annotations.mir,
+#   set by env `MIR_COLUMNAR_SIDECARS`, 0 by default: writes none, and removes existing ones
+COLUMNAR_SIDECARS = int(os.environ.get('MIR_COLUMNAR_SIDECARS', '0'))
 ASSET_LIMIT_PER_DATASET = 1000000
+# workers to hash, copy and export assets
+ASSET_IO_WORKERS = 8
+# how training and mining place assets into executor work dir, see `exporter.ExportLinkMode`,
+#   executors see assets read only, so they can be hardlinked from asset storage
+EXECUTANT_EXPORT_LINK_MODE = 'hardlink'
+# lmdb asset format: dir name of lmdb in asset dir, and bytes written in each transaction
+LMDB_EXPORT_DIR_NAME = 'assets.lmdb'
+LMDB_EXPORT_COMMIT_BYTES = 64 * BYTES_PER_MB
+# per image annotations (ark, voc) are exported by so many worker processes, in chunks of assets,
+#   1 to export in current process, which is the default, as serializing them to workers costs more than it saves,
+#   less assets than `EXPORT_ANNO_POOL_MIN_ASSETS`, they are also exported in current process
+EXPORT_ANNO_WORKERS = 1
+EXPORT_ANNO_POOL_MIN_ASSETS = 20000
+EXPORT_ANNO_POOL_CHUNK_ASSETS = 1000
+# archive name in gt and pred dirs if annotations exported as one archive, see `exporter.AnnoArchiveFormat`
+ANNO_ARCHIVE_NAME = 'annotations'
+# voc xml files are parsed by so many worker processes, in shards of files,
+#   1 to parse in current process, which is the default, as sending parsed objects back from workers costs more,
+#   less files than `IMPORT_ANNO_POOL_MIN_FILES`, they are also parsed in current process
+IMPORT_ANNO_WORKERS = 1
+IMPORT_ANNO_POOL_MIN_FILES = 5000
+# less assets than this, metadatas are extracted in current process
+METADATAS_POOL_MIN_ASSETS = 5000
 
 # evaluate default args
 DEFAULT_EVALUATE_CONF_THR = 0.005
 DEFAULT_EVALUATE_IOU_THR = '0.5'
 DEFAULT_EVALUATE_SUB_CKS = 10
+# evaluate policy of `save_and_commit` if not assigned: sync, deferred or off, see `EvaluatePolicy`,
+#   filter, sampling and copy take it from `--evaluate-policy`, which controller sets from its `MIR_EVALUATE_POLICY`
+DEFAULT_EVALUATE_POLICY = 'sync'
+
+# semantic segmentation evaluation shards assets to so many worker processes, 0 or 1 to evaluate in current process
+SEM_SEG_EVAL_WORKERS = 4
+SEM_SEG_EVAL_POOL_MIN_ASSETS = 2000
 
 # evaluation limitations
 MAX_EVALUATION_ASSETS_COUNT = 50000
 MAX_EVALUATION_CLASS_IDS_COUNT = 20
+
+# parsed label storage files cached in each process, keyed by inode, mtime and size, see `class_ids.UserLabels`
+LABELS_CACHE_MAX_FILES = 64
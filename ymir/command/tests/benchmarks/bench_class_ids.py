@@ -0,0 +1,76 @@
+"""
+benchmark: load user labels from a large label storage file,
+yaml parsed and labels validated in each load (previous implementation)
+    vs. lookup dicts cached in process by inode, mtime and size of label storage file
+
+usage: python -m tests.benchmarks.bench_class_ids [--labels 10000] [--aliases-per-label 2] [--loads 20]
+"""
+
+import argparse
+import os
+import shutil
+import time
+from typing import Dict
+
+import yaml
+
+from mir.tools import class_ids
+
+
+def _legacy_load(label_storage_file: str) -> Dict[str, int]:
+    # previous implementation of `UserLabels._generate_dicts`, only the dict of names and aliases returned
+    with open(label_storage_file, 'r') as f:
+        file_obj = yaml.safe_load(f)
+    labels = class_ids.LabelStorage(**(file_obj or {})).labels
+    name_aliases_to_id: Dict[str, int] = {}
+    for label in labels:
+        name_aliases_to_id[label.name] = label.id
+        for label_alias in label.aliases:
+            name_aliases_to_id[label_alias] = label.id
+    return name_aliases_to_id
+
+
+def _load(label_storage_file: str) -> Dict[str, int]:
+    return class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)._name_aliases_to_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--labels', type=int, default=10000)
+    parser.add_argument('--aliases-per-label', type=int, default=2)
+    parser.add_argument('--loads', type=int, default=20)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/class_ids')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    os.makedirs(args.root)
+    label_storage_file = class_ids.ids_file_path(args.root)
+    labels = [
+        class_ids.SingleLabel(id=idx,
+                              name=f"label-{idx}",
+                              aliases=[f"alias-{idx}-{alias_idx}" for alias_idx in range(args.aliases_per_label)])
+        for idx in range(args.labels)
+    ]
+    with open(label_storage_file, 'w') as f:
+        yaml.safe_dump(class_ids.LabelStorage(labels=labels).dict(), f, allow_unicode=True)
+
+    try:
+        expected = None
+        for name, run in [('legacy', _legacy_load), ('cached', _load)]:
+            start = time.time()
+            name_aliases_to_id = run(label_storage_file)
+            first_seconds = time.time() - start
+            start = time.time()
+            for _ in range(args.loads):
+                name_aliases_to_id = run(label_storage_file)
+            seconds = (time.time() - start) / args.loads
+            expected = expected or name_aliases_to_id
+            print(f"{name:>6}: {args.labels} labels, first load {first_seconds:.3f}s, "
+                  f"then {seconds * 1000:.2f}ms per load, same as legacy: {expected == name_aliases_to_id}")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+benchmark: CocoDetEval with bbox ious,
+per image evaluation (previous implementation) vs. array backed evaluation
+
+usage: python -m tests.benchmarks.bench_coco_eval [--assets 2000] [--classes 20]
+"""
+
+import argparse
+import random
+import time
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools.eval import eval_coco
+from tests.unit.test_tools_coco_eval import _LegacyCocoDetEval
+
+
+def _make_mir_datas(assets: int, classes: int) -> tuple:
+    rng = random.Random(0)
+    mir_metadatas = mirpb.MirMetadatas()
+    mir_annotations = mirpb.MirAnnotations()
+    for task_annotations in [mir_annotations.prediction, mir_annotations.ground_truth]:
+        task_annotations.type = mirpb.ObjectType.OT_DET
+    for asset_idx in range(assets):
+        asset_id = f"a{asset_idx:08d}"
+        mir_metadatas.attributes[asset_id].width = 640
+        mir_metadatas.attributes[asset_id].height = 480
+        for index in range(8):
+            class_id = rng.randint(1, classes)
+            x, y, w, h = rng.randint(0, 500), rng.randint(0, 400), rng.randint(10, 140), rng.randint(10, 80)
+            gt = mir_annotations.ground_truth.image_annotations[asset_id].boxes.add()
+            gt.index, gt.class_id = index, class_id
+            gt.box.x, gt.box.y, gt.box.w, gt.box.h = x, y, w, h
+            for pred_index in range(index * 2, index * 2 + 2):
+                pred = mir_annotations.prediction.image_annotations[asset_id].boxes.add()
+                pred.index, pred.class_id, pred.score = pred_index, class_id, rng.random()
+                pred.box.x, pred.box.y = x + rng.randint(-8, 8), y + rng.randint(-8, 8)
+                pred.box.w, pred.box.h = w + rng.randint(-8, 8), h + rng.randint(-8, 8)
+    return mir_metadatas, mir_annotations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=2000)
+    parser.add_argument('--classes', type=int, default=20)
+    args = parser.parse_args()
+
+    mir_metadatas, mir_annotations = _make_mir_datas(assets=args.assets, classes=args.classes)
+    params = eval_coco.Params()
+    params.iouType = 'bbox'
+    params.catIds = list(range(1, args.classes + 1))
+    params.confThr = 0
+    coco_gt = eval_coco.MirCoco(task_annotations=mir_annotations.ground_truth,
+                                mir_metadatas=mir_metadatas,
+                                conf_thr=None,
+                                need_segmentation=False)
+    coco_dt = eval_coco.MirCoco(task_annotations=mir_annotations.prediction,
+                                mir_metadatas=mir_metadatas,
+                                conf_thr=0,
+                                need_segmentation=False)
+
+    for name, evaluator_cls in [('per-image', _LegacyCocoDetEval), ('array', eval_coco.CocoDetEval)]:
+        evaluator = evaluator_cls(coco_gt=coco_gt, coco_dt=coco_dt, params=params, assets_metadata=mir_metadatas)
+        start = time.time()
+        evaluator.evaluate()
+        evaluator.accumulate()
+        cost = time.time() - start
+        print(f"{name:>10}: {args.assets} assets, {args.classes} classes, {cost:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+benchmark: export voc annotations with assets symlinked,
+one element tree for each image in current process (previous implementation)
+    vs. template serializer in current process, into one tar / zip, and in worker processes sharded by hash prefix
+
+usage: python -m tests.benchmarks.bench_export_anno [--assets 50000] [--boxes-per-asset 10] [--anno-workers 4]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Optional
+from unittest import mock
+import xml.etree.ElementTree as ElementTree
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import exporter, mir_storage
+from mir.tools import settings as mir_settings
+from mir.tools.class_ids import UserLabels
+
+_CLASS_NAMES = [f"c{idx}" for idx in range(20)]
+
+
+def _legacy_voc(attributes: mirpb.MetadataAttributes, image_annotations: mirpb.SingleImageAnnotations,
+                image_cks: Optional[mirpb.SingleImageCks], class_ids_mapping: Optional[Dict[int, int]],
+                cls_id_mgr: Optional[UserLabels], asset_filename: str) -> str:
+    # previous implementation: element tree for each image, without cks and tags, which are not in this benchmark
+    assert cls_id_mgr
+    annotation_node = ElementTree.Element('annotation')
+    ElementTree.SubElement(annotation_node, 'folder').text = 'folder'
+    ElementTree.SubElement(annotation_node, 'filename').text = asset_filename
+    source_node = ElementTree.SubElement(annotation_node, 'source')
+    ElementTree.SubElement(source_node, 'annotation').text = 'unknown'
+    ElementTree.SubElement(source_node, 'image').text = 'unknown'
+    size_node = ElementTree.SubElement(annotation_node, 'size')
+    ElementTree.SubElement(size_node, 'width').text = str(attributes.width)
+    ElementTree.SubElement(size_node, 'height').text = str(attributes.height)
+    ElementTree.SubElement(size_node, 'depth').text = str(attributes.image_channels)
+    ElementTree.SubElement(annotation_node, 'segmented').text = '0'
+    if image_cks:
+        ElementTree.SubElement(annotation_node, 'image_quality').text = f"{image_cks.image_quality:.4f}"
+    for annotation in image_annotations.boxes:
+        object_node = ElementTree.SubElement(annotation_node, 'object')
+        ElementTree.SubElement(object_node, 'name').text = cls_id_mgr.main_name_for_id(annotation.class_id)
+        ElementTree.SubElement(object_node, 'pose').text = 'unknown'
+        ElementTree.SubElement(object_node, 'truncated').text = 'unknown'
+        ElementTree.SubElement(object_node, 'occluded').text = '0'
+        bndbox_node = ElementTree.SubElement(object_node, 'bndbox')
+        ElementTree.SubElement(bndbox_node, 'xmin').text = str(annotation.box.x)
+        ElementTree.SubElement(bndbox_node, 'ymin').text = str(annotation.box.y)
+        ElementTree.SubElement(bndbox_node, 'xmax').text = str(annotation.box.x + annotation.box.w - 1)
+        ElementTree.SubElement(bndbox_node, 'ymax').text = str(annotation.box.y + annotation.box.h - 1)
+        ElementTree.SubElement(bndbox_node, 'rotate_angle').text = f"{annotation.box.rotate_angle:.4f}"
+        ElementTree.SubElement(object_node, 'difficult').text = '0'
+        ElementTree.SubElement(object_node, 'box_quality').text = f"{annotation.anno_quality:.4f}"
+        ElementTree.SubElement(object_node, 'confidence').text = f"{annotation.score:.4f}"
+    return ElementTree.tostring(element=annotation_node, encoding='unicode')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=50000)
+    parser.add_argument('--boxes-per-asset', type=int, default=10)
+    parser.add_argument('--anno-workers', type=int, default=4)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/export_anno')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    media_location = os.path.join(args.root, 'media')
+    os.makedirs(media_location)
+    mir_metadatas = mirpb.MirMetadatas()
+    mir_annotations = mirpb.MirAnnotations()
+    for idx in range(args.assets):
+        asset_id = f"{idx * 2654435761 % (1 << 160):040x}"
+        open(mir_storage.get_asset_storage_path(location=media_location, hash=asset_id), 'wb').close()
+        attributes = mir_metadatas.attributes[asset_id]
+        attributes.asset_type = mirpb.AssetType.AssetTypeImageJpeg
+        attributes.width, attributes.height, attributes.image_channels = 640, 480, 3
+        image_annotations = mir_annotations.prediction.image_annotations[asset_id]
+        for box_idx in range(args.boxes_per_asset):
+            annotation = image_annotations.boxes.add()
+            annotation.index = box_idx
+            annotation.class_id = (idx + box_idx) % len(_CLASS_NAMES)
+            annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h = box_idx, idx % 400, 30, 40
+            annotation.score = 0.5
+    cls_id_mgr = UserLabels(labels=[{'id': idx, 'name': name} for idx, name in enumerate(_CLASS_NAMES)])
+
+    runs = [
+        ('legacy', exporter.AnnoArchiveFormat.NONE, 0, _legacy_voc),
+        ('template', exporter.AnnoArchiveFormat.NONE, 0, None),
+        ('tar', exporter.AnnoArchiveFormat.TAR, 0, None),
+        ('zip', exporter.AnnoArchiveFormat.ZIP, 0, None),
+        ('pool', exporter.AnnoArchiveFormat.NONE, args.anno_workers, None),
+        ('pool-tar', exporter.AnnoArchiveFormat.TAR, args.anno_workers, None),
+        ('pool-zip', exporter.AnnoArchiveFormat.ZIP, args.anno_workers, None),
+    ]
+    try:
+        for name, anno_archive, anno_workers, voc_func in runs:
+            dst_dir = os.path.join(args.root, 'dst')
+            ec = mirpb.ExportConfig(asset_format=mirpb.AssetFormat.AF_RAW,
+                                    asset_dir=os.path.join(dst_dir, 'assets'),
+                                    media_location=media_location,
+                                    need_sub_folder=True,
+                                    anno_format=mirpb.AnnoFormat.AF_VOC_XML,
+                                    pred_dir=os.path.join(dst_dir, 'pred'))
+            with mock.patch.object(exporter, '_single_image_annotations_to_voc',
+                                   voc_func or exporter._single_image_annotations_to_voc), \
+                    mock.patch.object(mir_settings, 'EXPORT_ANNO_POOL_MIN_ASSETS', 0):
+                start = time.time()
+                exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas,
+                                                ec=ec,
+                                                mir_annotations=mir_annotations,
+                                                cls_id_mgr=cls_id_mgr,
+                                                link_mode=exporter.ExportLinkMode.SYMLINK,
+                                                anno_archive=anno_archive,
+                                                anno_workers=anno_workers)
+                seconds = time.time() - start
+            anno_files = sum(len(file_names) for _, _, file_names in os.walk(ec.pred_dir))
+            print(f"{name:>8}: {args.assets} assets, {seconds:.3f}s, {args.assets / seconds:.1f} assets/s, "
+                  f"{anno_files} files in pred dir")
+            shutil.rmtree(dst_dir)
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
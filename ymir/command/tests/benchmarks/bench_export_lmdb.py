@@ -0,0 +1,91 @@
+"""
+benchmark: export small assets in raw and lmdb asset format, and read them back as an executor does,
+one open per file vs. zero-copy buffers from one memory mapped lmdb
+
+usage: python -m tests.benchmarks.bench_export_lmdb [--assets 20000] [--asset-size 20000] [--workers 8]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import time
+
+import lmdb
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import exporter, mir_storage, settings
+
+
+def _prepare_assets(media_location: str, assets: int, asset_size: int) -> mirpb.MirMetadatas:
+    mir_metadatas = mirpb.MirMetadatas()
+    for idx in range(assets):
+        asset_id = f"{idx:040x}"
+        with open(mir_storage.get_asset_storage_path(location=media_location, hash=asset_id), 'wb') as f:
+            f.write(os.urandom(asset_size))
+        attributes = mir_metadatas.attributes[asset_id]
+        attributes.asset_type = mirpb.AssetType.AssetTypeImageJpeg
+        attributes.byte_size = asset_size
+    return mir_metadatas
+
+
+def _read_raw(index_file: str) -> int:
+    total = 0
+    with open(index_file, 'r') as idx_f:
+        for line in idx_f:
+            with open(line.strip(), 'rb') as f:
+                total += len(f.read())
+    return total
+
+
+def _read_lmdb(index_file: str, lmdb_dir: str) -> int:
+    total = 0
+    lmdb_env = lmdb.open(lmdb_dir, readonly=True, lock=False, readahead=False)
+    with lmdb_env.begin(buffers=True) as txn, open(index_file, 'r') as idx_f:
+        for line in idx_f:
+            total += len(txn.get(line.strip().encode()))
+    lmdb_env.close()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=20000)
+    parser.add_argument('--asset-size', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/export_lmdb')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    media_location = os.path.join(args.root, 'media')
+    os.makedirs(media_location)
+    mir_metadatas = _prepare_assets(media_location=media_location, assets=args.assets, asset_size=args.asset_size)
+
+    try:
+        for asset_format, name in [(mirpb.AssetFormat.AF_RAW, 'raw'), (mirpb.AssetFormat.AF_LMDB, 'lmdb')]:
+            ec = mirpb.ExportConfig(asset_format=asset_format,
+                                    asset_dir=os.path.join(args.root, f"dst-{name}"),
+                                    media_location=media_location,
+                                    need_sub_folder=True,
+                                    anno_format=mirpb.AnnoFormat.AF_NO_ANNOS)
+            start = time.time()
+            exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas, ec=ec, workers=args.workers)
+            export_seconds = time.time() - start
+
+            os.system('sync')
+            start = time.time()
+            if asset_format == mirpb.AssetFormat.AF_RAW:
+                total = _read_raw(ec.asset_index_file)
+            else:
+                total = _read_lmdb(ec.asset_index_file, os.path.join(ec.asset_dir, settings.LMDB_EXPORT_DIR_NAME))
+            read_seconds = time.time() - start
+            print(f"{name:>5}: export {export_seconds:.3f}s, read {args.assets} assets ({total} bytes) "
+                  f"{read_seconds:.3f}s, {args.assets / read_seconds:.1f} assets/s")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
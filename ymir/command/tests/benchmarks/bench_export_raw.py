@@ -0,0 +1,80 @@
+"""
+benchmark: export raw assets to a work dir, as training and mining do,
+serial locate, stat and copy (previous implementation) vs. worker pool with each link mode
+
+usage: python -m tests.benchmarks.bench_export_raw [--assets 5000] [--asset-size 200000] [--workers 8]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import time
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import exporter, mir_storage
+
+
+def _serial_export(mir_metadatas: mirpb.MirMetadatas, media_location: str, asset_dir: str) -> None:
+    for asset_id in mir_metadatas.attributes:
+        asset_src_file = mir_storage.locate_asset_path(location=media_location, hash=asset_id)
+        sub_dir = os.path.join(asset_dir, asset_id[-2:])
+        os.makedirs(sub_dir, exist_ok=True)
+        asset_abs_file = os.path.join(sub_dir, f"{asset_id}.jpg")
+        if not os.path.isfile(asset_abs_file) or os.stat(asset_src_file).st_size != os.stat(asset_abs_file).st_size:
+            shutil.copyfile(asset_src_file, asset_abs_file)
+
+
+def _prepare_assets(media_location: str, assets: int, asset_size: int) -> mirpb.MirMetadatas:
+    mir_metadatas = mirpb.MirMetadatas()
+    for idx in range(assets):
+        asset_id = f"{idx:040x}"
+        with open(mir_storage.get_asset_storage_path(location=media_location, hash=asset_id), 'wb') as f:
+            f.write(os.urandom(asset_size))
+        mir_metadatas.attributes[asset_id].asset_type = mirpb.AssetType.AssetTypeImageJpeg
+    return mir_metadatas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=5000)
+    parser.add_argument('--asset-size', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/export_raw')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    media_location = os.path.join(args.root, 'assets')
+    os.makedirs(media_location)
+    mir_metadatas = _prepare_assets(media_location=media_location, assets=args.assets, asset_size=args.asset_size)
+    total_mbytes = args.assets * args.asset_size / 1024 / 1024
+
+    def _pool_export(asset_dir: str, link_mode: exporter.ExportLinkMode) -> None:
+        ec = mirpb.ExportConfig(asset_format=mirpb.AssetFormat.AF_RAW,
+                                asset_dir=asset_dir,
+                                media_location=media_location,
+                                need_sub_folder=True,
+                                anno_format=mirpb.AnnoFormat.AF_NO_ANNOS)
+        exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas, ec=ec, link_mode=link_mode, workers=args.workers)
+
+    runs = [('serial', lambda dst: _serial_export(mir_metadatas, media_location, dst))]
+    runs.extend((f"pool-{mode.value}", lambda dst, mode=mode: _pool_export(dst, mode))  # type: ignore
+                for mode in exporter.ExportLinkMode)
+    try:
+        for name, run in runs:
+            for attempt in ['fresh', 'again']:
+                dst = os.path.join(args.root, f"dst-{name}")
+                start = time.time()
+                run(dst)
+                cost = time.time() - start
+                print(f"{name:>14} {attempt}: {args.assets} assets, {cost:.3f}s, {args.assets / cost:.1f} assets/s, "
+                      f"{total_mbytes / cost:.1f} MB/s")
+            shutil.rmtree(dst)
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+benchmark: syscalls of raw export with index files,
+three passes over assets with paths recomputed and sub dirs made for each file (previous implementation)
+    vs. single pass with paths computed once and sub dirs made once,
+assets are symlinked so the counts are dominated by paths and index files,
+mkdir / open / symlink are counted by audit hooks, read / write syscalls by `/proc/self/io`
+
+usage: python -m tests.benchmarks.bench_export_raw_index [--assets 1000000] [--anno-format ark]
+"""
+
+import argparse
+from collections import Counter
+import logging
+import os
+import shutil
+import sys
+import time
+from typing import Callable, Dict
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import exporter, mir_storage
+
+_AUDIT_EVENTS = {'os.mkdir', 'open', 'os.symlink'}
+_audit_counter: Counter = Counter()
+
+
+def _audit_hook(event: str, args: tuple) -> None:
+    if event in _AUDIT_EVENTS:
+        _audit_counter[event] += 1
+
+
+def _proc_io() -> Dict[str, int]:
+    with open('/proc/self/io', 'r') as f:
+        return {k: int(v) for k, v in (line.split(': ') for line in f.read().splitlines())}
+
+
+def _legacy_export(mir_metadatas: mirpb.MirMetadatas, mir_annotations: mirpb.MirAnnotations,
+                   ec: mirpb.ExportConfig) -> None:
+    # previous implementation: assets, annotations and index lines in separated passes
+    index_asset_f = open(ec.asset_index_file, 'w')
+    os.makedirs(ec.pred_dir, exist_ok=True)
+    index_pred_f = open(ec.pred_index_file, 'w')
+    for asset_id, attributes in mir_metadatas.attributes.items():
+        asset_abs_file, asset_idx_file = exporter._gen_abs_idx_file_path(abs_dir=ec.asset_dir,
+                                                                         idx_prefix=ec.asset_index_prefix,
+                                                                         file_name=asset_id,
+                                                                         file_ext='jpg',
+                                                                         need_sub_folder=ec.need_sub_folder)
+        exporter._export_asset(ec.media_location, asset_id, asset_abs_file, exporter.ExportLinkMode.SYMLINK)
+        index_asset_f.write(f"{asset_idx_file}\n")
+
+    if ec.anno_format == mirpb.AnnoFormat.AF_NO_ANNOS:
+        index_asset_f.close()
+        index_pred_f.close()
+        return
+
+    for asset_id, attributes in mir_metadatas.attributes.items():
+        _, asset_idx_file = exporter._gen_abs_idx_file_path(abs_dir=ec.asset_dir,
+                                                            idx_prefix=ec.asset_index_prefix,
+                                                            file_name=asset_id,
+                                                            file_ext='jpg',
+                                                            need_sub_folder=ec.need_sub_folder)
+        anno_abs_file, _ = exporter._gen_abs_idx_file_path(abs_dir=ec.pred_dir,
+                                                           idx_prefix='',
+                                                           file_name=asset_id,
+                                                           file_ext='txt',
+                                                           need_sub_folder=ec.need_sub_folder)
+        with open(anno_abs_file, 'w') as af:
+            af.write(
+                exporter._single_image_annotations_to_det_ark(
+                    attributes=attributes,
+                    image_annotations=mir_annotations.prediction.image_annotations[asset_id],
+                    image_cks=None,
+                    class_ids_mapping=None,
+                    cls_id_mgr=None,
+                    asset_filename=asset_idx_file))
+
+    for asset_id, attributes in mir_metadatas.attributes.items():
+        _, asset_idx_file = exporter._gen_abs_idx_file_path(abs_dir=ec.asset_dir,
+                                                            idx_prefix=ec.asset_index_prefix,
+                                                            file_name=asset_id,
+                                                            file_ext='jpg',
+                                                            need_sub_folder=ec.need_sub_folder)
+        _, pred_idx_file = exporter._gen_abs_idx_file_path(abs_dir=ec.pred_dir,
+                                                           idx_prefix=ec.pred_index_prefix,
+                                                           file_name=asset_id,
+                                                           file_ext='txt',
+                                                           need_sub_folder=ec.need_sub_folder)
+        index_pred_f.write(f"{asset_idx_file}\t{pred_idx_file}\n")
+    index_asset_f.close()
+    index_pred_f.close()
+
+
+def _export(mir_metadatas: mirpb.MirMetadatas, mir_annotations: mirpb.MirAnnotations,
+            ec: mirpb.ExportConfig) -> None:
+    exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas,
+                                    ec=ec,
+                                    mir_annotations=mir_annotations,
+                                    link_mode=exporter.ExportLinkMode.SYMLINK,
+                                    workers=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=1000000)
+    parser.add_argument('--anno-format', type=str, default='ark', choices=['ark', 'none'])
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/export_raw_index')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    media_location = os.path.join(args.root, 'media')
+    os.makedirs(media_location)
+    mir_metadatas = mirpb.MirMetadatas()
+    mir_annotations = mirpb.MirAnnotations()
+    for idx in range(args.assets):
+        asset_id = f"{idx * 2654435761 % (1 << 160):040x}"
+        open(mir_storage.get_asset_storage_path(location=media_location, hash=asset_id), 'wb').close()
+        mir_metadatas.attributes[asset_id].asset_type = mirpb.AssetType.AssetTypeImageJpeg
+        box = mir_annotations.prediction.image_annotations[asset_id].boxes.add()
+        box.box.x, box.box.y, box.box.w, box.box.h = 1, 2, 3, 4
+    anno_format = mirpb.AnnoFormat.AF_ARK_TXT if args.anno_format == 'ark' else mirpb.AnnoFormat.AF_NO_ANNOS
+    sys.addaudithook(_audit_hook)
+
+    runs: Dict[str, Callable[[mirpb.MirMetadatas, mirpb.MirAnnotations, mirpb.ExportConfig], None]] = {
+        'legacy': _legacy_export,
+        'single pass': _export,
+    }
+    try:
+        for name, run in runs.items():
+            dst_dir = os.path.join(args.root, 'dst')
+            ec = mirpb.ExportConfig(asset_format=mirpb.AssetFormat.AF_RAW,
+                                    asset_dir=os.path.join(dst_dir, 'assets'),
+                                    asset_index_file=os.path.join(dst_dir, 'index.tsv'),
+                                    asset_index_prefix='/in/assets',
+                                    media_location=media_location,
+                                    need_sub_folder=True,
+                                    anno_format=anno_format,
+                                    pred_dir=os.path.join(dst_dir, 'pred'),
+                                    pred_index_file=os.path.join(dst_dir, 'pred-index.tsv'),
+                                    pred_index_prefix='/in/pred')
+            os.makedirs(ec.asset_dir)
+
+            _audit_counter.clear()
+            io_start = _proc_io()
+            start = time.time()
+            run(mir_metadatas, mir_annotations, ec)
+            seconds = time.time() - start
+            io_end = _proc_io()
+            counts = ', '.join(f"{event}: {_audit_counter[event]}" for event in sorted(_AUDIT_EVENTS))
+            print(f"{name:>12}: {args.assets} assets, {seconds:.3f}s, {counts}, "
+                  f"read: {io_end['syscr'] - io_start['syscr']}, write: {io_end['syscw'] - io_start['syscw']}")
+            shutil.rmtree(dst_dir)
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+benchmark: `mir filter` by a rare class,
+scan over parsed annotations (used by the command without a sidecar) vs. class id columns of columnar sidecar
+    (used by the command if the sidecar of src rev exists)
+
+usage: python -m tests.benchmarks.bench_filter_keywords [--assets 20000] [--rare 10]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import time
+
+from mir.commands import filter as cmd_filter
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import class_ids, mir_columnar, mir_storage_ops
+from tests import utils as test_utils
+
+
+def _make_mir_datas(assets: int, rare: int, rng: random.Random) -> tuple:
+    mir_metadatas = mirpb.MirMetadatas()
+    mir_annotations = mirpb.MirAnnotations()
+    for task_annotations in [mir_annotations.prediction, mir_annotations.ground_truth]:
+        task_annotations.type = mirpb.ObjectType.OT_DET
+    rare_asset_idxes = set(rng.sample(range(assets), rare))
+    for asset_idx in range(assets):
+        asset_id = f"a{asset_idx:08d}"
+        mir_metadatas.attributes[asset_id].byte_size = 100000
+        for task_annotations in [mir_annotations.prediction, mir_annotations.ground_truth]:
+            for index in range(4):
+                annotation = task_annotations.image_annotations[asset_id].boxes.add()
+                annotation.index, annotation.class_id = index, rng.randint(0, 8)
+            if asset_idx in rare_asset_idxes:
+                annotation.class_id = 9
+    return mir_metadatas, mir_annotations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=20000)
+    parser.add_argument('--rare', type=int, default=10)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/filter_keywords')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    os.makedirs(args.root)
+    test_utils.prepare_labels(mir_root=args.root, names=[f"c{idx}" for idx in range(10)])
+    test_utils.mir_repo_init(args.root)
+
+    mir_metadatas, mir_annotations = _make_mir_datas(assets=args.assets, rare=args.rare, rng=random.Random(0))
+    mir_storage_ops.MirStorageOps.save_and_commit(
+        mir_root=args.root,
+        mir_branch='a',
+        his_branch='master',
+        mir_datas={
+            mirpb.MirStorage.MIR_METADATAS: mir_metadatas,
+            mirpb.MirStorage.MIR_ANNOTATIONS: mir_annotations
+        },
+        task=mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeImportData,
+                                                task_id='t0',
+                                                message='import'),
+        evaluate_policy=mir_storage_ops.EvaluatePolicy.OFF)
+    label_storage_file = class_ids.ids_file_path(args.root)
+
+    try:
+        start = time.time()
+        mir_metadatas, mir_annotations = mir_storage_ops.MirStorageOps.load_multiple_storages(
+            mir_root=args.root,
+            mir_branch='a',
+            mir_task_id='t0',
+            ms_list=[mirpb.MirStorage.MIR_METADATAS, mirpb.MirStorage.MIR_ANNOTATIONS],
+            as_dict=False)
+        print(f"{'load':>10}: metadatas and annotations, {time.time() - start:.3f}s")
+
+        start = time.time()
+        blob_hash = mir_columnar.locate_annotations_blob(mir_root=args.root, rev='a@t0')
+        mir_columnar.write_annotations_sidecar(mir_root=args.root, mir_annotations=mir_annotations, blob_hash=blob_hash)
+        print(f"{'sidecar':>10}: write, {time.time() - start:.3f}s")
+        columnar_annotations = mir_columnar.open_annotations_sidecar(mir_root=args.root, blob_hash=blob_hash)
+
+        runs = [
+            ('scan', dict(mir_annotations=mir_annotations)),
+            ('columnar', dict(mir_annotations=None, columnar_annotations=columnar_annotations)),
+        ]
+        for name, kwargs in runs:
+            start = time.time()
+            asset_ids = cmd_filter.match_asset_ids(mir_metadatas=mir_metadatas,
+                                                   label_storage_file=label_storage_file,
+                                                   in_cis='c9',
+                                                   ex_cis='',
+                                                   filter_anno_src=mirpb.AnnotationType.AT_ANY,
+                                                   **kwargs)
+            print(f"{name:>10}: {args.assets} assets, matched {len(asset_ids)}, {time.time() - start:.3f}s")
+
+        # the command, with and without the sidecar of src rev
+        for name, dst_rev, with_sidecar in [('command', 'b@t1', False), ('command', 'c@t2', True)]:
+            if not with_sidecar:
+                shutil.rmtree(mir_columnar.sidecar_root(args.root))
+            elif not mir_columnar.open_annotations_sidecar(mir_root=args.root, blob_hash=blob_hash):
+                mir_columnar.write_annotations_sidecar(mir_root=args.root,
+                                                       mir_annotations=mir_annotations,
+                                                       blob_hash=blob_hash)
+            start = time.time()
+            cmd_filter.CmdFilter.run_with_args(mir_root=args.root,
+                                               label_storage_file=label_storage_file,
+                                               in_cis='c9',
+                                               ex_cis='',
+                                               filter_anno_src=mirpb.AnnotationType.AT_ANY,
+                                               src_revs='a@t0',
+                                               dst_rev=dst_rev,
+                                               work_dir='',
+                                               evaluate_policy=mir_storage_ops.EvaluatePolicy.OFF)
+            print(f"{name:>10}: mir filter, {'with' if with_sidecar else 'without'} sidecar, "
+                  f"{time.time() - start:.3f}s")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
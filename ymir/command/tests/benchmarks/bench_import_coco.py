@@ -0,0 +1,136 @@
+"""
+benchmark: import coco json annotations with duplicated and zero size objects,
+protobuf built for each object then deduped by string signatures over whole dataset (previous implementation)
+    vs. boxes checked and deduped by tuple keys scoped per asset before protobuf built
+
+usage: python -m tests.benchmarks.bench_import_coco [--images 20000] [--objects-per-image 20] [--duplicate-ratio 0.2]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import time
+import tracemalloc
+from typing import Dict, List
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import annotations, class_ids
+from tests import utils as test_utils
+
+_CLASS_NAMES = [f"c{idx}" for idx in range(20)]
+
+
+def _legacy_import(file_name_to_asset_ids: Dict[str, str], coco_dict: dict, label_storage_file: str,
+                   image_annotations: mirpb.SingleTaskAnnotations) -> None:
+    # previous implementation of the annotations loop, strategy ignore
+    image_id_to_hashes = {v['id']: file_name_to_asset_ids[v['file_name']] for v in coco_dict['images']}
+    category_id_to_names = {v['id']: v['name'] for v in coco_dict['categories']}
+    class_type_manager = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
+
+    known_signatures = set()
+    for anno_dict in coco_dict['annotations']:
+        obj_anno = annotations._coco_object_dict_to_annotation(anno_dict=anno_dict,
+                                                               category_id_to_names=category_id_to_names)
+        if not obj_anno or obj_anno.box.w <= 0 or obj_anno.box.h <= 0:
+            continue
+        obj_anno.class_id, obj_anno.class_name = class_type_manager.id_and_main_name_for_name(obj_anno.class_name)
+        if obj_anno.class_id < 0:
+            continue
+
+        asset_hash = image_id_to_hashes[anno_dict['image_id']]
+        signature = (f"{asset_hash}-{obj_anno.class_name}-{obj_anno.box.x}-{obj_anno.box.y}-{obj_anno.box.w}"
+                     f"-{obj_anno.box.h}-{obj_anno.box.rotate_angle}")
+        if signature in known_signatures:
+            continue
+        known_signatures.add(signature)
+
+        obj_anno.index = len(image_annotations.image_annotations[asset_hash].boxes)
+        image_annotations.image_annotations[asset_hash].boxes.append(obj_anno)
+
+
+def _coco_dict(images: int, objects_per_image: int, duplicate_ratio: float) -> dict:
+    rng = random.Random(0)
+    annotations_list: List[dict] = []
+    for image_id in range(images):
+        for obj_idx in range(objects_per_image):
+            if annotations_list and rng.random() < duplicate_ratio:
+                anno_dict = dict(annotations_list[-1])
+            else:
+                anno_dict = {'image_id': image_id, 'category_id': rng.randrange(len(_CLASS_NAMES)),
+                             'bbox': [obj_idx * 10, rng.randrange(400), 30, rng.choice([0, 40, 40, 40])],
+                             'iscrowd': 0}
+            anno_dict['id'] = len(annotations_list)
+            annotations_list.append(anno_dict)
+    return {
+        'images': [{'id': image_id, 'file_name': f"{image_id:08d}.jpg", 'height': 480, 'width': 640}
+                   for image_id in range(images)],
+        'categories': [{'id': idx, 'name': name} for idx, name in enumerate(_CLASS_NAMES)],
+        'annotations': annotations_list,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=20000)
+    parser.add_argument('--objects-per-image', type=int, default=20)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.2)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/import_coco')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    os.makedirs(args.root)
+    test_utils.prepare_labels(mir_root=args.root, names=_CLASS_NAMES)
+    label_storage_file = class_ids.ids_file_path(args.root)
+    coco_dict = _coco_dict(images=args.images,
+                           objects_per_image=args.objects_per_image,
+                           duplicate_ratio=args.duplicate_ratio)
+    with open(os.path.join(args.root, 'coco-annotations.json'), 'w') as f:
+        json.dump(coco_dict, f)
+    file_name_to_asset_ids = {f"{image_id:08d}.jpg": f"{image_id:040x}" for image_id in range(args.images)}
+    objects = len(coco_dict['annotations'])
+
+    def _legacy(image_annotations: mirpb.SingleTaskAnnotations) -> None:
+        # json loaded again here, as current implementation streams it from file
+        with open(os.path.join(args.root, 'coco-annotations.json'), 'r') as f:
+            _legacy_import(file_name_to_asset_ids=file_name_to_asset_ids,
+                           coco_dict=json.load(f),
+                           label_storage_file=label_storage_file,
+                           image_annotations=image_annotations)
+
+    def _import(image_annotations: mirpb.SingleTaskAnnotations) -> None:
+        annotations.import_annotations_coco_json(file_name_to_asset_ids=file_name_to_asset_ids,
+                                                 mir_annotation=mirpb.MirAnnotations(),
+                                                 annotations_dir_path=args.root,
+                                                 label_storage_file=label_storage_file,
+                                                 unknown_types_strategy=annotations.UnknownTypesStrategy.IGNORE,
+                                                 image_annotations=image_annotations,
+                                                 accu_new_class_names=set())
+
+    try:
+        expected = None
+        for name, run in [('legacy', _legacy), ('tuple keys', _import)]:
+            image_annotations = mirpb.SingleTaskAnnotations()
+            start = time.time()
+            run(image_annotations)
+            seconds = time.time() - start
+
+            # memory traced in a separated run, tracing slows down the timed one
+            tracemalloc.start()
+            run(mirpb.SingleTaskAnnotations())
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            expected = expected or image_annotations
+            kept = sum(len(v.boxes) for v in image_annotations.image_annotations.values())
+            print(f"{name:>10}: {objects} objects, {kept} kept, {seconds:.3f}s, {objects / seconds:.1f} objects/s, "
+                  f"peak traced memory: {peak / 1024 / 1024:.1f} MB, same as legacy: {expected == image_annotations}")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
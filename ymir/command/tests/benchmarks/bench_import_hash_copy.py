@@ -0,0 +1,80 @@
+"""
+benchmark: hash and copy assets for `mir import`,
+serial hash-then-copy (previous implementation) vs. worker pool with single pass hash and copy
+
+usage: python -m tests.benchmarks.bench_import_hash_copy [--assets 2000] [--asset-size 200000] [--workers 8]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import time
+
+from mir.commands.import_dataset import _generate_sha_and_copy
+from mir.tools.mir_storage import get_asset_storage_path
+from mir.tools.phase_logger import PhaseLoggerCenter
+
+
+def _serial_hash_and_copy(index_file: str, sha_folder: str) -> None:
+    os.makedirs(sha_folder, exist_ok=True)
+    with open(index_file) as f:
+        for line in f:
+            media_src = line.strip()
+            h = hashlib.sha1()
+            with open(media_src, 'rb') as media_f:
+                chunk = b'0'
+                while chunk != b'':
+                    chunk = media_f.read(h.block_size)
+                    h.update(chunk)
+            media_dst = get_asset_storage_path(location=sha_folder, hash=h.hexdigest())
+            if not os.path.isfile(media_dst):
+                shutil.copyfile(media_src, media_dst)
+
+
+def _prepare_assets(root: str, assets: int, asset_size: int) -> str:
+    src_dir = os.path.join(root, 'src')
+    os.makedirs(src_dir, exist_ok=True)
+    index_file = os.path.join(root, 'index.tsv')
+    with open(index_file, 'w') as idx_f:
+        for i in range(assets):
+            asset_path = os.path.join(src_dir, f"{i}.jpg")
+            with open(asset_path, 'wb') as f:
+                f.write(os.urandom(asset_size))
+            idx_f.write(f"{asset_path}\n")
+    return index_file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=2000)
+    parser.add_argument('--asset-size', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/import_hash_copy')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    index_file = _prepare_assets(root=args.root, assets=args.assets, asset_size=args.asset_size)
+    PhaseLoggerCenter.create_phase_loggers(top_phase='import', monitor_file=None, task_name='bench')
+    total_mbytes = args.assets * args.asset_size / 1024 / 1024
+
+    runs = [
+        ('serial', lambda dst: _serial_hash_and_copy(index_file, dst)),
+        ('pool-copy', lambda dst: _generate_sha_and_copy(index_file, dst, workers=args.workers)),
+        ('pool-hardlink', lambda dst: _generate_sha_and_copy(index_file, dst, workers=args.workers, hardlink=True)),
+    ]
+    try:
+        for name, run in runs:
+            dst = os.path.join(args.root, f"dst-{name}")
+            start = time.time()
+            run(dst)
+            cost = time.time() - start
+            print(f"{name:>14}: {args.assets} assets, {cost:.3f}s, {args.assets / cost:.1f} assets/s, "
+                  f"{total_mbytes / cost:.1f} MB/s")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
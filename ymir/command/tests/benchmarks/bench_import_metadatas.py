@@ -0,0 +1,76 @@
+"""
+benchmark: extract metadatas for `mir import`,
+serial PIL open (previous implementation) vs. header parsers, serial and in worker pool
+
+usage: python -m tests.benchmarks.bench_import_metadatas [--assets 5000] [--workers 8]
+"""
+
+import argparse
+import os
+import shutil
+import time
+from unittest import mock
+
+from PIL import Image
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import metadatas, mir_storage
+from mir.tools.phase_logger import PhaseLoggerCenter
+
+
+def _prepare_assets(root: str, assets: int) -> dict:
+    src_dir = os.path.join(root, 'src')
+    assets_root = os.path.join(root, 'assets')
+    os.makedirs(src_dir, exist_ok=True)
+    os.makedirs(assets_root, exist_ok=True)
+    file_name_to_asset_ids = {}
+    for i in range(assets):
+        fmt, ext = [('JPEG', 'jpg'), ('PNG', 'png'), ('BMP', 'bmp')][i % 3]
+        asset_path = os.path.join(src_dir, f"{i}.{ext}")
+        Image.new('RGB', (320 + i % 320, 240), color=(i % 256, 0, 0)).save(asset_path, fmt)
+        asset_id, _ = mir_storage.sha1sum_and_store_file(asset_path, assets_root)
+        file_name_to_asset_ids[os.path.basename(asset_path)] = asset_id
+    return file_name_to_asset_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/import_metadatas')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    file_name_to_asset_ids = _prepare_assets(root=args.root, assets=args.assets)
+    assets_root = os.path.join(args.root, 'assets')
+    PhaseLoggerCenter.create_phase_loggers(top_phase='import', monitor_file=None, task_name='bench')
+
+    def _run(workers: int) -> None:
+        metadatas.import_metadatas(mir_metadatas=mirpb.MirMetadatas(),
+                                   file_name_to_asset_ids=dict(file_name_to_asset_ids),
+                                   hashed_asset_root=assets_root,
+                                   phase='import.others',
+                                   workers=workers)
+
+    def _run_pil() -> None:
+        with mock.patch.object(metadatas, '_read_header_type_shape', return_value=None):
+            _run(workers=1)
+
+    runs = [
+        ('serial-pil', _run_pil),
+        ('serial-header', lambda: _run(workers=1)),
+        ('pool-header', lambda: _run(workers=args.workers)),
+    ]
+    try:
+        for name, run in runs:
+            start = time.time()
+            run()
+            cost = time.time() - start
+            print(f"{name:>14}: {args.assets} assets, {cost:.3f}s, {args.assets / cost:.1f} assets/s")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+benchmark: import voc xml annotations,
+two passes over files with `xmltodict` (previous implementation, needs xmltodict installed)
+    vs. one streaming pass in current process, and in worker processes sharded by files
+
+usage: python -m tests.benchmarks.bench_import_voc [--files 20000] [--objects-per-file 10] [--workers 4]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterator, Set, Tuple
+from unittest import mock
+
+import xmltodict
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import annotations, class_ids
+from mir.tools import settings as mir_settings
+from tests import utils as test_utils
+
+_CLASS_NAMES = [f"c{idx}" for idx in range(20)]
+
+
+def _legacy_iter_voc_annos_dict(file_name_to_asset_ids: Dict[str, str],
+                                annotations_dir_path: str) -> Iterator[Tuple[str, dict]]:
+    for filename, asset_hash in file_name_to_asset_ids.items():
+        annotation_file = os.path.join(annotations_dir_path, os.path.splitext(filename)[0] + '.xml')
+        if not os.path.isfile(annotation_file):
+            continue
+        with open(annotation_file, 'r') as f:
+            annos_xml_str = f.read()
+        yield (asset_hash, xmltodict.parse(annos_xml_str)['annotation'])
+
+
+def _legacy_import(file_name_to_asset_ids: Dict[str, str], mir_annotation: mirpb.MirAnnotations,
+                   annotations_dir_path: str, label_storage_file: str) -> None:
+    # previous implementation: first pass for class names, second pass for annotations, strategy ignore
+    class_names: Set[str] = set()
+    for _, annos_dict in _legacy_iter_voc_annos_dict(file_name_to_asset_ids, annotations_dir_path):
+        objects = annos_dict.get('object', [])
+        objects = [objects] if isinstance(objects, dict) else objects
+        class_names.update([obj['name'] for obj in objects if obj.get('name')])
+    class_type_manager = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
+    class_type_manager.id_for_names(list(class_names))
+
+    image_annotations = mir_annotation.ground_truth
+    for asset_hash, annos_dict in _legacy_iter_voc_annos_dict(file_name_to_asset_ids, annotations_dir_path):
+        mir_annotation.image_cks[asset_hash].image_quality = float(annos_dict.get('image_quality', '-1.0'))
+        objects = annos_dict.get('object', [])
+        objects = [objects] if isinstance(objects, dict) else objects
+        known_signatures = set()
+        for object_dict in objects:
+            cid, cname = class_type_manager.id_and_main_name_for_name(name=object_dict['name'])
+            if cid < 0:
+                continue
+            annotation = mirpb.ObjectAnnotation()
+            annotation.class_id = cid
+            annotation.class_name = cname
+            annotation.score = float(object_dict.get('confidence', '-1.0'))
+            annotation.anno_quality = float(object_dict.get('box_quality', '-1.0'))
+            bndbox_dict: Dict[str, Any] = object_dict['bndbox']
+            xmin, ymin = int(float(bndbox_dict['xmin'])), int(float(bndbox_dict['ymin']))
+            annotation.box.x, annotation.box.y = xmin, ymin
+            annotation.box.w = int(float(bndbox_dict['xmax'])) - xmin + 1
+            annotation.box.h = int(float(bndbox_dict['ymax'])) - ymin + 1
+            annotation.box.rotate_angle = float(bndbox_dict.get('rotate_angle', '0.0'))
+            if annotation.box.w <= 0 or annotation.box.h <= 0:
+                continue
+            signature = (f"{asset_hash}-{annotation.class_name}-{annotation.box.x}-{annotation.box.y}"
+                         f"-{annotation.box.w}-{annotation.box.h}-{annotation.box.rotate_angle}")
+            if signature in known_signatures:
+                continue
+            known_signatures.add(signature)
+            annotation.index = len(image_annotations.image_annotations[asset_hash].boxes)
+            image_annotations.image_annotations[asset_hash].boxes.append(annotation)
+
+
+def _write_voc_files(annotations_dir_path: str, files: int, objects_per_file: int) -> Dict[str, str]:
+    file_name_to_asset_ids: Dict[str, str] = {}
+    for idx in range(files):
+        objects = ''.join(f"<object><name>{_CLASS_NAMES[(idx + obj_idx) % len(_CLASS_NAMES)]}</name>"
+                          f"<pose>Unspecified</pose><truncated>0</truncated><difficult>0</difficult>"
+                          f"<bndbox><xmin>{obj_idx}</xmin><ymin>{idx % 400}</ymin><xmax>{obj_idx + 30}</xmax>"
+                          f"<ymax>{idx % 400 + 40}</ymax></bndbox><confidence>0.5</confidence></object>"
+                          for obj_idx in range(objects_per_file))
+        with open(os.path.join(annotations_dir_path, f"{idx:08d}.xml"), 'w') as f:
+            f.write(f"<annotation><folder>VOC</folder><filename>{idx:08d}.jpg</filename>"
+                    f"<size><width>640</width><height>480</height><depth>3</depth></size>"
+                    f"<segmented>0</segmented>{objects}</annotation>")
+        file_name_to_asset_ids[f"{idx:08d}.jpg"] = f"{idx:040x}"
+    return file_name_to_asset_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=20000)
+    parser.add_argument('--objects-per-file', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/import_voc')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    annotations_dir_path = os.path.join(args.root, 'gt')
+    os.makedirs(annotations_dir_path)
+    test_utils.prepare_labels(mir_root=args.root, names=_CLASS_NAMES)
+    label_storage_file = class_ids.ids_file_path(args.root)
+    file_name_to_asset_ids = _write_voc_files(annotations_dir_path=annotations_dir_path,
+                                              files=args.files,
+                                              objects_per_file=args.objects_per_file)
+
+    def _import(workers: int) -> mirpb.MirAnnotations:
+        mir_annotation = mirpb.MirAnnotations()
+        with mock.patch.object(mir_settings, 'IMPORT_ANNO_POOL_MIN_FILES', 0):
+            annotations._import_annotations_voc_xml(file_name_to_asset_ids=file_name_to_asset_ids,
+                                                    mir_annotation=mir_annotation,
+                                                    annotations_dir_path=annotations_dir_path,
+                                                    label_storage_file=label_storage_file,
+                                                    unknown_types_strategy=annotations.UnknownTypesStrategy.IGNORE,
+                                                    accu_new_class_names=set(),
+                                                    image_annotations=mir_annotation.ground_truth,
+                                                    workers=workers)
+        return mir_annotation
+
+    def _legacy() -> mirpb.MirAnnotations:
+        mir_annotation = mirpb.MirAnnotations()
+        _legacy_import(file_name_to_asset_ids=file_name_to_asset_ids,
+                       mir_annotation=mir_annotation,
+                       annotations_dir_path=annotations_dir_path,
+                       label_storage_file=label_storage_file)
+        return mir_annotation
+
+    try:
+        expected = None
+        for name, run in [('legacy', _legacy), ('one pass', lambda: _import(1)),
+                          (f"pool-{args.workers}", lambda: _import(args.workers))]:
+            start = time.time()
+            mir_annotation = run()
+            seconds = time.time() - start
+            expected = expected or mir_annotation
+            print(f"{name:>8}: {args.files} files, {seconds:.3f}s, {args.files / seconds:.1f} files/s, "
+                  f"same as legacy: {expected == mir_annotation}")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+benchmark: read a large detection infer result,
+`json.loads` the whole file and ParseDict each box (previous implementation) vs. streamed per asset with direct
+    field assignments, each mode runs in its own process, and reports its peak rss
+
+usage: python -m tests.benchmarks.bench_infer_result_stream [--boxes 1000000] [--boxes-per-asset 50] [--parse-only]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from google.protobuf import json_format
+
+from mir.commands import infer
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import class_ids, json_stream
+from mir.tools.annotations import UnknownTypesStrategy
+from tests import utils as test_utils
+
+_CLASS_NAMES = [f"c{idx}" for idx in range(20)]
+
+
+def _write_infer_result(file_path: str, boxes: int, boxes_per_asset: int, rng: random.Random) -> None:
+    with open(file_path, 'w') as f:
+        f.write('{"detection": {')
+        for asset_idx in range(boxes // boxes_per_asset):
+            annotations = [{
+                'box': {
+                    'x': rng.randint(0, 1000),
+                    'y': rng.randint(0, 1000),
+                    'w': rng.randint(1, 200),
+                    'h': rng.randint(1, 200),
+                    'rotate_angle': 0.0
+                },
+                'class_name': rng.choice(_CLASS_NAMES),
+                'score': rng.random(),
+            } for _ in range(boxes_per_asset)]
+            f.write(f"{',' if asset_idx else ''}\"a{asset_idx:09d}.jpg\": {json.dumps({'boxes': annotations})}")
+        f.write('}}')
+
+
+def _legacy_parse(file_path: str, label_storage_file: str) -> int:
+    # previous implementation: whole file loaded, then ParseDict for each box
+    with open(file_path, 'r') as f:
+        results = json.loads(f.read())
+    class_id_mgr = class_ids.load_or_create_userlabels(label_storage_file=label_storage_file)
+    task_annotations = mirpb.SingleTaskAnnotations()
+    for asset_name, annotations_dict in results['detection'].items():
+        single_image_annotations = mirpb.SingleImageAnnotations()
+        for annotation_dict in annotations_dict['boxes']:
+            annotation: Any = mirpb.ObjectAnnotation()
+            json_format.ParseDict(annotation_dict['box'], annotation.box)
+            annotation.score = float(annotation_dict['score'])
+            annotation.class_id, annotation.class_name = class_id_mgr.id_and_main_name_for_name(
+                annotation_dict['class_name'])
+            annotation.index = len(single_image_annotations.boxes)
+            single_image_annotations.boxes.append(annotation)
+        task_annotations.image_annotations[asset_name].CopyFrom(single_image_annotations)
+    return sum(len(v.boxes) for v in task_annotations.image_annotations.values())
+
+
+def _stream_parse(file_path: str, label_storage_file: str) -> int:
+    task_annotations = mirpb.SingleTaskAnnotations()
+    infer._process_infer_detbox_result(task_annotations=task_annotations,
+                                       work_dir_out=os.path.dirname(file_path),
+                                       label_storage_file=label_storage_file,
+                                       unknown_types_strategy=UnknownTypesStrategy.IGNORE)
+    return sum(len(v.boxes) for v in task_annotations.image_annotations.values())
+
+
+def _loads_only(file_path: str, label_storage_file: str) -> int:
+    with open(file_path, 'r') as f:
+        results = json.loads(f.read())
+    return sum(len(v['boxes']) for v in results['detection'].values())
+
+
+def _stream_only(file_path: str, label_storage_file: str) -> int:
+    cnt = 0
+    with open(file_path, 'r') as f:
+        reader = json_stream.JsonStreamReader(f)
+        for key in reader.iter_keys():
+            for _, annotations_dict in reader.iter_object_items():
+                cnt += len(annotations_dict['boxes'])
+    return cnt
+
+
+def _run(func: Callable[[str, str], int], file_path: str, label_storage_file: str,
+         results: Dict[str, Tuple[int, float, float]], name: str) -> None:
+    start = time.time()
+    cnt = func(file_path, label_storage_file)
+    seconds = time.time() - start
+    results[name] = (cnt, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--boxes', type=int, default=1000000)
+    parser.add_argument('--boxes-per-asset', type=int, default=50)
+    parser.add_argument('--parse-only', action='store_true', help='only json parsing, no protobuf messages')
+    parser.add_argument('--root', type=str, default='/tmp/mir_cmd_bench/infer_result_stream')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if os.path.isdir(args.root):
+        shutil.rmtree(args.root)
+    os.makedirs(args.root)
+    test_utils.prepare_labels(mir_root=args.root, names=_CLASS_NAMES)
+    label_storage_file = class_ids.ids_file_path(args.root)
+    file_path = os.path.join(args.root, 'infer-result.json')
+    _write_infer_result(file_path=file_path,
+                        boxes=args.boxes,
+                        boxes_per_asset=args.boxes_per_asset,
+                        rng=random.Random(0))
+    print(f"infer result: {os.path.getsize(file_path) / 1024 / 1024:.1f}MB, {args.boxes} boxes")
+
+    try:
+        ctx = multiprocessing.get_context('fork')
+        results = ctx.Manager().dict()
+        runs = [('stream', _stream_only), ('loads', _loads_only)]
+        if not args.parse_only:
+            runs.extend([('legacy pb', _legacy_parse), ('stream pb', _stream_parse)])
+        for name, func in runs:
+            process = ctx.Process(target=_run, args=(func, file_path, label_storage_file, results, name))
+            process.start()
+            process.join()
+            if name not in results:
+                print(f"{name:>10}: failed, exitcode: {process.exitcode}")  # killed by oom for example
+                continue
+            cnt, seconds, rss_mb = results[name]
+            print(f"{name:>10}: {cnt} boxes, {seconds:.3f}s, peak rss {rss_mb:.1f}MB")
+    finally:
+        shutil.rmtree(args.root)
+
+
+if __name__ == '__main__':
+    main()
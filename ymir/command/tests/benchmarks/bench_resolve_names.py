@@ -0,0 +1,53 @@
+"""
+benchmark: resolve class names of boxes, as importers and infer result processing do for each object,
+normalized and looked up for each box (previous implementation)
+    vs. memoized by `ClassNameResolver`, one name at a time and as a whole list
+
+usage: python -m tests.benchmarks.bench_resolve_names [--boxes 10000000] [--classes 80]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from mir.tools import class_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--boxes', type=int, default=10000000)
+    parser.add_argument('--classes', type=int, default=80)
+    args = parser.parse_args()
+
+    # 1 / 4 of class names unknown, raw names in mixed cases as they come from infer results
+    known_classes = args.classes * 3 // 4
+    user_labels = class_ids.UserLabels(labels=[{'id': idx, 'name': f"c{idx}"} for idx in range(known_classes)])
+    raw_names = [f"C{idx}" if idx % 2 else f"c{idx}" for idx in range(args.classes)]
+    rng = random.Random(0)
+    names = [rng.choice(raw_names) for _ in range(args.boxes)]
+
+    def _legacy() -> List[Tuple[int, str]]:
+        return [user_labels.id_and_main_name_for_name(name) for name in names]
+
+    def _resolve() -> List[Tuple[int, str]]:
+        resolver = class_ids.ClassNameResolver(user_labels)
+        return [resolver.resolve(name) for name in names]
+
+    def _resolve_many() -> List[Tuple[int, str]]:
+        return class_ids.ClassNameResolver(user_labels).resolve_many(names)
+
+    runs: List[Tuple[str, Callable[[], List[Tuple[int, str]]]]] = [('legacy', _legacy), ('resolve', _resolve),
+                                                                   ('resolve_many', _resolve_many)]
+    expected = None
+    for name, run in runs:
+        start = time.time()
+        resolved = run()
+        seconds = time.time() - start
+        expected = expected or resolved
+        print(f"{name:>12}: {args.boxes} boxes, {seconds:.3f}s, {args.boxes / seconds:.1f} boxes/s, "
+              f"same as legacy: {expected == resolved}")
+
+
+if __name__ == '__main__':
+    main()
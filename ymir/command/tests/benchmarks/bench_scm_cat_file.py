@@ -0,0 +1,71 @@
+"""
+benchmark: read small mir files by per-call `git rev-parse` + `git cat-file -p`,
+vs. long-lived `git cat-file --batch-check` / `--batch` co-processes
+
+usage: python -m tests.benchmarks.bench_scm_cat_file [--reads 200]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import time
+
+from mir.scm.cmd import CmdScm
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import mir_storage_ops
+from mir.tools.annotations import make_empty_mir_annotations
+from tests import utils as test_utils
+
+
+def _prepare_repo(mir_root: str) -> None:
+    test_utils.remake_dirs(mir_root)
+    test_utils.mir_repo_init(mir_root)
+    task = mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeImportData,
+                                              task_id='t0',
+                                              message='bench')
+    mir_storage_ops.MirStorageOps.save_and_commit(mir_root=mir_root,
+                                                  mir_branch='a',
+                                                  his_branch='master',
+                                                  mir_datas={
+                                                      mirpb.MirStorage.MIR_METADATAS: mirpb.MirMetadatas(),
+                                                      mirpb.MirStorage.MIR_ANNOTATIONS: make_empty_mir_annotations(),
+                                                  },
+                                                  task=task)
+
+
+def _read_per_call(scm_git: CmdScm, obj: str) -> bytes:
+    blob_hash = scm_git.rev_parse(obj)
+    bio = io.BytesIO()
+    scm_git.cat_file(['-p', blob_hash], output_stream=bio)
+    return bio.getvalue()
+
+
+def _read_batch(scm_git: CmdScm, obj: str) -> bytes:
+    blob_hash = scm_git.cat_file_batch_check(obj)[0]
+    return scm_git.cat_file_batch(blob_hash) or b''
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reads', type=int, default=200)
+    parser.add_argument('--mir-root', type=str, default='/tmp/mir_cmd_bench/scm_cat_file')
+    args = parser.parse_args()
+
+    _prepare_repo(args.mir_root)
+    scm_git = CmdScm(args.mir_root, 'git')
+    objs = [f"a@t0:{name}" for name in ['tasks.mir', 'context.mir', 'metadatas.mir', 'keywords.mir']]
+    try:
+        for name, read_func in [('per-call', _read_per_call), ('batch', _read_batch)]:
+            start = time.time()
+            for i in range(args.reads):
+                read_func(scm_git, objs[i % len(objs)])
+            cost = time.time() - start
+            print(f"{name:>10}: {args.reads} reads, {cost:.3f}s, {cost / args.reads * 1000:.3f}ms per read")
+    finally:
+        if os.path.isdir(args.mir_root):
+            shutil.rmtree(args.mir_root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+benchmark: semantic segmentation evaluation,
+dense label images of all assets kept in memory (previous implementation) vs. streaming rle areas per asset,
+    in current process and sharded to worker processes
+
+usage: python -m tests.benchmarks.bench_sem_seg_eval [--assets 400] [--size 1024] [--workers 4]
+"""
+
+import argparse
+from collections import OrderedDict
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from pycocotools import mask as mask_utils
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import settings as mir_settings
+from mir.tools.eval import sem_seg_eval_mm
+
+
+def _make_task_annotations(assets: int, size: int, class_ids: List[int],
+                           rng: np.random.Generator) -> mirpb.SingleTaskAnnotations:
+    task_annotations = mirpb.SingleTaskAnnotations()
+    task_annotations.type = mirpb.ObjectType.OT_SEM_SEG
+    for asset_idx in range(assets):
+        image_annotations = task_annotations.image_annotations[f"a{asset_idx:08d}"]
+        for index, class_id in enumerate(class_ids):
+            mask = np.zeros((size, size), dtype=np.uint8)
+            y, x = rng.integers(0, size // 2, size=2)
+            mask[y:y + size // 3, x:x + size // 3] = 1
+            annotation = image_annotations.boxes.add()
+            annotation.index, annotation.class_id = index, class_id
+            annotation.type = mirpb.ObjectSubType.OST_SEG_MASK
+            annotation.mask = mask_utils.encode(np.asfortranarray(mask))['counts'].decode('utf-8')
+    return task_annotations
+
+
+def _legacy_mean_iou(prediction: mirpb.SingleTaskAnnotations, ground_truth: mirpb.SingleTaskAnnotations,
+                     class_ids: List[int], asset_id_to_hws: Dict[str, Tuple[int, int]]) -> float:
+    # previous implementation: decoded label images of all assets, then histograms over them
+    def _label_image(image_annotations: mirpb.SingleImageAnnotations, hw: Tuple[int, int]) -> np.ndarray:
+        img = np.full(hw, 255, dtype=np.uint8)
+        for annotation in image_annotations.boxes:
+            bitmap = mask_utils.decode({'counts': annotation.mask, 'size': list(hw)})
+            img[bitmap == 1] = class_ids.index(annotation.class_id)
+        return img
+
+    def _images(task_annotations: mirpb.SingleTaskAnnotations) -> List[np.ndarray]:
+        return [
+            _label_image(image_annotations=task_annotations.image_annotations[asset_id], hw=hw)
+            for asset_id, hw in asset_id_to_hws.items()
+        ]
+
+    dts, gts = _images(prediction), _images(ground_truth)
+    num_classes = len(class_ids)
+    total_intersect, total_union = np.zeros(num_classes), np.zeros(num_classes)
+    for dt, gt in zip(dts, gts):
+        mask = gt != 255
+        dt, gt = dt[mask], gt[mask]
+        area_intersect = np.histogram(dt[dt == gt], bins=np.arange(num_classes + 1))[0]
+        area_dt = np.histogram(dt, bins=np.arange(num_classes + 1))[0]
+        area_gt = np.histogram(gt, bins=np.arange(num_classes + 1))[0]
+        total_intersect += area_intersect
+        total_union += area_dt + area_gt - area_intersect
+    return float(np.nanmean(total_intersect / total_union))
+
+
+def _measure(func: Callable[[], Any]) -> Tuple[Any, float, float]:
+    # tracemalloc slows down numpy allocations, time and memory are measured in separated runs
+    start = time.time()
+    result = func()
+    seconds = time.time() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=400)
+    parser.add_argument('--size', type=int, default=1024)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    class_ids = [1, 2, 3]
+    rng = np.random.default_rng(0)
+    prediction = _make_task_annotations(assets=args.assets, size=args.size, class_ids=class_ids, rng=rng)
+    ground_truth = _make_task_annotations(assets=args.assets, size=args.size, class_ids=class_ids, rng=rng)
+    asset_id_to_hws = OrderedDict((asset_id, (args.size, args.size))
+                                  for asset_id in sorted(prediction.image_annotations.keys()))
+
+    mir_settings.SEM_SEG_EVAL_POOL_MIN_ASSETS = 0
+    runs = [
+        ('legacy', lambda: _legacy_mean_iou(prediction, ground_truth, class_ids, asset_id_to_hws)),
+        ('stream', lambda: sem_seg_eval_mm._mir_mean_iou(
+            prediction, ground_truth, class_ids, asset_id_to_hws, workers=0)[0].mIoU),
+        (f"stream x{args.workers}", lambda: sem_seg_eval_mm._mir_mean_iou(
+            prediction, ground_truth, class_ids, asset_id_to_hws, workers=args.workers)[0].mIoU),
+    ]
+    for name, func in runs:
+        miou, seconds, peak_mb = _measure(func)
+        print(f"{name:>10}: {args.assets} assets of {args.size}x{args.size}, mIoU {miou:.6f}, "
+              f"{seconds:.3f}s, peak traced memory {peak_mb:.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -150,6 +150,7 @@ class TestCmdCopy(unittest.TestCase):
         fake_args.data_src_revs = 'a@t0'
         fake_args.dst_rev = 'b@t1'
         fake_args.work_dir = self._work_dir
+        fake_args.evaluate_policy = 'sync'
         fake_args.ignore_unknown_types = True
         fake_args.drop_annotations = False
         cmd_copy = copy.CmdCopy(fake_args)
@@ -168,6 +169,7 @@ class TestCmdCopy(unittest.TestCase):
         fake_args.data_src_revs = 'a@t0'
         fake_args.dst_rev = 'b@t2'
         fake_args.work_dir = self._work_dir
+        fake_args.evaluate_policy = 'sync'
         fake_args.ignore_unknown_types = True
         fake_args.drop_annotations = True
         cmd_copy = copy.CmdCopy(fake_args)
@@ -186,6 +188,7 @@ class TestCmdCopy(unittest.TestCase):
         fake_args.data_src_revs = 'a@t0'
         fake_args.dst_rev = 'b@t1'
         fake_args.work_dir = self._work_dir
+        fake_args.evaluate_policy = 'sync'
         fake_args.ignore_unknown_types = True
         fake_args.drop_annotations = False
         cmd_copy = copy.CmdCopy(fake_args)
@@ -200,6 +203,7 @@ class TestCmdCopy(unittest.TestCase):
         fake_args.data_src_revs = 'a@t0'
         fake_args.dst_rev = 'b@t1'
         fake_args.work_dir = self._work_dir
+        fake_args.evaluate_policy = 'sync'
         fake_args.ignore_unknown_types = True
         fake_args.drop_annotations = False
         cmd_copy = copy.CmdCopy(fake_args)
@@ -216,6 +220,7 @@ class TestCmdCopy(unittest.TestCase):
         fake_args.data_src_revs = 'a@t1'
         fake_args.dst_rev = 'b@t1'
         fake_args.work_dir = self._work_dir
+        fake_args.evaluate_policy = 'sync'
         fake_args.ignore_unknown_types = True
         fake_args.drop_annotations = False
         cmd_copy = copy.CmdCopy(fake_args)
@@ -1,14 +1,20 @@
+import json
 import os
 import shutil
-from typing import List, Tuple
+import tarfile
+from typing import Dict, List, Tuple
 import unittest
+from unittest import mock
+import zipfile
 
 from google.protobuf import json_format
+import lmdb
 
 from mir.commands import export
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools import mir_storage_ops, mir_storage
-from mir.tools.class_ids import ids_file_path
+from mir.tools import exporter, mir_storage_ops, mir_storage
+from mir.tools.class_ids import ids_file_path, load_or_create_userlabels
+from mir.tools import settings as mir_settings
 from mir.tools.code import MirCode
 from mir.tools.mir_storage import sha1sum_for_file
 from tests import utils as test_utils
@@ -219,6 +225,8 @@ class TestCmdExport(unittest.TestCase):
         fake_args.asset_format = 'raw'
         fake_args.class_names = 'person'
         fake_args.work_dir = ''
+        fake_args.link_mode = 'copy'
+        fake_args.anno_archive = 'none'
         runner = export.CmdExport(fake_args)
         result = runner.run()
         self.assertEqual(MirCode.RC_OK, result)
@@ -236,6 +244,168 @@ class TestCmdExport(unittest.TestCase):
         fake_args.asset_format = 'raw'
         fake_args.class_names = 'person'
         fake_args.work_dir = ''
+        fake_args.link_mode = 'copy'
+        fake_args.anno_archive = 'none'
         runner = export.CmdExport(fake_args)
         result = runner.run()
         self.assertNotEqual(MirCode.RC_OK, result)
+
+    def test_link_modes_00(self):
+        def _export(link_mode: exporter.ExportLinkMode) -> List[Tuple[str, str]]:
+            mir_metadatas: mirpb.MirMetadatas = mir_storage_ops.MirStorageOps.load_single_storage(
+                mir_root=self._mir_root, mir_branch='a', mir_task_id='a', ms=mirpb.MirStorage.MIR_METADATAS)
+            ec = mirpb.ExportConfig(asset_format=mirpb.AssetFormat.AF_RAW,
+                                    asset_dir=self._dest_root,
+                                    media_location=self._assets_location,
+                                    need_sub_folder=True,
+                                    anno_format=mirpb.AnnoFormat.AF_NO_ANNOS)
+            self.assertEqual(MirCode.RC_OK,
+                             exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas,
+                                                             ec=ec,
+                                                             link_mode=link_mode,
+                                                             workers=2))
+            with open(ec.asset_index_file, 'r') as f:
+                dst_files = f.read().splitlines()
+            self.assertEqual(len(mir_metadatas.attributes), len(dst_files))
+            return [(mir_storage.locate_asset_path(location=self._assets_location, hash=asset_id), dst_file)
+                    for asset_id, dst_file in zip(mir_metadatas.attributes, dst_files)]
+
+        for src_file, dst_file in _export(exporter.ExportLinkMode.HARDLINK):
+            self.assertTrue(os.path.samefile(src_file, dst_file))
+        for src_file, dst_file in _export(exporter.ExportLinkMode.SYMLINK):
+            self.assertEqual(src_file, os.readlink(dst_file))
+        # links replaced by real copies
+        for mode in [exporter.ExportLinkMode.COPY, exporter.ExportLinkMode.REFLINK]:
+            shutil.rmtree(self._dest_root)
+            os.makedirs(self._dest_root)
+            for src_file, dst_file in _export(mode):
+                self.assertFalse(os.path.islink(dst_file))
+                self.assertFalse(os.path.samefile(src_file, dst_file))
+                self.assertEqual(sha1sum_for_file(src_file), sha1sum_for_file(dst_file))
+
+    def test_lmdb_00(self):
+        def _export(asset_format: "mirpb.AssetFormat.V", anno_format: "mirpb.AnnoFormat.V", dst_dir: str) -> None:
+            mir_metadatas, mir_annotations = mir_storage_ops.MirStorageOps.load_multiple_storages(
+                mir_root=self._mir_root,
+                mir_branch='a',
+                mir_task_id='a',
+                ms_list=[mirpb.MirStorage.MIR_METADATAS, mirpb.MirStorage.MIR_ANNOTATIONS])
+            ec = mirpb.ExportConfig(asset_format=asset_format,
+                                    asset_dir=os.path.join(dst_dir, 'assets'),
+                                    media_location=self._assets_location,
+                                    need_sub_folder=False,
+                                    anno_format=anno_format,
+                                    pred_dir=os.path.join(dst_dir, 'pred'))
+            self.assertEqual(MirCode.RC_OK,
+                             exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas,
+                                                             ec=ec,
+                                                             mir_annotations=mir_annotations,
+                                                             cls_id_mgr=load_or_create_userlabels(
+                                                                 label_storage_file=ids_file_path(self._mir_root))))
+
+        raw_dir = os.path.join(self._dest_root, 'raw')
+        _export(mirpb.AssetFormat.AF_RAW, mirpb.AnnoFormat.AF_ARK_TXT, raw_dir)
+        lmdb_dir = os.path.join(self._dest_root, 'lmdb')
+        _export(mirpb.AssetFormat.AF_LMDB, mirpb.AnnoFormat.AF_ARK_TXT, lmdb_dir)
+
+        # assets and annotations same as raw format, index files list keys
+        asset_ids = ['430df22960b0f369318705800139fcc8ec38a3e4', 'a3008c032eb11c8d9ffcb58208a36682ee40900f']
+        with open(os.path.join(lmdb_dir, 'pred', 'index.tsv'), 'r') as f:
+            self.assertEqual(sorted(f"{asset_id}\tpred/{asset_id}" for asset_id in asset_ids),
+                             sorted(f.read().splitlines()))
+        lmdb_env = lmdb.open(os.path.join(lmdb_dir, 'assets', mir_settings.LMDB_EXPORT_DIR_NAME), readonly=True)
+        with lmdb_env.begin() as txn:
+            for asset_id in asset_ids:
+                with open(mir_storage.locate_asset_path(location=self._assets_location, hash=asset_id), 'rb') as f:
+                    self.assertEqual(f.read(), txn.get(asset_id.encode()))
+                with open(os.path.join(raw_dir, 'pred', f"{asset_id}.txt"), 'rb') as f:
+                    self.assertEqual(f.read(), txn.get(f"pred/{asset_id}".encode()))
+        lmdb_env.close()
+
+        # coco: one json for all assets
+        _export(mirpb.AssetFormat.AF_LMDB, mirpb.AnnoFormat.AF_COCO_JSON, lmdb_dir)
+        lmdb_env = lmdb.open(os.path.join(lmdb_dir, 'assets', mir_settings.LMDB_EXPORT_DIR_NAME), readonly=True)
+        with lmdb_env.begin() as txn:
+            coco_dict = json.loads(txn.get(f"pred/{mir_settings.COCO_JSON_NAME}".encode()))
+            self.assertEqual(2, len(coco_dict['images']))
+            self.assertEqual(5, len(coco_dict['annotations']))
+        lmdb_env.close()
+
+    def test_anno_archive_00(self):
+        def _export(dst_dir: str, anno_archive: exporter.AnnoArchiveFormat, anno_workers: int) -> Dict[str, bytes]:
+            # returns annotations and index files, keyed by path relative to `dst_dir`
+            mir_metadatas, mir_annotations = mir_storage_ops.MirStorageOps.load_multiple_storages(
+                mir_root=self._mir_root,
+                mir_branch='a',
+                mir_task_id='a',
+                ms_list=[mirpb.MirStorage.MIR_METADATAS, mirpb.MirStorage.MIR_ANNOTATIONS])
+            ec = mirpb.ExportConfig(asset_format=mirpb.AssetFormat.AF_RAW,
+                                    asset_dir=os.path.join(dst_dir, 'assets'),
+                                    asset_index_prefix='/in/assets',
+                                    media_location=self._assets_location,
+                                    need_sub_folder=True,
+                                    anno_format=mirpb.AnnoFormat.AF_VOC_XML,
+                                    pred_dir=os.path.join(dst_dir, 'pred'),
+                                    pred_index_prefix='/in/pred',
+                                    gt_dir=os.path.join(dst_dir, 'gt'),
+                                    gt_index_prefix='/in/gt')
+            with mock.patch.object(mir_settings, 'EXPORT_ANNO_POOL_MIN_ASSETS', 0), \
+                    mock.patch.object(mir_settings, 'EXPORT_ANNO_POOL_CHUNK_ASSETS', 1):
+                self.assertEqual(
+                    MirCode.RC_OK,
+                    exporter.export_mirdatas_to_dir(mir_metadatas=mir_metadatas,
+                                                    ec=ec,
+                                                    mir_annotations=mir_annotations,
+                                                    cls_id_mgr=load_or_create_userlabels(
+                                                        label_storage_file=ids_file_path(self._mir_root)),
+                                                    anno_archive=anno_archive,
+                                                    anno_workers=anno_workers))
+
+            contents: Dict[str, bytes] = {}
+            for anno_type in ['pred', 'gt']:
+                anno_dir = os.path.join(dst_dir, anno_type)
+                with open(os.path.join(anno_dir, 'index.tsv'), 'rb') as f:
+                    contents[f"{anno_type}/index.tsv"] = f.read()
+                if anno_archive == exporter.AnnoArchiveFormat.TAR:
+                    with tarfile.open(os.path.join(anno_dir, 'annotations.tar'), 'r') as tar:
+                        for member in tar.getmembers():
+                            contents[f"{anno_type}/{member.name}"] = tar.extractfile(member).read()  # type: ignore
+                elif anno_archive == exporter.AnnoArchiveFormat.ZIP:
+                    with zipfile.ZipFile(os.path.join(anno_dir, 'annotations.zip'), 'r') as zip_f:
+                        for name in zip_f.namelist():
+                            contents[f"{anno_type}/{name}"] = zip_f.read(name)
+                else:
+                    for root, _, file_names in os.walk(anno_dir):
+                        for file_name in file_names:
+                            if file_name != 'index.tsv':
+                                with open(os.path.join(root, file_name), 'rb') as f:
+                                    contents[os.path.relpath(os.path.join(root, file_name), dst_dir)] = f.read()
+            return contents
+
+        expected_contents = _export(os.path.join(self._dest_root, 'files'), exporter.AnnoArchiveFormat.NONE, 0)
+        self.assertEqual(6, len(expected_contents))
+        self.assertEqual(b'/in/assets/e4/430df22960b0f369318705800139fcc8ec38a3e4.jpg\t'
+                         b'/in/pred/e4/430df22960b0f369318705800139fcc8ec38a3e4.xml\n'
+                         b'/in/assets/0f/a3008c032eb11c8d9ffcb58208a36682ee40900f.jpg\t'
+                         b'/in/pred/0f/a3008c032eb11c8d9ffcb58208a36682ee40900f.xml\n',
+                         expected_contents['pred/index.tsv'])
+        # same as xml built by ElementTree
+        self.assertEqual(
+            b'<annotation><folder>folder</folder>'
+            b'<filename>/in/assets/0f/a3008c032eb11c8d9ffcb58208a36682ee40900f.jpg</filename>'
+            b'<source><annotation>unknown</annotation><image>unknown</image></source>'
+            b'<size><width>500</width><height>333</height><depth>3</depth></size><segmented>0</segmented>'
+            b'<image_quality>0.0000</image_quality>'
+            b'<object><name>airplane</name><pose>unknown</pose><truncated>unknown</truncated><occluded>0</occluded>'
+            b'<bndbox><xmin>181</xmin><ymin>127</ymin><xmax>274</xmax><ymax>193</ymax>'
+            b'<rotate_angle>0.0000</rotate_angle></bndbox><difficult>0</difficult>'
+            b'<tags><fake tag name>fake tag data</fake tag name></tags>'
+            b'<box_quality>0.9500</box_quality><confidence>1.0000</confidence></object></annotation>',
+            expected_contents['pred/0f/a3008c032eb11c8d9ffcb58208a36682ee40900f.xml'])
+
+        # per image annotations written by worker processes, or as one archive, are the same
+        for anno_archive in exporter.AnnoArchiveFormat:
+            for anno_workers in [0, 2]:
+                contents = _export(os.path.join(self._dest_root, f"{anno_archive.value}-{anno_workers}"), anno_archive,
+                                   anno_workers)
+                self.assertEqual(expected_contents, contents)
@@ -3,12 +3,13 @@ import os
 import shutil
 from typing import Dict, List, Set
 import unittest
+from unittest import mock
 
 from google.protobuf import json_format
 
 from mir.commands import filter as cmd_filter
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools import mir_storage_ops
+from mir.tools import mir_columnar, mir_storage_ops, settings as mir_settings
 from mir.tools.class_ids import ids_file_path
 from mir.tools.code import MirCode
 from mir.tools.mir_storage_ops import MirStorageOps
@@ -150,14 +151,15 @@ class TestCmdFilter(unittest.TestCase):
 
         task = mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeImportData, task_id='t0', message='import')
 
-        MirStorageOps.save_and_commit(mir_root=self._mir_root,
-                                      mir_branch='a',
-                                      his_branch='master',
-                                      mir_datas={
-                                          mirpb.MirStorage.MIR_METADATAS: mir_metadatas,
-                                          mirpb.MirStorage.MIR_ANNOTATIONS: mir_annotations,
-                                      },
-                                      task=task)
+        with mock.patch.object(mir_settings, 'COLUMNAR_SIDECARS', 1):
+            MirStorageOps.save_and_commit(mir_root=self._mir_root,
+                                          mir_branch='a',
+                                          his_branch='master',
+                                          mir_datas={
+                                              mirpb.MirStorage.MIR_METADATAS: mir_metadatas,
+                                              mirpb.MirStorage.MIR_ANNOTATIONS: mir_annotations,
+                                          },
+                                          task=task)
 
     @staticmethod
     def __annotations_for_single_image(type_ids: List[int]) -> Dict[str, list]:
@@ -193,6 +195,39 @@ class TestCmdFilter(unittest.TestCase):
         self.assertEqual(MirCode.RC_OK, pipe0[0].recv())
         self.assertEqual(MirCode.RC_OK, pipe1[0].recv())
 
+    def test_match_asset_ids_00(self):
+        mir_metadatas, mir_annotations = MirStorageOps.load_multiple_storages(
+            mir_root=self._mir_root,
+            mir_branch='a',
+            mir_task_id='t0',
+            ms_list=[mirpb.MirStorage.MIR_METADATAS, mirpb.MirStorage.MIR_ANNOTATIONS])
+        columnar_annotations = MirStorageOps.load_columnar_annotations(mir_root=self._mir_root,
+                                                                       mir_branch='a',
+                                                                       mir_task_id='t0')
+        self.assertIsInstance(columnar_annotations, mir_columnar.ColumnarAnnotations)
+        for filter_anno_src in [mirpb.AnnotationType.AT_ANY, mirpb.AnnotationType.AT_GT, mirpb.AnnotationType.AT_PRED]:
+            for in_cis, ex_cis in [('person', ''), ('', 'cat'), ('frisbee;chair', 'cat'), ('type1', 'type3;chair')]:
+                kwargs = dict(mir_metadatas=mir_metadatas,
+                              mir_annotations=mir_annotations,
+                              label_storage_file=ids_file_path(self._mir_root),
+                              in_cis=in_cis,
+                              ex_cis=ex_cis,
+                              filter_anno_src=filter_anno_src)
+                expected_asset_ids = cmd_filter.match_asset_ids(**kwargs)
+                self.assertEqual(expected_asset_ids,
+                                 cmd_filter.match_asset_ids(**kwargs, columnar_annotations=columnar_annotations))
+
+        asset_ids = cmd_filter.match_asset_ids(mir_metadatas=mir_metadatas,
+                                               mir_annotations=None,
+                                               label_storage_file=ids_file_path(self._mir_root),
+                                               in_cis='chair',
+                                               ex_cis='',
+                                               filter_anno_src=mirpb.AnnotationType.AT_ANY,
+                                               columnar_annotations=columnar_annotations)
+        self.assertEqual({
+            'a0000000000000000000000000000000000000000000000000', 'a0000000000000000000000000000000000000000000000001'
+        }, asset_ids)
+
     def __test_cmd_filter_normal_01(self):
         preds = "frisbee; person; ChAiR"  # 0; 2; 5
         excludes = "Cat"  # 4
@@ -237,6 +272,7 @@ class TestCmdFilter(unittest.TestCase):
         fake_args.src_revs = "a@t0"  # src branch name and base task id
         fake_args.dst_rev = f"{dst_branch}@t1"
         fake_args.work_dir = ''
+        fake_args.evaluate_policy = 'sync'
         cmd = cmd_filter.CmdFilter(fake_args)
         cmd_run_result = cmd.run()
 
@@ -265,6 +301,7 @@ class TestCmdFilter(unittest.TestCase):
         fake_args.src_revs = "a@t0"  # src branch name and base task id
         fake_args.dst_rev = f"{dst_branch}@t1"
         fake_args.work_dir = ''
+        fake_args.evaluate_policy = 'sync'
         cmd = cmd_filter.CmdFilter(fake_args)
         cmd_run_result = cmd.run()
         child_conn.send(cmd_run_result)
@@ -6,12 +6,15 @@ import unittest
 from unittest import mock
 import zipfile
 
-from mir.commands.import_dataset import CmdImport
+from mir.commands.import_dataset import CmdImport, _generate_sha_and_copy
 from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import annotations, settings as mir_settings
 from mir.tools.class_ids import ids_file_path
 from mir.tools.code import MirCode
 from mir.tools.eval import det_eval_voc, sem_seg_eval_mm, ins_seg_eval_coco
+from mir.tools.mir_storage import sha1sum_for_file
 from mir.tools.mir_storage_ops import MirStorageOps
+from mir.tools.phase_logger import PhaseLoggerCenter
 from tests import utils as test_utils
 
 
@@ -74,6 +77,8 @@ class TestCmdImport(unittest.TestCase):
         args.work_dir = self._work_dir
         args.unknown_types_strategy = 'stop'
         args.anno_type_fmt = 'det:voc'
+        args.workers = 4
+        args.hardlink = False
         importing_instance = CmdImport(args)
         ret = importing_instance.run()
         self.assertEqual(ret, MirCode.RC_OK)
@@ -144,6 +149,8 @@ class TestCmdImport(unittest.TestCase):
         args.work_dir = self._work_dir
         args.unknown_types_strategy = 'stop'
         args.anno_type_fmt = 'det:voc'
+        args.workers = 4
+        args.hardlink = False
         importing_instance = CmdImport(args)
         ret = importing_instance.run()
         self.assertEqual(ret, MirCode.RC_OK)
@@ -175,6 +182,8 @@ class TestCmdImport(unittest.TestCase):
         args.work_dir = self._work_dir
         args.unknown_types_strategy = 'add'
         args.anno_type_fmt = 'sem-seg:coco'
+        args.workers = 4
+        args.hardlink = False
         importing_instance = CmdImport(args)
         ret = importing_instance.run()
         self.assertEqual(ret, MirCode.RC_OK)
@@ -200,6 +209,8 @@ class TestCmdImport(unittest.TestCase):
         args.work_dir = self._work_dir
         args.unknown_types_strategy = 'add'
         args.anno_type_fmt = 'sem-seg:coco'
+        args.workers = 4
+        args.hardlink = False
         importing_instance = CmdImport(args)
         ret = importing_instance.run()
         self.assertEqual(ret, MirCode.RC_OK)
@@ -227,6 +238,8 @@ class TestCmdImport(unittest.TestCase):
         args.work_dir = self._work_dir
         args.unknown_types_strategy = 'add'
         args.anno_type_fmt = 'sem-seg:coco'
+        args.workers = 4
+        args.hardlink = False
         importing_instance = CmdImport(args)
         ret = importing_instance.run()
         self.assertEqual(ret, MirCode.RC_OK)
@@ -259,6 +272,8 @@ class TestCmdImport(unittest.TestCase):
         args.work_dir = self._work_dir
         args.unknown_types_strategy = 'add'
         args.anno_type_fmt = 'ins-seg:coco'
+        args.workers = 4
+        args.hardlink = False
         importing_instance = CmdImport(args)
         ret = importing_instance.run()
         self.assertEqual(ret, MirCode.RC_OK)
@@ -266,6 +281,105 @@ class TestCmdImport(unittest.TestCase):
 
         shutil.move(os.path.join(self._data_xml_path, 'meta.yaml'), os.path.join(self._data_xml_path, 'pred_meta.yaml'))
 
+    def test_generate_sha_and_copy(self) -> None:
+        # duplicated asset with another name, and a missing file
+        dup_asset_path = os.path.join(self._data_img_path, 'dup.jpg')
+        shutil.copyfile(os.path.join(self._data_img_path, '2007_000032.jpg'), dup_asset_path)
+        with open(self._idx_file, 'a') as idx_f:
+            idx_f.write(f"{dup_asset_path}\n{os.path.join(self._data_img_path, 'missing.jpg')}\n")
+        PhaseLoggerCenter.create_phase_loggers(top_phase='import', monitor_file=None, task_name='hash')
+
+        for hardlink in [False, True]:
+            gen_folder = os.path.join(self._storage_root, f"gen-{hardlink}")
+            file_name_to_asset_ids = _generate_sha_and_copy(self._idx_file, gen_folder, workers=2, hardlink=hardlink)
+            self.assertEqual({'2007_000032.jpg', '2007_000243.jpg', '2007_000243.xml'},
+                             set(file_name_to_asset_ids.keys()))
+            for file_name, asset_id in file_name_to_asset_ids.items():
+                asset_path = os.path.join(gen_folder, asset_id[-2:], asset_id)
+                self.assertEqual(asset_id, sha1sum_for_file(asset_path))
+                self.assertEqual(asset_id, sha1sum_for_file(os.path.join(self._data_img_path, file_name)))
+            # no temp files left
+            self.assertEqual(set(a[-2:] for a in file_name_to_asset_ids.values()), set(os.listdir(gen_folder)))
+
+            # import again: nothing new, same results
+            self.assertEqual(file_name_to_asset_ids, _generate_sha_and_copy(self._idx_file, gen_folder, workers=2))
+
+    def test_import_voc_workers_00(self) -> None:
+        # voc files parsed in current process or by worker processes give the same annotations
+        open(os.path.join(self._data_xml_path, 'empty.xml'), 'w').close()
+        file_name_to_asset_ids = {
+            '2007_000032.jpg': 'a0',
+            '2007_000243.jpg': 'a1',
+            'empty.jpg': 'a2',
+            'no-annotations.jpg': 'a3',
+        }
+        results = []
+        for workers in [1, 2]:
+            mir_annotations = mirpb.MirAnnotations()
+            with mock.patch.object(mir_settings, 'IMPORT_ANNO_POOL_MIN_FILES', 0):
+                annotations._import_annotations_voc_xml(file_name_to_asset_ids=file_name_to_asset_ids,
+                                                        mir_annotation=mir_annotations,
+                                                        annotations_dir_path=self._data_xml_path,
+                                                        label_storage_file=ids_file_path(self._mir_repo_root),
+                                                        unknown_types_strategy=annotations.UnknownTypesStrategy.IGNORE,
+                                                        accu_new_class_names=set(),
+                                                        image_annotations=mir_annotations.ground_truth,
+                                                        workers=workers)
+            results.append(mir_annotations)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual({'a0', 'a1'}, set(results[0].ground_truth.image_annotations.keys()))
+        self.assertEqual({'weather': 'rainy', 'camera': 'camera 1', 'theme': 'gray sky'},
+                         dict(results[0].image_cks['a1'].cks))
+        box = results[0].ground_truth.image_annotations['a1'].boxes[0]
+        self.assertEqual((181, 127, 94, 67), (box.box.x, box.box.y, box.box.w, box.box.h))
+        self.assertEqual('airplane', box.class_name)
+
+    def test_import_coco_dedup_00(self) -> None:
+        # duplicated objects are scoped per asset, empty box of polygon is filled before size checked
+        coco_dir = os.path.join(self._data_root, 'coco-dedup')
+        os.makedirs(coco_dir)
+        box_anno = {'image_id': 0, 'category_id': 0, 'bbox': [1.5, 2, 30, 40]}
+        polygon_anno = {
+            'image_id': 0,
+            'category_id': 1,
+            'bbox': [0, 0, 0, 0],
+            'segmentation': [[10, 10, 20, 10, 20, 30]],
+        }
+        coco_dict = {
+            'images': [{'id': 0, 'file_name': '0.jpg', 'height': 50, 'width': 60},
+                       {'id': 1, 'file_name': '1.jpg', 'height': 50, 'width': 60}],
+            'categories': [{'id': 0, 'name': 'cat'}, {'id': 1, 'name': 'aeroplane'}],
+            'annotations': [
+                box_anno, box_anno, {**box_anno, 'image_id': 1}, polygon_anno, polygon_anno,
+                {'image_id': 0, 'category_id': 0, 'bbox': [1, 2, 0, 40]},
+                {'image_id': 0, 'category_id': 0, 'bbox': [1, 2, 3]},
+            ],
+        }
+        with open(os.path.join(coco_dir, 'coco-annotations.json'), 'w') as f:
+            json.dump(coco_dict, f)
+
+        mir_annotations = mirpb.MirAnnotations()
+        with self.assertLogs(level='INFO') as logs:
+            annotations.import_annotations_coco_json(file_name_to_asset_ids={'0.jpg': 'a0', '1.jpg': 'a1'},
+                                                     mir_annotation=mir_annotations,
+                                                     annotations_dir_path=coco_dir,
+                                                     label_storage_file=ids_file_path(self._mir_repo_root),
+                                                     unknown_types_strategy=annotations.UnknownTypesStrategy.IGNORE,
+                                                     image_annotations=mir_annotations.ground_truth,
+                                                     accu_new_class_names=set())
+        boxes = mir_annotations.ground_truth.image_annotations['a0'].boxes
+        self.assertEqual([('cat', 1, 2, 30, 40), ('airplane', 10, 10, 10, 19)],
+                         [(b.class_name, b.box.x, b.box.y, b.box.w, b.box.h) for b in boxes])
+        self.assertEqual([0, 1], [b.index for b in boxes])
+        self.assertEqual(1, len(mir_annotations.ground_truth.image_annotations['a1'].boxes))
+        stats_logs = [log for log in logs.output if '[import stats]' in log]
+        self.assertEqual(1, len(stats_logs))
+        import_stats = json.loads(stats_logs[0].split('[import stats]: ')[1])
+        self.assertEqual(3, import_stats['objects'])
+        self.assertEqual(2, import_stats['duplicate_objects'])
+        self.assertEqual(1, import_stats['zero_size_objects'])
+        self.assertEqual(1, import_stats['error_format_objects'])
+
     def _check_repo_by_file(self, mir_root: str, mir_branch: str, mir_task_id: str, expected_file_name: str) -> None:
         with open(os.path.join('tests', 'assets', expected_file_name), 'r') as f:
             expected_dict = json.loads(f.read())
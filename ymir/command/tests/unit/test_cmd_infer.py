@@ -175,7 +175,7 @@ class TestCmdInfer(unittest.TestCase):
         expected_cmd = ['docker', 'run', '--rm']
         expected_cmd.append(f"-v{os.path.join(fake_args.work_dir, 'in')}:/in:ro")
         expected_cmd.append(f"-v{os.path.join(fake_args.work_dir, 'out')}:/out")
-        expected_cmd.append(f"-v{self._src_assets_root}:{self._src_assets_root}")
+        expected_cmd.append(f"-v{self._src_assets_root}:{self._src_assets_root}:ro")
         expected_cmd.extend(['--user', f"{os.getuid()}:{os.getgid()}"])
         expected_cmd.append("--shm-size=16G")
         expected_cmd.extend(['--name', fake_args.executant_name])
@@ -98,6 +98,7 @@ class TestCmdSampling(unittest.TestCase):
         fake_args.dst_rev = 'b@t1'
         fake_args.count = 2
         fake_args.rate = 0
+        fake_args.evaluate_policy = 'sync'
         cmd = CmdSampling(fake_args)
         cmd_run_result = cmd.run()
 
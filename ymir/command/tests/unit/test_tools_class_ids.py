@@ -1,7 +1,9 @@
 import os
 import shutil
 import unittest
+from unittest import mock
 
+from mir.tools import class_ids
 from mir.tools.class_ids import load_or_create_userlabels, ids_file_path
 from tests import utils as test_utils
 
@@ -51,3 +53,46 @@ class TestToolsClassIds(unittest.TestCase):
         cim.add_main_name('a')
         self.assertEqual([0, 1, 2], cim.all_ids())
         self.assertEqual([0, 1, 2], cim.id_for_names(['a', 'b', 'c'])[0])
+
+    def test_cache(self) -> None:
+        cim = load_or_create_userlabels(label_storage_file=self._label_storage_file)
+
+        # same file version: no parse again, and lookup dicts not shared between instances
+        with mock.patch.object(class_ids.yaml, 'safe_load', side_effect=AssertionError('parsed again')):
+            cim_cached = load_or_create_userlabels(label_storage_file=self._label_storage_file)
+        self.assertEqual(cim.labels, cim_cached.labels)
+        cim_cached._add_new_cname('d')
+        self.assertEqual([0, 1, 2, 3], cim_cached.all_ids())
+        self.assertEqual([0, 1, 2], cim.all_ids())
+        self.assertEqual(3, len(cim.labels))
+
+        # file renamed by another instance: new version loaded
+        cim.add_main_name('e')
+        self.assertEqual((3, 'e'), load_or_create_userlabels(self._label_storage_file).id_and_main_name_for_name('e'))
+        self.assertEqual((3, 'e'), cim_cached.add_main_name('e'))
+        self.assertEqual((4, 'f'), cim_cached.add_main_name('f'))
+        self.assertEqual([0, 1, 2, 3, 4], load_or_create_userlabels(self._label_storage_file).all_ids())
+
+        # file overwritten in place
+        test_utils.prepare_labels(mir_root=self._test_root, names=['x,y'])
+        cim = load_or_create_userlabels(label_storage_file=self._label_storage_file)
+        self.assertEqual([0], cim.all_ids())
+        self.assertEqual((0, 'x'), cim.id_and_main_name_for_name('y'))
+
+    def test_resolver(self) -> None:
+        cim = load_or_create_userlabels(label_storage_file=self._label_storage_file)
+        resolver = class_ids.ClassNameResolver(cim)
+        self.assertEqual([(0, 'a'), (1, 'b'), (-1, 'd'), (0, 'a'), (-1, 'e'), (-1, 'd')],
+                         resolver.resolve_many(['a', ' B ', 'D', 'a', 'e', 'd']))
+        self.assertEqual(['d', 'e'], resolver.unknown_names)
+
+        # memoized: no lookup again for known raw names
+        with mock.patch.object(class_ids.UserLabels,
+                               'id_and_main_name_for_name',
+                               side_effect=AssertionError('resolved again')):
+            self.assertEqual((1, 'b'), resolver.resolve(' B '))
+
+        self.assertEqual([(3, 'd'), (4, 'e')], resolver.add_unknown_names())
+        self.assertEqual([], resolver.unknown_names)
+        self.assertEqual([(3, 'd'), (3, 'd'), (4, 'e')], resolver.resolve_many(['D', 'd', 'e']))
+        self.assertEqual([0, 1, 2, 3, 4], load_or_create_userlabels(self._label_storage_file).all_ids())
@@ -0,0 +1,329 @@
+from collections import defaultdict
+import random
+from typing import Any, Dict, List, Optional, Tuple
+import unittest
+from unittest import mock
+
+import numpy as np
+import pycocotools.mask
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools.eval import eval_coco
+
+
+class _LegacyCocoDetEval(eval_coco.CocoDetEval):
+    """
+    per image evaluation, the previous implementation of CocoDetEval, used as reference in regression tests
+    """
+    def __init__(self, coco_gt: eval_coco.MirCoco, coco_dt: eval_coco.MirCoco, params: eval_coco.Params,
+                 assets_metadata: Optional[mirpb.MirMetadatas]) -> None:
+        super().__init__(coco_gt=coco_gt, coco_dt=coco_dt, params=params, assets_metadata=assets_metadata)
+        self.evalImgs: dict = {}
+        self.ious: dict = {}
+        self._legacy_gts = defaultdict(list, self._to_img_cat_to_annotations(coco_gt))
+        self._legacy_dts = defaultdict(list, self._to_img_cat_to_annotations(coco_dt))
+
+    @classmethod
+    def _to_img_cat_to_annotations(cls, coco: eval_coco.MirCoco) -> Dict[Tuple[str, int], List[dict]]:
+        img_cat_to_annotations: Dict[Tuple[str, int], List[dict]] = defaultdict(list)
+        for idx in range(len(coco.ids)):
+            annotation_dict = {
+                'id': int(coco.ids[idx]),
+                'area': int(coco.areas[idx]),
+                'bbox': [int(v) for v in coco.bboxes[idx]],
+                'score': float(coco.scores[idx]),
+                'iscrowd': int(coco.iscrowds[idx]),
+                'ignore': 0,
+                'pb_index_id': int(coco.pb_index_ids[idx]),
+                'segmentation': coco.segmentations[idx] if coco.segmentations is not None else None,
+            }
+            key = (coco.asset_ids[coco.asset_idxes[idx]], int(coco.class_ids[idx]))
+            img_cat_to_annotations[key].append(annotation_dict)
+        return img_cat_to_annotations
+
+    def evaluate(self) -> None:
+        self.params.maxDets.sort()
+        p = self.params
+        catIds = p.catIds
+        self.ious = {(asset_id, catId): self.computeIoU(asset_id, catId)
+                     for asset_id in self._asset_ids for catId in catIds}
+        maxDet = p.maxDets[-1]
+        self.evalImgs = {(asset_id, cIdx, aIdx): self.evaluateImg(asset_id, catId, areaRng, maxDet)
+                         for cIdx, catId in enumerate(catIds) for aIdx, areaRng in enumerate(p.areaRng)
+                         for asset_id in self._asset_ids}
+
+    def computeIoU(self, asset_id: str, catId: int) -> Any:
+        gt = self._legacy_gts[asset_id, catId]
+        dt = self._legacy_dts[asset_id, catId]
+        if len(gt) == 0 and len(dt) == 0:
+            return []
+        inds = np.argsort([-d['score'] for d in dt], kind='mergesort')
+        dt = [dt[i] for i in inds]
+        if len(dt) > self.params.maxDets[-1]:
+            dt = dt[0:self.params.maxDets[-1]]
+        key = 'bbox' if self.params.iouType == 'bbox' else 'segmentation'
+        return pycocotools.mask.iou([d[key] for d in dt], [g[key] for g in gt], [int(g['iscrowd']) for g in gt])
+
+    def evaluateImg(self, asset_id: str, catId: int, aRng: Any, maxDet: int) -> Optional[dict]:
+        gt = self._legacy_gts[asset_id, catId]
+        dt = self._legacy_dts[asset_id, catId]
+        if len(gt) == 0 and len(dt) == 0:
+            return None
+        for g in gt:
+            g['_ignore'] = 1 if g['ignore'] or (g['area'] < aRng[0] or g['area'] > aRng[1]) else 0
+        gtind = np.argsort([g['_ignore'] for g in gt], kind='mergesort')
+        gt = [gt[i] for i in gtind]
+        dtind = np.argsort([-d['score'] for d in dt], kind='mergesort')
+        dt = [dt[i] for i in dtind[0:maxDet]]
+        iscrowd = [int(o['iscrowd']) for o in gt]
+        ious = self.ious[asset_id, catId]
+        ious = ious[:, gtind] if len(ious) > 0 else ious
+
+        p = self.params
+        T, G, D = len(p.iouThrs), len(gt), len(dt)
+        gtm = np.zeros((T, G))
+        dtm = np.zeros((T, D))
+        gtIg = np.array([g['_ignore'] for g in gt])
+        dtIg = np.zeros((T, D))
+        if not len(ious) == 0:
+            for tind, t in enumerate(p.iouThrs):
+                for dind, d in enumerate(dt):
+                    iou = min([t, 1 - 1e-10])
+                    m = -1
+                    for gind, g in enumerate(gt):
+                        if gtm[tind, gind] > 0 and not iscrowd[gind]:
+                            continue
+                        if m > -1 and gtIg[m] == 0 and gtIg[gind] == 1:
+                            break
+                        if ious[dind, gind] < iou:
+                            continue
+                        iou = ious[dind, gind]
+                        m = gind
+                    if m == -1:
+                        continue
+                    dtIg[tind, dind] = gtIg[m]
+                    dtm[tind, dind] = gt[m]['id']
+                    gtm[tind, m] = d['id']
+                    self.match_result.add_match(asset_id=asset_id,
+                                                iou_thr=t,
+                                                gt_pb_idx=gt[m]['pb_index_id'],
+                                                pred_pb_idx=d['pb_index_id'])
+
+        a = np.array([d['area'] < aRng[0] or d['area'] > aRng[1] for d in dt]).reshape((1, len(dt)))
+        dtIg = np.logical_or(dtIg, np.logical_and(dtm == 0, np.repeat(a, T, 0)))
+        return {
+            'dtMatches': dtm,
+            'gtMatches': gtm,
+            'dtScores': [d['score'] for d in dt],
+            'gtIgnore': gtIg,
+            'dtIgnore': dtIg,
+        }
+
+    def accumulate(self, p: eval_coco.Params = None) -> None:
+        p = p or self.params
+        T, R, K, A, M = len(p.iouThrs), len(p.recThrs), len(p.catIds), len(p.areaRng), len(p.maxDets)
+        precision = -np.ones((T, R, K, A, M))
+        recall = -np.ones((T, K, A, M))
+        scores = -np.ones((T, R, K, A, M))
+        all_tps = np.zeros((T, K, A, M))
+        all_fps = np.zeros((T, K, A, M))
+        all_fns = np.zeros((T, K, A, M))
+        for k in range(K):
+            for a in range(A):
+                for m, maxDet in enumerate(p.maxDets):
+                    E = [self.evalImgs.get((asset_id, k, a), None) for asset_id in self._asset_ids]
+                    E = [e for e in E if e is not None]
+                    if len(E) == 0:
+                        continue
+                    dtScores = np.concatenate([e['dtScores'][0:maxDet] for e in E])
+                    if len(dtScores) == 0:
+                        continue
+                    inds = np.argsort(-dtScores, kind='mergesort')
+                    dtScoresSorted = dtScores[inds]
+                    dtm = np.concatenate([e['dtMatches'][:, 0:maxDet] for e in E], axis=1)[:, inds]
+                    dtIg = np.concatenate([e['dtIgnore'][:, 0:maxDet] for e in E], axis=1)[:, inds]
+                    gtIg = np.concatenate([e['gtIgnore'] for e in E])
+                    npig = np.count_nonzero(gtIg == 0)
+                    if npig == 0:
+                        continue
+                    tps = np.logical_and(dtm, np.logical_not(dtIg))
+                    fps = np.logical_and(np.logical_not(dtm), np.logical_not(dtIg))
+                    tp_sum = np.cumsum(tps, axis=1).astype(dtype=float)
+                    fp_sum = np.cumsum(fps, axis=1).astype(dtype=float)
+                    all_tps[:, k, a, m] = tp_sum[:, -1]
+                    all_fps[:, k, a, m] = fp_sum[:, -1]
+                    all_fns[:, k, a, m] = npig - all_tps[:, k, a, m]
+                    for t, (tp, fp) in enumerate(zip(tp_sum, fp_sum)):
+                        nd = len(tp)
+                        rc = tp / npig
+                        pr = (tp / (fp + tp + np.spacing(1))).tolist()
+                        q = np.zeros((R, )).tolist()
+                        ss = np.zeros((R, ))
+                        recall[t, k, a, m] = rc[-1] if nd else 0
+                        for i in range(nd - 1, 0, -1):
+                            if pr[i] > pr[i - 1]:
+                                pr[i - 1] = pr[i]
+                        inds = np.searchsorted(rc, p.recThrs, side='left')
+                        try:
+                            for ri, pi in enumerate(inds):
+                                q[ri] = pr[pi]
+                                ss[ri] = dtScoresSorted[pi]
+                        except Exception:
+                            pass
+                        precision[t, :, k, a, m] = np.array(q)
+                        scores[t, :, k, a, m] = np.array(ss)
+        self.eval = {
+            'params': p,
+            'counts': [T, R, K, A, M],
+            'precision': precision,
+            'recall': recall,
+            'scores': scores,
+            'all_fps': all_fps,
+            'all_tps': all_tps,
+            'all_fns': all_fns,
+        }
+
+
+class TestToolsCocoEval(unittest.TestCase):
+    # protected: misc
+    @classmethod
+    def _make_random_mir_datas(cls, seed: int, object_type: int) -> Tuple[mirpb.MirMetadatas, mirpb.MirAnnotations]:
+        """
+        random annotations with lots of overlaps, tied scores, crowds and assets only in gt or pred
+        """
+        rng = random.Random(seed)
+        mir_metadatas = mirpb.MirMetadatas()
+        mir_annotations = mirpb.MirAnnotations()
+        mir_annotations.prediction.type = object_type  # type: ignore
+        mir_annotations.ground_truth.type = object_type  # type: ignore
+
+        for asset_idx in range(40):
+            asset_id = f"a{asset_idx:03d}"
+            mir_metadatas.attributes[asset_id].width = 64
+            mir_metadatas.attributes[asset_id].height = 64
+            gt_boxes: List[Tuple[int, int, int, int, int]] = []
+            for task_annotations, is_pred in [(mir_annotations.ground_truth, False),
+                                              (mir_annotations.prediction, True)]:
+                if rng.random() < 0.1:
+                    continue
+                image_annotations = task_annotations.image_annotations[asset_id]
+                for index in range(rng.randint(0, 12)):
+                    if is_pred and gt_boxes and rng.random() < 0.7:
+                        # near some gt
+                        class_id, x, y, w, h = rng.choice(gt_boxes)
+                        x, y = max(0, x + rng.randint(-2, 2)), max(0, y + rng.randint(-2, 2))
+                        w, h = max(0, w + rng.randint(-2, 2)), max(0, h + rng.randint(-2, 2))
+                    else:
+                        class_id = rng.choice([1, 2, 3, 5])
+                        x, y, w, h = rng.randint(0, 40), rng.randint(0, 40), rng.randint(0, 24), rng.randint(0, 24)
+                    if not is_pred:
+                        gt_boxes.append((class_id, x, y, w, h))
+
+                    annotation = image_annotations.boxes.add()
+                    annotation.index = index
+                    annotation.class_id = class_id
+                    annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h = x, y, w, h
+                    annotation.score = rng.choice([0.1, 0.3, 0.5, 0.7, 0.9]) if is_pred else 0
+                    annotation.iscrowd = int(not is_pred and rng.random() < 0.1)
+                    annotation.mask_area = w * h
+                    if object_type != mirpb.ObjectType.OT_DET:
+                        annotation.type = mirpb.ObjectSubType.OST_SEG_POLYGON
+                        for px, py in [(x, y), (x + w, y), (x + w // 2, y + h), (x, y + h)]:
+                            annotation.polygon.add(x=px, y=py)
+        return mir_metadatas, mir_annotations
+
+    def _check_same_eval(self, mir_metadatas: mirpb.MirMetadatas, mir_annotations: mirpb.MirAnnotations,
+                         params_kwargs: dict) -> None:
+        evaluators = []
+        for evaluator_cls in [eval_coco.CocoDetEval, _LegacyCocoDetEval]:
+            params = eval_coco.Params()
+            for k, v in params_kwargs.items():
+                setattr(params, k, v)
+            need_segmentation = (params.iouType == 'segm')
+            coco_gt = eval_coco.MirCoco(task_annotations=mir_annotations.ground_truth,
+                                        mir_metadatas=mir_metadatas,
+                                        conf_thr=None,
+                                        need_segmentation=need_segmentation)
+            coco_dt = eval_coco.MirCoco(task_annotations=mir_annotations.prediction,
+                                        mir_metadatas=mir_metadatas,
+                                        conf_thr=params.confThr,
+                                        need_segmentation=need_segmentation)
+            evaluator = evaluator_cls(coco_gt=coco_gt, coco_dt=coco_dt, params=params, assets_metadata=mir_metadatas)
+            evaluator.evaluate()
+            evaluator.accumulate()
+            evaluators.append(evaluator)
+
+        new_evaluator, legacy_evaluator = evaluators
+        for key in ['precision', 'recall', 'scores', 'all_tps', 'all_fps', 'all_fns']:
+            # bit identical, not just close
+            self.assertTrue(np.array_equal(legacy_evaluator.eval[key], new_evaluator.eval[key]), key)
+        for iou_thr in params.iouThrs:
+            legacy_asset_ids = set(legacy_evaluator.match_result.get_asset_ids(iou_thr=iou_thr))
+            self.assertEqual(legacy_asset_ids, set(new_evaluator.match_result.get_asset_ids(iou_thr=iou_thr)))
+            for asset_id in legacy_asset_ids:
+                self.assertEqual(legacy_evaluator.match_result.get_matches(asset_id=asset_id, iou_thr=iou_thr),
+                                 new_evaluator.match_result.get_matches(asset_id=asset_id, iou_thr=iou_thr))
+
+    # public: test cases
+    def test_bbox_00(self) -> None:
+        for seed in range(5):
+            mir_metadatas, mir_annotations = self._make_random_mir_datas(seed=seed,
+                                                                         object_type=mirpb.ObjectType.OT_DET)
+            self._check_same_eval(mir_metadatas=mir_metadatas,
+                                  mir_annotations=mir_annotations,
+                                  params_kwargs={
+                                      'iouType': 'bbox',
+                                      'catIds': [1, 2, 3, 4],
+                                      'confThr': 0.3,
+                                  })
+
+    def test_bbox_01(self) -> None:
+        # multiple area ranges and max dets
+        mir_metadatas, mir_annotations = self._make_random_mir_datas(seed=10, object_type=mirpb.ObjectType.OT_DET)
+        self._check_same_eval(mir_metadatas=mir_metadatas,
+                              mir_annotations=mir_annotations,
+                              params_kwargs={
+                                  'iouType': 'bbox',
+                                  'catIds': [3, 1, 2],
+                                  'confThr': 0,
+                                  'iouThrs': np.array([0.1, 0.5, 0.95]),
+                                  'maxDets': [10, 1, 3],
+                                  'areaRng': [[0, 1e10], [0, 64], [64, 256], [256, 1e10]],
+                              })
+
+    def test_segm_00(self) -> None:
+        for seed in range(3):
+            mir_metadatas, mir_annotations = self._make_random_mir_datas(seed=seed,
+                                                                         object_type=mirpb.ObjectType.OT_INS_SEG)
+            self._check_same_eval(mir_metadatas=mir_metadatas,
+                                  mir_annotations=mir_annotations,
+                                  params_kwargs={
+                                      'iouType': 'segm',
+                                      'catIds': [1, 2, 3],
+                                      'confThr': 0.3,
+                                      'areaRng': [[0, 1e10], [0, 100]],
+                                  })
+
+    def test_evaluate_00(self) -> None:
+        # whole evaluation pb, including confusion matrix written back to annotations
+        for object_type in [mirpb.ObjectType.OT_DET, mirpb.ObjectType.OT_INS_SEG]:
+            mir_metadatas, mir_annotations = self._make_random_mir_datas(seed=20, object_type=object_type)
+            evaluate_config = mirpb.EvaluateConfig()
+            evaluate_config.conf_thr = 0.3
+            evaluate_config.iou_thrs_interval = '0.5:0.95:0.05'
+            evaluate_config.need_pr_curve = True
+            evaluate_config.class_ids[:] = [1, 2, 3]
+            evaluate_config.type = object_type  # type: ignore
+
+            results = []
+            for evaluator_cls in [eval_coco.CocoDetEval, _LegacyCocoDetEval]:
+                mir_annotations_copy = mirpb.MirAnnotations()
+                mir_annotations_copy.CopyFrom(mir_annotations)
+                with mock.patch.object(eval_coco, 'CocoDetEval', evaluator_cls):
+                    evaluation = eval_coco.evaluate(prediction=mir_annotations_copy.prediction,
+                                                    ground_truth=mir_annotations_copy.ground_truth,
+                                                    config=evaluate_config,
+                                                    assets_metadata=mir_metadatas)
+                results.append((evaluation, mir_annotations_copy))
+            self.assertEqual(results[1][0], results[0][0])
+            self.assertEqual(results[1][1], results[0][1])
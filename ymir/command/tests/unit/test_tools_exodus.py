@@ -1,12 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
 import os
 import shutil
 from typing import Type
 import unittest
+from unittest import mock
 
 import google.protobuf.json_format as pb_format
 
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools import exodus, mir_storage_ops
+from mir.scm.cmd import CmdScm
+from mir.tools import exodus, mir_storage_ops, settings as mir_settings
 from mir.tools.annotations import make_empty_mir_annotations
 from mir.tools.code import MirCode
 from mir.tools.errors import MirRuntimeError
@@ -48,6 +52,90 @@ class TestExodus(unittest.TestCase):
         self._test_open_abnormal_cases(None, "fake-branch", MirCode.RC_CMD_INVALID_ARGS)
         self._test_open_abnormal_cases(None, None, MirCode.RC_CMD_INVALID_ARGS)
 
+    def test_cache_00(self):
+        exodus.clear_memory_cache()
+        contents = exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+        stats = exodus.cache_stats()
+        self.assertEqual((0, 1, 0, 1), (stats.memory_hits, stats.misses, stats.rev_hits, stats.rev_misses))
+
+        # warm run: no git subprocess
+        with mock.patch.object(CmdScm, 'execute', side_effect=AssertionError('git called')):
+            self.assertEqual(contents, exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir'))
+            self.assertEqual(contents,
+                             exodus.read_mir(mir_root=self._mir_root, rev='a@mining-task-id', file_name='metadatas.mir'))
+        stats = exodus.cache_stats()
+        self.assertEqual((2, 1, 2, 1), (stats.memory_hits, stats.misses, stats.rev_hits, stats.rev_misses))
+        self.assertFalse(os.path.exists(os.path.join(self._mir_root, '.mir', 'exodus_cache')))
+
+        # least recently used blobs evicted when over limit
+        tasks_contents = exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='tasks.mir')
+        exodus.clear_memory_cache()
+        with mock.patch.object(exodus._blob_cache, '_max_bytes', len(contents) + len(tasks_contents) - 1):
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='tasks.mir')
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+        stats = exodus.cache_stats()
+        self.assertEqual((0, 3), (stats.memory_hits, stats.misses))
+
+        # least recently used revs evicted when over limit
+        exodus.clear_memory_cache()
+        with mock.patch.object(exodus._blob_cache, '_max_rev_blobs', 1):
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='tasks.mir')
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='tasks.mir')
+            exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+        stats = exodus.cache_stats()
+        self.assertEqual((1, 3), (stats.rev_hits, stats.rev_misses))
+        self.assertEqual(1, len(exodus._blob_cache._rev_blobs))
+
+        # lower limit evicts cached blobs
+        exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+        exodus.set_memory_cache_limit(len(contents))
+        try:
+            self.assertEqual([contents], list(exodus._blob_cache._blobs.values()))
+        finally:
+            exodus.set_memory_cache_limit(mir_settings.EXODUS_CACHE_MEMORY_BYTES)
+
+    def test_cache_01(self):
+        # branch head moves: reads contents of new head
+        exodus.clear_memory_cache()
+        contents_a = exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+
+        mir_datas = {
+            mirpb.MirStorage.MIR_METADATAS: mirpb.MirMetadatas(),
+            mirpb.MirStorage.MIR_ANNOTATIONS: make_empty_mir_annotations(),
+        }
+        task = mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeMining,
+                                                  task_id='mining-task-id-2',
+                                                  message='branch_a_for_test_exodus_2')
+        mir_storage_ops.MirStorageOps.save_and_commit(mir_root=self._mir_root,
+                                                      mir_branch='a',
+                                                      his_branch='a',
+                                                      mir_datas=mir_datas,
+                                                      task=task)
+        contents_a_2 = exodus.read_mir(mir_root=self._mir_root, rev='a', file_name='metadatas.mir')
+        self.assertNotEqual(contents_a, contents_a_2)
+        self.assertEqual(contents_a,
+                         exodus.read_mir(mir_root=self._mir_root, rev='a@mining-task-id', file_name='metadatas.mir'))
+
+    def test_cat_file_batch(self):
+        scm_git = CmdScm(self._mir_root, 'git')
+        blob_hash = scm_git.rev_parse('a:metadatas.mir')
+        self.assertEqual((blob_hash, 'blob'), scm_git.cat_file_batch_check('a:metadatas.mir')[:2])
+        self.assertIsNone(scm_git.cat_file_batch_check('a:fake-file'))
+        self.assertIsNone(scm_git.cat_file_batch('fake-branch:metadatas.mir'))
+
+        bio = io.BytesIO()
+        scm_git.cat_file(['-p', blob_hash], output_stream=bio)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(scm_git.cat_file_batch, ['a:metadatas.mir'] * 16))
+        self.assertEqual([bio.getvalue()] * 16, results)
+
+        # not a git repo
+        with self.assertRaises(MirRuntimeError) as e:
+            CmdScm(os.path.join(self._mir_root, '.mir'), 'git').cat_file_batch('a:metadatas.mir')
+        self.assertEqual(MirCode.RC_CMD_INVALID_MIR_REPO, e.exception.error_code)
+
     # protected: test cases
     def _test_open_normal_cases(self, file_name: str, branch: str, pb_class: Type):
         contents = exodus.read_mir(mir_root=self._mir_root, rev=branch, file_name=file_name)
@@ -0,0 +1,90 @@
+import io
+import json
+import os
+import random
+import shutil
+import unittest
+
+from mir.tools import annotations, json_stream
+from mir.tools.errors import MirRuntimeError
+from tests import utils as test_utils
+
+
+def _random_value(rng: random.Random, depth: int = 0) -> object:
+    choice = rng.randint(0, 8 if depth < 3 else 5)
+    if choice == 0:
+        return rng.randint(-10**12, 10**12)
+    if choice == 1:
+        return rng.random() * 10**rng.randint(-300, 300)
+    if choice == 2:
+        return 'a"\\é\n' * rng.randint(0, 3)
+    if choice == 3:
+        return None
+    if choice == 4:
+        return rng.choice([True, False])
+    if choice == 5:
+        return -1.5e-7
+    if choice in {6, 7}:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f"k{idx}": _random_value(rng, depth + 1) for idx in range(rng.randint(0, 4))}
+
+
+class TestToolsJsonStream(unittest.TestCase):
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self._test_root = test_utils.dir_test_root(self.id().split('.')[-3:])
+
+    def setUp(self) -> None:
+        test_utils.remake_dirs(self._test_root)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        if os.path.isdir(self._test_root):
+            shutil.rmtree(self._test_root)
+        return super().tearDown()
+
+    # public: test cases
+    def test_read_00(self) -> None:
+        # any chunk size gives the same result as json.loads, values not consumed are skipped
+        rng = random.Random(0)
+        for _ in range(100):
+            doc = {f"k{idx}": _random_value(rng) for idx in range(rng.randint(0, 6))}
+            doc_str = json.dumps(doc, indent=rng.choice([None, 1]))
+            for chunk_size in [1, 3, 1024]:
+                reader = json_stream.JsonStreamReader(io.StringIO(doc_str), chunk_size=chunk_size)
+                result = {}
+                for key in reader.iter_keys():
+                    c = reader.peek()
+                    if rng.random() < 0.3:
+                        continue
+                    if c == '[':
+                        result[key] = list(reader.iter_array_items())
+                    elif c == '{':
+                        result[key] = dict(reader.iter_object_items())
+                    else:
+                        result[key] = reader.read_value()
+                self.assertEqual({k: v for k, v in doc.items() if k in result}, result)
+
+    def test_read_01(self) -> None:
+        for doc_str in ['{"a": [1, 2}', '{"a": 1', '{"a" 1}', '[1]', '{"a": tru}', '{"a": [1,]}', '{"a": 1.}']:
+            with self.assertRaises(json.JSONDecodeError):
+                reader = json_stream.JsonStreamReader(io.StringIO(doc_str), chunk_size=2)
+                for _ in reader.iter_keys():
+                    pass
+
+    def test_coco_annotations_00(self) -> None:
+        # annotations before images and categories: read in a second pass
+        coco_file_path = os.path.join(self._test_root, 'coco.json')
+        with open(coco_file_path, 'w') as f:
+            f.write('{"annotations": [{"id": 1}, {"id": 2}], "images": [{"id": 1}], "categories": []}')
+        sections: dict = {}
+        annotations_iter = annotations._iter_coco_annotations(coco_file_path=coco_file_path, sections=sections)
+        self.assertEqual({'id': 1}, next(annotations_iter))
+        self.assertEqual({'images': [{'id': 1}], 'categories': [], 'annotations': True}, sections)
+        self.assertEqual([{'id': 2}], list(annotations_iter))
+
+        # bad json
+        with open(coco_file_path, 'w') as f:
+            f.write('{"images": [{"id": 1}], "categories": [], "annotations": [{"id": 1},')
+        with self.assertRaises(MirRuntimeError):
+            list(annotations._iter_coco_annotations(coco_file_path=coco_file_path, sections={}))
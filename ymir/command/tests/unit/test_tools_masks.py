@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+import pycocotools.mask
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import masks
+from mir.tools.eval import sem_seg_eval_mm
+
+
+def _rle(bitmap: np.ndarray) -> dict:
+    rle = pycocotools.mask.encode(np.asfortranarray(bitmap.astype(np.uint8)))
+    return {'counts': rle['counts'].decode('ascii'), 'size': rle['size']}
+
+
+class TestToolsMasks(unittest.TestCase):
+    # public: test cases
+    def test_ops_00(self) -> None:
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            h, w = rng.integers(1, 30, size=2)
+            a = rng.random((h, w)) < rng.random()
+            b = rng.random((h, w)) < rng.random()
+            self.assertTrue(np.array_equal(~a, pycocotools.mask.decode(masks.complement(_rle(a))).astype(bool)))
+            self.assertEqual(int((a & ~b).sum()), masks.area(masks.difference(_rle(a), _rle(b))))
+            self.assertEqual(int((a | b).sum()), masks.area(masks.union([_rle(a), _rle(b)])))
+            self.assertEqual(int((a & b).sum()), masks.area(masks.intersect([_rle(a), _rle(b)])))
+
+    def test_annotation_rle_00(self) -> None:
+        annotation = mirpb.ObjectAnnotation()
+        annotation.type = mirpb.ObjectSubType.OST_SEG_POLYGON
+        for x, y in [(2, 2), (10, 2), (10, 8), (2, 8)]:
+            annotation.polygon.append(mirpb.IntPoint(x=x, y=y))
+        expected_rle = masks.polygon_rle(polygon=annotation.polygon, hw=(20, 30))
+
+        # box and area filled, polygon not converted into mask
+        masks.fill_box_and_area(annotation=annotation, mask_hw=(0, 0))
+        self.assertFalse(annotation.mask)
+        self.assertEqual(masks.area(expected_rle), annotation.mask_area)
+        self.assertEqual((2, 2, 8, 6), (annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h))
+
+        # polygon converted with image size in metadata
+        self.assertEqual(expected_rle, masks.annotation_rle(annotation=annotation, hw=(20, 30)))
+
+        annotation = mirpb.ObjectAnnotation()
+        annotation.type = mirpb.ObjectSubType.OST_SEG_MASK
+        annotation.mask = expected_rle['counts'].decode('ascii')
+        masks.fill_box_and_area(annotation=annotation, mask_hw=(20, 30))
+        self.assertEqual(masks.area(expected_rle), annotation.mask_area)
+        self.assertEqual((2, 2, 8, 6), (annotation.box.x, annotation.box.y, annotation.box.w, annotation.box.h))
+        self.assertEqual(masks.area(expected_rle), masks.area(masks.annotation_rle(annotation=annotation,
+                                                                                   hw=(20, 30))))
+
+    def test_sem_seg_areas_00(self) -> None:
+        # overlapped annotations: later one wins, same as a painted label image
+        rng = np.random.default_rng(1)
+        hw = (24, 32)
+        class_ids = [1, 2, 3]
+
+        def _image_annotations() -> mirpb.SingleImageAnnotations:
+            image_annotations = mirpb.SingleImageAnnotations()
+            for class_id in [1, 2, 3, 1, 4]:
+                annotation = image_annotations.boxes.add()
+                annotation.class_id = class_id
+                annotation.type = mirpb.ObjectSubType.OST_SEG_MASK
+                annotation.mask = _rle(rng.random(hw) < 0.3)['counts']
+            return image_annotations
+
+        def _label_image(image_annotations: mirpb.SingleImageAnnotations) -> np.ndarray:
+            img = np.full(hw, 255, dtype=np.uint8)
+            for annotation in image_annotations.boxes:
+                if annotation.class_id in class_ids:
+                    bitmap = pycocotools.mask.decode({'counts': annotation.mask, 'size': list(hw)})
+                    img[bitmap == 1] = class_ids.index(annotation.class_id)
+            return img
+
+        dt_annotations, gt_annotations = _image_annotations(), _image_annotations()
+        dt, gt = _label_image(dt_annotations), _label_image(gt_annotations)
+        dt, gt = dt[gt != 255], gt[gt != 255]
+        expected_intersect = np.bincount(dt[dt == gt], minlength=3)[:3]
+        expected_dt = np.bincount(dt, minlength=3)[:3]
+        expected_gt = np.bincount(gt, minlength=3)[:3]
+
+        area_intersect, area_union, area_gt = sem_seg_eval_mm._asset_areas(dt_annotations=dt_annotations,
+                                                                           gt_annotations=gt_annotations,
+                                                                           hw=hw,
+                                                                           class_ids=class_ids)
+        self.assertEqual(expected_intersect.tolist(), area_intersect.tolist())
+        self.assertEqual((expected_dt + expected_gt - expected_intersect).tolist(), area_union.tolist())
+        self.assertEqual(expected_gt.tolist(), area_gt.tolist())
@@ -0,0 +1,111 @@
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import metadatas, mir_storage, settings as mir_settings
+from mir.tools.errors import MirRuntimeError
+from mir.tools.phase_logger import PhaseLoggerCenter
+from tests import utils as test_utils
+
+
+class TestMetadatas(unittest.TestCase):
+    # life cycle
+    def __init__(self, methodName: str) -> None:
+        super().__init__(methodName=methodName)
+        self._test_root = test_utils.dir_test_root(self.id().split(".")[-3:])
+        self._assets_root = os.path.join(self._test_root, 'assets')
+
+    def setUp(self) -> None:
+        test_utils.remake_dirs(self._assets_root)
+        PhaseLoggerCenter.create_phase_loggers(top_phase='import', monitor_file=None, task_name='import-task')
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        if os.path.isdir(self._test_root):
+            shutil.rmtree(self._test_root)
+        return super().tearDown()
+
+    # protected: misc
+    def _make_images(self) -> list:
+        image_paths = []
+        for fmt, modes in [('JPEG', ['L', 'RGB', 'CMYK']), ('PNG', ['1', 'L', 'P', 'RGB', 'RGBA', 'LA', 'I;16']),
+                           ('BMP', ['1', 'L', 'P', 'RGB'])]:
+            for mode in modes:
+                for size in [(1, 1), (17, 33)]:
+                    image_path = os.path.join(self._test_root, f"{fmt}-{mode.replace(';', '')}-{size[0]}x{size[1]}")
+                    Image.new(mode, size).save(image_path, fmt)
+                    image_paths.append(image_path)
+        return image_paths
+
+    def _store_assets(self, image_paths: list) -> dict:
+        file_name_to_asset_ids = {}
+        for image_path in image_paths:
+            asset_id, _ = mir_storage.sha1sum_and_store_file(image_path, self._assets_root)
+            file_name_to_asset_ids[os.path.basename(image_path)] = asset_id
+        return file_name_to_asset_ids
+
+    # public: test cases
+    def test_read_header_00(self) -> None:
+        # header parsers should always agree with PIL, or leave it to PIL
+        for image_path in self._make_images():
+            type_shape = metadatas._read_header_type_shape(image_path)
+            if type_shape is not None:
+                self.assertEqual(metadatas._pil_type_shape(image_path), type_shape, image_path)
+
+        self.assertEqual((mirpb.AssetTypeImageJpeg, 500, 281, 3),
+                         metadatas._read_header_type_shape(os.path.join('tests', 'assets', '2007_000032.jpg')))
+
+    def test_read_header_01(self) -> None:
+        # not an image
+        not_image_path = os.path.join(self._test_root, 'a.txt')
+        with open(not_image_path, 'w') as f:
+            f.write('not an image')
+        self.assertIsNone(metadatas._read_header_type_shape(not_image_path))
+        self.assertEqual((mirpb.AssetTypeUnknown, 0, 0, 0), metadatas._type_shape_for_asset(not_image_path))
+
+        # truncated jpeg, left to PIL
+        truncated_path = os.path.join(self._test_root, 'truncated.jpg')
+        with open(truncated_path, 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0\x00')
+        self.assertIsNone(metadatas._read_header_type_shape(truncated_path))
+
+    def test_import_metadatas_00(self) -> None:
+        image_paths = self._make_images()
+        not_image_path = os.path.join(self._test_root, 'a.txt')
+        with open(not_image_path, 'w') as f:
+            f.write('not an image')
+        file_name_to_asset_ids = self._store_assets(image_paths + [not_image_path])
+
+        # serial and pooled extraction should get the same results
+        mir_metadatas_list = []
+        for workers in [1, 2]:
+            mir_metadatas = mirpb.MirMetadatas()
+            names_to_ids = dict(file_name_to_asset_ids)
+            with mock.patch.object(mir_settings, 'METADATAS_POOL_MIN_ASSETS', 1):
+                metadatas.import_metadatas(mir_metadatas=mir_metadatas,
+                                           file_name_to_asset_ids=names_to_ids,
+                                           hashed_asset_root=self._assets_root,
+                                           phase='import.others',
+                                           workers=workers)
+            self.assertFalse('a.txt' in names_to_ids)
+            self.assertEqual(len(image_paths), len(mir_metadatas.attributes))
+            mir_metadatas_list.append(mir_metadatas)
+        self.assertEqual(mir_metadatas_list[0], mir_metadatas_list[1])
+
+        attrs = mir_metadatas_list[0].attributes[file_name_to_asset_ids['PNG-RGBA-17x33']]
+        self.assertEqual((mirpb.AssetTypeImagePng, 17, 33, 4), (attrs.asset_type, attrs.width, attrs.height,
+                                                                 attrs.image_channels))
+        self.assertEqual('PNG-RGBA-17x33', attrs.origin_filename)
+        self.assertTrue(attrs.byte_size > 0)
+
+        # missing asset
+        with self.assertRaises(MirRuntimeError):
+            metadatas.import_metadatas(mir_metadatas=mirpb.MirMetadatas(),
+                                       file_name_to_asset_ids={'a.jpg': 'a' * 40},
+                                       hashed_asset_root=self._assets_root,
+                                       phase='import.others',
+                                       workers=1)
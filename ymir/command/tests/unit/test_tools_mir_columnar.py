@@ -0,0 +1,194 @@
+import os
+import shutil
+import time
+import unittest
+from unittest import mock
+
+import google.protobuf.json_format as pb_format
+
+from mir.protos import mir_command_pb2 as mirpb
+from mir.tools import mir_columnar, mir_storage_ops, settings as mir_settings
+from tests import utils as test_utils
+
+
+class TestMirColumnar(unittest.TestCase):
+    # life cycle
+    def __init__(self, methodName: str) -> None:
+        super().__init__(methodName=methodName)
+        self._mir_root = test_utils.dir_test_root(self.id().split(".")[-3:])
+
+    def setUp(self) -> None:
+        test_utils.remake_dirs(self._mir_root)
+        test_utils.mir_repo_init(self._mir_root)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        if os.path.isdir(self._mir_root):
+            shutil.rmtree(self._mir_root)
+        return super().tearDown()
+
+    # protected: misc
+    def _prepare_mir_pb(self) -> tuple:
+        mir_metadatas = mirpb.MirMetadatas()
+        pb_format.ParseDict({'attributes': {
+            'a001': {'width': 100, 'height': 100},
+            'a002': {'width': 100, 'height': 100},
+            'a003': {'width': 100, 'height': 100},
+        }}, mir_metadatas)
+
+        mir_annotations = mirpb.MirAnnotations()
+        pb_format.ParseDict({
+            'prediction': {
+                'type': mirpb.ObjectType.OT_DET,
+                'eval_class_ids': [1, 2],
+                'executor_config': 'a: 1',
+                'image_annotations': {
+                    'a002': {
+                        'boxes': [{
+                            'index': 0,
+                            'box': {'x': 1, 'y': 2, 'w': 3, 'h': 4},
+                            'class_id': 2,
+                            'score': 0.5,
+                            'tags': {'color': 'red'},
+                        }]
+                    },
+                    'a001': {
+                        'boxes': [{
+                            'index': 0,
+                            'box': {'x': 10, 'y': 20, 'w': 30, 'h': 40},
+                            'class_id': 1,
+                            'score': 0.25,
+                        }, {
+                            'index': 1,
+                            'box': {'x': 11, 'y': 21, 'w': 31, 'h': 41},
+                            'class_id': 2,
+                            'score': 0.75,
+                        }]
+                    },
+                }
+            },
+            'ground_truth': {
+                'type': mirpb.ObjectType.OT_DET,
+                'image_annotations': {
+                    'a003': {
+                        'boxes': [{
+                            'index': 0,
+                            'box': {'x': 5, 'y': 6, 'w': 7, 'h': 8},
+                            'class_id': 1,
+                        }]
+                    },
+                }
+            },
+            'image_cks': {
+                'a001': {'cks': {'weather': 'sunny'}, 'image_quality': 0.5},
+            },
+        }, mir_annotations)
+        return mir_metadatas, mir_annotations
+
+    def _commit(self, mir_metadatas: mirpb.MirMetadatas, mir_annotations: mirpb.MirAnnotations,
+                columnar_sidecars: int, tid: str = 't0') -> None:
+        task = mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeImportData,
+                                                  task_id=tid,
+                                                  message='import')
+        with mock.patch.object(mir_settings, 'COLUMNAR_SIDECARS', columnar_sidecars):
+            mir_storage_ops.MirStorageOps.save_and_commit(mir_root=self._mir_root,
+                                                          mir_branch='a',
+                                                          his_branch='master',
+                                                          mir_datas={
+                                                              mirpb.MirStorage.MIR_METADATAS: mir_metadatas,
+                                                              mirpb.MirStorage.MIR_ANNOTATIONS: mir_annotations,
+                                                          },
+                                                          task=task)
+
+    def _sidecar_names(self) -> set:
+        return set(os.listdir(mir_columnar.sidecar_root(self._mir_root)))
+
+    def _check_reader(self, reader: mir_columnar.ColumnarAnnotations,
+                      expected_annotations: mirpb.MirAnnotations) -> None:
+        self.assertEqual(expected_annotations, reader.to_pb())
+
+        prediction = reader.prediction
+        self.assertEqual(2, len(prediction))
+        self.assertEqual(['a001', 'a002'], list(prediction.asset_ids()))
+        self.assertTrue('a001' in prediction)
+        self.assertFalse('a003' in prediction)
+        self.assertFalse('a0011' in prediction)
+        self.assertIsNone(prediction.get('a003'))
+        self.assertEqual(expected_annotations.prediction.image_annotations['a002'], prediction.get('a002'))
+        self.assertEqual([1, 2], list(prediction.header.eval_class_ids))
+        self.assertEqual('a: 1', prediction.header.executor_config)
+        self.assertEqual(0, len(prediction.header.image_annotations))
+
+        box_columns = prediction.box_columns('a001')
+        self.assertEqual([10, 11], box_columns['x'].tolist())
+        self.assertEqual([40, 41], box_columns['h'].tolist())
+        self.assertEqual([1, 2], box_columns['class_id'].tolist())
+        self.assertEqual([0.25, 0.75], box_columns['score'].tolist())
+        self.assertIsNone(prediction.box_columns('a003'))
+        self.assertEqual([0, 2, 3], prediction.box_offsets.tolist())
+        self.assertEqual([10, 11, 1], prediction.columns['x'].tolist())
+
+        self.assertEqual(['a003'], list(reader.ground_truth.asset_ids()))
+        self.assertEqual('sunny', reader.get_image_cks('a001').cks['weather'])
+        self.assertIsNone(reader.get_image_cks('a002'))
+
+    # public: test cases
+    def test_sidecar_00(self):
+        mir_metadatas, mir_annotations = self._prepare_mir_pb()
+        self._commit(mir_metadatas=mir_metadatas, mir_annotations=mir_annotations, columnar_sidecars=2)
+
+        saved_annotations = mir_storage_ops.MirStorageOps.load_single_storage(mir_root=self._mir_root,
+                                                                              mir_branch='a',
+                                                                              mir_task_id='t0',
+                                                                              ms=mirpb.MirStorage.MIR_ANNOTATIONS)
+        blob_hash = mir_columnar.locate_annotations_blob(mir_root=self._mir_root, rev='a@t0')
+        self.assertEqual({blob_hash}, self._sidecar_names())
+
+        reader = mir_storage_ops.MirStorageOps.load_columnar_annotations(mir_root=self._mir_root,
+                                                                         mir_branch='a',
+                                                                         mir_task_id='t0')
+        self.assertIsInstance(reader, mir_columnar.ColumnarAnnotations)
+        self._check_reader(reader=reader, expected_annotations=saved_annotations)
+
+    def test_sidecar_01(self):
+        # off by default: no sidecar, annotations.mir should be parsed
+        mir_metadatas, mir_annotations = self._prepare_mir_pb()
+        self._commit(mir_metadatas=mir_metadatas, mir_annotations=mir_annotations, columnar_sidecars=0)
+        self.assertFalse(os.path.isdir(mir_columnar.sidecar_root(self._mir_root)))
+        self.assertIsNone(
+            mir_storage_ops.MirStorageOps.load_columnar_annotations(mir_root=self._mir_root,
+                                                                    mir_branch='a',
+                                                                    mir_task_id='t0'))
+
+    def test_sidecar_02(self):
+        # keeps most recently used sidecars, removes the others, unfinished ones, and all of them when turned off
+        mir_metadatas, mir_annotations = self._prepare_mir_pb()
+        blob_hashes = []
+        for idx in range(3):
+            mir_annotations.prediction.executor_config = f"a: {idx}"
+            self._commit(mir_metadatas=mir_metadatas,
+                         mir_annotations=mir_annotations,
+                         columnar_sidecars=2,
+                         tid=f"t{idx}")
+            blob_hashes.append(mir_columnar.locate_annotations_blob(mir_root=self._mir_root, rev=f"a@t{idx}"))
+            # mtime resolution of some file systems
+            time.sleep(0.01)
+        self.assertEqual(set(blob_hashes[1:]), self._sidecar_names())
+
+        self.assertIsNotNone(mir_columnar.open_annotations_sidecar(mir_root=self._mir_root, blob_hash=blob_hashes[1]))
+        os.makedirs(os.path.join(mir_columnar.sidecar_root(self._mir_root), f"{blob_hashes[0]}.tmp-1"))
+        time.sleep(0.01)
+        mir_annotations.prediction.executor_config = 'a: 3'
+        self._commit(mir_metadatas=mir_metadatas, mir_annotations=mir_annotations, columnar_sidecars=2, tid='t3')
+        self.assertEqual({blob_hashes[1], mir_columnar.locate_annotations_blob(mir_root=self._mir_root, rev='a@t3')},
+                         self._sidecar_names())
+
+        self._commit(mir_metadatas=mir_metadatas, mir_annotations=mir_annotations, columnar_sidecars=0, tid='t4')
+        self.assertFalse(os.path.isdir(mir_columnar.sidecar_root(self._mir_root)))
+
+    def test_git_blob_hash(self):
+        mir_metadatas, mir_annotations = self._prepare_mir_pb()
+        self._commit(mir_metadatas=mir_metadatas, mir_annotations=mir_annotations, columnar_sidecars=0)
+        with open(os.path.join(self._mir_root, 'annotations.mir'), 'rb') as f:
+            self.assertEqual(mir_columnar.locate_annotations_blob(mir_root=self._mir_root, rev='a@t0'),
+                             mir_columnar.git_blob_hash(f.read()))
@@ -1,7 +1,9 @@
 import logging
 import os
+import random
 import shutil
 import unittest
+from unittest import mock
 
 import google.protobuf.json_format as pb_format
 from google.protobuf.json_format import MessageToDict
@@ -9,6 +11,7 @@ from google.protobuf.json_format import MessageToDict
 from mir.protos import mir_command_pb2 as mirpb
 from mir.tools import mir_storage, mir_storage_ops, settings as mir_settings
 from mir.tools.annotations import make_empty_mir_annotations
+from mir.tools.eval import eval_deferred
 from tests import utils as test_utils
 
 
@@ -324,3 +327,162 @@ class TestMirStorage(unittest.TestCase):
             logging.info(f"expected: {mir_context}")
             logging.info(f"actual: {loaded_mir_context}")
             raise e
+
+    # protected: random mir datas
+    def _make_random_mir_datas(self, asset_ids: list, rng: random.Random) -> tuple:
+        mir_metadatas = mirpb.MirMetadatas()
+        mir_annotations = make_empty_mir_annotations()
+        for task_annotations in [mir_annotations.prediction, mir_annotations.ground_truth]:
+            task_annotations.type = mirpb.ObjectType.OT_DET
+        mir_annotations.prediction.eval_class_ids[:] = [1, 2]
+        for asset_id in asset_ids:
+            mir_metadatas.attributes[asset_id].byte_size = rng.randint(1, 4 * mir_settings.BYTES_PER_MB)
+            for task_annotations in [mir_annotations.prediction, mir_annotations.ground_truth]:
+                # some assets are negative
+                for index in range(rng.randint(-1, 3)):
+                    annotation = task_annotations.image_annotations[asset_id].boxes.add()
+                    annotation.index = index
+                    annotation.class_id = rng.randint(0, 4)
+                    annotation.mask_area = rng.randint(0, 100)
+                    annotation.box.x, annotation.box.y = rng.randint(0, 50), rng.randint(0, 50)
+                    annotation.box.w, annotation.box.h = rng.randint(10, 50), rng.randint(10, 50)
+                    annotation.score = rng.random()
+                    if rng.random() < 0.5:
+                        annotation.tags['color'] = rng.choice(['red', 'blue'])
+            if rng.random() < 0.5:
+                mir_annotations.image_cks[asset_id].cks['weather'] = rng.choice(['sunny', 'rainy'])
+        return mir_metadatas, mir_annotations
+
+    def test_evaluate_policy_00(self):
+        rng = random.Random(0)
+        mir_metadatas, mir_annotations = self._make_random_mir_datas(asset_ids=[f"a{i:03d}" for i in range(20)],
+                                                                     rng=rng)
+
+        def _commit(tid: str, evaluate_policy: mir_storage_ops.EvaluatePolicy) -> mirpb.Task:
+            task = mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeFilter, task_id=tid, message=tid)
+            metadatas, annotations = mirpb.MirMetadatas(), mirpb.MirAnnotations()
+            metadatas.CopyFrom(mir_metadatas)
+            annotations.CopyFrom(mir_annotations)
+            mir_storage_ops.MirStorageOps.save_and_commit(mir_root=self._mir_root,
+                                                          mir_branch='a',
+                                                          his_branch='master',
+                                                          mir_datas={
+                                                              mirpb.MirStorage.MIR_METADATAS: metadatas,
+                                                              mirpb.MirStorage.MIR_ANNOTATIONS: annotations
+                                                          },
+                                                          task=task,
+                                                          evaluate_policy=evaluate_policy)
+            mir_tasks: mirpb.MirTasks = mir_storage_ops.MirStorageOps.load_single_storage(
+                mir_root=self._mir_root, mir_branch='a', mir_task_id=tid, ms=mirpb.MirStorage.MIR_TASKS)
+            return mir_tasks.tasks[tid]
+
+        sync_task = _commit(tid='t-sync', evaluate_policy=mir_storage_ops.EvaluatePolicy.SYNC)
+        self.assertEqual(mirpb.EvaluationState.ES_READY, sync_task.evaluation.state)
+
+        off_task = _commit(tid='t-off', evaluate_policy=mir_storage_ops.EvaluatePolicy.OFF)
+        self.assertEqual(mirpb.EvaluationState.ES_NOT_SET, off_task.evaluation.state)
+
+        # deferred: pending after commit, evaluated by worker, and same as sync
+        with mock.patch.object(eval_deferred, 'start_worker') as mock_start_worker:
+            deferred_task = _commit(tid='t-deferred', evaluate_policy=mir_storage_ops.EvaluatePolicy.DEFERRED)
+        mock_start_worker.assert_called_once_with(mir_root=self._mir_root)
+        self.assertEqual(mirpb.EvaluationState.ES_PENDING, deferred_task.evaluation.state)
+        self.assertEqual(['a@t-deferred'], eval_deferred.pending_rev_tids(self._mir_root))
+
+        self.assertEqual(1, eval_deferred.run_pending(self._mir_root))
+        self.assertEqual([], eval_deferred.pending_rev_tids(self._mir_root))
+        mir_tasks = mir_storage_ops.MirStorageOps.load_single_storage(mir_root=self._mir_root,
+                                                                      mir_branch='a',
+                                                                      mir_task_id='t-deferred',
+                                                                      ms=mirpb.MirStorage.MIR_TASKS)
+        self.assertEqual(sync_task.evaluation, mir_tasks.tasks['t-deferred'].evaluation)
+
+        # nothing to defer: state decided on commit
+        mir_annotations.prediction.eval_class_ids[:] = []
+        with mock.patch.object(eval_deferred, 'start_worker') as mock_start_worker:
+            deferred_task = _commit(tid='t-deferred-1', evaluate_policy=mir_storage_ops.EvaluatePolicy.DEFERRED)
+        mock_start_worker.assert_not_called()
+        self.assertEqual(mirpb.EvaluationState.ES_NOT_ENOUGH_CLASS_IDS, deferred_task.evaluation.state)
+
+    def test_evaluate_policy_01(self):
+        rng = random.Random(0)
+        mir_metadatas, mir_annotations = self._make_random_mir_datas(asset_ids=[f"a{i:03d}" for i in range(20)],
+                                                                     rng=rng)
+        mir_annotations.prediction.eval_class_ids[:] = [0, 1]
+        for tid in ['t-stale', 't-error']:
+            task = mir_storage_ops.create_task_record(task_type=mirpb.TaskType.TaskTypeFilter, task_id=tid, message=tid)
+            with mock.patch.object(eval_deferred, 'start_worker'):
+                mir_storage_ops.MirStorageOps.save_and_commit(mir_root=self._mir_root,
+                                                              mir_branch='a',
+                                                              his_branch='master',
+                                                              mir_datas={
+                                                                  mirpb.MirStorage.MIR_METADATAS: mir_metadatas,
+                                                                  mirpb.MirStorage.MIR_ANNOTATIONS: mir_annotations
+                                                              },
+                                                              task=task,
+                                                              evaluate_policy=mir_storage_ops.EvaluatePolicy.DEFERRED)
+        self.assertEqual(['a@t-error', 'a@t-stale'], eval_deferred.pending_rev_tids(self._mir_root))
+
+        # t-stale: taken by a worker which died, t-error: evaluation raises
+        evaluations_root = eval_deferred.evaluations_root(self._mir_root)
+        os.rename(os.path.join(evaluations_root, 'a@t-stale.pending'),
+                  os.path.join(evaluations_root, 'a@t-stale.running'))
+        with mock.patch.object(eval_deferred.eval_ops, 'evaluate_with_pb', side_effect=ValueError('bad eval')):
+            self.assertEqual(0, eval_deferred.run_worker(self._mir_root))
+
+        # neither stays pending
+        self.assertEqual([], eval_deferred.pending_rev_tids(self._mir_root))
+        self.assertEqual(['a@t-error.mir', 'a@t-stale.mir', 'worker.lock'], sorted(os.listdir(evaluations_root)))
+        for tid in ['t-stale', 't-error']:
+            mir_tasks = mir_storage_ops.MirStorageOps.load_single_storage(mir_root=self._mir_root,
+                                                                          mir_branch='a',
+                                                                          mir_task_id=tid,
+                                                                          ms=mirpb.MirStorage.MIR_TASKS)
+            evaluation = mir_tasks.tasks[tid].evaluation
+            self.assertEqual(mirpb.EvaluationState.ES_NOT_SET, evaluation.state)
+            self.assertEqual([0, 1], list(evaluation.config.class_ids))
+
+        # at most one worker for a mir repo
+        mock_lock = mock.MagicMock()
+        with mock.patch.object(eval_deferred, '_worker_lock', return_value=mock_lock), \
+                mock.patch.object(eval_deferred.subprocess, 'Popen') as mock_popen:
+            mock_lock.acquire.return_value = False
+            eval_deferred.start_worker(self._mir_root)
+            mock_popen.assert_not_called()
+
+            mock_lock.acquire.return_value = True
+            eval_deferred.start_worker(self._mir_root)
+            mock_lock.release.assert_called_once()
+            mock_popen.assert_called_once()
+
+    def test_store_file_00(self):
+        src_path = os.path.join(self._mir_root, 'src.jpg')
+        with open(src_path, 'wb') as f:
+            f.write(os.urandom(3 * mir_storage.HASH_BUFFER_SIZE + 7))
+        assets_root = os.path.join(self._mir_root, 'assets')
+        for hardlink in [False, True]:
+            shutil.rmtree(assets_root, ignore_errors=True)
+            os.makedirs(assets_root)
+            asset_id, stored = mir_storage.sha1sum_and_store_file(src_path, assets_root, hardlink=hardlink)
+            self.assertEqual((mir_storage.sha1sum_for_file(src_path), True), (asset_id, stored))
+            asset_path = mir_storage.get_asset_storage_path(assets_root, asset_id)
+            self.assertEqual(mir_storage.sha1sum_for_file(asset_path), asset_id)
+            self.assertEqual(hardlink, os.stat(asset_path).st_ino == os.stat(src_path).st_ino)
+
+            # already stored: not stored again, no temp files left
+            self.assertEqual((asset_id, False),
+                             mir_storage.sha1sum_and_store_file(src_path, assets_root, hardlink=hardlink))
+            self.assertEqual([asset_id[-2:]], os.listdir(assets_root))
+
+            # error after copy: no temp files left
+            shutil.rmtree(assets_root)
+            os.makedirs(assets_root)
+            with mock.patch.object(mir_storage, '_commit_stored_file', side_effect=OSError('disk full')):
+                with self.assertRaises(OSError):
+                    mir_storage.sha1sum_and_store_file(src_path, assets_root, hardlink=hardlink)
+            self.assertEqual([], os.listdir(assets_root))
+
+        # source file not found
+        with self.assertRaises(FileNotFoundError):
+            mir_storage.sha1sum_and_store_file(os.path.join(self._mir_root, 'fake.jpg'), assets_root)
+        self.assertEqual([], os.listdir(assets_root))
@@ -1,14 +1,16 @@
+from collections import OrderedDict
 import json
 import os
 import shutil
 from typing import Tuple
 import unittest
+from unittest import mock
 
 from google.protobuf import json_format
 import numpy as np
 
 from mir.protos import mir_command_pb2 as mirpb
-from mir.tools.eval import eval_ops
+from mir.tools.eval import eval_ops, sem_seg_eval_mm
 from tests import utils as test_utils
 
 
@@ -194,3 +196,29 @@ class TestToolsSegEval(unittest.TestCase):
             for oa in sia.boxes:
                 self.assertEqual(-1, oa.det_link_id)
                 self.assertEqual(mirpb.ConfusionMatrixType.NotSet, oa.cm)
+
+    def test_sem_seg_eval_02(self) -> None:
+        # process pool shards give the same result as single process
+        mir_metadatas, mir_annotations = self._load_mirdatas(
+            filepath=os.path.join('tests', 'assets', 'test_eval_sem_seg.json'))
+        asset_id_to_hws = OrderedDict(
+            (asset_id, (mir_metadatas.attributes[asset_id].height, mir_metadatas.attributes[asset_id].width))
+            for asset_id in sorted(mir_metadatas.attributes.keys()))
+
+        expected_metrics, expected_iou = sem_seg_eval_mm._mir_mean_iou(
+            prediction=mir_annotations.prediction,
+            ground_truth=mir_annotations.ground_truth,
+            class_ids=[1, 3],
+            asset_id_to_hws=asset_id_to_hws,
+            workers=0)
+        self.assertTrue(np.isclose(0.50211951, expected_metrics.mIoU, atol=1e-7))
+        self.assertEqual((len(asset_id_to_hws), 2), expected_iou.shape)
+
+        with mock.patch.object(sem_seg_eval_mm.mir_settings, 'SEM_SEG_EVAL_POOL_MIN_ASSETS', 0):
+            metrics, iou = sem_seg_eval_mm._mir_mean_iou(prediction=mir_annotations.prediction,
+                                                         ground_truth=mir_annotations.ground_truth,
+                                                         class_ids=[1, 3],
+                                                         asset_id_to_hws=asset_id_to_hws,
+                                                         workers=2)
+        self.assertEqual(expected_metrics, metrics)
+        self.assertTrue(np.array_equal(expected_iou, iou))
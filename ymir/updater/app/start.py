@@ -2,7 +2,7 @@ import logging
 import os
 import sys
 
-from common_utils.sandbox_updater import update
+from common_utils.sandbox_updater import resume_src_version, update
 from common_utils.sandbox_util import detect_sandbox_src_versions
 from mir.version import YMIR_REPO_VERSION
 
@@ -10,15 +10,21 @@ from mir.version import YMIR_REPO_VERSION
 def main() -> int:
     sandbox_root = os.environ['BACKEND_SANDBOX_ROOT']
 
-    sandbox_versions = detect_sandbox_src_versions(sandbox_root)
-    if len(sandbox_versions) != 1:
-        raise Exception(f"invalid sandbox versions: {sandbox_versions}")
+    # an interrupted update resumes with its own src version, labels of some users may be updated already
+    src_ver = resume_src_version(sandbox_root)
+    if not src_ver:
+        sandbox_versions = detect_sandbox_src_versions(sandbox_root)
+        if len(sandbox_versions) != 1:
+            raise Exception(f"invalid sandbox versions: {sandbox_versions}")
+        src_ver = sandbox_versions[0]
 
+    workers = os.environ.get('UPDATER_WORKERS')
     update(sandbox_root=sandbox_root,
            assets_root=os.environ['ASSETS_PATH'],
            models_root=os.environ['MODELS_PATH'],
-           src_ver=sandbox_versions[0],
-           dst_ver=YMIR_REPO_VERSION)
+           src_ver=src_ver,
+           dst_ver=YMIR_REPO_VERSION,
+           workers=int(workers) if workers else None)
 
     return 0
 
@@ -20,9 +20,9 @@ import re
 import tarfile
 from typing import List, Tuple
 
-from google.protobuf.json_format import MessageToDict, ParseDict
 import yaml
 
+from common_utils.sandbox_checkpoint import RepoCheckpoint
 from id_definition.task_id import IDProto
 from mir.tools import revs_parser
 from mir.protos import mir_command_110_pb2 as pb_src, mir_command_200_pb2 as pb_dst
@@ -39,19 +39,29 @@ _DST_YMIR_VER = '2.0.0'
 
 
 # update user repo
-def update_repo(mir_root: str, assets_root: str, models_root: str) -> None:
+def update_repo(mir_root: str, assets_root: str, models_root: str, checkpoint: RepoCheckpoint) -> int:
     logging.info(f"updating repo: {mir_root}, {_SRC_YMIR_VER} -> {_DST_YMIR_VER}")
 
+    updated_tags = 0
     for tag in get_repo_tags(mir_root):
         if not re.match(f"^.{{{IDProto.ID_LENGTH}}}@.{{{IDProto.ID_LENGTH}}}$", tag):
             logging.info(f"    skip: {tag}")
             continue
+        if tag in checkpoint.done_tags:
+            logging.info(f"    already updated: {tag}")
+            continue
 
         logging.info(f"    updating: {tag}")
         rev_tid = revs_parser.parse_single_arg_rev(src_rev=tag, need_tid=True)
         datas_src = _load(mir_root, rev_tid)
         datas_dst = _update(datas_src, assets_root, models_root)
+        checkpoint.begin(tag)
         _save(mir_root, rev_tid, datas_dst)
+        checkpoint.done(tag)
+        updated_tags += 1
+
+    checkpoint.finish()
+    return updated_tags
 
 
 def _load(mir_root: str, rev_tid: revs_parser.TypRevTid) -> _MirDatasSrc:
@@ -85,38 +95,42 @@ def _save(mir_root: str, rev_tid: revs_parser.TypRevTid, datas_dst: _MirDatasDst
 
 
 def _update_metadatas(mir_metadatas_src: pb_src.MirMetadatas, assets_root: str) -> pb_dst.MirMetadatas:
+    # fields copied directly, schemas of them are the same in both versions
     mir_metadatas_dst = pb_dst.MirMetadatas()
     for asset_id, attr_src in mir_metadatas_src.attributes.items():
-        attr_dst = pb_dst.MetadataAttributes(tvt_type=attr_src.tvt_type,
-                                             asset_type=attr_src.asset_type,
-                                             width=attr_src.width,
-                                             height=attr_src.height,
-                                             image_channels=attr_src.image_channels)
+        attr_dst = mir_metadatas_dst.attributes[asset_id]
+        attr_dst.tvt_type = attr_src.tvt_type
+        attr_dst.asset_type = attr_src.asset_type
+        attr_dst.width = attr_src.width
+        attr_dst.height = attr_src.height
+        attr_dst.image_channels = attr_src.image_channels
 
         attr_dst.timestamp.start = attr_src.timestamp.start
         attr_dst.timestamp.duration = attr_src.timestamp.duration
 
         asset_path = mso_dst.locate_asset_path(location=assets_root, hash=asset_id)
         attr_dst.byte_size = os.stat(asset_path).st_size if asset_path else 0
-
-        mir_metadatas_dst.attributes[asset_id].CopyFrom(attr_dst)
     return mir_metadatas_dst
 
 
 def _update_annotations(mir_annotations_src: pb_src.MirAnnotations) -> pb_dst.MirAnnotations:
     task_annotations_src = mir_annotations_src.task_annotations[mir_annotations_src.head_task_id]
 
+    # fields copied directly, no dict round trip for each box
     mir_annotations_dst = pb_dst.MirAnnotations()
     for asset_id, single_image_annotations_src in task_annotations_src.image_annotations.items():
         single_image_annotations_dst = mir_annotations_dst.ground_truth.image_annotations[asset_id]
         for annotation_src in single_image_annotations_src.annotations:
-            object_annotation_dst = pb_dst.ObjectAnnotation()
-            ParseDict(MessageToDict(annotation_src, preserving_proto_field_name=True, use_integers_for_enums=True),
-                      object_annotation_dst)
+            object_annotation_dst = single_image_annotations_dst.boxes.add()
+            object_annotation_dst.index = annotation_src.index
+            if annotation_src.HasField('box'):
+                box_src, box_dst = annotation_src.box, object_annotation_dst.box
+                box_dst.x, box_dst.y, box_dst.w, box_dst.h = box_src.x, box_src.y, box_src.w, box_src.h
+            object_annotation_dst.class_id = annotation_src.class_id
+            object_annotation_dst.score = annotation_src.score
             object_annotation_dst.anno_quality = -1
             object_annotation_dst.cm = pb_dst.ConfusionMatrixType.NotSet
             object_annotation_dst.det_link_id = -1
-            single_image_annotations_dst.boxes.append(object_annotation_dst)
 
     mir_annotations_dst.ground_truth.task_id = mir_annotations_src.head_task_id
     mir_annotations_dst.ground_truth.type = pb_dst.AnnoType.AT_DET_BOX